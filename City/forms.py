@@ -6,6 +6,8 @@ from .utils.ontology_manager import get_city
 class CityFormMixin:
     def __init__(self, *args, **kwargs):
         self.original_name = kwargs.pop('original_name', None)
+        # False when the caller checks existence itself (bulk_import, one query per batch)
+        self.check_existing = kwargs.pop('check_existing', True)
         super().__init__(*args, **kwargs)
 
     def clean_name(self):
@@ -17,7 +19,7 @@ class CityFormMixin:
         if self.original_name and str(self.original_name).strip().lower() == name.lower():
             return name
 
-        if get_city(name):
+        if self.check_existing and get_city(name):
             raise forms.ValidationError(f"City '{name}' already exists in RDF store.")
 
         return name
@@ -1,3 +1,23 @@
-from django.test import TestCase
+from urllib.parse import quote
 
-# Create your tests here.
+from core.benchmark.testing import StandInTestCase
+
+
+class CityQueryBudgetTests(StandInTestCase):
+    """SPARQL budgets of the city and company pages (RDF only, no SQL)."""
+
+    def test_city_list(self):
+        self.assertViewBudget('/city/', sql=1, sparql=1)
+
+    def test_city_detail(self):
+        for name in self.network['cities'][:3]:
+            with self.subTest(city=name):
+                self.assertViewBudget(f"/city/{quote(name)}/", sql=1, sparql=1)
+
+    def test_company_list(self):
+        self.assertViewBudget('/company/', sql=1, sparql=1)
+
+    def test_company_detail(self):
+        for name in self.network['companies'][:3]:
+            with self.subTest(company=name):
+                self.assertViewBudget(f"/company/{quote(name)}/", sql=1, sparql=1)
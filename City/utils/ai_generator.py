@@ -1,10 +1,10 @@
 import os, json
-from groq import Groq
+from core.utils.llm import chat_completion, groq_client
 
 MODEL = "llama-3.3-70b-versatile"
 
 def generate_city_suggestions(prefs):
-    client = Groq(api_key=os.getenv('GROQ_API_KEY'))
+    client = groq_client(os.getenv('GROQ_API_KEY'))
     prompt = f"""
     Generate a {prefs.get('type','Capital')}City JSON for a Tunisian city.
     Use realistic numbers (population, area, etc.).
@@ -12,6 +12,6 @@ def generate_city_suggestions(prefs):
     {{"name":"Tunis","overall_status":"Planned","population":1200000,"area_km2":212.6,
       "government_seat":true,"ministries":20}}
     """
-    resp = client.chat.completions.create(model=MODEL, messages=[{"role":"user","content":prompt}],
+    resp = chat_completion(client, model=MODEL, messages=[{"role":"user","content":prompt}],
                                           temperature=0.3, max_tokens=500)
     return json.loads(resp.choices[0].message.content.strip())
\ No newline at end of file
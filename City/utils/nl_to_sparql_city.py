@@ -1,5 +1,5 @@
 import os
-from groq import Groq
+from core.utils.llm import chat_completion, groq_client
 
 MODEL = "llama-3.3-70b-versatile"
 
@@ -8,7 +8,7 @@ def city_nl_to_sparql(question: str) -> str:
     api_key = os.getenv('GROQ_API_KEY')
     if not api_key:
         return ""
-    client = Groq(api_key=api_key)
+    client = groq_client(api_key)
 
     schema = """
 PREFIX : <http://www.transport-ontology.org/travel#>
@@ -74,7 +74,8 @@ RULES:
 USER: {question}
 SPARQL:"""
 
-    resp = client.chat.completions.create(
+    resp = chat_completion(
+        client,
         model=MODEL,
         messages=[{"role": "user", "content": prompt}],
         temperature=0.0,
@@ -87,7 +88,7 @@ def city_nl_to_sparql_update(question: str) -> str:
     api_key = os.getenv('GROQ_API_KEY')
     if not api_key:
         return ""
-    client = Groq(api_key=api_key)
+    client = groq_client(api_key)
 
     schema = """
 GRAPH URI: <http://www.transport-ontology.org/travel>
@@ -120,7 +121,8 @@ Requirements:
 User request: {question}
 SPARQL UPDATE:"""
 
-    resp = client.chat.completions.create(
+    resp = chat_completion(
+        client,
         model=MODEL,
         messages=[{"role": "user", "content": schema + "\n" + prompt}],
         temperature=0.0,
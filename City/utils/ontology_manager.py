@@ -1,8 +1,19 @@
 # city/utils/ontology_manager.py
+import logging
 import time
 from rdflib import Graph
 from SPARQLWrapper import SPARQLWrapper, JSON, POST, URLENCODED
 import requests
+from core.utils.fuseki import (
+    get_session, sparql_query_all_graphs, sparql_query_all_graphs_async, query_url, update_url,
+)
+from core.utils.inference import refreshes_inference, subclass_filter, touch_update
+from core.utils.partitions import entity_graph, partition_graph, partitioned
+from core.utils.list_cache import ListCache
+from core.utils.versioning import bumps_version
+from core.utils.timing import timed
+
+logger = logging.getLogger(__name__)
 
 SPARQL_PREFIXES = """
 PREFIX : <http://www.transport-ontology.org/travel#>
@@ -12,17 +23,16 @@ PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
 """
 
 NS = "http://www.transport-ontology.org/travel#"
-FUSEKI_QUERY_URL = "http://localhost:3030/transport_db/query"
-FUSEKI_UPDATE_URL = "http://localhost:3030/transport_db/update"
 
 
 def _run_query(query: str):
-    sw = SPARQLWrapper(FUSEKI_QUERY_URL)
+    sw = SPARQLWrapper(query_url())
     sw.setReturnFormat(JSON)
     sw.setMethod('POST')
     sw.setRequestMethod(URLENCODED)
     sw.setQuery(SPARQL_PREFIXES + query)
-    return sw.query().convert()
+    with timed('sparql', 'query'):
+        return sw.query().convert()
 
 
 def _run_query_all_graphs(query: str):
@@ -31,11 +41,11 @@ def _run_query_all_graphs(query: str):
     """
     try:
         headers = {'Accept': 'application/sparql-results+json'}
-        resp = requests.get(FUSEKI_QUERY_URL, params={'query': SPARQL_PREFIXES + query}, headers=headers, timeout=15)
+        resp = get_session().get(query_url(), params={'query': SPARQL_PREFIXES + query}, headers=headers, timeout=15)
         resp.raise_for_status()
         return resp.json()
     except Exception as e:
-        print(f"[city/_run_query_all_graphs] HTTP query failed: {e}")
+        logger.warning("[city/_run_query_all_graphs] HTTP query failed: %s", e)
         return {"results": {"bindings": []}}
 
 
@@ -44,6 +54,12 @@ def query_all_graphs(sparql: str):
     return _run_query_all_graphs(sparql)
 
 
+async def query_all_graphs_async(sparql: str):
+    """Async query_all_graphs() on the shared async Fuseki client."""
+    data = await sparql_query_all_graphs_async(SPARQL_PREFIXES + sparql, timeout=15)
+    return data or {"results": {"bindings": []}}
+
+
 def _resolve_city_subject_by_name(city_name: str):
     sname = escape_sparql_string(city_name)
     q = f"""
@@ -63,15 +79,15 @@ def _delete_node_everywhere(node: str):
 
     # 1) Default graph deletes
     try:
-        requests.post(FUSEKI_UPDATE_URL, data={'update': f"DELETE WHERE {{ {node} ?p ?o }}"}, headers=headers, timeout=15)
-        requests.post(FUSEKI_UPDATE_URL, data={'update': f"DELETE WHERE {{ ?s ?p {node} }}"}, headers=headers, timeout=15)
+        get_session().post(update_url(), data={'update': f"DELETE WHERE {{ {node} ?p ?o }}"}, headers=headers, timeout=15)
+        get_session().post(update_url(), data={'update': f"DELETE WHERE {{ ?s ?p {node} }}"}, headers=headers, timeout=15)
     except Exception:
         pass
 
     # 2) Specific ontology named graph
     try:
-        requests.post(FUSEKI_UPDATE_URL, data={'update': f"WITH <{graph_uri}> DELETE WHERE {{ {node} ?p ?o }}"}, headers=headers, timeout=15)
-        requests.post(FUSEKI_UPDATE_URL, data={'update': f"WITH <{graph_uri}> DELETE WHERE {{ ?s ?p {node} }}"}, headers=headers, timeout=15)
+        get_session().post(update_url(), data={'update': f"WITH <{graph_uri}> DELETE WHERE {{ {node} ?p ?o }}"}, headers=headers, timeout=15)
+        get_session().post(update_url(), data={'update': f"WITH <{graph_uri}> DELETE WHERE {{ ?s ?p {node} }}"}, headers=headers, timeout=15)
     except Exception:
         pass
 
@@ -79,12 +95,14 @@ def _delete_node_everywhere(node: str):
     try:
         upd1 = f"DELETE {{ GRAPH ?g {{ {node} ?p ?o }} }} WHERE {{ GRAPH ?g {{ {node} ?p ?o }} }}"
         upd2 = f"DELETE {{ GRAPH ?g {{ ?s ?p {node} }} }} WHERE {{ GRAPH ?g {{ ?s ?p {node} }} }}"
-        requests.post(FUSEKI_UPDATE_URL, data={'update': upd1}, headers=headers, timeout=15)
-        requests.post(FUSEKI_UPDATE_URL, data={'update': upd2}, headers=headers, timeout=15)
+        get_session().post(update_url(), data={'update': upd1}, headers=headers, timeout=15)
+        get_session().post(update_url(), data={'update': upd2}, headers=headers, timeout=15)
     except Exception:
         pass
 
 
+@bumps_version('city', 0)
+@refreshes_inference
 def cleanup_city_duplicates(name: str):
     """Keep preferred :city_<Name> and delete other subjects having the same :cityName."""
     preferred = f":city_{name.replace(' ', '_')}"
@@ -102,6 +120,8 @@ def cleanup_city_duplicates(name: str):
         _delete_node_everywhere(f"<{s}>")
 
 
+@bumps_version('city', 0)
+@refreshes_inference
 def delete_city_by_name(name: str) -> bool:
     """Delete ALL subjects that have :cityName matching name (with and without artifacts)."""
     norm = escape_sparql_string(name)
@@ -124,14 +144,21 @@ def delete_city_by_name(name: str) -> bool:
     return any_deleted
 
 
+@bumps_version()
+@refreshes_inference
 def _run_update(update: str):
-    sw = SPARQLWrapper(FUSEKI_UPDATE_URL)
+    sw = SPARQLWrapper(update_url())
     sw.setMethod(POST)
     sw.setRequestMethod(URLENCODED)
     sw.setQuery(SPARQL_PREFIXES + update)
-    sw.query()
+    with timed('sparql', 'update'):
+        sw.query()
+    # SPARQLWrapper bypasses the shared session, which records the others
+    touch_update(SPARQL_PREFIXES + update)
 
 
+@bumps_version()
+@refreshes_inference
 def city_sparql_update(update: str):
     """City-scoped SPARQL UPDATE that guarantees using the ontology named graph.
     This does NOT touch shared utils; it's only used by the City app.
@@ -139,8 +166,9 @@ def city_sparql_update(update: str):
       - INSERT DATA -> INSERT DATA { GRAPH <http://www.transport-ontology.org/travel> { ... } }
       - DELETE WHERE -> WITH <graph>\nDELETE WHERE { ... }
       - DELETE/INSERT (MODIFY) -> WITH <graph>\n<original>
+    With FUSEKI_PARTITION_GRAPHS the graph is the city partition (core.utils.partitions).
     """
-    graph_uri = "http://www.transport-ontology.org/travel"
+    graph_uri = entity_graph('city')
     text = update or ""
     # Normalize small known typos from the LLM (ensure INSERT uses correct predicate)
     text = text.replace('City_hasName', 'cityName').replace(':City_hasName', ':cityName')
@@ -179,7 +207,7 @@ def city_sparql_update(update: str):
 
     try:
         headers = {'Content-Type': 'application/x-www-form-urlencoded'}
-        resp = requests.post(FUSEKI_UPDATE_URL, data=payload, headers=headers, timeout=20)
+        resp = get_session().post(update_url(), data=payload, headers=headers, timeout=20)
         if resp.status_code != 200:
             raise Exception(f"Fuseki update failed: {resp.status_code} - {resp.text}")
         # Post-fix: migrate any :City_hasName literals to :cityName and remove old ones
@@ -188,23 +216,24 @@ def city_sparql_update(update: str):
         INSERT {{ GRAPH <{graph_uri}> {{ ?s :cityName ?n }} }}
         WHERE  {{ GRAPH <{graph_uri}> {{ ?s :City_hasName ?n }} }}
         """
-        requests.post(FUSEKI_UPDATE_URL, data={'update': fix_insert}, headers=headers, timeout=20)
+        get_session().post(update_url(), data={'update': fix_insert}, headers=headers, timeout=20)
         fix_delete = f"""
         PREFIX : <{NS}>
         WITH <{graph_uri}>
         DELETE WHERE {{ {{ ?s :City_hasName ?n }} }}
         """
-        requests.post(FUSEKI_UPDATE_URL, data={'update': fix_delete}, headers=headers, timeout=20)
+        get_session().post(update_url(), data={'update': fix_delete}, headers=headers, timeout=20)
         return True
     except Exception as e:
-        print(f"[city_sparql_update] Error: {e}")
+        logger.warning("[city_sparql_update] Error: %s", e)
         raise
 
 def escape_sparql_string(value):
     if value is None: return ""
     return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
 
-def create_city(data, city_type):
+def city_triples(data, city_type):
+    """(name, Turtle block) of a new city; also used by core.utils.bulk_import."""
     city_name = data.get('name', '').strip()
     if not city_name:
         raise ValueError("City name is required!")
@@ -243,8 +272,16 @@ def create_city(data, city_type):
             triples += f" ;\n          :pollutionIndex {float(data['pollution_index']):.1f}"
 
     triples += " ."
+    return city_name, triples
+
 
+@bumps_version('city', lambda data, *_: data.get('name', '').strip())
+@refreshes_inference
+def create_city(data, city_type):
+    city_name, triples = city_triples(data, city_type)
     sparql = f"INSERT DATA {{ {triples} }}"
+    if partitioned():
+        sparql = f"INSERT DATA {{ GRAPH <{partition_graph('city')}> {{ {triples} }} }}"
     _run_update(sparql)
     time.sleep(0.2)
     return city_name
@@ -317,17 +354,18 @@ def get_city(city_name):
     data['type'] = city_type
     return data
 
-def list_cities():
-    q = """
+# Superclass types are materialized in the inference graph (core.utils.inference),
+# so a plain `?s a :City` lookup replaces the rdfs:subClassOf* path.
+LIST_CITIES_QUERY_TEMPLATE = """
     SELECT ?name ?pop ?area ?type ?region
            ?ministries ?districts ?visitors ?factories ?pollution ?hotels ?commute
     WHERE {
-      ?s rdf:type/rdfs:subClassOf* :City .
+      ?s a :City .
       ?s :cityName ?name .
       OPTIONAL { ?s :population ?pop }
       OPTIONAL { ?s :area ?area }
       OPTIONAL { ?s :region ?region }
-      OPTIONAL { ?s rdf:type ?type }
+      OPTIONAL { ?s rdf:type ?type %(type_filter)s }
       OPTIONAL { ?s :numberOfMinistries ?ministries }
       OPTIONAL { ?s :numberOfDistricts ?districts }
       OPTIONAL { ?s :annualVisitors ?visitors }
@@ -338,8 +376,39 @@ def list_cities():
     }
     ORDER BY ?name
     """
-    # Search across all graphs to include AI-inserted triples
-    results = _run_query_all_graphs(q)
+
+
+def list_cities_query():
+    return LIST_CITIES_QUERY_TEMPLATE % {'type_filter': subclass_filter('?type', 'City')}
+
+
+def _city_results():
+    # Search across all graphs to include AI-inserted triples (the city graphs
+    # when partitioned); {} on failure
+    try:
+        return sparql_query_all_graphs(SPARQL_PREFIXES + list_cities_query(), timeout=15, entity='city')
+    except Exception as e:
+        logger.warning("[city/list_cities] query failed: %s", e)
+        return {}
+
+
+async def _city_results_async():
+    return await sparql_query_all_graphs_async(SPARQL_PREFIXES + list_cities_query(), timeout=15, entity='city')
+
+
+CITY_LIST = ListCache('city', 'city', load=_city_results, aload=_city_results_async)
+
+
+def list_cities():
+    return _city_rows(CITY_LIST.get())
+
+
+async def list_cities_async():
+    """Async list_cities() for ASGI views."""
+    return _city_rows(await CITY_LIST.aget())
+
+
+def _city_rows(results):
     rows = []
     for b in results.get('results', {}).get('bindings', []):
         name = b['name']['value']
@@ -376,14 +445,20 @@ def list_cities():
         })
     return rows
 
+@bumps_version('city', 0)
+@refreshes_inference
 def update_city(old_name, new_data):
     delete_city(old_name)
     return create_city(new_data, new_data.get("type", "Capital"))
 
+@bumps_version('city', 0)
+@refreshes_inference
 def delete_city(city_name):
     uri = f":city_{city_name.replace(' ', '_')}"
     try:
         _run_update(f"DELETE WHERE {{ {uri} ?p ?o }}")
+        if partitioned():
+            _run_update(f"DELETE WHERE {{ GRAPH <{partition_graph('city')}> {{ {uri} ?p ?o }} }}")
         return True
     except Exception:
         return False
\ No newline at end of file
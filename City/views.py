@@ -1,17 +1,28 @@
 # views.py
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect
 from django.contrib import messages
 from .forms import CapitalCityForm, MetropolitanCityForm, TouristicCityForm, IndustrialCityForm
-from .utils.ontology_manager import create_city, get_city, update_city, delete_city, list_cities, city_sparql_update, query_all_graphs, cleanup_city_duplicates, delete_city_by_name
+from .utils.ontology_manager import create_city, get_city, update_city, delete_city, list_cities, city_sparql_update, query_all_graphs, cleanup_city_duplicates, delete_city_by_name, list_cities_async
 from .utils.nl_to_sparql_city import city_nl_to_sparql, city_nl_to_sparql_update
 from core.utils.fuseki import sparql_query
+from core.utils.versioning import conditional_page
 
-def city_list(request):
-    cities = list_cities()
-    return render(request, "core/city/city_list.html", {"cities": cities})
+@conditional_page('city')
+async def city_list(request):
+    cities = await list_cities_async()
+    return await sync_to_async(render)(request, "core/city/city_list.html", {"cities": cities})
 
 
-def city_ai_query(request):
+async def city_ai_query(request):
+    """
+    AI console entry point; the LLM/SPARQL handler runs in a worker thread that
+    is not serialised with the other sync views, leaving the event loop free.
+    """
+    return await sync_to_async(_city_ai_query, thread_sensitive=False)(request)
+
+
+def _city_ai_query(request):
     """Accept a natural-language command, generate SPARQL, execute, and render results on the list page."""
     if request.method != 'POST':
         return redirect('city:list')
@@ -37,7 +48,7 @@ def city_ai_query(request):
                 "PREFIX : <http://www.transport-ontology.org/travel#>\n"
                 "PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>\n"
                 "SELECT ?name ?pop ?area\nWHERE {\n"
-                "  ?c a/rdfs:subClassOf* :City ; :cityName ?name .\n"
+                "  ?c a :City ; :cityName ?name .\n"
                 f"  FILTER(LCASE(?name) = \"{target.lower()}\")\n"
                 "  OPTIONAL { ?c :population ?pop }\n"
                 "  OPTIONAL { ?c :area ?area }\n"
@@ -374,6 +385,7 @@ WHERE {{
             'ai_sparql': sparql if 'sparql' in locals() else '',
         })
                
+@conditional_page('city:{name}')
 def city_detail(request, name):
     city = get_city(name)
     if not city:
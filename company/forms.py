@@ -17,6 +17,7 @@ class CompanyForm(forms.ModelForm):
 
     def __init__(self, *args, **kwargs):
         self.original_name = kwargs.pop('original_name', None)
+        self.check_existing = kwargs.pop('check_existing', True)
         super().__init__(*args, **kwargs)
 
     def clean_name(self):
@@ -25,7 +26,7 @@ class CompanyForm(forms.ModelForm):
             raise forms.ValidationError('Company name is required.')
         if self.original_name and self.original_name.strip().lower() == name.lower():
             return name
-        if get_company(name):
+        if self.check_existing and get_company(name):
             raise forms.ValidationError(f"Company '{name}' already exists in RDF store.")
         return name
 
@@ -1,6 +1,6 @@
 # company/utils/nl_to_sparql_company.py
 import os
-from groq import Groq
+from core.utils.llm import chat_completion, groq_client
 
 MODEL = "llama-3.3-70b-versatile"
 
@@ -85,7 +85,7 @@ def company_nl_to_sparql_update(question: str) -> str:
     if not api_key:
         return ""
 
-    client = Groq(api_key=api_key)
+    client = groq_client(api_key)
     
     # Check if this is a DELETE operation
     lower = question.lower()
@@ -159,7 +159,8 @@ Generate ONLY the triples (no INSERT DATA wrapper, no PREFIX):
 """
 
     try:
-        resp = client.chat.completions.create(
+        resp = chat_completion(
+            client,
             model=MODEL,
             messages=[{"role": "user", "content": prompt}],
             temperature=0.0,
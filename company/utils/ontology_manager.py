@@ -1,8 +1,18 @@
 # company/utils/ontology_manager.py - CRITICAL FIX for get_company()
+import logging
 import time
 from rdflib.plugins.stores.sparqlstore import SPARQLStore, SPARQLUpdateStore
 from rdflib import Graph
 import requests
+from core.utils.fuseki import (
+    get_session, sparql_query_all_graphs, sparql_query_all_graphs_async, query_url, update_url,
+)
+from core.utils.inference import refreshes_inference, class_values, subclass_filter
+from core.utils.partitions import entity_graph, partitioned
+from core.utils.list_cache import ListCache
+from core.utils.versioning import bumps_version
+
+logger = logging.getLogger(__name__)
 
 SPARQL_PREFIXES = """
 PREFIX : <http://www.transport-ontology.org/travel#>
@@ -13,40 +23,59 @@ PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
 
 NS = "http://www.transport-ontology.org/travel#"
 GRAPH_URI = "http://www.transport-ontology.org/travel"
-FUSEKI_QUERY_URL = "http://localhost:3030/transport_db/query"
-FUSEKI_UPDATE_URL = "http://localhost:3030/transport_db/update"
+
+
+def company_graph():
+    """Named graph company writes go to: GRAPH_URI, or the company partition (core.utils.partitions)."""
+    return entity_graph('company') if partitioned() else GRAPH_URI
+
+
+def company_graphs():
+    """VALUES ?cg block of the named graphs holding companies (GRAPH_URI keeps the ontology's own)."""
+    graphs = [GRAPH_URI] + ([company_graph()] if partitioned() else [])
+    return "VALUES ?cg { " + " ".join(f"<{g}>" for g in graphs) + " }"
 
 
 def query_all_graphs(sparql: str):
     """Query across ALL graphs (default + named) - preferred for reading"""
     headers = {'Accept': 'application/sparql-results+json'}
     try:
-        resp = requests.get(FUSEKI_QUERY_URL, params={'query': SPARQL_PREFIXES + sparql}, headers=headers, timeout=15)
+        resp = get_session().get(query_url(), params={'query': SPARQL_PREFIXES + sparql}, headers=headers, timeout=15)
         resp.raise_for_status()
         return resp.json()
     except Exception as e:
-        print(f"[company/query_all_graphs] Error: {e}")
+        logger.warning("[company/query_all_graphs] Error: %s", e)
         return {"results": {"bindings": []}}
 
 
+async def query_all_graphs_async(sparql: str):
+    """Async query_all_graphs() on the shared async Fuseki client."""
+    data = await sparql_query_all_graphs_async(SPARQL_PREFIXES + sparql, timeout=15)
+    return data or {"results": {"bindings": []}}
+
+
+@bumps_version()
+@refreshes_inference
 def run_sparql_update(sparql_query: str):
     """Execute any SPARQL UPDATE query"""
-    print(f"[run_sparql_update] Executing:\n{sparql_query}")
+    logger.debug("[run_sparql_update] Executing:\n%s", sparql_query)
     
     headers = {'Content-Type': 'application/x-www-form-urlencoded'}
     payload = {'update': SPARQL_PREFIXES + sparql_query}
     
     try:
-        resp = requests.post(FUSEKI_UPDATE_URL, data=payload, headers=headers, timeout=20)
+        resp = get_session().post(update_url(), data=payload, headers=headers, timeout=20)
         if resp.status_code not in [200, 204]:
             raise Exception(f"Fuseki update failed: {resp.status_code} - {resp.text}")
-        print("[run_sparql_update] ✓ Update successful!")
+        logger.debug("[run_sparql_update] Update successful!")
         return True
     except Exception as e:
-        print(f"[run_sparql_update] ✗ Error: {e}")
+        logger.warning("[run_sparql_update] Error: %s", e)
         raise
 
 
+@bumps_version('company', 0)
+@refreshes_inference
 def update_company_property(company_name: str, property_updates: dict):
     """Update specific properties of a company"""
     property_map = {
@@ -88,7 +117,7 @@ def update_company_property(company_name: str, property_updates: dict):
                     break
         
         if not rdf_prop:
-            print(f"[WARNING] Unknown property: {prop_key}")
+            logger.warning("Unknown property: %s", prop_key)
             continue
         
         # Format value
@@ -109,7 +138,7 @@ def update_company_property(company_name: str, property_updates: dict):
     
     # Update in NAMED graph
     sparql = f"""
-WITH <{GRAPH_URI}>
+WITH <{company_graph()}>
 DELETE {{
 {chr(10).join(delete_clauses)}
 }}
@@ -146,6 +175,8 @@ WHERE {{
     return True
 
 
+@bumps_version()
+@refreshes_inference
 def company_sparql_update(triples: str):
     """Insert company triples into named graph"""
     text = triples.strip()
@@ -160,25 +191,25 @@ def company_sparql_update(triples: str):
     
     sparql = f"""
 INSERT DATA {{
-  GRAPH <{GRAPH_URI}> {{
+  GRAPH <{company_graph()}> {{
     {text}
   }}
 }}
 """
     
-    print(f"[DEBUG] Executing SPARQL:\n{sparql}")
+    logger.debug("Executing SPARQL:\n%s", sparql)
     
     headers = {'Content-Type': 'application/x-www-form-urlencoded'}
     payload = {'update': SPARQL_PREFIXES + sparql}
     
     try:
-        resp = requests.post(FUSEKI_UPDATE_URL, data=payload, headers=headers, timeout=20)
+        resp = get_session().post(update_url(), data=payload, headers=headers, timeout=20)
         if resp.status_code != 200:
             raise Exception(f"Fuseki update failed: {resp.status_code} - {resp.text}")
-        print("[SUCCESS] Company update executed!")
+        logger.debug("Company update executed!")
         return True
     except Exception as e:
-        print(f"[company_sparql_update] Error: {e}")
+        logger.warning("[company_sparql_update] Error: %s", e)
         raise
 
 
@@ -188,7 +219,8 @@ def escape_sparql_string(value):
     return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
 
 
-def create_company(data):
+def company_triples(data):
+    """(name, Turtle block) of a new company; also used by core.utils.bulk_import."""
     name = (data.get('name') or '').strip()
     if not name:
         raise ValueError("Company name is required!")
@@ -245,6 +277,13 @@ def create_company(data):
             triples += f" ;\n      :electricBikes {str(data['electric_bikes']).lower()}"
 
     triples += " ."
+    return name, triples
+
+
+@bumps_version('company', lambda data: (data.get('name') or '').strip())
+@refreshes_inference
+def create_company(data):
+    name, triples = company_triples(data)
     company_sparql_update(triples)
     time.sleep(0.3)
     return name
@@ -255,11 +294,11 @@ def get_company(name):
     CRITICAL FIX: Search for company by name using BOTH URI patterns AND direct name search
     This handles cases where URI might not match expected pattern
     """
-    print(f"\n[get_company] 🔍 Looking for company: '{name}'")
+    logger.debug("[get_company] Looking for company: '%s'", name)
     
     # Strategy 1: Try synthetic URI pattern first (most common)
     uri = f":company_{str(name).replace(' ', '_')}"
-    print(f"[get_company] Strategy 1: Trying synthetic URI: {uri}")
+    logger.debug("[get_company] Strategy 1: Trying synthetic URI: %s", uri)
     
     q_direct = f"""
     SELECT ?prop ?val WHERE {{
@@ -269,7 +308,8 @@ def get_company(name):
       }}
       UNION
       {{
-        GRAPH <{GRAPH_URI}> {{
+        {company_graphs()}
+        GRAPH ?cg {{
           {uri} ?prop ?val .
           FILTER(isIRI(?val) || isLiteral(?val))
         }}
@@ -282,7 +322,7 @@ def get_company(name):
     
     # Strategy 2: If synthetic URI failed, search by companyName property
     if not rows:
-        print(f"[get_company] Strategy 1 failed. Strategy 2: Searching by :companyName property")
+        logger.debug("[get_company] Strategy 1 failed. Strategy 2: Searching by :companyName property")
         
         # Use BOTH namespace patterns
         q_byname = f"""
@@ -294,7 +334,8 @@ def get_company(name):
           }}
           UNION
           {{
-            GRAPH <{GRAPH_URI}> {{
+            {company_graphs()}
+            GRAPH ?cg {{
               ?s :companyName "{escape_sparql_string(name)}" ;
                  ?prop ?val .
               FILTER(isIRI(?val) || isLiteral(?val))
@@ -307,12 +348,12 @@ def get_company(name):
         rows = [(b['prop']['value'], b['val']['value']) for b in results.get('results', {}).get('bindings', [])]
         
         if rows:
-            print(f"[get_company] ✓ Found via :companyName search!")
+            logger.debug("[get_company] Found via :companyName search!")
         else:
-            print(f"[get_company] ✗ Company '{name}' not found in RDF store")
+            logger.debug("[get_company] Company '%s' not found in RDF store", name)
             return None
     else:
-        print(f"[get_company] ✓ Found via synthetic URI!")
+        logger.debug("[get_company] Found via synthetic URI!")
 
     # Parse properties
     data = {'name': name}
@@ -370,22 +411,23 @@ def get_company(name):
             data[prop] = val
     
     data['type'] = ctype
-    print(f"[get_company] ✅ Successfully retrieved company data: {data}")
+    logger.debug("[get_company] Successfully retrieved company data: %s", data)
     return data
 
 
-def list_companies():
-    """List companies from BOTH default graph AND named graph"""
-    q = """
+# List companies from BOTH default graph AND named graph. Superclass types are
+# materialized in the inference graph, so the default-graph branch uses `?s a :Company`
+# and the named-graph branch enumerates the concrete company classes.
+LIST_COMPANIES_QUERY_TEMPLATE = """
     SELECT ?name ?type ?employees ?year ?hq ?busLines ?metroLines ?vehicles ?stations WHERE {
       {
-        ?s rdf:type/rdfs:subClassOf* :Company .
+        ?s a :Company .
         OPTIONAL { 
           { ?s <http://www.transport-ontology.org/companyName> ?name }
           UNION
           { ?s <http://www.transport-ontology.org/travel#companyName> ?name }
         }
-        OPTIONAL { ?s rdf:type ?type }
+        OPTIONAL { ?s rdf:type ?type %(type_filter)s }
         OPTIONAL { 
           { ?s <http://www.transport-ontology.org/numberOfEmployees> ?employees }
           UNION
@@ -424,14 +466,16 @@ def list_companies():
       }
       UNION
       {
-        GRAPH <http://www.transport-ontology.org/travel> {
-          ?s rdf:type/rdfs:subClassOf* :Company .
+        %(company_graphs)s
+        GRAPH ?cg {
+          %(company_classes)s
+          ?s a ?cls .
           OPTIONAL { 
             { ?s <http://www.transport-ontology.org/companyName> ?name }
             UNION
             { ?s <http://www.transport-ontology.org/travel#companyName> ?name }
           }
-          OPTIONAL { ?s rdf:type ?type }
+          OPTIONAL { ?s rdf:type ?type %(type_filter)s }
           OPTIONAL { 
             { ?s <http://www.transport-ontology.org/numberOfEmployees> ?employees }
             UNION
@@ -473,8 +517,43 @@ def list_companies():
     }
     ORDER BY ?name
     """
-    
-    results = query_all_graphs(q)
+
+
+
+def list_companies_query():
+    return LIST_COMPANIES_QUERY_TEMPLATE % {
+        'company_classes': class_values('?cls', 'Company'),
+        'type_filter': subclass_filter('?type', 'Company'),
+        'company_graphs': company_graphs(),
+    }
+
+
+def _company_results():
+    try:
+        return sparql_query_all_graphs(SPARQL_PREFIXES + list_companies_query(), timeout=15, entity='company')
+    except Exception as e:
+        logger.warning("[company/list_companies] query failed: %s", e)
+        return {}
+
+
+async def _company_results_async():
+    return await sparql_query_all_graphs_async(SPARQL_PREFIXES + list_companies_query(), timeout=15, entity='company')
+
+
+COMPANY_LIST = ListCache('company', 'company', load=_company_results, aload=_company_results_async)
+
+
+def list_companies():
+    """List companies from BOTH default graph AND named graph"""
+    return _company_rows(COMPANY_LIST.get())
+
+
+async def list_companies_async():
+    """Async list_companies() for ASGI views."""
+    return _company_rows(await COMPANY_LIST.aget())
+
+
+def _company_rows(results):
     rows = []
     seen_names = set()
     
@@ -505,10 +584,10 @@ def list_companies():
     return rows
 
 
+@bumps_version('company', 0)
+@refreshes_inference
 def delete_company(name):
     """Delete company - handles BOTH namespace patterns"""
-    import requests
-    
     escaped_name = escape_sparql_string(name)
     
     find_query = f"""
@@ -524,7 +603,8 @@ SELECT ?company WHERE {{
   }}
   UNION
   {{
-    GRAPH <http://www.transport-ontology.org/travel> {{
+    {company_graphs()}
+    GRAPH ?cg {{
       {{
         ?company <http://www.transport-ontology.org/companyName> "{escaped_name}" .
       }}
@@ -537,12 +617,12 @@ SELECT ?company WHERE {{
 }}
 """
     
-    print(f"\n[DELETE] Searching for company '{name}'...")
+    logger.debug("[DELETE] Searching for company '%s'...", name)
     
     headers = {'Accept': 'application/sparql-results+json'}
     try:
-        resp = requests.get(
-            FUSEKI_QUERY_URL, 
+        resp = get_session().get(
+            query_url(), 
             params={'query': find_query}, 
             headers=headers, 
             timeout=15
@@ -550,17 +630,17 @@ SELECT ?company WHERE {{
         resp.raise_for_status()
         results = resp.json()
         bindings = results.get('results', {}).get('bindings', [])
-        print(f"[DELETE] Found {len(bindings)} instance(s)")
+        logger.debug("[DELETE] Found %s instance(s)", len(bindings))
         
         for b in bindings:
-            print(f"  - {b.get('company', {}).get('value')}")
+            logger.debug("- %s", b.get('company', {}).get('value'))
             
     except Exception as e:
-        print(f"[DELETE ERROR] Search failed: {e}")
+        logger.error("[DELETE ERROR] Search failed: %s", e)
         return False
     
     if not bindings:
-        print(f"[DELETE] ❌ No company found with name '{name}'")
+        logger.warning("[DELETE] No company found with name '%s'", name)
         return False
     
     deleted_count = 0
@@ -572,51 +652,57 @@ SELECT ?company WHERE {{
         if not uri:
             continue
         
-        print(f"\n[DELETE] Deleting: {uri}")
+        logger.debug("[DELETE] Deleting: %s", uri)
         
         # Delete from default graph
         delete_default = f"DELETE WHERE {{ <{uri}> ?p ?o }}"
         try:
             payload = {'update': delete_default}
-            resp = requests.post(FUSEKI_UPDATE_URL, data=payload, headers=headers, timeout=15)
+            resp = get_session().post(update_url(), data=payload, headers=headers, timeout=15)
             if resp.status_code in [200, 204]:
-                print(f"[DELETE] ✓ Deleted from default graph")
+                logger.debug("[DELETE] Deleted from default graph")
                 deleted_count += 1
         except Exception as e:
-            print(f"[DELETE] Default graph error: {e}")
+            logger.warning("[DELETE] Default graph error: %s", e)
         
         # Delete from named graph
         delete_named = f"""
-DELETE WHERE {{
-  GRAPH <http://www.transport-ontology.org/travel> {{
+DELETE {{ GRAPH ?cg {{ <{uri}> ?p ?o }} }}
+WHERE {{
+  {company_graphs()}
+  GRAPH ?cg {{
     <{uri}> ?p ?o
   }}
 }}
 """
         try:
             payload = {'update': delete_named}
-            resp = requests.post(FUSEKI_UPDATE_URL, data=payload, headers=headers, timeout=15)
+            resp = get_session().post(update_url(), data=payload, headers=headers, timeout=15)
             if resp.status_code in [200, 204]:
-                print(f"[DELETE] ✓ Deleted from named graph")
+                logger.debug("[DELETE] Deleted from named graph")
                 deleted_count += 1
         except Exception as e:
-            print(f"[DELETE] Named graph error: {e}")
+            logger.warning("[DELETE] Named graph error: %s", e)
     
     if deleted_count > 0:
-        print(f"\n[DELETE] ✓✓✓ Successfully deleted from {deleted_count} location(s)")
+        logger.debug("[DELETE] Successfully deleted from %s location(s)", deleted_count)
         import time
         time.sleep(0.5)
         return True
     else:
-        print(f"\n[DELETE] ✗✗✗ No instances were deleted")
+        logger.warning("[DELETE] No instances were deleted")
         return False  
 
 
+@bumps_version('company', 0)
+@refreshes_inference
 def update_company(old_name, new_data):
     delete_company(old_name)
     return create_company(new_data)
 
 
+@bumps_version('company', 0)
+@refreshes_inference
 def cleanup_company_duplicates(name: str):
     """Keep preferred :company_<Name> and delete other subjects having the same :companyName."""
     preferred = f":company_{name.replace(' ', '_')}"
@@ -636,13 +722,13 @@ def _delete_node_everywhere(node: str):
     # Delete from default graph
     try:
         payload = {'update': SPARQL_PREFIXES + f"DELETE WHERE {{ {node} ?p ?o }}"}
-        requests.post(FUSEKI_UPDATE_URL, data=payload, headers=headers, timeout=15)
+        get_session().post(update_url(), data=payload, headers=headers, timeout=15)
     except:
         pass
     
     # Delete from named graph
     try:
-        payload = {'update': SPARQL_PREFIXES + f"WITH <{GRAPH_URI}> DELETE WHERE {{ {node} ?p ?o }}"}
-        requests.post(FUSEKI_UPDATE_URL, data=payload, headers=headers, timeout=15)
+        payload = {'update': SPARQL_PREFIXES + f"DELETE {{ GRAPH ?cg {{ {node} ?p ?o }} }} WHERE {{ {company_graphs()} GRAPH ?cg {{ {node} ?p ?o }} }}"}
+        get_session().post(update_url(), data=payload, headers=headers, timeout=15)
     except:
         pass
\ No newline at end of file
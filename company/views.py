@@ -1,21 +1,38 @@
 # company/views.py - COMPLETE REPLACEMENT
+import logging
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect
 from django.contrib import messages
 from .forms import BusCompanyForm, MetroCompanyForm, TaxiCompanyForm, BikeSharingCompanyForm
 from .utils.ontology_manager import (
     create_company, get_company, update_company, delete_company, list_companies,
-    query_all_graphs, cleanup_company_duplicates, update_company_property, escape_sparql_string
+    query_all_graphs, cleanup_company_duplicates, update_company_property, escape_sparql_string,
+    list_companies_async,
 )
 from .utils.nl_to_sparql_company import company_nl_to_sparql, company_nl_to_sparql_update
+from core.utils.concurrency import fan_map
+from core.utils.versioning import conditional_page
 import re
 
+logger = logging.getLogger(__name__)
 
-def company_list(request):
-    companies = list_companies()
-    return render(request, "core/company/company_list.html", {"companies": companies})
 
+@conditional_page('company')
+async def company_list(request):
+    companies = await list_companies_async()
+    return await sync_to_async(render)(request, "core/company/company_list.html", {"companies": companies})
 
-def company_ai_query(request):
+
+async def company_ai_query(request):
+    """
+    AI console entry point. The handler interleaves Groq calls, Fuseki writes and
+    form rendering, so it runs in a worker thread that is not serialised with the
+    other sync views, leaving the event loop free.
+    """
+    return await sync_to_async(_company_ai_query, thread_sensitive=False)(request)
+
+
+def _company_ai_query(request):
     """AI Query Handler - matches City's functionality exactly"""
     if request.method != 'POST':
         return redirect('company:list')
@@ -355,7 +372,7 @@ DELETE WHERE {{
                 sparql = f"""
 SELECT ?name ?type ?employees ?year ?hq
 WHERE {{
-  ?c a/rdfs:subClassOf* :Company ; :companyName ?name .
+  ?c a :Company ; :companyName ?name .
   FILTER(LCASE(?name) = "{target.lower()}")
   OPTIONAL {{ ?c rdf:type ?type }}
   OPTIONAL {{ ?c :numberOfEmployees ?employees }}
@@ -391,9 +408,13 @@ WHERE {{
                 if name:
                     selected_names.append(name)
             
+            # get_company lookups are independent: resolve each distinct name once, in parallel
+            unique_names = list(dict.fromkeys(selected_names))
+            fetched = dict(zip(unique_names, fan_map(get_company, unique_names)))
+
             companies = []
             for name in selected_names:
-                c = get_company(name)
+                c = dict(fetched[name]) if fetched.get(name) else None
                 if c:
                     # Map to list view format
                     c['employees'] = c.get('number_of_employees')
@@ -415,9 +436,7 @@ WHERE {{
             })
 
     except Exception as e:
-        import traceback
-        print(f"[ERROR] {e}")
-        print(traceback.format_exc())
+        logger.exception("%s", e)
         messages.error(request, f"❌ Error: {e}")
         return redirect('company:list')
 
@@ -426,6 +445,7 @@ WHERE {{
 # CRUD VIEWS (Form-based - unchanged)
 # ═══════════════════════════════════════════════════════════════════
 
+@conditional_page('company:{name}')
 def company_detail(request, name):
     company = get_company(name)
     if not company:
@@ -518,7 +538,8 @@ def company_delete(request, name):
 
 def company_debug(request):
     """Debug view to see what's in each graph (optional - for troubleshooting)"""
-    from .utils.ontology_manager import query_all_graphs, SPARQL_PREFIXES, FUSEKI_QUERY_URL
+    from .utils.ontology_manager import query_all_graphs, SPARQL_PREFIXES
+    from core.utils.fuseki import query_url
     from django.http import JsonResponse
     import requests
     
@@ -560,13 +581,13 @@ def company_debug(request):
     
     try:
         # Execute queries
-        resp1 = requests.get(FUSEKI_QUERY_URL, params={'query': SPARQL_PREFIXES + q1}, headers=headers, timeout=15)
+        resp1 = requests.get(query_url(), params={'query': SPARQL_PREFIXES + q1}, headers=headers, timeout=15)
         all_graphs = resp1.json() if resp1.status_code == 200 else {"results": {"bindings": []}}
         
-        resp2 = requests.get(FUSEKI_QUERY_URL, params={'query': SPARQL_PREFIXES + q2}, headers=headers, timeout=15)
+        resp2 = requests.get(query_url(), params={'query': SPARQL_PREFIXES + q2}, headers=headers, timeout=15)
         default_graph = resp2.json() if resp2.status_code == 200 else {"results": {"bindings": []}}
         
-        resp3 = requests.get(FUSEKI_QUERY_URL, params={'query': SPARQL_PREFIXES + q3}, headers=headers, timeout=15)
+        resp3 = requests.get(query_url(), params={'query': SPARQL_PREFIXES + q3}, headers=headers, timeout=15)
         named_graph = resp3.json() if resp3.status_code == 200 else {"results": {"bindings": []}}
         
         return JsonResponse({
@@ -0,0 +1,347 @@
+# core/api.py - Read-only JSON API over the ontology entity types
+#
+# /api/<type> returns one page of entities as compact JSON. Pages are keyset
+# paginated: the opaque ``cursor`` encodes the last key of the previous page
+# (subject URI for RDF entities, primary key for Django ones), so a page costs
+# one bounded query however deep the client reads, and rows inserted meanwhile
+# never shift or repeat entries. ``fields`` narrows the payload (and the SPARQL
+# OPTIONALs), and pages revalidate against the version stamps of their type
+# (core.utils.versioning), answering 304 without querying Fuseki.
+#
+# /api/autocomplete/<type>?q= serves name lookups from the in-process prefix
+# indexes of core.utils.autocomplete instead of shipping every option.
+import base64
+import json
+import logging
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+
+from .utils import autocomplete
+from .utils.fuseki import sparql_query_all_graphs
+from .utils.inference import NS, class_values, subclass_filter
+from .utils.versioning import GRAPH, ORM, conditional_page
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGE_SIZE = 50
+# Same ceiling as the list queries' historical LIMIT 500
+MAX_PAGE_SIZE = 500
+
+XSD = "http://www.w3.org/2001/XMLSchema#"
+_NUMERIC = {f"{XSD}{t}" for t in (
+    'integer', 'int', 'long', 'short', 'nonNegativeInteger', 'positiveInteger',
+)}
+_DECIMAL = {f"{XSD}{t}" for t in ('decimal', 'double', 'float')}
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+# ----------------------------------------------------------------------
+# ENTITY SOURCES
+# ----------------------------------------------------------------------
+class RdfEntity:
+    """
+    Entities stored only in Fuseki, keyed by subject URI.
+
+    ``fields`` maps an output name to the predicate(s) holding it; several
+    predicates become a SPARQL alternative path (companies were written under
+    two namespaces over time).
+    """
+
+    key = 'uri'
+
+    def __init__(self, cls, fields):
+        self.cls = cls
+        self.fields = fields
+        # Version stamp bumped by the entity's manager (e.g. 'city')
+        self.stamp = cls.lower()
+
+    @property
+    def field_names(self):
+        return ('uri', 'type', *self.fields)
+
+    def _predicate(self, name):
+        return "|".join(p if p.startswith('<') else f":{p}" for p in self.fields[name])
+
+    def query(self, after, limit, fields):
+        selected = [f for f in fields if f in self.fields]
+        projection = "".join(f" (SAMPLE(?v_{f}) AS ?{f})" for f in selected)
+        optionals = "\n".join(
+            f"  OPTIONAL {{ ?s {self._predicate(f)} ?v_{f} }}" for f in selected
+        )
+        type_pattern = ''
+        if 'type' in fields:
+            projection = " (SAMPLE(?t) AS ?type)" + projection
+            type_pattern = f"  OPTIONAL {{ ?s a ?t . {subclass_filter('?t', self.cls)} }}"
+        keyset = f'  FILTER(STR(?s) > "{_escape(after)}")' if after else ''
+        return f"""
+PREFIX : <{NS}>
+SELECT ?s{projection} WHERE {{
+  {class_values('?cls', self.cls)}
+  ?s a ?cls .
+{keyset}
+{type_pattern}
+{optionals}
+}}
+GROUP BY ?s
+ORDER BY STR(?s)
+LIMIT {limit}
+"""
+
+    def page(self, after, limit, fields):
+        try:
+            result = sparql_query_all_graphs(self.query(after, limit, fields))
+        except Exception as e:
+            logger.warning("API query for %s failed: %s", self.cls, e)
+            raise ApiError("Fuseki unavailable", status=502)
+        rows = []
+        for b in result.get('results', {}).get('bindings', []):
+            row = {'uri': b['s']['value']}
+            for name, value in b.items():
+                if name == 's':
+                    continue
+                row[name] = _local_name(value['value']) if name == 'type' else _literal(value)
+            rows.append(row)
+        return rows
+
+
+class ModelEntity:
+    """Entities stored in the Django database, keyed by primary key."""
+
+    key = 'id'
+    stamp = ORM
+
+    def __init__(self, model, fields):
+        self.model = model
+        self.fields = fields
+
+    @property
+    def field_names(self):
+        return ('id', 'type', *self.fields)
+
+    def page(self, after, limit, fields):
+        lookups = {name: self.fields[name] for name in fields if name in self.fields}
+        # Multi-table children are LEFT JOINed so the concrete type costs no extra query
+        children = {sub.__name__: f'{sub._meta.model_name}__pk' for sub in self.model.__subclasses__()}
+        columns = ['pk', *lookups.values()]
+        if 'type' in fields:
+            columns += children.values()
+        qs = self.model.objects.order_by('pk')
+        if after is not None:
+            try:
+                qs = qs.filter(pk__gt=int(after))
+            except (TypeError, ValueError):
+                raise ApiError("Invalid cursor")
+        rows = []
+        for values in qs.values(*columns)[:limit]:
+            row = {'id': values['pk']}
+            for name, lookup in lookups.items():
+                row[name] = values[lookup]
+            if 'type' in fields:
+                row['type'] = next(
+                    (name for name, lookup in children.items() if values[lookup] is not None),
+                    self.model.__name__,
+                )
+            rows.append(row)
+        return rows
+
+
+def _both_namespaces(prop):
+    """Company properties exist under travel# and under the bare ontology base."""
+    return (prop, f"<http://www.transport-ontology.org/{prop}>")
+
+
+def _entities():
+    from ticket_app.models import Ticket
+    from transport_app.models import Station
+
+    return {
+        'itineraries': RdfEntity('Itinerary', {
+            'id': ('itineraryID',),
+            'status': ('overallStatus',),
+            'cost': ('totalCostEstimate',),
+            'duration': ('totalDurationDays',),
+        }),
+        'schedules': RdfEntity('Schedule', {
+            'id': ('scheduleID',),
+            'route': ('routeName',),
+            'date': ('effectiveDate',),
+            'public': ('isPublic',),
+        }),
+        'companies': RdfEntity('Company', {
+            'name': _both_namespaces('companyName'),
+            'employees': _both_namespaces('numberOfEmployees'),
+            'year': _both_namespaces('foundedYear'),
+            'hq': _both_namespaces('headquartersLocation'),
+            'busLines': _both_namespaces('numberOfBusLines'),
+            'metroLines': _both_namespaces('numberOfLines'),
+            'vehicles': _both_namespaces('numberOfVehicles'),
+            'stations': _both_namespaces('numberOfStations'),
+        }),
+        'cities': RdfEntity('City', {
+            'name': ('cityName',),
+            'population': ('population',),
+            'area': ('area',),
+            'region': ('region',),
+        }),
+        'stations': ModelEntity(Station, {
+            'name': 'station_name',
+            'location': 'station_location',
+            'accessible': 'station_accessibility',
+            'city': 'located_in__city_name',
+        }),
+        'tickets': ModelEntity(Ticket, {
+            'ticket_id': 'has_ticket_id',
+            'price': 'has_price',
+            'validity': 'has_validity_duration',
+            'purchase_date': 'has_purchase_date',
+            'expiration_date': 'has_expiration_date',
+            'reduced_fare': 'is_reduced_fare',
+            'owner': 'owned_by__has_name',
+            'transport': 'valid_for__transport_line_number',
+        }),
+    }
+
+
+# ----------------------------------------------------------------------
+# HELPERS
+# ----------------------------------------------------------------------
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"')
+
+
+def _local_name(uri):
+    return uri.rsplit('#', 1)[-1].rsplit('/', 1)[-1]
+
+
+def _literal(binding):
+    """JSON value of a SPARQL JSON binding, numbers and booleans kept typed."""
+    value = binding['value']
+    datatype = binding.get('datatype')
+    try:
+        if datatype in _NUMERIC:
+            return int(value)
+        if datatype in _DECIMAL:
+            return float(value)
+    except ValueError:
+        return value
+    if datatype == f"{XSD}boolean":
+        return value == 'true'
+    return value
+
+
+def encode_cursor(key):
+    raw = json.dumps([key], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        (key,) = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return key
+    except (ValueError, TypeError):
+        raise ApiError("Invalid cursor")
+
+
+def _page_size(raw):
+    if raw in (None, ''):
+        return DEFAULT_PAGE_SIZE
+    try:
+        size = int(raw)
+    except ValueError:
+        raise ApiError("limit must be an integer")
+    if not 1 <= size <= MAX_PAGE_SIZE:
+        raise ApiError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    return size
+
+
+def _fields(raw, entity):
+    if not raw:
+        return entity.field_names
+    fields = [f.strip() for f in raw.split(',') if f.strip()]
+    unknown = sorted(set(fields) - set(entity.field_names))
+    if unknown:
+        raise ApiError(f"Unknown field(s): {', '.join(unknown)}")
+    # The key always comes back so the client can follow up
+    return (entity.key, *[f for f in fields if f != entity.key])
+
+
+def _compact(payload, status=200):
+    return JsonResponse(payload, status=status, encoder=DjangoJSONEncoder,
+                        json_dumps_params={'separators': (',', ':'), 'ensure_ascii': False})
+
+
+# ----------------------------------------------------------------------
+# VIEWS
+# ----------------------------------------------------------------------
+@require_GET
+def api_index(request):
+    """Entity types and the fields each one accepts in ``?fields=``."""
+    return _compact({name: list(entity.field_names) for name, entity in _entities().items()})
+
+
+def _entity_stamp(kwargs):
+    source = _entities().get(kwargs['entity'])
+    return source.stamp if source else GRAPH
+
+
+@require_GET
+@conditional_page(_entity_stamp)
+def entity_list(request, entity):
+    """
+    GET /api/<entity>?limit=&cursor=&fields=
+
+    {"results": [...], "next": <cursor or null>}; absent values are omitted.
+    """
+    source = _entities().get(entity)
+    if source is None:
+        return _compact({'error': f"Unknown entity type '{entity}'"}, status=404)
+    try:
+        limit = _page_size(request.GET.get('limit'))
+        fields = _fields(request.GET.get('fields'), source)
+        cursor = request.GET.get('cursor')
+        after = decode_cursor(cursor) if cursor else None
+        # One extra row tells whether another page exists
+        rows = source.page(after, limit + 1, fields)
+    except ApiError as e:
+        return _compact({'error': str(e)}, status=e.status)
+
+    has_more = len(rows) > limit
+    rows = [{k: v for k, v in row.items() if v is not None} for row in rows[:limit]]
+    return _compact({
+        'results': rows,
+        'next': encode_cursor(rows[-1][source.key]) if has_more else None,
+    })
+
+
+@require_GET
+def autocomplete_list(request, entity):
+    """
+    GET /api/autocomplete/<entity>?q=&limit=
+
+    {"results": [{"id"|"uri": ..., "label": ...}]}: entities with a word of
+    their name (or identifier) starting with ``q``.
+    """
+    key = autocomplete.source_keys().get(entity)
+    if key is None:
+        return _compact({'error': f"Unknown autocomplete type '{entity}'"}, status=404)
+    try:
+        limit = int(request.GET.get('limit') or autocomplete.DEFAULT_LIMIT)
+    except ValueError:
+        return _compact({'error': "limit must be an integer"}, status=400)
+    if not 1 <= limit <= autocomplete.MAX_LIMIT:
+        return _compact({'error': f"limit must be between 1 and {autocomplete.MAX_LIMIT}"}, status=400)
+
+    try:
+        matches = autocomplete.lookup(entity, request.GET.get('q', ''), limit)
+    except Exception as e:
+        logger.warning("Autocomplete index for %s unavailable: %s", entity, e)
+        return _compact({'error': "Fuseki unavailable"}, status=502)
+    return _compact({'results': [{key: value, 'label': label} for value, label in matches]})
@@ -4,3 +4,16 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from django.db.models.signals import m2m_changed, post_delete, post_save
+        from .utils import autocomplete
+        from .utils.versioning import bump_orm
+
+        # Stations, transports, persons and tickets pages revalidate on ORM writes
+        for name, signal in (('save', post_save), ('delete', post_delete), ('m2m', m2m_changed)):
+            signal.connect(bump_orm, dispatch_uid=f'core.versioning.{name}')
+        # Autocomplete indexes follow the same writes in place
+        post_save.connect(autocomplete.orm_saved, dispatch_uid='core.autocomplete.save')
+        post_delete.connect(autocomplete.orm_deleted, dispatch_uid='core.autocomplete.delete')
+        m2m_changed.connect(autocomplete.orm_m2m_changed, dispatch_uid='core.autocomplete.m2m')
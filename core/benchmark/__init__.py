@@ -0,0 +1,12 @@
+# core/benchmark - Offline benchmark harness
+#
+# fuseki_standin  rdflib-backed SPARQL endpoint speaking the Fuseki routes
+#                 (/<dataset>/query, /update, /data) on a local port
+# generator       synthetic Tunisian networks of configurable size, written
+#                 to the stand-in and to the (test) database
+# runner          list/detail/create/update/delete scenarios for every app,
+#                 reporting p50/p95 latency and queries per request
+# startup         -X importtime profile of django.setup() and a worker boot
+#
+# Entry points: `python manage.py benchmark` and `python manage.py startup_profile`
+# (transport_app/management/commands).
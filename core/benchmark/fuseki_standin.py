@@ -0,0 +1,362 @@
+# core/benchmark/fuseki_standin.py - Local SPARQL endpoint standing in for Fuseki
+#
+# An rdflib Dataset served over WSGI with the three routes the application
+# uses: SPARQL query, SPARQL update and the Graph Store protocol (/data). It
+# honours the parts of the Fuseki protocol the managers rely on
+# (default-graph-uri lists, unionDefaultGraph, form and raw bodies, JSON/XML
+# results) and counts every request so a benchmark can report queries per page.
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from socketserver import ThreadingMixIn
+from urllib.parse import parse_qs
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+from xml.sax.saxutils import escape
+
+import rdflib.plugins.sparql as rdflib_sparql
+from rdflib import BNode, Dataset, Graph, URIRef
+from rdflib.graph import ReadOnlyGraphAggregate
+from rdflib.paths import Path
+
+logger = logging.getLogger(__name__)
+
+# Graph Store / upload content types -> rdflib parser names
+RDF_FORMATS = {
+    'text/turtle': 'turtle',
+    'application/x-turtle': 'turtle',
+    'application/n-triples': 'nt',
+    'text/plain': 'nt',
+    'application/n-quads': 'nquads',
+    'application/trig': 'trig',
+    'application/rdf+xml': 'xml',
+    'application/ld+json': 'json-ld',
+}
+
+
+class _MergedGraphs(ReadOnlyGraphAggregate):
+    """
+    Default graph made of several default-graph-uri graphs. Fuseki takes their
+    RDF merge, so a triple held by two of them matches once (rdflib's aggregate
+    yields it once per graph).
+    """
+
+    def triples(self, triple):
+        s, p, o = triple
+        if isinstance(p, Path):
+            for s1, o1 in p.eval(self, s, o):
+                yield s1, p, o1
+            return
+        seen = set()
+        for graph in self.graphs:
+            for found in graph.triples((s, p, o)):
+                if found not in seen:
+                    seen.add(found)
+                    yield found
+
+
+class _ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        logger.debug("standin %s - %s", self.address_string(), format % args)
+
+
+class FusekiStandIn:
+    """
+    In-process stand-in for a Fuseki dataset.
+
+    - ``/<dataset>/query``  GET or POST (form or application/sparql-query body)
+    - ``/<dataset>/update`` POST (form or application/sparql-update body)
+    - ``/<dataset>/data``   Graph Store protocol: GET, POST (append), PUT
+      (replace) and DELETE on ``?graph=<uri>`` or the default graph
+
+    All access to the dataset goes through one re-entrant lock: rdflib's
+    memory store is not safe for concurrent writers, and Fuseki serialises
+    writes the same way.
+    """
+
+    def __init__(self, dataset='transport_db'):
+        self.dataset_name = dataset
+        self.dataset = Dataset()
+        self._lock = threading.RLock()
+        self._server = None
+        self._thread = None
+        self.reset_stats()
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def start(self, host='127.0.0.1', port=0):
+        """Serve on a background thread; port 0 picks a free port."""
+        self._server = make_server(
+            host, port, self, server_class=_ThreadingWSGIServer, handler_class=_QuietHandler,
+        )
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name='fuseki-standin', daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    @property
+    def url(self):
+        """Base URL to use as settings.FUSEKI_URL."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        return self.start() if self._server is None else self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # ------------------------------------------------------------------
+    # Request accounting
+    # ------------------------------------------------------------------
+    def reset_stats(self):
+        self._stats_lock = threading.Lock()
+        self.stats = {'query': 0, 'update': 0, 'data': 0, 'errors': 0, 'seconds': 0.0}
+
+    def _count(self, route, seconds, failed=False):
+        with self._stats_lock:
+            self.stats[route] = self.stats.get(route, 0) + 1
+            self.stats['seconds'] += seconds
+            if failed:
+                self.stats['errors'] += 1
+
+    def snapshot(self):
+        with self._stats_lock:
+            return dict(self.stats)
+
+    # ------------------------------------------------------------------
+    # Direct (in-process) access used by the generator
+    # ------------------------------------------------------------------
+    def graph(self, uri=None):
+        """Named graph ``uri``, or the default graph."""
+        return self.dataset.graph(URIRef(uri)) if uri else self.dataset.default_context
+
+    def load(self, source, graph=None, format='turtle'):
+        with self._lock:
+            self.graph(graph).parse(source, format=format)
+
+    def update(self, sparql):
+        with self._lock, _default_graph_union(False, self.dataset):
+            self.dataset.update(sparql)
+
+    def triple_count(self):
+        with self._lock:
+            return sum(len(g) for g in self.dataset.graphs())
+
+    # ------------------------------------------------------------------
+    # WSGI
+    # ------------------------------------------------------------------
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO', '').rstrip('/')
+        prefix, _, route = path.rpartition('/')
+        if prefix.strip('/') != self.dataset_name or route not in ('query', 'update', 'data'):
+            return self._respond(start_response, '404 Not Found', b'Not found', 'text/plain')
+
+        started = time.perf_counter()
+        failed = False
+        try:
+            status, body, content_type = getattr(self, f'_{route}')(environ)
+        except Exception as e:
+            failed = True
+            logger.warning("standin %s failed: %s", route, e)
+            status, body, content_type = '400 Bad Request', str(e).encode(), 'text/plain'
+        self._count(route, time.perf_counter() - started, failed)
+        return self._respond(start_response, status, body, content_type)
+
+    @staticmethod
+    def _respond(start_response, status, body, content_type):
+        start_response(status, [
+            ('Content-Type', content_type),
+            ('Content-Length', str(len(body))),
+        ])
+        return [body]
+
+    @staticmethod
+    def _read_body(environ):
+        length = int(environ.get('CONTENT_LENGTH') or 0)
+        return environ['wsgi.input'].read(length) if length else b''
+
+    def _params(self, environ, body_key):
+        """Query-string and form parameters, with a raw SPARQL body under ``body_key``."""
+        params = parse_qs(environ.get('QUERY_STRING', ''), keep_blank_values=True)
+        if environ.get('REQUEST_METHOD') == 'POST':
+            content_type = environ.get('CONTENT_TYPE', '').split(';')[0].strip()
+            body = self._read_body(environ)
+            if content_type == 'application/x-www-form-urlencoded':
+                for key, values in parse_qs(body.decode('utf-8'), keep_blank_values=True).items():
+                    params.setdefault(key, []).extend(values)
+            elif body:
+                params.setdefault(body_key, []).append(body.decode('utf-8'))
+        return params
+
+    def _query_target(self, params):
+        """Dataset view a query runs against (default-graph-uri / unionDefaultGraph)."""
+        graphs = params.get('default-graph-uri') or []
+        if graphs:
+            return _MergedGraphs([self.dataset.graph(URIRef(g)) for g in graphs])
+        return self.dataset
+
+    def _query(self, environ):
+        params = self._params(environ, 'query')
+        sparql = (params.get('query') or [''])[0]
+        union = (params.get('unionDefaultGraph') or ['false'])[0].lower() == 'true'
+        accept = environ.get('HTTP_ACCEPT', '')
+
+        with self._lock:
+            target = self._query_target(params)
+            # A default-graph-uri aggregate is queried as a whole
+            with _default_graph_union(union or target is not self.dataset, self.dataset):
+                result = target.query(sparql)
+                if result.type in ('CONSTRUCT', 'DESCRIBE'):
+                    fmt, content_type = _graph_format(accept)
+                    return '200 OK', result.graph.serialize(format=fmt, encoding='utf-8'), content_type
+                if 'text/tab-separated-values' in accept:
+                    return '200 OK', _results_delimited(result, tsv=True), 'text/tab-separated-values; charset=utf-8'
+                if 'text/csv' in accept:
+                    return '200 OK', _results_delimited(result, tsv=False), 'text/csv; charset=utf-8'
+                if 'sparql-results+xml' in accept and 'json' not in accept:
+                    return '200 OK', _results_xml(result), 'application/sparql-results+xml'
+                return '200 OK', _results_json(result), 'application/sparql-results+json'
+
+    def _update(self, environ):
+        params = self._params(environ, 'update')
+        for sparql in params.get('update') or []:
+            self.update(sparql)
+        # Fuseki answers 200 with a short message, which the callers check for
+        return '200 OK', b'Update succeeded', 'text/plain'
+
+    def _data(self, environ):
+        params = parse_qs(environ.get('QUERY_STRING', ''), keep_blank_values=True)
+        uri = (params.get('graph') or [None])[0]
+        method = environ.get('REQUEST_METHOD')
+        with self._lock:
+            graph = self.graph(uri)
+            if method == 'GET':
+                return '200 OK', graph.serialize(format='turtle', encoding='utf-8'), 'text/turtle'
+            if method == 'DELETE':
+                if uri:
+                    self.dataset.remove_graph(graph)
+                else:
+                    graph.remove((None, None, None))
+                return '200 OK', b'', 'text/plain'
+            content_type = environ.get('CONTENT_TYPE', 'text/turtle').split(';')[0].strip()
+            data = self._read_body(environ)
+            incoming = Graph().parse(data=data, format=RDF_FORMATS.get(content_type, 'turtle'))
+            if method == 'PUT':
+                graph.remove((None, None, None))
+            for triple in incoming:
+                graph.add(triple)
+            return '200 OK', json.dumps({'tripleCount': len(incoming)}).encode(), 'application/json'
+
+
+@contextmanager
+def _default_graph_union(union, dataset):
+    """
+    Evaluate with Fuseki's default-graph semantics. rdflib decides whether the
+    default graph is the union of all graphs from a module-level flag read when
+    the query context is built, plus the dataset's own default_union, so both
+    are switched around each evaluation (the callers hold the dataset lock).
+    """
+    previous = rdflib_sparql.SPARQL_DEFAULT_GRAPH_UNION, dataset.default_union
+    rdflib_sparql.SPARQL_DEFAULT_GRAPH_UNION = dataset.default_union = union
+    try:
+        yield
+    finally:
+        rdflib_sparql.SPARQL_DEFAULT_GRAPH_UNION, dataset.default_union = previous
+
+
+def _graph_format(accept):
+    """rdflib serializer and content type for a CONSTRUCT/DESCRIBE response."""
+    if 'turtle' in accept:
+        return 'turtle', 'text/turtle'
+    if 'n-triples' in accept:
+        return 'nt', 'application/n-triples'
+    if 'xml' in accept:
+        return 'xml', 'application/rdf+xml'
+    return 'turtle', 'text/turtle'
+
+
+def _results_xml(result):
+    """
+    SPARQL XML results. rdflib's own serializer writes the lexical form of
+    falsy literals (false, 0) as empty text, which rdflib clients then fail
+    to parse, so the document is written here.
+    """
+    out = ['<?xml version="1.0" encoding="utf-8"?>',
+           '<sparql xmlns="http://www.w3.org/2005/sparql-results#">']
+    if result.type == 'ASK':
+        out.append(f'<head/><boolean>{str(bool(result.askAnswer)).lower()}</boolean>')
+    else:
+        out.append('<head>' + ''.join(f'<variable name="{v}"/>' for v in result.vars) + '</head><results>')
+        for row in result:
+            out.append('<result>')
+            for var in result.vars:
+                term = row[var]
+                if term is None:
+                    continue
+                out.append(f'<binding name="{var}">{_xml_term(term)}</binding>')
+            out.append('</result>')
+        out.append('</results>')
+    out.append('</sparql>')
+    return ''.join(out).encode('utf-8')
+
+
+def _xml_term(term):
+    if isinstance(term, URIRef):
+        return f'<uri>{escape(str(term))}</uri>'
+    if isinstance(term, BNode):
+        return f'<bnode>{escape(str(term))}</bnode>'
+    attrs = ''
+    if term.language:
+        attrs = f' xml:lang="{escape(term.language)}"'
+    elif term.datatype:
+        attrs = f' datatype="{escape(str(term.datatype))}"'
+    return f'<literal{attrs}>{escape(str(term))}</literal>'
+
+
+def _results_delimited(result, tsv):
+    """SPARQL 1.1 TSV (terms in N-Triples syntax) or CSV (plain values) results."""
+    import csv
+    import io
+
+    out = io.StringIO()
+    if tsv:
+        out.write("\t".join(f"?{v}" for v in result.vars) + "\n")
+        for row in result:
+            out.write("\t".join(row[v].n3() if row[v] is not None else '' for v in result.vars) + "\n")
+    else:
+        writer = csv.writer(out, lineterminator='\r\n')
+        writer.writerow([str(v) for v in result.vars])
+        for row in result:
+            writer.writerow([_csv_value(row[v]) for v in result.vars])
+    return out.getvalue().encode('utf-8')
+
+
+def _csv_value(term):
+    if term is None:
+        return ''
+    if isinstance(term, BNode):
+        return f"_:{term}"
+    return str(term)
+
+
+def _results_json(result):
+    """SPARQL 1.1 JSON results; ASK answers are written directly."""
+    if result.type == 'ASK':
+        return json.dumps({'head': {}, 'boolean': bool(result.askAnswer)}).encode()
+    return result.serialize(format='json')
+
@@ -0,0 +1,420 @@
+# core/benchmark/generator.py - Synthetic Tunisian transport networks
+#
+# Produces a reproducible network of configurable size and writes it where the
+# application expects it:
+# - Django rows (cities, operators, daily schedules, stations, transports,
+#   persons, tickets) in the current database, so run it against a test DB;
+# - their RDF through the OntologySyncService builders, plus the RDF-only
+#   entities (city, company, itinerary and schedule apps) with the same shapes
+#   as the managers' create functions, loaded straight into a FusekiStandIn.
+import datetime
+import itertools
+import random
+
+from django.conf import settings
+from django.db import transaction
+from rdflib import Literal, Namespace
+from rdflib.namespace import RDF, XSD
+
+from core.utils.inference import inference_enabled, materialization_update
+from core.utils.schema import schema, schema_graph
+from transport_app.models import (
+    City, BusCompany, MetroCompany, DailySchedule,
+    BusStop, MetroStation, TrainStation, TramStation,
+    Bus, Metro, Train, Tram,
+    Conducteur, Contrôleur, EmployéAgence, Passager,
+)
+from ticket_app.models import (
+    TicketSimple, TicketSenior, TicketÉtudiant, AbonnementHebdomadaire, AbonnementMensuel,
+)
+
+NS = "http://www.transport-ontology.org/travel#"
+TR = Namespace(NS)
+
+# Named presets for `manage.py benchmark --size`
+SIZES = {
+    'tiny': {
+        'cities': 4, 'companies': 4, 'stations': 16, 'transports': 12, 'persons': 12,
+        'tickets': 16, 'itineraries': 9, 'schedules': 6,
+    },
+    'small': {
+        'cities': 8, 'companies': 8, 'stations': 60, 'transports': 50, 'persons': 60,
+        'tickets': 100, 'itineraries': 45, 'schedules': 24,
+    },
+    'medium': {
+        'cities': 24, 'companies': 20, 'stations': 300, 'transports': 250, 'persons': 400,
+        'tickets': 800, 'itineraries': 300, 'schedules': 120,
+    },
+    'large': {
+        'cities': 24, 'companies': 40, 'stations': 1500, 'transports': 1200, 'persons': 2000,
+        'tickets': 5000, 'itineraries': 1500, 'schedules': 600,
+    },
+}
+
+# (name, governorate, population, area km2, city-app class)
+CITIES = [
+    ('Tunis', 'Tunis', 638845, 212.6, 'Capital'),
+    ('Sfax', 'Sfax', 330440, 220.0, 'Industrial'),
+    ('Sousse', 'Sousse', 271428, 45.0, 'Touristic'),
+    ('Kairouan', 'Kairouan', 186653, 68.0, 'Touristic'),
+    ('Bizerte', 'Bizerte', 142966, 148.0, 'Industrial'),
+    ('Gabès', 'Gabès', 130984, 72.0, 'Industrial'),
+    ('Ariana', 'Ariana', 114486, 45.0, 'Metropolitan'),
+    ('Gafsa', 'Gafsa', 111170, 59.0, 'Industrial'),
+    ('Monastir', 'Monastir', 104535, 24.0, 'Touristic'),
+    ('Ben Arous', 'Ben Arous', 88322, 11.0, 'Metropolitan'),
+    ('Kasserine', 'Kasserine', 83534, 41.0, 'Industrial'),
+    ('Médenine', 'Médenine', 61705, 31.0, 'Metropolitan'),
+    ('Nabeul', 'Nabeul', 73128, 24.0, 'Touristic'),
+    ('Tataouine', 'Tataouine', 62577, 28.0, 'Touristic'),
+    ('Béja', 'Béja', 59567, 28.0, 'Industrial'),
+    ('Jendouba', 'Jendouba', 51408, 22.0, 'Metropolitan'),
+    ('Mahdia', 'Mahdia', 62189, 22.0, 'Touristic'),
+    ('Sidi Bouzid', 'Sidi Bouzid', 48741, 18.0, 'Industrial'),
+    ('Tozeur', 'Tozeur', 37365, 15.0, 'Touristic'),
+    ('Kébili', 'Kébili', 30283, 12.0, 'Touristic'),
+    ('Siliana', 'Siliana', 26960, 10.0, 'Industrial'),
+    ('Le Kef', 'Le Kef', 45191, 25.0, 'Metropolitan'),
+    ('Zaghouan', 'Zaghouan', 20387, 9.0, 'Industrial'),
+    ('La Manouba', 'Manouba', 26666, 14.0, 'Metropolitan'),
+]
+
+DISTRICTS = [
+    'Centre Ville', 'Médina', 'Bab Saadoun', 'Place Barcelone', 'Bab El Khadhra',
+    'Gare Centrale', 'Université', 'Hôpital', 'Stade', 'Souk', 'Corniche', 'Port',
+    'Zone Industrielle', 'Cité Olympique', 'El Menzah', 'Ennasr', 'Lafayette',
+    'Cité Ennour', 'Route de la Plage', 'Bab Jedid',
+]
+
+OPERATORS = [
+    'Transtu', 'SNTRI', 'SORETRAS', 'STS Sahel', 'SRT Sfax', 'SRT Gabès',
+    'SRT Bizerte', 'SRT Nabeul', 'Métro Léger de Tunis', 'Taxi Carthage', 'Vélo Tunis',
+]
+
+FIRST_NAMES = [
+    'Ahmed', 'Mohamed', 'Amira', 'Yasmine', 'Sami', 'Leila', 'Karim', 'Nour',
+    'Hichem', 'Salma', 'Youssef', 'Ines', 'Mehdi', 'Rania', 'Walid', 'Sana',
+]
+LAST_NAMES = [
+    'Ben Ali', 'Trabelsi', 'Jebali', 'Gharbi', 'Hammami', 'Mansouri', 'Chaabane',
+    'Ayari', 'Khelifi', 'Mejri', 'Dridi', 'Bouzid',
+]
+
+# Station class, transport class, operator class and line prefix per mode
+MODES = [
+    (BusStop, Bus, BusCompany, 'B'),
+    (MetroStation, Metro, MetroCompany, 'M'),
+    (TrainStation, Train, None, 'T'),
+    (TramStation, Tram, None, 'L'),
+]
+COMPANY_TYPES = ['BusCompany', 'MetroCompany', 'TaxiCompany', 'BikeSharingCompany']
+ITINERARY_TYPES = [('Business', 'I-B-'), ('Leisure', 'I-L-'), ('Educational', 'I-E-')]
+SCHEDULE_TYPES = [('DailySchedule', 'S-D-'), ('SeasonalSchedule', 'S-S-'), ('OnDemandSchedule', 'S-O-')]
+PERSON_CLASSES = [Passager, Conducteur, Contrôleur, EmployéAgence]
+TICKET_CLASSES = [TicketSimple, TicketSenior, TicketÉtudiant, AbonnementHebdomadaire, AbonnementMensuel]
+
+
+def resolve_counts(size='small', **overrides):
+    """Preset counts with per-entity overrides (None values are ignored)."""
+    counts = dict(SIZES[size])
+    counts.update({k: v for k, v in overrides.items() if v is not None})
+    return counts
+
+
+def _cycled(pool, index):
+    """pool[index], with a numeric suffix once the pool wraps around."""
+    name = pool[index % len(pool)]
+    round_ = index // len(pool)
+    return f"{name} {round_ + 1}" if round_ else name
+
+
+def _local(name):
+    return name.replace(' ', '_')
+
+
+# ----------------------------------------------------------------------
+# RDF-ONLY ENTITIES (city, company, itinerary and schedule apps)
+# ----------------------------------------------------------------------
+def city_triples(graph, name, population, area, city_type, rng):
+    """Same shape as City.utils.ontology_manager.create_city()."""
+    subj = TR[f"city_{_local(name)}"]
+    graph.add((subj, RDF.type, TR[f"{city_type}City"]))
+    graph.add((subj, TR.cityName, Literal(name)))
+    graph.add((subj, TR.population, Literal(population)))
+    graph.add((subj, TR.area, Literal(round(area, 2))))
+    if city_type == 'Capital':
+        graph.add((subj, TR.governmentSeat, Literal(True)))
+        graph.add((subj, TR.numberOfMinistries, Literal(rng.randint(20, 30))))
+    elif city_type == 'Metropolitan':
+        graph.add((subj, TR.numberOfDistricts, Literal(rng.randint(4, 12))))
+        graph.add((subj, TR.averageCommuteTime, Literal(round(rng.uniform(20, 60), 1))))
+    elif city_type == 'Touristic':
+        graph.add((subj, TR.annualVisitors, Literal(rng.randint(50_000, 2_000_000))))
+        graph.add((subj, TR.hotelCount, Literal(rng.randint(5, 150))))
+    elif city_type == 'Industrial':
+        graph.add((subj, TR.numberOfFactories, Literal(rng.randint(10, 400))))
+        graph.add((subj, TR.pollutionIndex, Literal(round(rng.uniform(20, 90), 1))))
+
+
+def company_triples(graph, name, company_type, headquarters, rng):
+    """Same shape as company.utils.ontology_manager.create_company()."""
+    subj = TR[f"company_{_local(name)}"]
+    graph.add((subj, RDF.type, TR[company_type]))
+    graph.add((subj, TR.companyName, Literal(name)))
+    graph.add((subj, TR.numberOfEmployees, Literal(rng.randint(20, 5000))))
+    graph.add((subj, TR.foundedYear, Literal(str(rng.randint(1956, 2020)))))
+    graph.add((subj, TR.headquartersLocation, Literal(headquarters)))
+    if company_type == 'BusCompany':
+        graph.add((subj, TR.numberOfBusLines, Literal(rng.randint(5, 250))))
+        graph.add((subj, TR.averageBusAge, Literal(round(rng.uniform(2, 18), 1))))
+        graph.add((subj, TR.ticketPrice, Literal(round(rng.uniform(0.5, 2.5), 2))))
+        graph.add((subj, TR.ecoFriendlyFleet, Literal(rng.random() < 0.3)))
+    elif company_type == 'MetroCompany':
+        graph.add((subj, TR.numberOfLines, Literal(rng.randint(1, 8))))
+        graph.add((subj, TR.totalTrackLength, Literal(round(rng.uniform(10, 80), 1))))
+        graph.add((subj, TR.automationLevel, Literal(rng.choice(['GoA1', 'GoA2', 'GoA4']))))
+        graph.add((subj, TR.dailyPassengers, Literal(rng.randint(50_000, 500_000))))
+    elif company_type == 'TaxiCompany':
+        graph.add((subj, TR.numberOfVehicles, Literal(rng.randint(20, 2000))))
+        graph.add((subj, TR.hasBookingApp, Literal(rng.random() < 0.5)))
+        graph.add((subj, TR.averageFarePerKm, Literal(round(rng.uniform(0.4, 1.2), 2))))
+    elif company_type == 'BikeSharingCompany':
+        graph.add((subj, TR.numberOfStations, Literal(rng.randint(5, 120))))
+        graph.add((subj, TR.bikeCount, Literal(rng.randint(50, 3000))))
+        graph.add((subj, TR.subscriptionPrice, Literal(round(rng.uniform(5, 30), 2))))
+        graph.add((subj, TR.electricBikes, Literal(rng.random() < 0.4)))
+
+
+def itinerary_triples(graph, index, rng, cities):
+    """Same shape as itinerary.utils.ontology_manager._create_itinerary_rdflib()."""
+    kind, prefix = ITINERARY_TYPES[index % len(ITINERARY_TYPES)]
+    full_id = f"{prefix}{index // len(ITINERARY_TYPES) + 1:03d}"
+    subj = TR[full_id]
+    graph.add((subj, RDF.type, TR[f"{kind}Trip"]))
+    graph.add((subj, TR.itineraryID, Literal(full_id)))
+    graph.add((subj, TR.overallStatus, Literal(rng.choice(['Planned', 'InProgress', 'Completed']))))
+    graph.add((subj, TR.totalCostEstimate, Literal(round(rng.uniform(20, 2000), 2), datatype=XSD.decimal)))
+    graph.add((subj, TR.totalDurationDays, Literal(rng.randint(1, 14), datatype=XSD.integer)))
+    if kind == 'Business':
+        graph.add((subj, TR.clientProjectName, Literal(f"Projet {rng.choice(cities)}")))
+        graph.add((subj, TR.expenseLimit, Literal(round(rng.uniform(100, 3000), 2), datatype=XSD.decimal)))
+        graph.add((subj, TR.purposeCode, Literal(f"PC-{rng.randint(100, 999)}")))
+        graph.add((subj, TR.approvalRequired, Literal(rng.random() < 0.5, datatype=XSD.boolean)))
+    elif kind == 'Leisure':
+        graph.add((subj, TR.activityType, Literal(rng.choice(['Plage', 'Désert', 'Médina', 'Randonnée']))))
+        graph.add((subj, TR.accommodation, Literal(rng.choice(['Hôtel', 'Maison d\'hôtes', 'Camping']))))
+        graph.add((subj, TR.budgetPerDay, Literal(round(rng.uniform(30, 300), 2), datatype=XSD.decimal)))
+        graph.add((subj, TR.groupSize, Literal(rng.randint(1, 12), datatype=XSD.integer)))
+    else:
+        graph.add((subj, TR.institution, Literal(f"Université de {rng.choice(cities)}")))
+        graph.add((subj, TR.courseReference, Literal(f"CR-{rng.randint(100, 999)}")))
+        graph.add((subj, TR.creditHours, Literal(rng.randint(1, 6), datatype=XSD.integer)))
+        graph.add((subj, TR.requiredDocumentation, Literal('Carte étudiant')))
+    return full_id
+
+
+def schedule_triples(graph, index, rng, route_name):
+    """Same shape as schedule.utils.ontology_manager._create_schedule_rdflib()."""
+    cls, prefix = SCHEDULE_TYPES[index % len(SCHEDULE_TYPES)]
+    full_id = f"{prefix}{index // len(SCHEDULE_TYPES) + 1:03d}"
+    subj = TR[full_id]
+    graph.add((subj, RDF.type, TR[cls]))
+    graph.add((subj, TR.scheduleID, Literal(full_id)))
+    graph.add((subj, TR.routeName, Literal(route_name)))
+    graph.add((subj, TR.effectiveDate, Literal('2025-01-01')))
+    graph.add((subj, TR.isPublic, Literal(True)))
+    details = {}
+    if cls == 'DailySchedule':
+        details = {
+            'first_run_time': datetime.time(rng.randint(5, 7), rng.choice([0, 15, 30])),
+            'last_run_time': datetime.time(rng.randint(20, 23), rng.choice([0, 30])),
+            'frequency_minutes': rng.choice([5, 10, 15, 20, 30, 60]),
+            'day_of_week_mask': rng.choice([0b0011111, 0b0111111, 0b1111111]),
+        }
+        graph.add((subj, TR.firstRunTime, Literal(details['first_run_time'].strftime('%H:%M'))))
+        graph.add((subj, TR.lastRunTime, Literal(details['last_run_time'].strftime('%H:%M'))))
+        graph.add((subj, TR.frequencyMinutes, Literal(details['frequency_minutes'])))
+        graph.add((subj, TR.dayOfWeekMask, Literal(str(details['day_of_week_mask']))))
+    elif cls == 'SeasonalSchedule':
+        graph.add((subj, TR.season, Literal(rng.choice(['Été', 'Hiver', 'Ramadan']))))
+        graph.add((subj, TR.startDate, Literal('2025-06-01')))
+        graph.add((subj, TR.endDate, Literal('2025-09-15')))
+        graph.add((subj, TR.operationalCapacityPercentage, Literal(rng.randint(40, 100))))
+    else:
+        graph.add((subj, TR.bookingLeadTimeHours, Literal(rng.randint(1, 48))))
+    return full_id, details
+
+
+# ----------------------------------------------------------------------
+# NETWORK
+# ----------------------------------------------------------------------
+def generate_network(standin, counts, seed=42):
+    """
+    Populate the database and ``standin`` with a synthetic network.
+
+    Returns {entity: [identifiers used in URLs]} for the benchmark scenarios
+    plus 'triples', the number of triples loaded into the stand-in.
+    """
+    from transport_app.services.ontology_service import OntologySyncService
+
+    rng = random.Random(seed)
+    data_graph = standin.graph(settings.FUSEKI_GRAPH)
+    default_graph = standin.graph()
+
+    # Base ontology, as loaded by `manage.py init_ontology`: the schema in its
+    # own graph, the sample individuals next to the instances
+    ontology = schema()
+    schema_part = standin.graph(schema_graph())
+    schema_part += ontology.tbox
+    data_graph += ontology.abox
+
+    network = {key: [] for key in (
+        'cities', 'companies', 'schedules', 'stations', 'transports',
+        'persons', 'tickets', 'itineraries',
+    )}
+    sync = OntologySyncService()
+
+    with transaction.atomic():
+        # Cities: city-app RDF (default graph, like create_city) + Django rows
+        city_rows = []
+        for i in range(max(1, counts['cities'])):
+            _, region, population, area, city_type = CITIES[i % len(CITIES)]
+            name = _cycled([c[0] for c in CITIES], i)
+            city_triples(default_graph, name, population, area, city_type, rng)
+            city_rows.append(City.objects.create(
+                city_name=name, population=population, area=area, region=region,
+            ))
+            network['cities'].append(name)
+
+        # Companies: company-app RDF for every type, Django operators for bus/metro
+        operators = {BusCompany: [], MetroCompany: []}
+        for i in range(counts['companies']):
+            name = _cycled(OPERATORS, i)
+            company_type = COMPANY_TYPES[i % len(COMPANY_TYPES)]
+            city = city_rows[i % len(city_rows)]
+            company_triples(default_graph, name, company_type, city.city_name, rng)
+            network['companies'].append(name)
+            model = {'BusCompany': BusCompany, 'MetroCompany': MetroCompany}.get(company_type)
+            if model is not None:
+                operators[model].append(model.objects.create(
+                    company_name=name, founded_year=rng.randint(1956, 2020),
+                    number_of_employees=rng.randint(20, 5000),
+                    headquarters_location=city.city_name, based_in=city,
+                ))
+
+        # Schedules: schedule-app RDF; daily ones also as Django rows for the route planner
+        daily_rows = []
+        for i in range(counts['schedules']):
+            route = f"Ligne {i + 1} {city_rows[i % len(city_rows)].city_name}"
+            full_id, details = schedule_triples(data_graph, i, rng, route)
+            network['schedules'].append(full_id)
+            if details:
+                daily_rows.append(DailySchedule.objects.create(
+                    schedule_id=full_id, route_name=route, effective_date=datetime.date(2025, 1, 1),
+                    **details,
+                ))
+
+        # Stations: spread over cities, mode cycling, chained within each city
+        stations_by_mode = {mode[0]: [] for mode in MODES}
+        last_in_city = {}
+        hubs = []
+        for i in range(counts['stations']):
+            city = city_rows[i % len(city_rows)]
+            station_cls = MODES[(i // len(city_rows)) % len(MODES)][0]
+            station = station_cls.objects.create(
+                station_name=_cycled(DISTRICTS, i // len(city_rows)),
+                station_location=f"{city.city_name}, Tunisie",
+                station_accessibility=rng.random() < 0.6,
+                located_in=city,
+            )
+            previous = last_in_city.get(city.pk)
+            if previous is not None:
+                station.connected_to.add(previous)
+            else:
+                hubs.append(station)
+            last_in_city[city.pk] = station
+            stations_by_mode[station_cls].append(station)
+            network['stations'].append(station.pk)
+        # Link the first station of each city to the next city's
+        for a, b in zip(hubs, hubs[1:]):
+            a.connected_to.add(b)
+
+        # Transports: between two stations of the matching mode
+        usable = [mode for mode in MODES if len(stations_by_mode[mode[0]]) >= 2]
+        transport_rows = []
+        for i in range(counts['transports'] if usable else 0):
+            station_cls, transport_cls, operator_cls, prefix = usable[i % len(usable)]
+            departs, arrives = rng.sample(stations_by_mode[station_cls], 2)
+            transport = transport_cls.objects.create(
+                transport_line_number=f"{prefix}-{i + 1:04d}",
+                transport_capacity=rng.choice([60, 90, 120, 250, 400]),
+                transport_speed=round(rng.uniform(18, 110), 1),
+                transport_frequency=rng.choice([5, 10, 15, 30, 60]),
+                departs_from=departs,
+                arrives_at=arrives,
+                operated_by=rng.choice(operators[operator_cls]) if operators.get(operator_cls) else None,
+                applies_to=rng.choice(daily_rows) if daily_rows else None,
+            )
+            transport.operates_in.add(departs.located_in)
+            if arrives.located_in_id != departs.located_in_id:
+                transport.operates_in.add(arrives.located_in)
+            transport_rows.append(transport)
+            network['transports'].append((transport.pk, transport_cls.__name__.lower()))
+
+        # Persons
+        person_rows = []
+        for i in range(counts['persons']):
+            person_cls = PERSON_CLASSES[i % len(PERSON_CLASSES)]
+            name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+            person = person_cls.objects.create(
+                has_id=f"P-{i + 1:05d}",
+                has_name=name,
+                has_age=rng.randint(16, 80),
+                has_email=f"{_local(name).lower()}.{i + 1}@example.tn",
+                has_phone_number=f"+216 {rng.randint(20, 99)} {rng.randint(100, 999)} {rng.randint(100, 999)}",
+                has_role=person_cls.__name__,
+            )
+            person_rows.append(person)
+            network['persons'].append(person.pk)
+
+        # Tickets
+        ticket_rows = []
+        for i in range(counts['tickets']):
+            ticket_cls = TICKET_CLASSES[i % len(TICKET_CLASSES)]
+            purchased = datetime.date(2025, 1, 1) + datetime.timedelta(days=rng.randint(0, 300))
+            ticket = ticket_cls.objects.create(
+                has_ticket_id=f"T-{i + 1:05d}",
+                has_price=round(rng.uniform(0.5, 60), 2),
+                has_validity_duration=rng.choice(['1 jour', '1 semaine', '1 mois']),
+                has_purchase_date=purchased,
+                has_expiration_date=purchased + datetime.timedelta(days=30),
+                is_reduced_fare=ticket_cls in (TicketSenior, TicketÉtudiant),
+                owned_by=rng.choice(person_rows) if person_rows else None,
+                valid_for=rng.choice(transport_rows) if transport_rows else None,
+            )
+            ticket_rows.append(ticket)
+            network['tickets'].append(ticket.pk)
+
+    # Django rows -> RDF with the same builders the sync service uses
+    for station in itertools.chain.from_iterable(stations_by_mode.values()):
+        sync.station_to_rdf(station)
+    for transport in transport_rows:
+        sync.transport_to_rdf(transport)
+    for person in person_rows:
+        sync.person_to_rdf(person)
+    for ticket in ticket_rows:
+        sync.ticket_to_rdf(ticket)
+    with standin._lock:
+        for triple in sync.graph:
+            data_graph.add(triple)
+
+    city_names = network['cities']
+    for i in range(counts['itineraries']):
+        network['itineraries'].append(itinerary_triples(data_graph, i, rng, city_names))
+
+    if inference_enabled():
+        standin.update(materialization_update())
+
+    network['triples'] = standin.triple_count()
+    return network
+
@@ -0,0 +1,369 @@
+# core/benchmark/runner.py - CRUD scenarios for every app, measured offline
+#
+# Each scenario is one list/detail/create/update/delete path of an app. The
+# runner creates the test databases, starts a FusekiStandIn, points
+# settings.FUSEKI_URL at it, generates a synthetic network and drives every
+# scenario through the Django test client. For each path it reports latency
+# percentiles and, per request, the SPARQL queries/updates the stand-in
+# received and the SQL queries Django ran.
+import math
+import statistics
+import time
+import warnings
+from urllib.parse import quote
+
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+
+from .fuseki_standin import FusekiStandIn
+from .generator import NS, generate_network
+
+
+class Scenario:
+    """
+    One HTTP path. ``path`` and ``data`` are called with (network, i) where i
+    is the iteration number, so creates use fresh identifiers and deletes
+    consume a different generated entity on every run.
+    """
+
+    def __init__(self, app, action, path, data=None, method=None):
+        self.app = app
+        self.action = action
+        self.path = path
+        self.data = data
+        self.method = method or ('post' if data is not None or action == 'delete' else 'get')
+
+    @property
+    def name(self):
+        return f"{self.app}.{self.action}"
+
+
+def _rdf_path(app, full_id, action=''):
+    """Itinerary/schedule link with the ?s=<subject> the list templates append."""
+    return f"/{app}/{full_id}/{action}?s={quote(NS + full_id)}"
+
+
+def _from_end(items, i):
+    """Entity consumed by the i-th delete: taken from the end of the generated list."""
+    return items[-(i + 1)]
+
+
+# ----------------------------------------------------------------------
+# FORM PAYLOADS
+# ----------------------------------------------------------------------
+def _station_data(network, i, name):
+    return {
+        'station_type': 'busstop',
+        'station_name': name,
+        'station_location': 'Tunis, Tunisie',
+        'station_accessibility': 'on',
+        'located_in': network['city_ids'][0],
+    }
+
+
+def _transport_data(network, i, line):
+    stops = network['bus_stops']
+    data = {
+        'transport_type': 'bus',
+        'transport_line_number': line,
+        'transport_capacity': 90,
+        'transport_speed': 35.0,
+        'transport_frequency': 15,
+        'departs_from': stops[i % len(stops)],
+        'arrives_at': stops[(i + 1) % len(stops)],
+        'operates_in': [network['city_ids'][0]],
+    }
+    if network['bus_companies']:
+        data['operated_by'] = network['bus_companies'][0]
+    return data
+
+
+def _person_data(network, i, person_id):
+    return {
+        'person_type': 'passager',
+        'has_id': person_id,
+        'has_name': f"Bench Passager {i}",
+        'has_age': 30,
+        'has_email': f"bench{i}@example.tn",
+        'has_subscription_type': 'mensuel',
+        'has_preferred_transport': 'metro',
+    }
+
+
+def _ticket_data(network, i, ticket_id):
+    return {
+        'ticket_type': 'ticketsimple',
+        'has_ticket_id': ticket_id,
+        'has_price': 1.2,
+        'has_validity_duration': '1 jour',
+        'owned_by': network['persons'][i % len(network['persons'])],
+        'valid_for': network['transports'][i % len(network['transports'])][0],
+    }
+
+
+# Superset payloads: each form only reads the fields of its own subtype
+ITINERARY_FIELDS = {
+    'overall_status': 'Planned',
+    'total_cost_estimate': '450.00',
+    'total_duration_days': 3,
+    'client_project_name': 'Projet Sfax',
+    'expense_limit': '900.00',
+    'purpose_code': 'PC-100',
+    'activity_type': 'Plage',
+    'accommodation': 'Hôtel',
+    'budget_per_day': '120.00',
+    'group_size': 2,
+    'institution': 'Université de Tunis',
+    'course_reference': 'CR-100',
+    'credit_hours': 3,
+    'required_documentation': 'Carte étudiant',
+}
+SCHEDULE_FIELDS = {
+    'route_name': 'Ligne Benchmark',
+    'effective_date': '2025-01-01',
+    'is_public': 'on',
+    'first_run_time': '06:00',
+    'last_run_time': '22:00',
+    'frequency_minutes': 15,
+    'day_of_week_mask': '127',
+}
+CITY_FIELDS = {
+    'population': 100000,
+    'area_km2': 50.0,
+    'government_seat': 'on',
+    'ministries': 24,
+    'districts': 6,
+    'commute_minutes': 35.0,
+    'annual_visitors': 250000,
+    'hotels': 40,
+    'factories': 120,
+    'pollution_index': 45.0,
+}
+COMPANY_FIELDS = {
+    'number_of_employees': 250,
+    'founded_year': '1998',
+    'headquarters_location': 'Tunis',
+    'number_of_bus_lines': 30,
+    'average_bus_age': 7.5,
+    'ticket_price': 0.8,
+    'number_of_lines': 4,
+    'total_track_length': 45.0,
+    'automation_level': 'GoA2',
+    'daily_passengers': 150000,
+    'number_of_vehicles': 300,
+    'number_of_stations': 40,
+    'bike_count': 500,
+    'subscription_price': 12.0,
+}
+
+
+def default_scenarios():
+    """Every list/detail/create/update/delete path of the CRUD apps."""
+    return [
+        # transport_app (Django models synced to the ontology)
+        Scenario('stations', 'list', lambda n, i: '/transport/stations/'),
+        Scenario('stations', 'create', lambda n, i: '/transport/stations/create/',
+                 lambda n, i: _station_data(n, i, f"Bench Station {i}")),
+        Scenario('stations', 'update', lambda n, i: f"/transport/stations/{n['stations'][0]}/update/",
+                 lambda n, i: _station_data(n, i, f"Bench Station MAJ {i}")),
+        Scenario('stations', 'delete', lambda n, i: f"/transport/stations/{_from_end(n['stations'], i)}/delete/"),
+        Scenario('transports', 'list', lambda n, i: '/transport/transports/'),
+        Scenario('transports', 'create', lambda n, i: '/transport/transports/create/',
+                 lambda n, i: _transport_data(n, i, f"BENCH-{i:04d}")),
+        Scenario('transports', 'update', lambda n, i: f"/transport/transports/{n['bus_lines'][0]}/bus/update/",
+                 lambda n, i: _transport_data(n, i, n['bus_line_numbers'][0])),
+        Scenario('transports', 'delete', lambda n, i: "/transport/transports/%s/%s/delete/" % _from_end(n['transports'], i)),
+        Scenario('persons', 'list', lambda n, i: '/transport/persons/'),
+        Scenario('persons', 'create', lambda n, i: '/transport/persons/create/',
+                 lambda n, i: _person_data(n, i, f"BENCH-P-{i:04d}")),
+        Scenario('persons', 'update', lambda n, i: f"/transport/persons/{n['passengers'][0]}/update/",
+                 lambda n, i: _person_data(n, i, n['passenger_ids'][0])),
+        Scenario('persons', 'delete', lambda n, i: f"/transport/persons/{_from_end(n['persons'], i)}/delete/"),
+        # ticket_app
+        Scenario('tickets', 'list', lambda n, i: '/ticket/tickets/'),
+        Scenario('tickets', 'create', lambda n, i: '/ticket/tickets/create/',
+                 lambda n, i: _ticket_data(n, i, f"BENCH-T-{i:04d}")),
+        Scenario('tickets', 'update', lambda n, i: f"/ticket/tickets/{n['tickets'][0]}/update/",
+                 lambda n, i: _ticket_data(n, i, n['ticket_ids'][0])),
+        Scenario('tickets', 'delete', lambda n, i: f"/ticket/tickets/{_from_end(n['tickets'], i)}/delete/"),
+        # itinerary (RDF only)
+        Scenario('itinerary', 'list', lambda n, i: '/itinerary/'),
+        Scenario('itinerary', 'detail', lambda n, i: _rdf_path('itinerary', n['itineraries'][i % len(n['itineraries'])])),
+        Scenario('itinerary', 'create', lambda n, i: '/itinerary/create/?type=Business',
+                 lambda n, i: {'itinerary_id': str(900 + i), **ITINERARY_FIELDS}),
+        Scenario('itinerary', 'update', lambda n, i: _rdf_path('itinerary', n['itineraries'][0], 'update/'),
+                 lambda n, i: {'itinerary_id': '1', **ITINERARY_FIELDS}),
+        Scenario('itinerary', 'delete', lambda n, i: _rdf_path('itinerary', _from_end(n['itineraries'], i), 'delete/')),
+        # schedule (RDF only)
+        Scenario('schedule', 'list', lambda n, i: '/schedule/'),
+        Scenario('schedule', 'detail', lambda n, i: _rdf_path('schedule', n['schedules'][i % len(n['schedules'])])),
+        Scenario('schedule', 'create', lambda n, i: '/schedule/create/?type=Daily',
+                 lambda n, i: {'schedule_id': str(900 + i), **SCHEDULE_FIELDS}),
+        Scenario('schedule', 'update', lambda n, i: _rdf_path('schedule', n['schedules'][0], 'update/'),
+                 lambda n, i: dict(SCHEDULE_FIELDS)),
+        Scenario('schedule', 'delete', lambda n, i: _rdf_path('schedule', _from_end(n['schedules'], i), 'delete/')),
+        # city (RDF only)
+        Scenario('city', 'list', lambda n, i: '/city/'),
+        Scenario('city', 'detail', lambda n, i: f"/city/{n['cities'][i % len(n['cities'])]}/"),
+        Scenario('city', 'create', lambda n, i: '/city/create/?type=Capital',
+                 lambda n, i: {'name': f"Bench City {i}", **CITY_FIELDS}),
+        Scenario('city', 'update', lambda n, i: f"/city/{n['cities'][0]}/update/",
+                 lambda n, i: {'name': n['cities'][0], **CITY_FIELDS}),
+        Scenario('city', 'delete', lambda n, i: f"/city/{_from_end(n['cities'], i)}/delete/"),
+        # company (RDF only)
+        Scenario('company', 'list', lambda n, i: '/company/'),
+        Scenario('company', 'detail', lambda n, i: f"/company/{n['companies'][i % len(n['companies'])]}/"),
+        Scenario('company', 'create', lambda n, i: '/company/create/?type=Bus',
+                 lambda n, i: {'name': f"Bench Company {i}", **COMPANY_FIELDS}),
+        Scenario('company', 'update', lambda n, i: f"/company/{n['companies'][0]}/update/",
+                 lambda n, i: {'name': n['companies'][0], **COMPANY_FIELDS}),
+        Scenario('company', 'delete', lambda n, i: f"/company/{_from_end(n['companies'], i)}/delete/"),
+    ]
+
+
+# ----------------------------------------------------------------------
+# MEASUREMENT
+# ----------------------------------------------------------------------
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _url_ids(network):
+    """Extra identifiers the payload builders need, derived from the generated rows."""
+    from transport_app.models import BusCompany, BusStop, Bus, City, Passager
+    from ticket_app.models import Ticket
+
+    network['city_ids'] = list(City.objects.order_by('pk').values_list('pk', flat=True))
+    network['bus_stops'] = list(BusStop.objects.order_by('pk').values_list('pk', flat=True))
+    network['bus_companies'] = list(BusCompany.objects.order_by('pk').values_list('pk', flat=True))
+    buses = list(Bus.objects.order_by('pk').values_list('pk', 'transport_line_number'))
+    network['bus_lines'] = [pk for pk, _ in buses]
+    network['bus_line_numbers'] = [line for _, line in buses]
+    passengers = list(Passager.objects.order_by('pk').values_list('pk', 'has_id'))
+    network['passengers'] = [pk for pk, _ in passengers]
+    network['passenger_ids'] = [has_id for _, has_id in passengers]
+    network['ticket_ids'] = list(
+        Ticket.objects.filter(pk__in=network['tickets'][:1]).values_list('has_ticket_id', flat=True)
+    )
+    return network
+
+
+def measure(client, standin, scenario, network, iteration):
+    """Run one request; returns the per-request sample."""
+    path = scenario.path(network, iteration)
+    data = scenario.data(network, iteration) if scenario.data else None
+    before = standin.snapshot()
+    with CaptureQueriesContext(connection) as sql:
+        started = time.perf_counter()
+        response = getattr(client, scenario.method)(path, data) if data is not None \
+            else getattr(client, scenario.method)(path)
+        elapsed = (time.perf_counter() - started) * 1000
+    after = standin.snapshot()
+    return {
+        'path': path,
+        'status': response.status_code,
+        'ms': elapsed,
+        'sparql_queries': after['query'] - before['query'],
+        'sparql_updates': after['update'] - before['update'],
+        'graph_store': after['data'] - before['data'],
+        'standin_errors': after['errors'] - before['errors'],
+        'db_queries': len(sql.captured_queries),
+    }
+
+
+def summarize(scenario, samples):
+    ok = [s for s in samples if s['status'] < 400]
+    timings = [s['ms'] for s in samples]
+    count = len(samples)
+    return {
+        'scenario': scenario.name,
+        'method': scenario.method.upper(),
+        'path': samples[0]['path'] if samples else '',
+        'requests': count,
+        'errors': count - len(ok) + sum(1 for s in samples if s['standin_errors']),
+        'p50_ms': percentile(timings, 50) if timings else 0.0,
+        'p95_ms': percentile(timings, 95) if timings else 0.0,
+        'mean_ms': statistics.fmean(timings) if timings else 0.0,
+        'sparql_queries': sum(s['sparql_queries'] for s in samples) / max(count, 1),
+        'sparql_updates': sum(s['sparql_updates'] for s in samples) / max(count, 1),
+        'graph_store': sum(s['graph_store'] for s in samples) / max(count, 1),
+        'db_queries': sum(s['db_queries'] for s in samples) / max(count, 1),
+    }
+
+
+def run_scenarios(standin, network, scenarios, repeat=5, warmup=1, log=None):
+    """Drive every scenario ``warmup + repeat`` times; returns one summary per scenario."""
+    client = Client(raise_request_exception=False)
+    results = []
+    for scenario in scenarios:
+        samples = []
+        for iteration in range(warmup + repeat):
+            sample = measure(client, standin, scenario, network, iteration)
+            if iteration >= warmup:
+                samples.append(sample)
+        summary = summarize(scenario, samples)
+        results.append(summary)
+        if log:
+            log(format_row(summary))
+    return results
+
+
+def run_benchmark(counts, repeat=5, warmup=1, seed=42, apps=None, log=None):
+    """
+    Full offline run: test databases + stand-in + generated network.
+
+    Returns {'counts', 'triples', 'results'}; ``log`` receives one formatted
+    line per scenario as it completes.
+    """
+    from itinerary.utils.route_planner import invalidate_route_planner
+    from transport_app.services.station_graph import invalidate_station_index
+
+    scenarios = [s for s in default_scenarios() if not apps or s.app in apps]
+    deletes = max(1, warmup + repeat)
+    if counts['cities'] <= deletes or counts['companies'] <= deletes:
+        raise ValueError(f"--cities and --companies must exceed warmup + repeat ({deletes})")
+
+    setup_test_environment()
+    runner = DiscoverRunner(verbosity=0, interactive=False)
+    old_config = runner.setup_databases()
+    standin = FusekiStandIn().start()
+    try:
+        with override_settings(FUSEKI_URL=standin.url, METRICS_TRIPLE_COUNT_INTERVAL=0), \
+                warnings.catch_warnings():
+            # rdflib deprecations and literal-parsing noise from the stand-in
+            warnings.simplefilter('ignore', DeprecationWarning)
+            warnings.simplefilter('ignore', UserWarning)
+            invalidate_station_index()
+            invalidate_route_planner()
+            network = _url_ids(generate_network(standin, counts, seed=seed))
+            if log:
+                log(f"Network: {network['triples']} triples, "
+                    + ", ".join(f"{counts[k]} {k}" for k in counts))
+                log(HEADER)
+            results = run_scenarios(standin, network, scenarios, repeat, warmup, log)
+            invalidate_station_index()
+            invalidate_route_planner()
+    finally:
+        standin.stop()
+        runner.teardown_databases(old_config)
+        teardown_test_environment()
+    return {'counts': counts, 'triples': network['triples'], 'results': results}
+
+
+HEADER = (
+    f"{'scenario':<20} {'p50 ms':>9} {'p95 ms':>9} {'mean ms':>9} "
+    f"{'sparql q':>9} {'sparql u':>9} {'gsp':>5} {'sql':>6} {'errors':>7}"
+)
+
+
+def format_row(result):
+    return (
+        f"{result['scenario']:<20} {result['p50_ms']:>9.1f} {result['p95_ms']:>9.1f} "
+        f"{result['mean_ms']:>9.1f} {result['sparql_queries']:>9.1f} {result['sparql_updates']:>9.1f} "
+        f"{result['graph_store']:>5.1f} {result['db_queries']:>6.1f} {result['errors']:>7}"
+    )
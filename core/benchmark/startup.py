@@ -0,0 +1,72 @@
+# core/benchmark/startup.py - Import-time profile of a process start
+#
+# Runs ``python -X importtime`` in a fresh interpreter for a start target and
+# parses its report: total import time, the slowest top-level imports and
+# whether any of the heavy optional backends (Groq SDK, torch, transformers)
+# was loaded. 'setup' is what every manage.py command pays (django.setup()),
+# 'urls' what a worker pays before its first request (setup plus the URLconf,
+# which imports every view).
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+TARGETS = {
+    'setup': "import django; django.setup()",
+    'urls': ("import django; django.setup(); from django.conf import settings; "
+             "from importlib import import_module; import_module(settings.ROOT_URLCONF)"),
+}
+
+# Only ever needed by the AI endpoints, on first use
+HEAVY = ('groq', 'torch', 'transformers', 'sentence_transformers')
+
+
+def parse_importtime(report):
+    """[(module, self_us, cumulative_us, depth)] from ``-X importtime`` stderr."""
+    rows = []
+    for line in report.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # header line
+        name = parts[2].rstrip()
+        depth = (len(name) - len(name.lstrip(' '))) // 2
+        rows.append((name.strip(), int(parts[0]), int(parts[1]), depth))
+    return rows
+
+
+def _run(target):
+    env = dict(os.environ)
+    env.setdefault('DJANGO_SETTINGS_MODULE', 'transport.settings')
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', TARGETS[target]],
+                          env=env, capture_output=True, text=True, timeout=300)
+    wall_ms = (time.perf_counter() - start) * 1000
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'start failed')
+    return wall_ms, parse_importtime(proc.stderr)
+
+
+def profile_startup(target='urls', repeat=3, top=15):
+    """
+    Median import/wall time over ``repeat`` fresh interpreters.
+
+    Returns {'target', 'import_ms', 'wall_ms', 'top': [(module, ms)],
+    'heavy': [loaded heavy modules], 'modules': set of imported modules}.
+    """
+    runs = [_run(target) for _ in range(max(1, repeat))]
+    rows = runs[-1][1]
+    modules = {name for name, *_ in rows}
+    top_level = sorted(((name, cumulative / 1000) for name, _, cumulative, depth in rows if depth == 0),
+                       key=lambda item: item[1], reverse=True)
+    return {
+        'target': target,
+        'import_ms': statistics.median(
+            sum(cumulative for _, _, cumulative, depth in run if depth == 0) / 1000 for _, run in runs),
+        'wall_ms': statistics.median(wall for wall, _ in runs),
+        'top': top_level[:top],
+        'heavy': sorted(m for m in HEAVY if m in modules),
+        'modules': modules,
+    }
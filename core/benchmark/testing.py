@@ -0,0 +1,101 @@
+# core/benchmark/testing.py - Query-budget assertions for view tests
+#
+# StandInTestCase serves a generated network from a FusekiStandIn for the
+# whole test class, so view tests can assert how many SQL queries and SPARQL
+# round trips a page costs. Budgets are upper bounds: a change that
+# reintroduces per-row ORM access or an extra Fuseki call fails the test.
+from django.test import TestCase, override_settings
+
+from .fuseki_standin import FusekiStandIn
+from .generator import SIZES, generate_network
+from .runner import Scenario, _url_ids, measure
+
+# Generous ceiling for list/detail pages against the in-process stand-in;
+# catches pathological regressions (sleeps, per-row round trips) without
+# making the suite timing-sensitive.
+DEFAULT_LATENCY_BUDGET_MS = 2000
+
+
+def _clear_stamped_caches():
+    """Drop the caches keyed by version stamps: stamps roll back with each test."""
+    from core.utils.autocomplete import invalidate_autocomplete
+    from core.utils.list_cache import invalidate_list_caches
+    from transport_app.services.choices import invalidate_choices
+
+    invalidate_autocomplete()
+    invalidate_choices()
+    invalidate_list_caches()
+
+
+class StandInTestCase(TestCase):
+    """TestCase with ``self.network`` generated into a per-class Fuseki stand-in."""
+
+    counts = SIZES['tiny']
+    seed = 42
+    latency_budget_ms = DEFAULT_LATENCY_BUDGET_MS
+
+    @classmethod
+    def setUpClass(cls):
+        cls.standin = FusekiStandIn().start()
+        cls._standin_settings = override_settings(
+            FUSEKI_URL=cls.standin.url, METRICS_TRIPLE_COUNT_INTERVAL=0,
+        )
+        cls._standin_settings.enable()
+        try:
+            super().setUpClass()
+        except Exception:
+            cls._stop_standin()
+            raise
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls._stop_standin()
+
+    @classmethod
+    def _stop_standin(cls):
+        from itinerary.utils.route_planner import invalidate_route_planner
+        from transport_app.services.station_graph import invalidate_station_index
+
+        cls._standin_settings.disable()
+        cls.standin.stop()
+        # In-memory indexes were built from this class's data
+        invalidate_station_index()
+        invalidate_route_planner()
+        _clear_stamped_caches()
+
+    @classmethod
+    def setUpTestData(cls):
+        from itinerary.utils.route_planner import invalidate_route_planner
+        from transport_app.services.station_graph import invalidate_station_index
+
+        invalidate_station_index()
+        invalidate_route_planner()
+        _clear_stamped_caches()
+        cls.network = _url_ids(generate_network(cls.standin, cls.counts, seed=cls.seed))
+
+    def setUp(self):
+        from core.utils.circuit import breaker
+
+        super().setUp()
+        _clear_stamped_caches()
+        # A test that points Fuseki elsewhere may have opened the breaker
+        breaker.reset()
+
+    def request(self, path, data=None):
+        """One measured request: status, ms, sparql_queries/updates, graph_store, db_queries."""
+        scenario = Scenario('test', 'view', lambda n, i: path,
+                            (lambda n, i: data) if data is not None else None)
+        return measure(self.client, self.standin, scenario, self.network, 0)
+
+    def assertViewBudget(self, path, sql, sparql, updates=0, status=200, latency_ms=None):
+        """Request ``path`` and assert it stays within the given query budgets."""
+        sample = self.request(path)
+        self.assertEqual(sample['status'], status, f"{path} answered {sample['status']}")
+        self.assertEqual(sample['standin_errors'], 0, f"{path} sent SPARQL the endpoint rejected")
+        self.assertLessEqual(sample['db_queries'], sql, f"{path}: SQL queries over budget")
+        self.assertLessEqual(sample['sparql_queries'], sparql, f"{path}: SPARQL queries over budget")
+        self.assertLessEqual(sample['sparql_updates'], updates, f"{path}: SPARQL updates over budget")
+        budget = latency_ms or self.latency_budget_ms
+        self.assertLess(sample['ms'], budget, f"{path}: {sample['ms']:.0f} ms over the {budget} ms budget")
+        return sample
@@ -0,0 +1,99 @@
+# core/middleware.py - Request-level instrumentation
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.template.loader import render_to_string
+
+from core.utils import timing
+
+
+class TimingMiddleware:
+    """
+    Collect the Fuseki/LLM calls made while serving a request and report them.
+
+    - ``Server-Timing`` header: one metric per kind of call (sparql, llm) with
+      total duration and a description holding the call count, bytes, tokens
+      and cache hits, plus the overall ``total``. Browsers show it in the
+      network panel's Timing tab.
+    - Optional HTML panel (settings.TIMING_PANEL, or ``?timing=1`` when DEBUG)
+      appended to HTML pages with the individual calls.
+
+    Works for both sync and async views.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = timing.begin()
+        try:
+            response = self.get_response(request)
+        finally:
+            timings = timing.end(token)
+        return self.process(request, response, timings)
+
+    async def __acall__(self, request):
+        token = timing.begin()
+        try:
+            response = await self.get_response(request)
+        finally:
+            timings = timing.end(token)
+        return self.process(request, response, timings)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        timings = timing.current()
+        if timings is not None:
+            timings.view_module = getattr(view_func, '__module__', None)
+        return None
+
+    def process(self, request, response, timings):
+        summary = timings.summary()
+        total_ms = timings.elapsed_ms()
+        response['Server-Timing'] = server_timing_header(summary, total_ms)
+        if self.show_panel(request, response):
+            self.inject_panel(response, summary, total_ms, timings.events)
+        return response
+
+    def show_panel(self, request, response):
+        if getattr(response, 'streaming', False):
+            return False
+        if 'text/html' not in response.get('Content-Type', ''):
+            return False
+        if getattr(settings, 'TIMING_PANEL', False):
+            return True
+        return settings.DEBUG and request.GET.get('timing') == '1'
+
+    def inject_panel(self, response, summary, total_ms, events):
+        panel = render_to_string('core/partials/_timing_panel.html', {
+            'summary': summary,
+            'total_ms': total_ms,
+            'events': events,
+        })
+        content = response.content.decode(response.charset)
+        marker = content.rfind('</body>')
+        if marker == -1:
+            content += panel
+        else:
+            content = content[:marker] + panel + content[marker:]
+        response.content = content.encode(response.charset)
+        if response.has_header('Content-Length'):
+            response['Content-Length'] = str(len(response.content))
+
+
+def server_timing_header(summary, total_ms):
+    metrics = []
+    for kind, s in summary.items():
+        desc = f"{s['count']} calls, {s['bytes']} B"
+        if s['tokens']:
+            desc += f", {s['tokens']} tokens"
+        if s['cache_hits']:
+            desc += f", {s['cache_hits']} cached"
+        metrics.append(f'{kind};dur={s["ms"]:.1f};desc="{desc}"')
+    metrics.append(f'total;dur={total_ms:.1f}')
+    return ', '.join(metrics)
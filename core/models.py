@@ -1,3 +1,15 @@
 from django.db import models
 
-# Create your models here.
+
+class GraphVersion(models.Model):
+    """
+    Version stamp of a slice of the data behind the pages (see
+    core.utils.versioning): ``graph`` for any Fuseki write, an entity type such
+    as ``city``, or one entity such as ``city:Tunis``.
+    """
+    key = models.CharField(max_length=255, unique=True)
+    version = models.PositiveBigIntegerField(default=0)
+    modified = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.key}@{self.version}"
@@ -1,3 +1,975 @@
-from django.test import TestCase
+import asyncio
+import io
+import json
+import threading
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase, override_settings
+from rdflib import Literal, URIRef
+from SPARQLWrapper import JSON, XML, SPARQLWrapper
+
+from core.benchmark.fuseki_standin import FusekiStandIn
+from core.benchmark.startup import profile_startup
+from core.benchmark.testing import StandInTestCase
+from core.utils import fuseki, singleflight
+from core.utils.circuit import CircuitOpenError, breaker, call_class, cap_timeout, classify, guarded
+from core.utils.fuseki import SparqlQueryError, get_session, query_url, select, sparql_query, update_url
+from core.utils.inference import NS
+from core.utils.list_cache import ListCache, invalidate_list_caches
+from core.utils.partitions import merge, partition_graph, repartition
+from core.utils.schema import RDF_TYPE, from_source, schema, schema_graph
+from core.utils.versioning import bump, versions
+from core.utils.warmup import warm_up
+
+EX = 'http://example.org/'
+
+
+class FusekiStandInTests(SimpleTestCase):
+    """The stand-in must answer the way Fuseki does for the managers' requests."""
+
+    def setUp(self):
+        self.standin = FusekiStandIn().start()
+        self.addCleanup(self.standin.stop)
+        self.standin.update(f"""
+            INSERT DATA {{
+                <{EX}a> <{EX}p> "default" .
+                GRAPH <{EX}g> {{ <{EX}b> <{EX}p> "named" . }}
+            }}
+        """)
+
+    def _select(self, query, fmt=JSON, **params):
+        client = SPARQLWrapper(f"{self.standin.url}/transport_db/query")
+        client.setQuery(query)
+        client.setReturnFormat(fmt)
+        for key, value in params.items():
+            client.addParameter(key, value)
+        return client.query().convert()
+
+    def _values(self, **params):
+        rows = self._select(f"SELECT ?o WHERE {{ ?s <{EX}p> ?o }}", **params)['results']['bindings']
+        return sorted(row['o']['value'] for row in rows)
+
+    def test_default_graph_excludes_named_graphs(self):
+        self.assertEqual(self._values(), ['default'])
+
+    def test_union_default_graph(self):
+        self.assertEqual(self._values(unionDefaultGraph='true'), ['default', 'named'])
+
+    def test_default_graph_uri(self):
+        self.assertEqual(self._values(**{'default-graph-uri': f'{EX}g'}), ['named'])
+
+    def test_ask_false_in_xml_results(self):
+        result = self._select(f"ASK {{ <{EX}a> <{EX}p> \"missing\" }}", fmt=XML)
+        self.assertEqual(result.getElementsByTagName('boolean')[0].firstChild.data, 'false')
+
+    def test_requests_are_counted(self):
+        self.standin.reset_stats()
+        self._values()
+        stats = self.standin.snapshot()
+        self.assertEqual((stats['query'], stats['update'], stats['errors']), (1, 0, 0))
+
+
+class StartupImportTests(SimpleTestCase):
+    """A worker boot must not import the AI backends (loaded on first use)."""
+
+    def test_worker_boot_skips_heavy_imports(self):
+        report = profile_startup('urls', repeat=1)
+        self.assertEqual(report['heavy'], [])
+        self.assertIn('core.views', report['modules'])
+
+
+class SingleFlightTests(SimpleTestCase):
+    """Identical concurrent reads share one request, never across a write."""
+
+    def _blocking_fetch(self):
+        calls, release = [], threading.Event()
+
+        def fetch():
+            calls.append(1)
+            release.wait(5)
+            return b'{"n": %d}' % len(calls)
+        return calls, release, fetch
+
+    def _run_threads(self, count, key, fetch):
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(singleflight.do(key, fetch)))
+                   for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        return threads, results
+
+    def test_concurrent_calls_share_one_fetch(self):
+        calls, release, fetch = self._blocking_fetch()
+        threads, results = self._run_threads(5, 'same', fetch)
+        time.sleep(0.1)
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [b'{"n": 1}'] * 5)
+
+    def test_write_starts_a_new_flight(self):
+        calls, release, fetch = self._blocking_fetch()
+        threads, _ = self._run_threads(1, 'written', fetch)
+        time.sleep(0.05)
+        singleflight.note_write()
+        more, _ = self._run_threads(1, 'written', fetch)
+        time.sleep(0.05)
+        release.set()
+        for thread in threads + more:
+            thread.join()
+        self.assertEqual(len(calls), 2)
+
+    def test_async_calls_share_one_fetch(self):
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return b'{}'
+
+        async def main():
+            return await asyncio.gather(*(singleflight.ado('async', fetch) for _ in range(5)))
+
+        self.assertEqual(asyncio.run(main()), [b'{}'] * 5)
+        self.assertEqual(len(calls), 1)
+
+    @override_settings(SPARQL_SINGLEFLIGHT_CACHE='singleflight', CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+        'singleflight': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'sf'},
+    })
+    def test_shared_cache_follower_uses_published_body(self):
+        from django.core.cache import caches
+        cache = caches['singleflight']
+        # Another worker leads and publishes its body
+        lock_key, body_key = singleflight._shared_keys(cache, 'shared')
+        cache.add(lock_key, 1)
+        cache.set(body_key, (time.time(), b'{"from": "leader"}'))
+        fetch = mock.Mock(return_value=b'{}')
+        self.assertEqual(singleflight.do('shared', fetch), b'{"from": "leader"}')
+        fetch.assert_not_called()
+
+    @override_settings(SPARQL_SINGLEFLIGHT_CACHE='singleflight', CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+        'singleflight': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'sf'},
+    })
+    def test_shared_body_read_before_another_workers_write_is_not_used(self):
+        calls, release, fetch = self._blocking_fetch()
+        # Worker A leads a read, then writes while it is in flight
+        leader, _ = self._run_threads(1, 'other-write', fetch)
+        time.sleep(0.05)
+        singleflight.note_write()
+        # Worker B has not written: its own write time says nothing of A's write
+        with mock.patch.object(singleflight, '_last_write', 0.0):
+            fresh = mock.Mock(return_value=b'{"after": "write"}')
+            self.assertEqual(singleflight._shared('other-write', fresh), b'{"after": "write"}')
+        release.set()
+        leader[0].join()
+        self.assertEqual(len(calls), 1)
+
+
+class EntityApiTests(StandInTestCase):
+    """Keyset pagination, field selection and ETags of /api/<type>."""
+
+    def _get(self, path, **headers):
+        response = self.client.get(path, headers=headers)
+        return response, (json.loads(response.content) if response.content else None)
+
+    def _walk(self, entity, limit):
+        keys, cursor, pages = [], None, 0
+        while True:
+            query = f"?limit={limit}" + (f"&cursor={cursor}" if cursor else '')
+            response, body = self._get(f"/api/{entity}{query}")
+            self.assertEqual(response.status_code, 200, body)
+            keys += [row.get('uri', row.get('id')) for row in body['results']]
+            pages += 1
+            cursor = body['next']
+            if not cursor:
+                return keys, pages
+
+    def test_rdf_pages_cover_every_entity_once(self):
+        # The ontology file's sample individuals are listed alongside the network
+        for entity in ('cities', 'itineraries', 'companies'):
+            with self.subTest(entity=entity):
+                keys, pages = self._walk(entity, limit=3)
+                everything, _ = self._walk(entity, limit=500)
+                self.assertEqual(keys, everything)
+                self.assertEqual(len(keys), len(set(keys)))
+                self.assertGreater(pages, 1)
+
+    def test_model_pages_cover_every_entity_once(self):
+        from transport_app.models import Station
+
+        keys, _ = self._walk('stations', limit=4)
+        self.assertEqual(keys, list(Station.objects.order_by('pk').values_list('pk', flat=True)))
+
+    def test_each_page_is_one_query(self):
+        # Plus the version stamp read of the conditional GET
+        _, body = self._get('/api/stations?limit=2')
+        self.assertViewBudget(f"/api/stations?limit=2&cursor={body['next']}", sql=2, sparql=0)
+        _, body = self._get('/api/schedules?limit=2')
+        self.assertViewBudget(f"/api/schedules?limit=2&cursor={body['next']}", sql=1, sparql=1)
+
+    def test_field_selection(self):
+        _, body = self._get('/api/itineraries?limit=2&fields=id,cost')
+        for row in body['results']:
+            self.assertLessEqual(set(row), {'uri', 'id', 'cost'})
+            self.assertIsInstance(row['cost'], float)
+        _, body = self._get('/api/stations?limit=2&fields=type')
+        self.assertEqual({row['type'] for row in body['results']} - {'BusStop', 'MetroStation', 'TrainStation', 'TramStation'}, set())
+
+    def test_etag_not_modified(self):
+        response, _ = self._get('/api/companies?limit=5')
+        etag = response['ETag']
+        response, _ = self._get('/api/companies?limit=5', if_none_match=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_bad_requests(self):
+        self.assertEqual(self._get('/api/unknown')[0].status_code, 404)
+        self.assertEqual(self._get('/api/cities?fields=nope')[0].status_code, 400)
+        self.assertEqual(self._get('/api/cities?limit=0')[0].status_code, 400)
+        self.assertEqual(self._get('/api/stations?cursor=%%%')[0].status_code, 400)
+
+
+class AutocompleteTests(StandInTestCase):
+    """/api/autocomplete/<type> answers from prefix indexes kept current by writes."""
+
+    def _labels(self, entity, q):
+        response = self.client.get(f"/api/autocomplete/{entity}", {'q': q})
+        self.assertEqual(response.status_code, 200)
+        return [row['label'] for row in json.loads(response.content)['results']]
+
+    def test_word_prefix_and_folding(self):
+        from transport_app.models import Passager
+        Passager.objects.create(has_id="AC-1", has_name="Hélène Ben Salah")
+        for q in ('hel', 'HÉLÈNE b', 'salah', 'ac-1'):
+            self.assertIn("Hélène Ben Salah (AC-1)", self._labels('persons', q))
+
+    def test_ontology_entities(self):
+        for entity in ('cities', 'companies'):
+            name = self.network[entity][0]
+            self.assertIn(name, self._labels(entity, name.split()[-1][:3]))
+
+    def test_warm_lookup_is_one_stamp_read(self):
+        self._labels('stations', 'a')
+        self.assertViewBudget('/api/autocomplete/stations?q=a', sql=1, sparql=0)
+        self.assertViewBudget('/api/autocomplete/cities?q=a', sql=1, sparql=1)
+        self.assertViewBudget('/api/autocomplete/cities?q=b', sql=1, sparql=0)
+
+    def test_writes_maintain_index(self):
+        from transport_app.models import BusStop, City
+        self._labels('stations', 'x')
+        stop = BusStop.objects.create(station_name="Zéphyr Nord", located_in=City.objects.first())
+        with self.assertNumQueries(1):
+            self.assertEqual(self._labels('stations', 'zeph'), ["Zéphyr Nord"])
+        stop.delete()
+        self.assertEqual(self._labels('stations', 'zeph'), [])
+
+    def test_build_matches_incremental_adds(self):
+        from core.utils.autocomplete import PrefixIndex
+
+        rows = [(3, 'Gare Sud', 'Gare Sud'), (1, 'Gare Nord', 'Gare Nord', 'GN'), (3, 'Gare Est', 'Gare Est')]
+        built, added = PrefixIndex.build(rows), PrefixIndex()
+        for key, label, *texts in rows:
+            added.add(key, label, *texts)
+        self.assertEqual((built._entries, built._labels), (added._entries, added._labels))
+        self.assertEqual(built.search('gare'), [(3, 'Gare Est'), (1, 'Gare Nord')])
+
+    def test_errors(self):
+        self.assertEqual(self.client.get('/api/autocomplete/nope').status_code, 404)
+        self.assertEqual(self.client.get('/api/autocomplete/persons?limit=0').status_code, 400)
+
+
+class WarmupTests(StandInTestCase):
+    """The warm-up stage fills the caches the first requests would have built."""
+
+    def test_warm_up_primes_list_pages(self):
+        report = warm_up()
+        self.assertEqual([name for name, _, error in report if error], [])
+        for path in ('/itinerary/', '/schedule/', '/city/', '/company/'):
+            self.assertViewBudget(path, sql=1, sparql=0)
+
+    def test_failing_step_is_reported(self):
+        with override_settings(FUSEKI_URL='http://127.0.0.1:9'):
+            report = dict((name, error) for name, _, error in warm_up(steps=['fuseki']))
+        self.assertTrue(report['fuseki'])
+
+
+@override_settings(LIST_CACHE_TTL=30, LIST_CACHE_MAX_STALE=300)
+class StaleWhileRevalidateTests(StandInTestCase):
+    """Aged lists are served stale and reloaded behind; writes reload at once."""
+
+    def setUp(self):
+        super().setUp()
+        self.loads = 0
+        self.cache = ListCache(f"swr-{self._testMethodName}", 'city', load=self._load)
+
+    def _load(self):
+        self.loads += 1
+        return {'results': {'bindings': [self.loads]}}
+
+    def _age(self, seconds):
+        signature, value, loaded_at = self.cache._entry
+        self.cache._entry = (signature, value, loaded_at - seconds)
+
+    def _settle(self):
+        for thread in threading.enumerate():
+            if thread.name == f"list-cache-{self.cache.name}":
+                thread.join(5)
+
+    def test_aged_list_is_served_stale_then_refreshed(self):
+        first = self.cache.get()
+        self._age(60)
+        self.assertIs(self.cache.get(), first)
+        self._settle()
+        self.assertEqual(self.loads, 2)
+        self.assertEqual(self.cache.get()['results']['bindings'], [2])
+
+    def test_one_background_reload_at_a_time(self):
+        release = threading.Event()
+        self.cache.get()
+        self.cache.load = lambda: release.wait(5) and self._load()
+        self._age(60)
+        for _ in range(5):
+            self.cache.get()
+        release.set()
+        self._settle()
+        self.assertEqual(self.loads, 2)
+
+    def test_too_old_list_is_reloaded_before_answering(self):
+        self.cache.get()
+        self._age(600)
+        self.assertEqual(self.cache.get()['results']['bindings'], [2])
+
+    def test_write_reloads_before_answering(self):
+        self.cache.get()
+        bump('city')
+        self.assertEqual(self.cache.get()['results']['bindings'], [2])
+
+    def test_failed_background_reload_keeps_the_list(self):
+        first = self.cache.get()
+        self.cache.load = lambda: {}
+        self._age(60)
+        self.cache.get()
+        self._settle()
+        self.assertIs(self.cache.get(), first)
+
+    def test_raising_reload_serves_the_last_answer(self):
+        first = self.cache.get()
+        bump('city')
+        self.cache.load = mock.Mock(side_effect=Exception('Fuseki indisponible'))
+        self.assertIs(self.cache.get(), first)
+        # aget() reads the stamps in a worker thread, outside the test transaction
+        with mock.patch('core.utils.list_cache.versions', return_value=versions(self.cache.stamps)):
+            self.assertIs(asyncio.run(self.cache.aget()), first)
+        self.cache.clear()
+        with self.assertRaises(Exception):
+            self.cache.get()
+
+
+@override_settings(FUSEKI_BREAKER_MIN_CALLS=3, FUSEKI_BREAKER_COOLDOWN=60)
+class CircuitBreakerTests(StandInTestCase):
+    """A dead Fuseki is refused fast; cached lists keep being served."""
+
+    def _fail(self, calls=3):
+        with override_settings(FUSEKI_URL='http://127.0.0.1:9'):
+            for _ in range(calls):
+                with self.assertRaises(Exception):
+                    sparql_query('ASK {}')
+
+    def test_opens_after_failures_and_refuses_without_sending(self):
+        self._fail()
+        self.assertTrue(breaker.is_open())
+        before = self.standin.snapshot()['query']
+        with self.assertRaises(CircuitOpenError):
+            get_session().get(query_url(), params={'query': 'ASK {}'})
+        self.assertEqual(self.standin.snapshot()['query'], before)
+
+    def test_half_open_probe_closes_the_breaker(self):
+        self._fail()
+        with override_settings(FUSEKI_BREAKER_COOLDOWN=0):
+            self.assertIn('boolean', sparql_query('ASK {}'))
+        self.assertEqual(breaker.state, 'closed')
+
+    def test_failed_probe_reopens(self):
+        self._fail()
+        with override_settings(FUSEKI_BREAKER_COOLDOWN=0):
+            self._fail(1)
+        self.assertTrue(breaker.is_open())
+
+    def test_cancelled_probe_frees_the_slot(self):
+        self._fail()
+        with override_settings(FUSEKI_BREAKER_COOLDOWN=0):
+            with self.assertRaises(asyncio.CancelledError):
+                with guarded(query_url()):
+                    raise asyncio.CancelledError
+            self.assertEqual(breaker.state, 'half_open')
+            self.assertIn('boolean', sparql_query('ASK {}'))
+        self.assertEqual(breaker.state, 'closed')
+
+    def test_client_errors_do_not_open(self):
+        for _ in range(3):
+            with self.assertRaises(Exception):
+                sparql_query('NOT SPARQL')
+        self.assertEqual(breaker.state, 'closed')
+
+    def test_timeouts_are_capped_per_class(self):
+        self.assertEqual(cap_timeout(None, 'read'), 15)
+        self.assertEqual(cap_timeout(5, 'write'), 5)
+        self.assertEqual(cap_timeout((5, 600), 'bulk'), (5, 300))
+        self.assertEqual(classify(update_url()), 'write')
+        with call_class('bulk'):
+            self.assertEqual(classify(update_url()), 'bulk')
+
+    def test_open_breaker_serves_cached_list(self):
+        self.client.get('/city/')
+        self._fail()
+        bump('city')
+        sample = self.request('/city/')
+        self.assertEqual(sample['status'], 200)
+        self.assertEqual(sample['sparql_queries'], 0)
+        self.assertContains(self.client.get('/city/'), self.network['cities'][0])
+
+    def test_open_breaker_serves_cached_ontology_stations(self):
+        from transport_app.views import ONTOLOGY_STATIONS
+
+        self.client.get('/transport/stations/')
+        cached = ONTOLOGY_STATIONS._entry[1]['results']['bindings']
+        self.assertTrue(cached)
+        self._fail()
+        bump('orm')
+        response = self.client.get('/transport/stations/')
+        self.assertEqual(response.context['ontology_stations'], cached)
+
+
+@override_settings(FUSEKI_RETRY_BACKOFF=0)
+class SelectTests(StandInTestCase):
+    """Reads tell no match from failure and only retry what may succeed."""
+
+    def test_no_match_is_one_round_trip(self):
+        before = self.standin.snapshot()['query']
+        result = select(f"SELECT ?o WHERE {{ <{EX}missing> ?p ?o }}")
+        self.assertEqual(result['results']['bindings'], [])
+        self.assertEqual(self.standin.snapshot()['query'] - before, 1)
+
+    def test_bad_query_raises_without_retry(self):
+        before = self.standin.snapshot()['query']
+        with self.assertRaises(SparqlQueryError):
+            select('NOT SPARQL')
+        self.assertEqual(self.standin.snapshot()['query'] - before, 1)
+
+    def test_retryable_failures_are_retried(self):
+        failure = SparqlQueryError('503', retryable=True)
+        with mock.patch('core.utils.fuseki._select_once', side_effect=[failure, {'boolean': True}]) as once:
+            self.assertEqual(select('ASK {}'), {'boolean': True})
+        self.assertEqual(once.call_count, 2)
+        with mock.patch('core.utils.fuseki._select_once', side_effect=failure) as once:
+            with self.assertRaises(SparqlQueryError):
+                select('ASK {}')
+        self.assertEqual(once.call_count, 3)
+
+    def test_read_timeout_is_not_retried(self):
+        import requests
+
+        with mock.patch.object(get_session(), 'post', side_effect=requests.exceptions.ReadTimeout('slow')) as post:
+            with self.assertRaises(SparqlQueryError) as raised:
+                select('ASK {}', union=False)
+        self.assertFalse(raised.exception.retryable)
+        self.assertEqual(post.call_count, 1)
+
+        refused = requests.exceptions.ConnectionError('refused')
+        with mock.patch.object(get_session(), 'post', side_effect=refused) as post:
+            with self.assertRaises(SparqlQueryError):
+                select('ASK {}', union=False)
+        self.assertEqual(post.call_count, 3)
+
+    def test_union_default_graph_setting(self):
+        with mock.patch('core.utils.fuseki._select_once', return_value={}) as once:
+            with override_settings(FUSEKI_UNION_DEFAULT_GRAPH=False):
+                select('ASK {}')
+            select('ASK {}')
+        self.assertEqual([c.args[1] for c in once.call_args_list], [False, True])
+
+
+class AsyncClientTests(StandInTestCase):
+    """The pooled async client lives on ASGI worker loops only, and is closed with them."""
+
+    ASK = 'ASK { ?s ?p ?o }'
+
+    def test_without_pool_async_reads_use_the_shared_session(self):
+        before = self.standin.snapshot()['query']
+        self.assertFalse(fuseki.async_pool_enabled())
+        self.assertEqual(asyncio.run(fuseki.sparql_query_async(self.ASK)), {'head': {}, 'boolean': True})
+        self.assertEqual(len(fuseki._async_clients), 0)
+        self.assertEqual(self.standin.snapshot()['query'] - before, 1)
+
+    @mock.patch('core.utils.fuseki._async_pool', True)
+    @override_settings(FUSEKI_RETRY_BACKOFF=0)
+    def test_pooled_reads_follow_the_select_rules(self):
+        import httpx
+
+        async def read(error=None, union=False):
+            client = fuseki.get_async_client()
+            try:
+                if error is None:
+                    return await fuseki.aselect(self.ASK, union=union)
+                with mock.patch.object(client, 'get' if union else 'post', side_effect=error) as send:
+                    with self.assertRaises(SparqlQueryError) as raised:
+                        await fuseki.aselect(self.ASK, union=union)
+                return send.call_count, raised.exception.retryable
+            finally:
+                await fuseki.close_async_clients()
+
+        self.assertTrue(asyncio.run(read(union=True))['boolean'])
+        self.assertEqual(asyncio.run(read(httpx.ReadTimeout('slow'))), (1, False))
+        self.assertEqual(asyncio.run(read(httpx.ConnectError('refused'), union=True)), (3, True))
+
+        async def query():
+            try:
+                with mock.patch.object(fuseki.get_async_client(), 'post', side_effect=httpx.ConnectError('refused')):
+                    await fuseki.sparql_query_async(self.ASK)
+            finally:
+                await fuseki.close_async_clients()
+
+        with self.assertRaisesMessage(Exception, 'Impossible de se connecter à Fuseki'):
+            asyncio.run(query())
+
+    @mock.patch('core.utils.fuseki._async_pool', False)
+    def test_lifespan_shutdown_closes_the_client(self):
+        async def app(scope, receive, send):
+            raise AssertionError('lifespan is not forwarded to Django')
+
+        application = fuseki.with_async_pool(app)
+        messages = asyncio.Queue()
+        sent = []
+
+        async def send(message):
+            sent.append(message['type'])
+
+        async def worker():
+            server = asyncio.create_task(application({'type': 'lifespan'}, messages.get, send))
+            await messages.put({'type': 'lifespan.startup'})
+            await fuseki.sparql_query_async(self.ASK)
+            client = fuseki._async_clients[asyncio.get_running_loop()]
+            await messages.put({'type': 'lifespan.shutdown'})
+            await server
+            return client
+
+        client = asyncio.run(worker())
+        self.assertTrue(client.is_closed)
+        self.assertEqual(sent, ['lifespan.startup.complete', 'lifespan.shutdown.complete'])
+        self.assertEqual(len(fuseki._async_clients), 0)
+
+
+class PartitionTests(StandInTestCase):
+    """Per-entity graphs: same lists, fewer scans, writes in the entity's graph."""
+
+    def _lists(self):
+        from city.utils.ontology_manager import list_cities
+        from company.utils.ontology_manager import list_companies
+        from itinerary.utils.ontology_manager import list_itineraries
+        from schedule.utils.ontology_manager import list_schedules
+
+        invalidate_list_caches()
+        # Rows by identity: which duplicate of a repeated id wins follows the result order
+        return {name: sorted(str(row.get('id') or row['name']) for row in rows())
+                for name, rows in (('itineraries', list_itineraries), ('schedules', list_schedules),
+                                   ('cities', list_cities), ('companies', list_companies))}
+
+    def test_repartition_keeps_the_lists(self):
+        before = self._lists()
+        planned = repartition(dry_run=True)
+        self.assertTrue(planned['itinerary'] and planned['city'])
+        self.assertEqual(repartition(), planned)
+        self.assertEqual(repartition(dry_run=True), {})
+        itinerary = f"{NS}{self.network['itineraries'][0]}"
+        self.assertIn(URIRef(itinerary), set(self.standin.graph(partition_graph('itinerary')).subjects()))
+
+        with override_settings(FUSEKI_PARTITION_GRAPHS=True):
+            self.assertEqual(self._lists(), before)
+            invalidate_list_caches()
+            self.assertViewBudget('/itinerary/', sql=1, sparql=1)
+
+        merge()
+        self.assertEqual(len(self.standin.graph(partition_graph('itinerary'))), 0)
+        self.assertEqual(self._lists(), before)
+
+    @override_settings(FUSEKI_PARTITION_GRAPHS=True)
+    def test_writes_land_in_the_entity_graph(self):
+        from city.utils.ontology_manager import create_city, list_cities
+        from schedule.utils.ontology_manager import create_schedule
+
+        create_city({'name': 'Partition Town', 'population': 1000}, 'Capital')
+        schedule = create_schedule({'schedule_id': '901', 'route_name': 'Partition line'})
+        self.assertIn(URIRef(f"{NS}city_Partition_Town"),
+                      set(self.standin.graph(partition_graph('city')).subjects()))
+        self.assertIn(URIRef(f"{NS}{schedule}"), set(self.standin.graph(partition_graph('schedule')).subjects()))
+        self.assertIn('Partition Town', [row['name'] for row in list_cities()])
+
+    @override_settings(FUSEKI_PARTITION_GRAPHS=True)
+    def test_prefixed_updates_are_scoped_to_the_entity_graph(self):
+        from itinerary.utils import ontology_manager as itineraries
+        from transport_app.models import BusStop, City
+
+        stop = BusStop.objects.create(station_name='Arrêt partition', located_in=City.objects.first())
+        station = URIRef(f"{NS}station_{stop.pk}")
+        self.standin.update(f"INSERT DATA {{ GRAPH <{partition_graph('station')}> {{ <{station}> a <{NS}BusStop> }} }}")
+        self.client.post(f'/transport/stations/{stop.pk}/delete/')
+        self.assertNotIn(station, set(self.standin.graph(partition_graph('station')).subjects()))
+
+        trip = URIRef(f"{NS}I-B-902")
+        with mock.patch.object(itineraries, 'USE_RDFLIB', False), mock.patch('time.sleep'):
+            itineraries.create_itinerary({'itinerary_id': '902'}, 'Business')
+            self.assertIn(trip, set(self.standin.graph(partition_graph('itinerary')).subjects()))
+            self.assertNotIn(trip, set(self.standin.graph().subjects()))
+            itineraries.delete_itinerary('I-B-902')
+        self.assertNotIn(trip, set(self.standin.graph(partition_graph('itinerary')).subjects()))
+
+
+class InferenceTests(StandInTestCase):
+    """Writes re-derive the inferred types of the subjects they touch only."""
+
+    def _inferred(self, subject):
+        from core.utils.inference import inference_graph
+
+        return {str(o) for o in self.standin.graph(inference_graph()).objects(URIRef(subject), URIRef(RDF_TYPE))}
+
+    def test_update_subjects(self):
+        from core.utils.inference import update_subjects
+
+        self.assertEqual(update_subjects(f'PREFIX : <{NS}> INSERT DATA {{ :a a :BusTrip . GRAPH <{NS}g> {{ :b :x 1 }} }}'),
+                         {f'{NS}a', f'{NS}b'})
+        # Incoming links and non-type patterns cannot change a type
+        self.assertEqual(update_subjects(f'DELETE WHERE {{ ?s ?p <{NS}a> }}'), set())
+        self.assertEqual(update_subjects(f'PREFIX : <{NS}> DELETE {{ ?s :n ?o }} INSERT {{ ?s :n 2 }} WHERE {{ ?s :n ?o }}'), set())
+        self.assertIsNone(update_subjects(f'PREFIX : <{NS}> DELETE WHERE {{ ?s a :City ; :cityName "x" }}'))
+        self.assertIsNone(update_subjects(f'DROP SILENT GRAPH <{NS}g>'))
+        self.assertIsNone(update_subjects('not sparql'))
+
+    def test_writes_refresh_their_subjects(self):
+        from django.core.management import call_command
+
+        from core.utils import inference
+        from core.utils.fuseki import sparql_update
+
+        probe = f"{NS}InferenceProbe"
+        with mock.patch.object(inference, 'materialization_update', wraps=inference.materialization_update) as full:
+            sparql_update(f'PREFIX : <{NS}> INSERT DATA {{ :InferenceProbe a :BusinessTrip }}')
+            self.assertIn(f"{NS}Itinerary", self._inferred(probe))
+            sparql_update(f'PREFIX : <{NS}> DELETE WHERE {{ :InferenceProbe ?p ?o }}')
+            self.assertEqual(self._inferred(probe), set())
+            self.assertFalse(full.called)
+
+            # A type pattern on a variable subject rebuilds the whole graph
+            sparql_update(f'PREFIX : <{NS}> DELETE WHERE {{ ?s a :BusinessTrip ; :itineraryID "none" }}')
+            self.assertEqual(full.call_count, 1)
+
+        itinerary = f"{NS}{self.network['itineraries'][0]}"
+        self.standin.update(f"DROP SILENT GRAPH <{inference.inference_graph()}>")
+        call_command('refresh_inference', stdout=io.StringIO())
+        self.assertIn(f"{NS}Itinerary", self._inferred(itinerary))
+
+
+class ConditionalGetTests(StandInTestCase):
+    """Pages revalidate from version stamps; writes change the ETag."""
+
+    def _revalidate(self, path):
+        self.client.get(path)  # the first visit sets the CSRF cookie, part of the tag
+        etag = self.client.get(path)['ETag']
+        before = self.standin.snapshot()['query']
+        response = self.client.get(path, headers={'if-none-match': etag})
+        return etag, response, self.standin.snapshot()['query'] - before
+
+    def test_not_modified_without_fuseki(self):
+        for path in ('/city/', '/company/', '/itinerary/', '/schedule/', '/transport/stations/',
+                     f"/city/{self.network['cities'][0]}/"):
+            with self.subTest(path=path):
+                etag, response, queries = self._revalidate(path)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response['ETag'], etag)
+                self.assertEqual(queries, 0)
+
+    def test_manager_write_changes_type_and_entity_stamps(self):
+        from city.utils.ontology_manager import delete_city
+
+        # The stand-in is not rolled back between tests: delete the last city only
+        second, first = self.network['cities'][-2:]
+        list_etag = self.client.get('/city/')['ETag']
+        other_etag = self.client.get(f"/city/{second}/")['ETag']
+        company_etag = self.client.get('/company/')['ETag']
+        delete_city(first)
+        self.assertNotEqual(self.client.get('/city/')['ETag'], list_etag)
+        self.assertEqual(self.client.get(f"/city/{second}/")['ETag'], other_etag)
+        self.assertEqual(self.client.get('/company/')['ETag'], company_etag)
+
+    def test_free_form_update_changes_every_stamp(self):
+        from core.utils.fuseki import sparql_update
+
+        etag = self.client.get('/company/')['ETag']
+        sparql_update('PREFIX : <http://www.transport-ontology.org/travel#> INSERT DATA { :x :y "z" }')
+        self.assertNotEqual(self.client.get('/company/')['ETag'], etag)
+
+    def test_orm_write_changes_orm_pages(self):
+        from transport_app.models import BusStop
+
+        etag = self.client.get('/transport/stations/')['ETag']
+        BusStop.objects.create(station_name='Arrêt test')
+        self.assertNotEqual(self.client.get('/transport/stations/')['ETag'], etag)
+
+
+class ExportTests(StandInTestCase):
+    """/export/ streams the dataset (or one class) in every format."""
+
+    def _download(self, query):
+        response = self.client.get(f"/export/?{query}")
+        self.assertEqual(response.status_code, 200)
+        return response, b''.join(response.streaming_content)
+
+    def test_nquads_round_trip(self):
+        from rdflib import Dataset
+
+        _, body = self._download('format=nq&inferred=1')
+        dataset = Dataset()
+        dataset.parse(data=body.decode('utf-8'), format='nquads')
+        self.assertEqual(len(list(dataset.quads())), self.standin.triple_count())
+
+    def test_class_slice_gzip(self):
+        import gzip
+        from rdflib import Graph
+
+        response, body = self._download('format=nt&type=Itinerary&gzip=1')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="itinerary.nt.gz"')
+        graph = Graph().parse(data=gzip.decompress(body).decode('utf-8'), format='nt')
+        subjects = {str(s).rsplit('#', 1)[-1] for s in graph.subjects()}
+        self.assertTrue(set(self.network['itineraries']) <= subjects)
+        self.assertFalse(any(s.startswith('city_') for s in subjects))
+
+    def test_csv(self):
+        _, body = self._download('format=csv&type=City')
+        self.assertTrue(body.startswith(b's,p,o,g\r\n'))
+
+    def test_bad_requests(self):
+        self.assertEqual(self.client.get('/export/?format=xml').status_code, 400)
+        self.assertEqual(self.client.get('/export/?type=Nope').status_code, 400)
+
+
+class BulkImportTests(StandInTestCase):
+    """bulk_import validates rows, loads them in batches and resumes after a failure."""
+
+    ROWS = [
+        {'entity': 'itinerary', 'type': 'Leisure', 'itinerary_id': '901', 'overall_status': 'Planned',
+         'total_cost_estimate': 120.5, 'total_duration_days': 3, 'activity_type': 'Hiking',
+         'group_size': 4},
+        {'entity': 'schedule', 'type': 'Daily', 'schedule_id': '901', 'route_name': 'Bulk Line',
+         'is_public': True, 'frequency_minutes': 15},
+        {'entity': 'city', 'type': 'Touristic', 'name': 'Bulkville', 'population': 1200,
+         'area_km2': 12.5, 'annual_visitors': 5000, 'hotels': 12},
+        {'entity': 'company', 'type': 'Taxi', 'name': 'Bulk Cabs', 'number_of_vehicles': 30},
+        {'entity': 'city', 'type': 'Capital', 'name': 'Bulkville'},
+        {'entity': 'itinerary', 'type': 'Business', 'itinerary_id': '902', 'total_duration_days': 'x'},
+    ]
+
+    def setUp(self):
+        import tempfile
+
+        self.path = f"{tempfile.mkdtemp()}/rows.jsonl"
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write("\n".join(json.dumps(row) for row in self.ROWS) + "\n")
+
+    def _import(self, **options):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        out, err = StringIO(), StringIO()
+        call_command('bulk_import', self.path, batch_size=2, stdout=out, stderr=err, **options)
+        return out.getvalue(), err.getvalue()
+
+    def _subjects(self, *local_names):
+        """Those of ``local_names`` present in any graph of the stand-in."""
+        wanted = {f"{NS}{name}" for name in local_names}
+        found = {str(s) for g in self.standin.dataset.graphs() for s in g.subjects() if str(s) in wanted}
+        return {uri.rsplit('#', 1)[-1] for uri in found}
+
+    def test_import_and_resume(self):
+        from core.utils import bulk_import
+
+        # The second batch (city + company) fails: the first one stays committed
+        real_insert = bulk_import._insert_data
+        calls = []
+
+        def failing_insert(records):
+            calls.append(len(records))
+            if len(calls) == 2:
+                raise bulk_import.BulkImportError("Fuseki update failed: 503")
+            real_insert(records)
+
+        with mock.patch.object(bulk_import, '_insert_data', failing_insert):
+            with self.assertRaises(CommandError):
+                self._import(method='insert')
+        self.assertEqual(self._subjects('I-L-901', 'S-D-901', 'city_Bulkville'), {'I-L-901', 'S-D-901'})
+        with open(f"{self.path}.checkpoint", encoding='utf-8') as f:
+            self.assertEqual(json.load(f)['rows'], 2)
+
+        out, err = self._import(method='gsp')
+        self.assertIn('2 lignes déjà importées', out)
+        self.assertIn('2 entités importées, 2 rejetées', out)
+        self.assertIn('ligne 5', err)  # Bulkville twice
+        self.assertIn('ligne 6', err)  # invalid duration
+        self.assertEqual(self._subjects('city_Bulkville', 'company_Bulk_Cabs', 'I-B-902'),
+                         {'city_Bulkville', 'company_Bulk_Cabs'})
+
+        # The triples are those of the create pages, so the managers read them back
+        from city.utils.ontology_manager import get_city
+        self.assertEqual(get_city('Bulkville')['type'], 'Touristic')
+
+    def test_existing_entities_are_rejected(self):
+        city = self.network['cities'][0]
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'type': 'Capital', 'name': city}) + "\n")
+        out, err = self._import(entity='city')
+        self.assertIn('0 entités importées, 1 rejetées', out)
+        self.assertIn('already exists', err)
+
+
+class OntologyBootstrapTests(StandInTestCase):
+    """The ontology load and the Django sync only write what changed."""
+
+    def setUp(self):
+        from core.utils import rdf_loader
+
+        rdf_loader._loaded.clear()
+
+    def _data_triples(self):
+        from django.conf import settings
+
+        return len(self.standin.graph(settings.FUSEKI_GRAPH))
+
+    def test_unchanged_ontology_is_skipped(self):
+        from core.utils.rdf_loader import _loaded, load_ontology_to_fuseki
+
+        before = self._data_triples()
+        load_ontology_to_fuseki()  # first load: no digest recorded yet
+        self.assertEqual(self._data_triples(), before)  # replaced, not appended
+
+        stats = self.standin.snapshot()
+        self.assertFalse(load_ontology_to_fuseki())
+        _loaded.clear()  # another process: one digest query, no write
+        self.assertFalse(load_ontology_to_fuseki())
+        after = self.standin.snapshot()
+        self.assertEqual((after['query'] - stats['query'], after['update'] - stats['update'],
+                          after['data'] - stats['data']), (1, 0, 0))
+
+    def test_changed_ontology_is_applied_as_delta(self):
+        import tempfile
+
+        from core.utils.rdf_loader import load_ontology_to_fuseki, ontology_path
+
+        load_ontology_to_fuseki()
+        with open(ontology_path(), encoding='utf-8') as f:
+            source = f.read()
+        edited = f"{tempfile.mkdtemp()}/ontology.ttl"
+        with open(edited, 'w', encoding='utf-8') as f:
+            f.write(source + f"\n<{NS}DeltaClass> a <http://www.w3.org/2002/07/owl#Class> .\n")
+
+        itinerary = f"{NS}{self.network['itineraries'][0]}"
+        before, schema_before = self._data_triples(), len(self.standin.graph(schema_graph()))
+        self.assertTrue(load_ontology_to_fuseki(edited))
+        # A new class is schema: it lands in the schema graph only
+        self.assertEqual(len(self.standin.graph(schema_graph())), schema_before + 1)
+        self.assertEqual(self._data_triples(), before)
+        self.assertTrue(load_ontology_to_fuseki())  # back to the original file
+        self.assertEqual(len(self.standin.graph(schema_graph())), schema_before)
+        self.assertEqual(self._data_triples(), before)
+        # Instance data written by the application is kept
+        self.assertTrue(any(str(s) == itinerary for g in self.standin.dataset.graphs() for s in g.subjects()))
+
+    def test_schema_triples_leave_the_data_graph(self):
+        from django.conf import settings
+
+        from core.utils.rdf_loader import META, ONTOLOGY_STATE, load_ontology_to_fuseki, meta_graph
+
+        # A load from before the split: the whole file in FUSEKI_GRAPH, no schema graph recorded
+        ontology = schema()
+        data = self.standin.graph(settings.FUSEKI_GRAPH)
+        data += ontology.tbox
+        self.standin.graph(schema_graph()).remove((None, None, None))
+        state = self.standin.graph(meta_graph('ontology'))
+        state.remove((None, None, None))
+        state.add((ONTOLOGY_STATE, META.sha256, Literal(ontology.digest)))
+        state.add((ONTOLOGY_STATE, META.source, Literal(ontology.source)))
+
+        self.assertTrue(load_ontology_to_fuseki())
+        owl_class = (None, URIRef(RDF_TYPE), URIRef("http://www.w3.org/2002/07/owl#Class"))
+        self.assertFalse(any(True for _ in data.triples(owl_class)))
+        self.assertTrue(any(True for _ in self.standin.graph(schema_graph()).triples(owl_class)))
+        self.assertFalse(load_ontology_to_fuseki())
+        # Subclass lookups through the schema graph still work on the default scope
+        result = sparql_query(
+            f"SELECT DISTINCT ?s WHERE {{ ?s a/<http://www.w3.org/2000/01/rdf-schema#subClassOf>* <{NS}Itinerary> }}"
+        )
+        found = {b['s']['value'] for b in result['results']['bindings']}
+        self.assertLessEqual({f"{NS}{i}" for i in self.network['itineraries']}, found)
+
+    def test_instance_writes_keep_the_schema(self):
+        from core.utils.fuseki import sparql_update
+        from core.utils.inference import class_values, materialization_update
+
+        ontology = schema()
+        self.assertIs(from_source(ontology.source.encode('utf-8')), ontology)
+        values, update = class_values('?type', 'Itinerary'), materialization_update()
+        triples = len(self.standin.graph(schema_graph()))
+
+        sparql_update(f'PREFIX : <{NS}> INSERT DATA {{ :SchemaProbe a :BusinessTrip }}')
+        self.assertIs(schema(), ontology)
+        self.assertIs(class_values('?type', 'Itinerary'), values)
+        self.assertIs(materialization_update(), update)
+        self.assertEqual(len(self.standin.graph(schema_graph())), triples)
+
+        edited = from_source(ontology.source.encode('utf-8') + f"\n<{NS}Probe> a <http://www.w3.org/2002/07/owl#Class> .\n".encode('utf-8'))
+        self.assertIsNot(edited, ontology)
+        self.assertIn(f"{NS}Probe", {str(s) for s in edited.tbox.subjects()})
+
+    def test_incremental_sync(self):
+        from transport_app.models import Station
+        from transport_app.services.ontology_service import OntologySyncService
+
+        OntologySyncService().sync_all_data()
+        stats = self.standin.snapshot()
+        self.assertIn('(0/', OntologySyncService().sync_all_data())
+        self.assertEqual(self.standin.snapshot()['data'], stats['data'])
+
+        Station.objects.filter(pk=Station.objects.order_by('pk')[0].pk).update(station_name='Renamed')
+        self.assertIn('(1/', OntologySyncService().sync_all_data())
+
+    def test_sync_replaces_changed_and_removed_subjects(self):
+        from transport_app.models import Bus, Station
+        from transport_app.services.ontology_service import ONTOLOGY, OntologySyncService
+
+        def values(subject, prop=None):
+            return [o for g in self.standin.dataset.graphs()
+                    for o in g.objects(URIRef(subject), URIRef(prop) if prop else None)]
+
+        OntologySyncService().sync_all_data()
+        station = Station.objects.order_by('pk')[0]
+        transport = Bus.objects.order_by('pk')[0]
+        transport_uri = f"{ONTOLOGY}Bus_{transport.transport_line_number}"
+        self.assertTrue(values(transport_uri))
+
+        Station.objects.filter(pk=station.pk).update(station_name='Renamed')
+        transport.delete()
+        self.assertIn('1 removed', OntologySyncService().sync_all_data())
+        self.assertEqual([str(v) for v in values(f"{ONTOLOGY}station_{station.pk}", f"{ONTOLOGY}Station_hasName")],
+                         ['Renamed'])
+        self.assertEqual(values(transport_uri), [])
+
+        # A full sync replaces the network partition as a whole
+        network = self.standin.graph(partition_graph('station'))
+        network.add((URIRef(transport_uri), URIRef(RDF_TYPE), URIRef(f"{ONTOLOGY}Bus")))
+        with override_settings(FUSEKI_PARTITION_GRAPHS=True):
+            OntologySyncService().sync_all_data(incremental=False)
+        self.assertNotIn(URIRef(transport_uri), set(network.subjects()))
+        self.assertIn(URIRef(f"{ONTOLOGY}station_{station.pk}"), set(network.subjects()))
@@ -1,5 +1,5 @@
 from django.urls import path , include
-from . import views
+from . import api, views
 
 
 urlpatterns = [
@@ -7,6 +7,11 @@ urlpatterns = [
     path('query/', views.query_view, name='query'),
     path('load-ontology/', views.load_ontology, name='load_ontology'),
     path('debug-fuseki/', views.debug_fuseki, name='debug_fuseki'),
+    path('metrics', views.metrics, name='metrics'),
+    path('export/', views.export_graph, name='export_graph'),
+    path('api/', api.api_index, name='api_index'),
+    path('api/autocomplete/<str:entity>', api.autocomplete_list, name='api_autocomplete'),
+    path('api/<str:entity>', api.entity_list, name='api_entity_list'),
     path('itinerary/', include('itinerary.urls')),
     path('schedule/', include('schedule.urls')),
     path('city/', include('city.urls')),
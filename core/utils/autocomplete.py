@@ -0,0 +1,261 @@
+# core/utils/autocomplete.py - In-process prefix indexes for autocomplete
+#
+# Each entity type (persons, stations, transports, companies, cities) has a
+# sorted list of (term, key) pairs; a lookup is a bisect to the first term
+# starting with the query and a scan of the matches, so it costs microseconds
+# whatever the table size. Terms are the accent- and case-folded text from
+# every word onwards ("gare de tunis", "de tunis", "tunis"), so a query
+# matches the start of any word as well as the whole name.
+#
+# Indexes are built on first use and checked against the version stamps of
+# their source at each lookup (one SQL read). ORM rows are maintained in
+# place from post_save/post_delete (wired in core.apps); the bumps of those
+# local writes are counted so they do not force a rebuild, while a write from
+# another worker does. Ontology entities are rebuilt from one SPARQL query
+# when their stamp moves.
+import bisect
+import logging
+import re
+import threading
+import unicodedata
+
+from .inference import NS, class_values
+from .versioning import GRAPH, ORM, versions
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+_WORD = re.compile(r"\w+")
+
+
+def normalize(text):
+    """Case- and accent-folded words of ``text`` joined by single spaces."""
+    folded = unicodedata.normalize('NFKD', str(text)).casefold()
+    folded = ''.join(c for c in folded if not unicodedata.combining(c))
+    return ' '.join(_WORD.findall(folded))
+
+
+def _terms(texts):
+    terms = set()
+    for text in texts:
+        words = normalize(text).split(' ') if text else []
+        for i in range(len(words)):
+            if words[i]:
+                terms.add(' '.join(words[i:]))
+    return terms
+
+
+class PrefixIndex:
+    """Sorted (term, key) pairs with a label per key; not thread-safe on its own."""
+
+    def __init__(self):
+        self._entries = []
+        self._labels = {}
+        self._terms = {}
+
+    def __len__(self):
+        return len(self._labels)
+
+    @classmethod
+    def build(cls, rows):
+        """Index of ``rows`` ((key, label, *texts)), sorted once; a repeated key keeps its last row."""
+        index = cls()
+        for key, label, *texts in rows:
+            index._labels[key] = label
+            index._terms[key] = _terms(texts)
+        index._entries = sorted((term, key) for key, terms in index._terms.items() for term in terms)
+        return index
+
+    def add(self, key, label, *texts):
+        """Index ``key`` under ``texts`` (replacing a previous entry); for in-place updates."""
+        self.remove(key)
+        terms = _terms(texts)
+        for term in terms:
+            bisect.insort(self._entries, (term, key))
+        self._labels[key] = label
+        self._terms[key] = terms
+
+    def remove(self, key):
+        for term in self._terms.pop(key, ()):
+            i = bisect.bisect_left(self._entries, (term, key))
+            if i < len(self._entries) and self._entries[i] == (term, key):
+                del self._entries[i]
+        self._labels.pop(key, None)
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        """[(key, label)] of at most ``limit`` entries with a term starting with ``query``."""
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        found = {}
+        i = bisect.bisect_left(self._entries, (prefix,))
+        while i < len(self._entries) and len(found) < limit:
+            term, key = self._entries[i]
+            if not term.startswith(prefix):
+                break
+            found.setdefault(key, self._labels[key])
+            i += 1
+        return list(found.items())
+
+
+# ----------------------------------------------------------------------
+# SOURCES
+# ----------------------------------------------------------------------
+def _persons():
+    from transport_app.models import Person
+    for pk, name, ident in Person.objects.values_list('pk', 'has_name', 'has_id'):
+        yield pk, f"{name} ({ident})", name, ident
+
+
+def _person_entry(person):
+    return person.pk, f"{person.has_name} ({person.has_id})", person.has_name, person.has_id
+
+
+def _stations():
+    from transport_app.models import Station
+    for pk, name in Station.objects.values_list('pk', 'station_name'):
+        yield pk, name, name
+
+
+def _station_entry(station):
+    return station.pk, station.station_name, station.station_name
+
+
+def _transports():
+    from transport_app.models import Transport
+    for pk, line in Transport.objects.values_list('pk', 'transport_line_number'):
+        yield pk, line, line
+
+
+def _transport_entry(transport):
+    return transport.pk, transport.transport_line_number, transport.transport_line_number
+
+
+def _named(cls, predicate):
+    def load():
+        # Not at module level: core.apps imports this module for its receivers
+        from .fuseki import sparql_query_all_graphs
+
+        result = sparql_query_all_graphs(f"""
+PREFIX : <{NS}>
+SELECT ?s (SAMPLE(?n) AS ?name) WHERE {{
+  {class_values('?cls', cls)}
+  ?s a ?cls ; {predicate} ?n .
+}}
+GROUP BY ?s
+""")
+        for b in result.get('results', {}).get('bindings', []):
+            if 'name' in b:
+                yield b['s']['value'], b['name']['value'], b['name']['value']
+    return load
+
+
+class Source:
+    """
+    Where an index comes from: ``load()`` yields (key, label, *texts), and
+    ``stamps`` invalidate it. ORM sources also name the ``model`` whose saves
+    and deletes are applied in place through ``entry(instance)``.
+    """
+
+    def __init__(self, key, stamps, load, model=None, entry=None):
+        self.key = key
+        self.stamps = stamps
+        self.load = load
+        self.model = model
+        self.entry = entry
+
+
+def _sources():
+    from transport_app.models import Person, Station, Transport
+
+    return {
+        'persons': Source('id', (ORM,), _persons, Person, _person_entry),
+        'stations': Source('id', (ORM,), _stations, Station, _station_entry),
+        'transports': Source('id', (ORM,), _transports, Transport, _transport_entry),
+        'companies': Source('uri', (GRAPH, 'company'), _named(
+            'Company', ":companyName|<http://www.transport-ontology.org/companyName>")),
+        'cities': Source('uri', (GRAPH, 'city'), _named('City', ':cityName')),
+    }
+
+
+def source_keys():
+    """{entity type: name of its key in results ('id' or 'uri')}."""
+    return {name: source.key for name, source in _sources().items()}
+
+
+# ----------------------------------------------------------------------
+# INDEX REGISTRY
+# ----------------------------------------------------------------------
+# name -> [stamp versions the index reflects, PrefixIndex]
+_indexes = {}
+_lock = threading.Lock()
+
+
+def _build(source):
+    return PrefixIndex.build(source.load())
+
+
+def lookup(name, query, limit=DEFAULT_LIMIT):
+    """
+    [(key, label)] of ``name`` entities matching ``query``. Raises KeyError for
+    an unknown name and the Fuseki error when an ontology index cannot be built.
+    """
+    source = _sources()[name]
+    current = versions(source.stamps)
+    with _lock:
+        state = _indexes.get(name)
+        if state is not None and state[0] == current:
+            return state[1].search(query, limit)
+
+    try:
+        index = _build(source)
+    except Exception as e:
+        if state is None:
+            raise
+        # Fuseki down: the previous index is better than nothing
+        logger.warning("Autocomplete index %s not rebuilt, serving the previous one: %s", name, e)
+        return state[1].search(query, limit)
+    with _lock:
+        _indexes[name] = [current, index]
+    return index.search(query, limit)
+
+
+def invalidate_autocomplete():
+    with _lock:
+        _indexes.clear()
+
+
+def _orm_write(sender, instance, deleted):
+    if sender._meta.app_label not in ('transport_app', 'ticket_app'):
+        return
+    sources = _sources()
+    with _lock:
+        for name, state in _indexes.items():
+            source = sources[name]
+            if ORM not in source.stamps:
+                continue
+            # bump_orm counts this write once: expect it rather than rebuild
+            state[0] = {**state[0], ORM: state[0][ORM] + 1}
+            if source.model is None or not isinstance(instance, source.model):
+                continue
+            key, label, *texts = source.entry(instance)
+            if deleted:
+                state[1].remove(key)
+            else:
+                state[1].add(key, label, *texts)
+
+
+def orm_saved(sender, instance, **kwargs):
+    """post_save receiver (same senders as versioning.bump_orm)."""
+    _orm_write(sender, instance, deleted=False)
+
+
+def orm_deleted(sender, instance, **kwargs):
+    _orm_write(sender, instance, deleted=True)
+
+
+def orm_m2m_changed(sender, **kwargs):
+    # Links are not indexed, but bump_orm counts them
+    _orm_write(sender, None, deleted=False)
@@ -0,0 +1,377 @@
+# core/utils/bulk_import.py - Bulk loading of itineraries, schedules, cities and companies
+#
+# Rows (CSV with a header line, or JSON Lines) are validated with the create
+# pages' forms and turned into the very triples the managers' create_* write
+# (itinerary_triples, city_triples, ...), but loaded a batch at a time: one
+# existence check and one INSERT DATA (or one Graph Store POST per target
+# graph) per batch, instead of several round trips per entity. A checkpoint
+# file records how many rows are committed, so a failed run resumes where it
+# stopped. Inference and version stamps are refreshed once, at the end.
+import csv
+import json
+import logging
+import os
+import time
+
+from django.conf import settings
+
+from .circuit import call_class
+from .fuseki import data_url, get_session, query_url, update_url
+from .inference import NS, refreshes_inference, touching
+from .partitions import entity_graph, partition_graph, partitioned
+from .versioning import bumps_version
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+METHODS = ('insert', 'gsp')
+TIMEOUT = 120
+
+XSD = "http://www.w3.org/2001/XMLSchema#"
+
+
+class BulkImportError(Exception):
+    pass
+
+
+# ----------------------------------------------------------------------
+# ENTITY TYPES
+# ----------------------------------------------------------------------
+def _statements(triples):
+    """N-Triples lines for rdflib triples (valid Turtle and SPARQL data)."""
+    return "\n".join(f"{s.n3()} {p.n3()} {o.n3()} ." for s, p, o in triples)
+
+
+def _named_graph(entity):
+    """Graph create_* of ``entity`` writes to (its partition when partitioned)."""
+    return entity_graph(entity) if getattr(settings, 'FUSEKI_GRAPH', None) else None
+
+
+def _itinerary(cleaned, kind):
+    from itinerary.utils.ontology_manager import itinerary_triples
+
+    # Same mapping as itinerary_create
+    data = {
+        'itinerary_id': cleaned.get('itinerary_id'),
+        'overall_status': cleaned.get('overall_status', 'Planned'),
+        'total_cost_estimate': float(cleaned.get('total_cost_estimate') or 0),
+        'total_duration_days': int(cleaned.get('total_duration_days') or 1),
+    }
+    if kind == 'Business':
+        data.update({
+            'client_project_name': cleaned.get('client_project_name', ''),
+            'expense_limit': float(cleaned.get('expense_limit') or 0),
+            'purpose_code': cleaned.get('purpose_code', ''),
+            'approval_required': bool(cleaned.get('approval_required', False)),
+        })
+    elif kind == 'Leisure':
+        data.update({
+            'activity_type': cleaned.get('activity_type', ''),
+            'accommodation': cleaned.get('accommodation', ''),
+            'budget_per_day': float(cleaned.get('budget_per_day') or 0),
+            'group_size': int(cleaned.get('group_size') or 1),
+        })
+    elif kind == 'Educational':
+        data.update({
+            'institution': cleaned.get('institution', ''),
+            'course_reference': cleaned.get('course_reference', ''),
+            'credit_hours': int(cleaned.get('credit_hours') or 0),
+            'required_documentation': cleaned.get('required_documentation', ''),
+        })
+    full_id, triples = itinerary_triples(data, kind)
+    return f"{NS}{full_id}", _statements(triples), _named_graph('itinerary')
+
+
+def _schedule(cleaned, kind):
+    from schedule.utils.ontology_manager import schedule_triples
+
+    data = {**cleaned, 'is_public': bool(cleaned.get('is_public', False)),
+            'schedule_type': '' if kind == 'Schedule' else kind}
+    full_id, triples = schedule_triples(data)
+    return f"{NS}{full_id}", _statements(triples), _named_graph('schedule')
+
+
+def _city(cleaned, kind):
+    from city.utils.ontology_manager import city_triples
+
+    name, block = city_triples({**cleaned, 'type': kind}, kind)
+    # create_city writes to the default graph, or to the city partition
+    return f"{NS}city_{name.replace(' ', '_')}", block, partition_graph('city') if partitioned() else None
+
+
+def _company(cleaned, kind):
+    from company.utils.ontology_manager import company_graph, company_triples
+
+    name, block = company_triples({**cleaned, 'type': kind})
+    return f"{NS}company_{name.replace(' ', '_')}", block, company_graph()
+
+
+class EntityType:
+    """
+    One importable entity: its forms by type (the first is the default) and a
+    builder turning cleaned data into (subject IRI, statements, target graph).
+    """
+
+    def __init__(self, forms, build, checks_existing=True):
+        self.forms = forms
+        self.build = build
+        # Forms whose clean_* look the entity up in Fuseki (check_existing=)
+        self.checks_existing = checks_existing
+
+    def kind(self, raw):
+        if not raw:
+            return next(iter(self.forms))
+        lookup = {k.lower(): k for k in self.forms}
+        kind = lookup.get(str(raw).lower()) or lookup.get(f"{raw}company".lower())
+        if kind is None:
+            raise BulkImportError(f"Unknown type '{raw}' (choose from {', '.join(self.forms)})")
+        return kind
+
+    def form(self, kind, row):
+        kwargs = {'check_existing': False} if self.checks_existing else {}
+        return self.forms[kind](data=row, **kwargs)
+
+
+def entity_types():
+    from city.forms import CapitalCityForm, IndustrialCityForm, MetropolitanCityForm, TouristicCityForm
+    from company.forms import BikeSharingCompanyForm, BusCompanyForm, MetroCompanyForm, TaxiCompanyForm
+    from itinerary.forms import BusinessTripForm, EducationalTripForm, LeisureTripForm
+    from schedule.forms import DailyScheduleForm, OnDemandScheduleForm, ScheduleForm, SeasonalScheduleForm
+
+    return {
+        'itinerary': EntityType({
+            'Business': BusinessTripForm,
+            'Leisure': LeisureTripForm,
+            'Educational': EducationalTripForm,
+        }, _itinerary),
+        'schedule': EntityType({
+            'Schedule': ScheduleForm,
+            'Daily': DailyScheduleForm,
+            'Seasonal': SeasonalScheduleForm,
+            'OnDemand': OnDemandScheduleForm,
+        }, _schedule, checks_existing=False),
+        'city': EntityType({
+            'Capital': CapitalCityForm,
+            'Metropolitan': MetropolitanCityForm,
+            'Touristic': TouristicCityForm,
+            'Industrial': IndustrialCityForm,
+        }, _city),
+        'company': EntityType({
+            'BusCompany': BusCompanyForm,
+            'MetroCompany': MetroCompanyForm,
+            'TaxiCompany': TaxiCompanyForm,
+            'BikeSharingCompany': BikeSharingCompanyForm,
+        }, _company),
+    }
+
+
+# ----------------------------------------------------------------------
+# READING
+# ----------------------------------------------------------------------
+def read_rows(path, fmt=None):
+    """
+    (line number, row, error) for each record of a CSV file (header line
+    first) or a JSON Lines file; blank lines are not records.
+    """
+    fmt = fmt or ('csv' if path.lower().endswith('.csv') else 'jsonl')
+    with open(path, newline='', encoding='utf-8') as f:
+        if fmt == 'csv':
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row, None
+            return
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield number, None, f"invalid JSON: {e}"
+                continue
+            if not isinstance(row, dict):
+                yield number, None, "a JSON object is expected"
+                continue
+            yield number, row, None
+
+
+def _form_errors(form):
+    return "; ".join(f"{field}: {' '.join(errors)}" for field, errors in form.errors.items())
+
+
+# ----------------------------------------------------------------------
+# LOADING
+# ----------------------------------------------------------------------
+def _by_graph(records):
+    groups = {}
+    for record in records:
+        groups.setdefault(record['graph'], []).append(record['statements'])
+    # Default graph first: INSERT DATA takes its triples before the GRAPH blocks
+    return sorted(groups.items(), key=lambda item: item[0] is not None)
+
+
+def _insert_data(records):
+    parts = []
+    for graph, blocks in _by_graph(records):
+        body = "\n".join(blocks)
+        parts.append(f"GRAPH <{graph}> {{\n{body}\n}}" if graph else body)
+    update = f"PREFIX : <{NS}>\nPREFIX xsd: <{XSD}>\nINSERT DATA {{\n" + "\n".join(parts) + "\n}"
+    with call_class('bulk'):
+        response = get_session().post(update_url(), data={'update': update},
+                                      headers={'Content-Type': 'application/x-www-form-urlencoded'},
+                                      timeout=TIMEOUT)
+    if response.status_code not in (200, 204):
+        raise BulkImportError(f"Fuseki update failed: {response.status_code} - {response.text[:200]}")
+
+
+def _graph_store_post(records):
+    for graph, blocks in _by_graph(records):
+        body = f"@prefix : <{NS}> .\n@prefix xsd: <{XSD}> .\n" + "\n".join(blocks)
+        response = get_session().post(
+            data_url(), params={'graph': graph} if graph else {'default': ''},
+            data=body.encode('utf-8'), headers={'Content-Type': 'text/turtle; charset=utf-8'},
+            timeout=TIMEOUT,
+        )
+        if response.status_code not in (200, 201, 204):
+            raise BulkImportError(f"Fuseki upload failed: {response.status_code} - {response.text[:200]}")
+
+
+def existing_subjects(subjects):
+    """Subjects among ``subjects`` already in the default graph or a named graph."""
+    if not subjects:
+        return set()
+    values = " ".join(f"<{s}>" for s in subjects)
+    sparql = f"""SELECT DISTINCT ?s WHERE {{
+  VALUES ?s {{ {values} }}
+  {{ ?s ?p ?o }} UNION {{ GRAPH ?g {{ ?s ?p ?o }} }}
+}}"""
+    with call_class('bulk'):
+        response = get_session().post(query_url(), data={'query': sparql},
+                                      headers={'Accept': 'application/sparql-results+json'},
+                                      timeout=TIMEOUT)
+    response.raise_for_status()
+    return {b['s']['value'] for b in response.json().get('results', {}).get('bindings', [])}
+
+
+class BulkImporter:
+    """
+    Stream ``path`` into Fuseki ``batch_size`` rows at a time. ``entity`` is
+    the default for rows without an ``entity`` column; ``reject(line, reason)``
+    and ``progress(stats)`` (after each batch) are optional callbacks.
+    """
+
+    def __init__(self, path, entity=None, fmt=None, batch_size=DEFAULT_BATCH_SIZE, method='insert',
+                 checkpoint=None, restart=False, reject=None, progress=None):
+        if method not in METHODS:
+            raise BulkImportError(f"Unknown method '{method}' (choose from {', '.join(METHODS)})")
+        if batch_size < 1:
+            raise BulkImportError("batch size must be at least 1")
+        self.types = entity_types()
+        if entity and entity not in self.types:
+            raise BulkImportError(f"Unknown entity '{entity}' (choose from {', '.join(self.types)})")
+        self.path = path
+        self.entity = entity
+        self.fmt = fmt
+        self.batch_size = batch_size
+        self.load = _graph_store_post if method == 'gsp' else _insert_data
+        self.checkpoint = checkpoint or f"{path}.checkpoint"
+        self.restart = restart
+        self.reject = reject or (lambda line, reason: None)
+        self.progress = progress or (lambda stats: None)
+        self.stats = {'rows': 0, 'resumed': 0, 'loaded': 0, 'rejected': 0, 'batches': 0,
+                      'seconds': 0.0, 'rate': 0.0}
+
+    # -- checkpoint --------------------------------------------------
+    def _source(self):
+        return {'source': os.path.abspath(self.path), 'size': os.path.getsize(self.path)}
+
+    def _resume_from(self):
+        if self.restart or not os.path.exists(self.checkpoint):
+            return 0
+        with open(self.checkpoint, encoding='utf-8') as f:
+            state = json.load(f)
+        if {k: state.get(k) for k in ('source', 'size')} != self._source():
+            raise BulkImportError(f"{self.checkpoint} was written for another file; use restart")
+        return int(state.get('rows', 0))
+
+    def _save(self, rows):
+        state = {**self._source(), 'rows': rows}
+        tmp = f"{self.checkpoint}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp, self.checkpoint)
+
+    # -- rows --------------------------------------------------------
+    def _record(self, row):
+        """Validated record for ``row``, or the reason it is rejected."""
+        row = dict(row)
+        entity_name = row.pop('entity', None) or self.entity
+        entity = self.types.get(entity_name)
+        if entity is None:
+            return None, f"unknown entity '{entity_name}'" if entity_name else "no entity given"
+        try:
+            kind = entity.kind(row.pop('type', None))
+            form = entity.form(kind, row)
+            if not form.is_valid():
+                return None, _form_errors(form)
+            subject, statements, graph = entity.build(form.cleaned_data, kind)
+        except (BulkImportError, ValueError, TypeError) as e:
+            return None, str(e)
+        return {'subject': subject, 'statements': statements, 'graph': graph}, None
+
+    def _flush(self, batch, rows):
+        existing = existing_subjects([r['subject'] for r in batch])
+        records = []
+        for record in batch:
+            if record['subject'] in existing:
+                self._rejected(record['line'], f"{record['subject']} already exists")
+            else:
+                records.append(record)
+        if records:
+            with touching([r['subject'] for r in records]):
+                self.load(records)
+        self.stats['loaded'] += len(records)
+        self.stats['batches'] += 1
+        self._save(rows)
+
+    def _rejected(self, line, reason):
+        self.stats['rejected'] += 1
+        self.reject(line, reason)
+
+    def _tick(self, started):
+        elapsed = time.perf_counter() - started
+        self.stats['seconds'] = elapsed
+        self.stats['rate'] = self.stats['rows'] / elapsed if elapsed else 0.0
+        self.progress(dict(self.stats))
+
+    @bumps_version()
+    @refreshes_inference
+    def run(self):
+        """Import the file; returns the stats. The checkpoint is removed on success."""
+        resume = self._resume_from()
+        started = time.perf_counter()
+        batch, seen, position = [], set(), 0
+        for line, row, error in read_rows(self.path, self.fmt):
+            position += 1
+            if position <= resume:
+                self.stats['resumed'] += 1
+                continue
+            self.stats['rows'] += 1
+            record, error = (None, error) if error else self._record(row)
+            if record is None:
+                self._rejected(line, error)
+            elif record['subject'] in seen:
+                self._rejected(line, f"{record['subject']} appears twice in the file")
+            else:
+                seen.add(record['subject'])
+                batch.append({**record, 'line': line})
+            if len(batch) >= self.batch_size:
+                self._flush(batch, position)
+                batch = []
+                self._tick(started)
+        if batch:
+            self._flush(batch, position)
+        self._tick(started)
+        if os.path.exists(self.checkpoint):
+            os.remove(self.checkpoint)
+        logger.info("Bulk import of %s: %s", self.path, self.stats)
+        return self.stats
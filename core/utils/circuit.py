@@ -0,0 +1,208 @@
+# core/utils/circuit.py - Circuit breaker and per-class timeouts of the Fuseki client
+#
+# A slow or dead Fuseki used to hold each worker thread for the whole 30 s
+# timeout of every query of a page (and of the list pages' HTTP fallbacks),
+# so one outage took the site down. Every call made through the shared
+# clients of core.utils.fuseki (requests session and httpx client) now goes
+# through one breaker per process:
+#
+# - closed: calls go through; their outcomes are kept over a rolling window
+#   of FUSEKI_BREAKER_WINDOW seconds. Once at least FUSEKI_BREAKER_MIN_CALLS
+#   calls were made and FUSEKI_BREAKER_FAILURE_RATE of them failed
+#   (connection error, timeout or 5xx answer), the breaker opens.
+# - open: calls fail at once with CircuitOpenError (a requests
+#   ConnectionError, handled like an unreachable Fuseki) for
+#   FUSEKI_BREAKER_COOLDOWN seconds. The list caches, choice lists and
+#   autocomplete indexes keep serving their last complete answer.
+# - half-open: one call at a time is let through as a probe; its success
+#   closes the breaker, its failure opens it for another cooldown. A
+#   cancelled probe leaves the slot to the next call.
+#
+# Each call also gets the timeout of its class (FUSEKI_TIMEOUTS): 'read'
+# (/query), 'write' (/update) or 'bulk' (Graph Store /data, and any call made
+# within call_class('bulk'): imports, ontology loads, exports). A caller's own
+# timeout is kept when shorter.
+import contextlib
+import contextvars
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+import requests
+from django.conf import settings
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+CLASSES = ('read', 'write', 'bulk')
+DEFAULT_TIMEOUTS = {'read': 15, 'write': 30, 'bulk': 300}
+
+CLOSED, HALF_OPEN, OPEN = 'closed', 'half_open', 'open'
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+_call_class = contextvars.ContextVar('fuseki_call_class', default=None)
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Fuseki call refused without being sent: the breaker is open."""
+
+
+# ----------------------------------------------------------------------
+# CALL CLASSES AND TIMEOUTS
+# ----------------------------------------------------------------------
+@contextlib.contextmanager
+def call_class(name):
+    """Calls made inside the block use the timeout of class ``name``."""
+    token = _call_class.set(name)
+    try:
+        yield
+    finally:
+        _call_class.reset(token)
+
+
+def classify(url):
+    """Class of a call to ``url`` (call_class() wins over the endpoint)."""
+    forced = _call_class.get()
+    if forced:
+        return forced
+    path = str(url).split('?', 1)[0].rstrip('/')
+    if path.endswith('/update'):
+        return 'write'
+    if path.endswith('/data'):
+        return 'bulk'
+    return 'read'
+
+
+def class_timeout(kind):
+    return {**DEFAULT_TIMEOUTS, **getattr(settings, 'FUSEKI_TIMEOUTS', {})}[kind]
+
+
+def cap_timeout(timeout, kind):
+    """``timeout`` (seconds or a (connect, read) pair) bounded by the class timeout."""
+    limit = class_timeout(kind)
+    if timeout is None:
+        return limit
+    if isinstance(timeout, tuple):
+        return tuple(limit if t is None else min(t, limit) for t in timeout)
+    return min(timeout, limit)
+
+
+# ----------------------------------------------------------------------
+# BREAKER
+# ----------------------------------------------------------------------
+def _setting(name, default):
+    return getattr(settings, f'FUSEKI_BREAKER_{name}', default)
+
+
+class CircuitBreaker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.state = CLOSED
+            self._outcomes = deque()  # (monotonic time, ok)
+            self._opened_at = 0.0
+            self._probing = False
+        metrics.FUSEKI_CIRCUIT_STATE.set(_STATE_VALUES[CLOSED])
+
+    def _set(self, state):
+        if state != self.state:
+            logger.warning("Fuseki circuit %s -> %s", self.state, state)
+        self.state = state
+        metrics.FUSEKI_CIRCUIT_STATE.set(_STATE_VALUES[state])
+
+    def before(self, kind):
+        """Raise CircuitOpenError unless a call may be sent now."""
+        if not getattr(settings, 'FUSEKI_BREAKER', True):
+            return
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self._opened_at >= _setting('COOLDOWN', 15):
+                self._set(HALF_OPEN)
+            if self.state == CLOSED or (self.state == HALF_OPEN and not self._probing):
+                self._probing = self.state == HALF_OPEN
+                return
+        metrics.FUSEKI_CIRCUIT_REJECTED.inc(kind=kind)
+        raise CircuitOpenError("Fuseki indisponible (circuit ouvert), requête non envoyée")
+
+    def record(self, ok):
+        now = time.monotonic()
+        with self._lock:
+            if self.state == HALF_OPEN and self._probing:
+                self._probing = False
+                self._outcomes.clear()
+                if ok:
+                    self._set(CLOSED)
+                else:
+                    self._opened_at = now
+                    self._set(OPEN)
+                return
+            if self.state != CLOSED:
+                return
+            self._outcomes.append((now, ok))
+            horizon = now - _setting('WINDOW', 30)
+            while self._outcomes and self._outcomes[0][0] < horizon:
+                self._outcomes.popleft()
+            calls = len(self._outcomes)
+            failures = sum(1 for _, success in self._outcomes if not success)
+            if calls >= _setting('MIN_CALLS', 5) and failures / calls >= _setting('FAILURE_RATE', 0.5):
+                self._opened_at = now
+                self._outcomes.clear()
+                self._set(OPEN)
+
+    def release(self):
+        """A call ended without an outcome (cancelled): free the probe slot, count nothing."""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probing = False
+
+    def is_open(self):
+        with self._lock:
+            return self.state == OPEN
+
+
+breaker = CircuitBreaker()
+
+os.register_at_fork(after_in_child=breaker.reset)
+
+
+@contextlib.contextmanager
+def guarded(url, timeout=None):
+    """
+    Wrap one call to Fuseki: yields the capped timeout, records the outcome.
+    The body signals a 5xx answer by raising, or by calling the yielded
+    ``failed()``; transport errors propagate after being counted.
+    """
+    kind = classify(url)
+    breaker.before(kind)
+    outcome = {'ok': True}
+
+    def failed():
+        outcome['ok'] = False
+
+    try:
+        yield cap_timeout(timeout, kind), failed
+    except Exception as e:
+        breaker.record(not _transport_error(e))
+        raise
+    except BaseException:
+        # Cancelled (asyncio.CancelledError when the client of an async view
+        # disconnects) or interrupted: says nothing about Fuseki
+        breaker.release()
+        raise
+    else:
+        breaker.record(outcome['ok'])
+
+
+def _transport_error(error):
+    if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return True
+    try:
+        import httpx
+    except ImportError:
+        return False
+    return isinstance(error, httpx.TransportError)
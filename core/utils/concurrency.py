@@ -0,0 +1,120 @@
+# core/utils/concurrency.py - Parallel fan-out for independent SPARQL requests
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+
+# ----------------------------------------------------------------------
+# POOL CONFIGURATION
+# ----------------------------------------------------------------------
+# Bounded so that a burst of list/detail pages cannot open an unbounded number
+# of simultaneous connections against Fuseki.
+DEFAULT_MAX_WORKERS = 8
+
+_executor = None
+_executor_lock = threading.Lock()
+_local = threading.local()
+
+
+def _reset_after_fork():
+    # Pool threads do not survive a fork: a child reusing the parent's executor
+    # would queue tasks that no thread ever runs
+    global _executor, _executor_lock
+    _executor = None
+    _executor_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_max_workers():
+    """Size of the shared pool (settings.SPARQL_FANOUT_WORKERS, default 8)."""
+    try:
+        return max(1, int(getattr(settings, 'SPARQL_FANOUT_WORKERS', DEFAULT_MAX_WORKERS)))
+    except (TypeError, ValueError):
+        return DEFAULT_MAX_WORKERS
+
+
+def get_executor():
+    """Return the process-wide ThreadPoolExecutor, created on first use."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=get_max_workers(),
+                    thread_name_prefix='sparql-fanout',
+                    initializer=_mark_worker,
+                )
+    return _executor
+
+
+def _mark_worker():
+    _local.in_pool = True
+
+
+def _in_pool():
+    return getattr(_local, 'in_pool', False)
+
+
+# ----------------------------------------------------------------------
+# FAN-OUT HELPERS
+# ----------------------------------------------------------------------
+def fan_out(tasks, return_exceptions=False, timeout=None):
+    """
+    Run independent callables concurrently and return their results.
+
+    ``tasks`` is either a dict {name: callable} (returns a dict with the same
+    keys) or a list of callables (returns a list in the same order), so callers
+    can merge results deterministically regardless of completion order.
+
+    With return_exceptions=True a failing task yields its exception instead of
+    aborting the whole batch (same contract as asyncio.gather).
+
+    Tasks only perform HTTP calls; they must not touch the Django ORM, whose
+    connections are per-thread. When called from inside a pool worker the tasks
+    run inline to avoid starving the pool with nested fan-outs.
+    """
+    if isinstance(tasks, dict):
+        names = list(tasks.keys())
+        callables = [tasks[n] for n in names]
+    else:
+        names = None
+        callables = list(tasks)
+
+    if len(callables) <= 1 or _in_pool():
+        results = [_call(fn, return_exceptions) for fn in callables]
+    else:
+        executor = get_executor()
+        # Copy the caller's context so context-local state follows the task
+        futures = [
+            executor.submit(contextvars.copy_context().run, _call, fn, return_exceptions)
+            for fn in callables
+        ]
+        results = [f.result(timeout=timeout) for f in futures]
+
+    if names is not None:
+        return dict(zip(names, results))
+    return results
+
+
+def fan_map(fn, items, return_exceptions=False, timeout=None):
+    """Apply ``fn`` to every item concurrently; results keep the input order."""
+    return fan_out([_bind(fn, item) for item in items],
+                   return_exceptions=return_exceptions, timeout=timeout)
+
+
+def _bind(fn, item):
+    return lambda: fn(item)
+
+
+def _call(fn, return_exceptions):
+    try:
+        return fn()
+    except Exception as e:
+        if return_exceptions:
+            return e
+        raise
@@ -0,0 +1,149 @@
+# core/utils/export.py - Streaming export of the knowledge graph
+#
+# One SELECT ?s ?p ?o ?g is streamed from Fuseki as TSV (terms in N-Triples
+# syntax) and rewritten line by line into N-Triples or N-Quads; CSV is passed
+# through from Fuseki's text/csv writer. Nothing is buffered beyond a read
+# chunk, so memory stays flat whatever the graph size. A single response is
+# used rather than keyset pages because blank node labels (the ontology's
+# owl:Restriction nodes) are only consistent within one result set.
+import re
+import zlib
+
+from django.conf import settings
+
+from .circuit import call_class
+from .fuseki import get_session, query_url
+from .inference import NS, class_hierarchy, inference_graph, subclasses
+
+FORMATS = {
+    'nt': ('application/n-triples', 'nt'),
+    'nq': ('application/n-quads', 'nq'),
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+}
+
+CHUNK_SIZE = 64 * 1024
+# (connect, read) seconds: a read timeout applies between chunks, not to the whole export
+TIMEOUT = (5, 300)
+
+XSD = "http://www.w3.org/2001/XMLSchema#"
+# TSV results may abbreviate numbers and booleans the Turtle way
+_SHORTHAND = (
+    (re.compile(r'^[+-]?\d+$'), 'integer'),
+    (re.compile(r'^[+-]?\d*\.\d+$'), 'decimal'),
+    (re.compile(r'^[+-]?(\d+\.?\d*|\.\d+)[eE][+-]?\d+$'), 'double'),
+    (re.compile(r'^(true|false)$'), 'boolean'),
+)
+
+
+class ExportError(Exception):
+    pass
+
+
+def export_query(cls=None, include_inferred=False):
+    """SELECT over the default graph and every named graph, optionally one class."""
+    subjects = ''
+    if cls:
+        values = " ".join(f"<{c}>" for c in subclasses(cls))
+        subjects = f"""
+  {{ SELECT DISTINCT ?s WHERE {{
+      VALUES ?cls {{ {values} }}
+      {{ ?s a ?cls }} UNION {{ GRAPH ?tg {{ ?s a ?cls }} }}
+  }} }}"""
+    # The bookkeeping graphs (core.utils.rdf_loader) are not data
+    excluded = f'!STRSTARTS(STR(?g), "{settings.FUSEKI_META_GRAPH}")'
+    if not include_inferred:
+        excluded += f" && ?g != <{inference_graph()}>"
+    return f"""SELECT ?s ?p ?o ?g WHERE {{{subjects}
+  {{ ?s ?p ?o }} UNION {{ GRAPH ?g {{ ?s ?p ?o }} }}
+  FILTER(!BOUND(?g) || ({excluded}))
+}}"""
+
+
+def resolve_class(name):
+    """Ontology class URI for ``Itinerary`` / ``:Itinerary`` / a full URI."""
+    uri = name if name.startswith('http') else f"{NS}{name.lstrip(':')}"
+    hierarchy = class_hierarchy()
+    if uri not in hierarchy and not any(uri in sups for sups in hierarchy.values()):
+        raise ExportError(f"Unknown ontology class: {name}")
+    return uri
+
+
+def _term(value):
+    if value.startswith(('<', '_:', '"')):
+        return value
+    for pattern, datatype in _SHORTHAND:
+        if pattern.match(value):
+            return f'"{value}"^^<{XSD}{datatype}>'
+    return value
+
+
+def _statement_lines(lines, fmt):
+    """N-Triples/N-Quads statements from TSV result lines (header first)."""
+    header = next(lines, None)
+    if header is None:
+        return
+    for line in lines:
+        if not line:
+            continue
+        s, p, o, g = (line.split('\t') + [''] * 4)[:4]
+        if fmt == 'nq' and g:
+            yield f"{_term(s)} {_term(p)} {_term(o)} {g} .\n"
+        else:
+            yield f"{_term(s)} {_term(p)} {_term(o)} .\n"
+
+
+def _gzipped(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # 31: gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def _batched(lines):
+    """Group text lines into ~CHUNK_SIZE byte chunks."""
+    buffer, size = [], 0
+    for line in lines:
+        data = line.encode('utf-8')
+        buffer.append(data)
+        size += len(data)
+        if size >= CHUNK_SIZE:
+            yield b''.join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def iter_export(fmt='nq', cls=None, gzip=False, include_inferred=False):
+    """
+    Byte chunks of the export. The Fuseki request is issued on the first
+    iteration, so the generator can be handed to a StreamingHttpResponse.
+    """
+    if fmt not in FORMATS:
+        raise ExportError(f"Unknown format '{fmt}' (choose from {', '.join(FORMATS)})")
+    sparql = export_query(resolve_class(cls) if cls else None, include_inferred)
+
+    def chunks():
+        accept = 'text/csv' if fmt == 'csv' else 'text/tab-separated-values'
+        with call_class('bulk'):
+            response = get_session().post(query_url(), data={'query': sparql}, headers={'Accept': accept},
+                                          stream=True, timeout=TIMEOUT)
+        with response:
+            if response.status_code != 200:
+                raise ExportError(f"Fuseki export failed: {response.status_code} - {response.text[:200]}")
+            if fmt == 'csv':
+                yield from response.iter_content(CHUNK_SIZE)
+            else:
+                response.encoding = 'utf-8'
+                # Split on \n only: str.splitlines() would also break on U+2028 in literals
+                lines = (line.rstrip('\r') for line in
+                         response.iter_lines(CHUNK_SIZE, decode_unicode=True, delimiter='\n'))
+                yield from _batched(_statement_lines(lines, fmt))
+
+    return _gzipped(chunks()) if gzip else chunks()
+
+
+def filename(fmt, cls=None, gzip=False):
+    stem = cls.rsplit('#', 1)[-1].lstrip(':').lower() if cls else 'graph'
+    return f"{stem}.{FORMATS[fmt][1]}{'.gz' if gzip else ''}"
@@ -1,40 +1,276 @@
+import asyncio
+import logging
+import os
+import random
+import re
 import requests
+import sys
+import threading
+import time
+import weakref
+from functools import lru_cache
 from django.conf import settings
 import json
+from . import circuit, partitions, singleflight, timing
+from .inference import (
+    refreshes_inference, refresh_inferred_types_async, inference_enabled, inference_graph, touch_update, update_subjects,
+)
+from .schema import schema_graph
+from .versioning import bumps_version
 
-def sparql_query(sparql):
-    """Execute SPARQL query on Fuseki"""
-    try:
-        FUSEKI_QUERY_URL = f"{settings.FUSEKI_URL}/{settings.FUSEKI_DATASET}/query"
-        
-        headers = {
-            'Accept': 'application/sparql-results+json',
-            'Content-Type': 'application/x-www-form-urlencoded'
-        }
-        
-        payload = {'query': sparql}
-        
-        # Ajouter le graph URI comme paramètre si disponible
-        if hasattr(settings, 'FUSEKI_GRAPH') and settings.FUSEKI_GRAPH:
-            payload['default-graph-uri'] = settings.FUSEKI_GRAPH
-        
-        print(f"[DEBUG] Envoi requete a: {FUSEKI_QUERY_URL}")
-        print(f"[DEBUG] Graph: {settings.FUSEKI_GRAPH}")
-        print(f"[DEBUG] Requete SPARQL:\n{sparql}")
-        
-        response = requests.post(FUSEKI_QUERY_URL, data=payload, headers=headers, timeout=30)
-        
-        if response.status_code != 200:
-            print(f"[ERROR] Erreur Fuseki: {response.status_code} - {response.text}")
-            raise Exception(f"Fuseki query failed: {response.status_code} - {response.text}")
-        
-        return response.json()
+logger = logging.getLogger(__name__)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+class TimedSession(requests.Session):
+    """
+    requests.Session that records every Fuseki call into core.utils.timing,
+    behind the circuit breaker and class timeouts of core.utils.circuit, and
+    the subjects of the updates a write sends into core.utils.inference.
+    """
+
+    def request(self, method, url, *args, **kwargs):
+        with circuit.guarded(url, kwargs.get('timeout')) as (timeout, failed):
+            kwargs['timeout'] = timeout
+            with timing.timed('sparql', timing.sparql_label(url)) as info:
+                response = super().request(method, url, *args, **kwargs)
+                if not kwargs.get('stream'):
+                    info['bytes'] = len(response.content)
+            if response.status_code >= 500:
+                failed()
+        if method.upper() == 'POST' and response.status_code < 400:
+            _record_update(url, kwargs.get('data'))
+        return response
+
+
+def _record_update(url, data):
+    """Hand the updates sent inside a write to core.utils.inference (touch_update)."""
+    if isinstance(data, dict) and data.get('update') and str(url).split('?')[0].endswith('/update'):
+        touch_update(data['update'])
+
+
+def get_session():
+    """Shared requests.Session so keep-alive connections to Fuseki are reused.
+
+    The connection pool is sized to the SPARQL fan-out pool so that parallel
+    queries (see core.utils.concurrency) never wait on a free connection.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                from requests.adapters import HTTPAdapter
+                from .concurrency import get_max_workers
+                session = TimedSession()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=get_max_workers())
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                _session = session
+    return _session
+
+
+def _reset_after_fork():
+    # Keep-alive sockets opened before a fork (warm-up) must not be shared
+    global _session, _session_lock
+    _session = None
+    _session_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def query_url():
+    """SPARQL query endpoint of the configured dataset (read at call time)."""
+    return f"{settings.FUSEKI_URL}/{settings.FUSEKI_DATASET}/query"
+
+
+def update_url():
+    """SPARQL update endpoint of the configured dataset (read at call time)."""
+    return f"{settings.FUSEKI_URL}/{settings.FUSEKI_DATASET}/update"
+
+
+def data_url():
+    """Graph Store protocol endpoint of the configured dataset (read at call time)."""
+    return f"{settings.FUSEKI_URL}/{settings.FUSEKI_DATASET}/data"
+
+
+def put_graph(graph_uri, graph):
+    """Replace the named graph ``graph_uri`` with the rdflib ``graph`` (Graph Store PUT)."""
+    response = get_session().put(
+        data_url(),
+        params={'graph': graph_uri},
+        data=graph.serialize(format='turtle', encoding='utf-8'),
+        headers={'Content-Type': 'text/turtle; charset=utf-8'},
+        timeout=60,
+    )
+    if response.status_code not in (200, 201, 204):
+        raise Exception(f"Fuseki PUT failed: {response.status_code} - {response.text}")
+    return response
+
+
+def _query_request(sparql, graphs=None):
+    """
+    URL, form payload and headers for a SELECT/ASK against the configured
+    graphs, or against ``graphs`` (default-graph-uri values) when given.
+    """
+    FUSEKI_QUERY_URL = f"{settings.FUSEKI_URL}/{settings.FUSEKI_DATASET}/query"
     
-    except requests.exceptions.ConnectionError:
-        raise Exception("Impossible de se connecter à Fuseki. Vérifiez que le serveur est démarré.")
-    except Exception as e:
-        raise Exception(f"Erreur lors de la requête SPARQL: {e}")
+    headers = {
+        'Accept': 'application/sparql-results+json',
+        'Content-Type': 'application/x-www-form-urlencoded'
+    }
+    
+    payload = {'query': sparql}
+    
+    if graphs is not None:
+        if graphs:
+            payload['default-graph-uri'] = list(graphs)
+    # Ajouter le graph URI comme paramètre si disponible
+    elif hasattr(settings, 'FUSEKI_GRAPH') and settings.FUSEKI_GRAPH:
+        # Instance data lives in FUSEKI_GRAPH, or in the per-entity partitions
+        # (core.utils.partitions) when FUSEKI_PARTITION_GRAPHS is set; the
+        # classes and properties are in their own graph (core.utils.schema)
+        payload['default-graph-uri'] = partitions.instance_graphs() + [schema_graph()]
+        # The default graph is the merge of all default-graph-uri values, so the
+        # materialized superclass types are visible to `?s a :Station` patterns
+        if inference_enabled():
+            payload['default-graph-uri'] = payload['default-graph-uri'] + [inference_graph()]
+    return FUSEKI_QUERY_URL, payload, headers
+
+
+# ----------------------------------------------------------------------
+# READS
+# ----------------------------------------------------------------------
+# Gateway errors are worth another attempt; a 4xx or a 500 (bad query,
+# evaluation error) would fail the same way again.
+RETRYABLE_STATUS = (502, 503, 504)
+
+
+class SparqlQueryError(Exception):
+    """A read that failed, as opposed to one that matched nothing."""
+
+    def __init__(self, message, retryable=False):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+def union_default_graph():
+    """Whether reads that do not choose see the union of all graphs (FUSEKI_UNION_DEFAULT_GRAPH)."""
+    return getattr(settings, 'FUSEKI_UNION_DEFAULT_GRAPH', True)
+
+
+def _select_once(sparql, union, timeout, graphs=None):
+    if union:
+        url = query_url()
+        key = singleflight.flight_key(url, 'union', sparql)
+
+        def send():
+            # unionDefaultGraph=true makes Fuseki expose the union of all named graphs as the default graph
+            return get_session().get(url, params={'query': sparql, 'unionDefaultGraph': 'true'},
+                                     headers={'Accept': 'application/sparql-results+json'}, timeout=timeout)
+    else:
+        url, payload, headers = _query_request(sparql, graphs)
+        key = singleflight.flight_key(url, payload)
+
+        def send():
+            return get_session().post(url, data=payload, headers=headers, timeout=timeout)
+
+    def fetch():
+        try:
+            response = send()
+        except circuit.CircuitOpenError as e:
+            raise SparqlQueryError(str(e)) from e
+        except requests.exceptions.ReadTimeout as e:
+            # Another attempt would hold the worker for a full timeout again
+            raise SparqlQueryError(f"Fuseki n'a pas répondu à temps: {e}") from e
+        except requests.exceptions.ConnectionError as e:
+            raise SparqlQueryError(f"Fuseki injoignable: {e}", retryable=True) from e
+        if response.status_code != 200:
+            raise SparqlQueryError(f"Fuseki query failed: {response.status_code} - {response.text}",
+                                   retryable=response.status_code in RETRYABLE_STATUS)
+        return response.content
+
+    # Identical concurrent queries share one round trip (core.utils.singleflight)
+    return json.loads(singleflight.do(key, fetch))
+
+
+def select(sparql, union=None, timeout=None, graphs=None, entity=None):
+    """
+    Parsed result of a SELECT/ASK, empty bindings included; raises
+    SparqlQueryError when the read failed. Connection errors (connect
+    timeouts included) and gateway errors are retried FUSEKI_READ_RETRIES
+    times with jittered exponential backoff; read timeouts and an open
+    circuit are not. ``union`` picks
+    the union of all graphs or FUSEKI_GRAPH (plus inferred types); None
+    follows FUSEKI_UNION_DEFAULT_GRAPH. ``graphs`` scopes the read to those
+    graphs ([] is the default graph proper); ``entity`` to the graphs of one
+    entity type when they are partitioned (core.utils.partitions), which wins
+    over ``union``.
+    """
+    union, graphs = _read_scope(union, graphs, entity)
+    retries = _read_retries()
+    for attempt in range(retries + 1):
+        try:
+            return _select_once(sparql, union, timeout, graphs)
+        except SparqlQueryError as e:
+            time.sleep(_retry_delay(e, attempt, retries))
+
+
+def _read_scope(union, graphs, entity):
+    if graphs is None and entity is not None:
+        graphs = partitions.read_scope(entity)
+    if graphs is not None:
+        union = False
+    elif union is None:
+        union = union_default_graph()
+    return union, graphs
+
+
+def _read_retries():
+    return getattr(settings, 'FUSEKI_READ_RETRIES', 2)
+
+
+def _retry_delay(error, attempt, retries):
+    """Jittered backoff before retrying the failed read ``error``; re-raises it when it is final."""
+    if not error.retryable or attempt == retries:
+        raise error
+    delay = random.uniform(0, getattr(settings, 'FUSEKI_RETRY_BACKOFF', 0.2) * 2 ** attempt)
+    logger.warning("Lecture SPARQL en échec (%s), nouvel essai %s/%s dans %.2f s", error, attempt + 1, retries, delay)
+    return delay
+
+
+def _query_exception(error):
+    """The exception sparql_query() and sparql_query_async() raise for a failed read."""
+    logger.error("Erreur Fuseki: %s", error)
+    httpx = sys.modules.get('httpx')
+    unreachable = (requests.exceptions.ConnectionError,)
+    if httpx is not None:
+        unreachable += (httpx.ConnectError, httpx.ConnectTimeout)
+    if isinstance(error.__cause__, unreachable):
+        return Exception("Impossible de se connecter à Fuseki. Vérifiez que le serveur est démarré.")
+    return Exception(f"Erreur lors de la requête SPARQL: {error}")
+
 
+def sparql_query(sparql, entity=None):
+    """Execute SPARQL query on Fuseki (FUSEKI_GRAPH and its inferred types, or the graphs of ``entity``)"""
+    logger.debug("Envoi requete a: %s (graph %s)\n%s", query_url(), settings.FUSEKI_GRAPH, sparql)
+    try:
+        return select(sparql, union=False, entity=entity)
+    except SparqlQueryError as e:
+        raise _query_exception(e)
+
+
+def sparql_query_all_graphs(sparql, timeout=10, entity=None):
+    """
+    SELECT over the union of all graphs, or over the graphs of ``entity`` when
+    partitioned; raises SparqlQueryError on failure.
+    """
+    return select(sparql, union=True, timeout=timeout, entity=entity)
+
+
+@bumps_version()
 def upload_rdf(file_path, graph_uri=None):
     """Upload RDF file to Fuseki"""
     try:
@@ -60,7 +296,7 @@ def upload_rdf(file_path, graph_uri=None):
         with open(file_path, 'rb') as f:
             headers = {'Content-Type': content_type}
             data = f.read()
-            response = requests.post(upload_url, data=data, headers=headers, timeout=30)
+            response = get_session().post(upload_url, data=data, headers=headers, timeout=30)
             
             if response.status_code != 200:
                 raise Exception(f"Fuseki upload failed: {response.status_code} - {response.text}")
@@ -84,89 +320,281 @@ def test_fuseki_connection():
     except:
         return False
 
-def sparql_update(sparql):
-    """Execute SPARQL update on Fuseki avec gestion du graphe"""
+
+# PREFIX/BASE declarations before the first operation of an update
+_PROLOGUE = re.compile(r'\s*(?:(?:PREFIX\s+[^\s:]*:\s*<[^>]*>|BASE\s*<[^>]*>)\s*)*', re.IGNORECASE)
+_NAMES_GRAPH = re.compile(r'\bGRAPH\s*[<?$]', re.IGNORECASE)
+
+
+def _update_payload(sparql, graph=None):
+    """Form payload for an update, scoped to ``graph`` or settings.FUSEKI_GRAPH when configured."""
+    graph = graph or getattr(settings, 'FUSEKI_GRAPH', None)
+    if graph:
+        # Scoping starts after the prologue: the managers' updates lead with PREFIX
+        split = _PROLOGUE.match(sparql).end()
+        prologue, operation = sparql[:split], sparql[split:]
+        head = operation.upper()
+        if _NAMES_GRAPH.search(operation):
+            # The update already says which graphs it writes
+            return {'update': sparql}
+        if head.startswith(('INSERT DATA', 'DELETE DATA', 'DELETE WHERE')):
+            # INSERT DATA { ... } -> INSERT DATA { GRAPH <uri> { ... } } (WITH is not
+            # allowed with the DATA and DELETE WHERE forms)
+            data_start = operation.find('{')
+            data_end = operation.rfind('}')
+            if data_start != -1 and data_end != -1:
+                sparql_with_graph = (f"{prologue}{operation[:data_start]}{{ GRAPH <{graph}> "
+                                     f"{operation[data_start:data_end + 1]} }}{operation[data_end + 1:]}")
+                logger.debug("Requete AVEC graphe:\n%s", sparql_with_graph)
+                return {'update': sparql_with_graph}
+            return {'update': sparql}
+
+        elif head.startswith('DELETE') and 'INSERT' in head:
+            # Pour DELETE/INSERT (modification), utiliser WITH
+            sparql_with_graph = f"{prologue}WITH <{graph}>\n{operation}"
+            logger.debug("Requete MODIFY AVEC graphe:\n%s", sparql_with_graph)
+            return {'update': sparql_with_graph}
+    
+    return {'update': sparql}
+
+
+@bumps_version()
+@refreshes_inference
+def sparql_update(sparql, graph=None):
+    """Execute SPARQL update on Fuseki avec gestion du graphe (``graph``, FUSEKI_GRAPH par défaut)"""
     try:
-        from django.conf import settings
-        
         FUSEKI_UPDATE_URL = f"{settings.FUSEKI_URL}/{settings.FUSEKI_DATASET}/update"
         
         headers = {
             'Content-Type': 'application/x-www-form-urlencoded'
         }
         
-        # CORRECTION : Utiliser GRAPH au lieu de WITH pour INSERT DATA
-        if hasattr(settings, 'FUSEKI_GRAPH') and settings.FUSEKI_GRAPH:
-            if sparql.strip().upper().startswith('INSERT DATA'):
-                # Remplacer INSERT DATA { ... } par INSERT DATA { GRAPH <uri> { ... } }
-                lines = sparql.split('\n')
-                insert_line = lines[0]
-                
-                # Trouver le début et la fin des données
-                data_start = sparql.find('{')
-                data_end = sparql.rfind('}')
-                
-                if data_start != -1 and data_end != -1:
-                    data_content = sparql[data_start:data_end+1]
-                    # Encapsuler dans GRAPH
-                    sparql_with_graph = f"{insert_line} GRAPH <{settings.FUSEKI_GRAPH}> {data_content}"
-                    print(f"[DEBUG] Requete AVEC graphe:\n{sparql_with_graph}")
-                    payload = {'update': sparql_with_graph}
-                else:
-                    payload = {'update': sparql}
-            
-            elif sparql.strip().upper().startswith('DELETE WHERE'):
-                # Pour DELETE WHERE, utiliser WITH est correct
-                lines = sparql.split('\n')
-                delete_line = lines[0]
-                where_section = '\n'.join(lines[1:])
-                sparql_with_graph = f"{delete_line}\nWITH <{settings.FUSEKI_GRAPH}>\n{where_section}"
-                print(f"[DEBUG] Requete DELETE AVEC graphe:\n{sparql_with_graph}")
-                payload = {'update': sparql_with_graph}
-            
-            elif sparql.strip().upper().startswith('DELETE') and 'INSERT' in sparql.upper():
-                # Pour DELETE/INSERT (modification), utiliser WITH
-                sparql_with_graph = f"WITH <{settings.FUSEKI_GRAPH}>\n{sparql}"
-                print(f"[DEBUG] Requete MODIFY AVEC graphe:\n{sparql_with_graph}")
-                payload = {'update': sparql_with_graph}
-            
-            else:
-                payload = {'update': sparql}
-        else:
-            payload = {'update': sparql}
+        payload = _update_payload(sparql, graph)
         
-        print(f"[DEBUG] Envoi UPDATE a: {FUSEKI_UPDATE_URL}")
-        print(f"[DEBUG] Graph: {getattr(settings, 'FUSEKI_GRAPH', 'Non specifie')}")
+        logger.debug("Envoi UPDATE a: %s (graph %s)", FUSEKI_UPDATE_URL, graph or getattr(settings, 'FUSEKI_GRAPH', 'Non specifie'))
         
-        response = requests.post(FUSEKI_UPDATE_URL, data=payload, headers=headers, timeout=30)
+        response = get_session().post(FUSEKI_UPDATE_URL, data=payload, headers=headers, timeout=30)
         
-        print(f"[OK] Reponse UPDATE: {response.status_code}")
+        logger.debug("Reponse UPDATE: %s", response.status_code)
         if response.status_code != 200:
-            print(f"[ERROR] Erreur UPDATE: {response.text}")
+            logger.error("Erreur UPDATE: %s", response.text)
             raise Exception(f"Fuseki update failed: {response.status_code} - {response.text}")
         
-        # VÉRIFICATION IMMÉDIATE
-        print("[DEBUG] Verification de l'insertion...")
-        verification_query = f"""
-        PREFIX : <http://www.transport-ontology.org/travel#>
-        SELECT (COUNT(*) as ?count) WHERE {{
-            GRAPH <{settings.FUSEKI_GRAPH}> {{
-                ?s ?p ?o
+        # VÉRIFICATION IMMÉDIATE (debug only: costs an extra COUNT round trip)
+        if logger.isEnabledFor(logging.DEBUG):
+            verification_query = f"""
+            PREFIX : <http://www.transport-ontology.org/travel#>
+            SELECT (COUNT(*) as ?count) WHERE {{
+                GRAPH <{graph or settings.FUSEKI_GRAPH}> {{
+                    ?s ?p ?o
+                }}
             }}
-        }}
-        """
-        try:
-            from . import sparql_query
-            verification_result = sparql_query(verification_query)
-            triple_count = verification_result.get('results', {}).get('bindings', [{}])[0].get('count', {}).get('value', '0')
-            print(f"[OK] Nombre de triples dans le graphe apres UPDATE: {triple_count}")
-        except Exception as e:
-            print(f"[WARNING] Impossible de verifier: {e}")
+            """
+            try:
+                verification_result = sparql_query(verification_query)
+                triple_count = verification_result.get('results', {}).get('bindings', [{}])[0].get('count', {}).get('value', '0')
+                logger.debug("Nombre de triples dans le graphe apres UPDATE: %s", triple_count)
+            except Exception as e:
+                logger.warning("Impossible de verifier: %s", e)
         
         return response
     
     except Exception as e:
-        print(f"[ERROR] Erreur UPDATE: {e}")
+        logger.error("Erreur UPDATE: %s", e)
         raise Exception(f"Erreur lors de la mise à jour SPARQL: {e}")
 
 
+# ----------------------------------------------------------------------
+# ASYNC CLIENT (ASGI views)
+# ----------------------------------------------------------------------
+# The pooled httpx.AsyncClient targets ASGI servers (uvicorn, daphne,
+# hypercorn) running transport/asgi.py: each worker serves all its requests on
+# one long-lived event loop, with one client per loop (a client's connection
+# pool is bound to the loop it was created on). with_async_pool() turns it on
+# and closes the clients on lifespan shutdown.
+#
+# Async views served through WSGI/runserver run on a fresh loop per request
+# (async_to_sync), where a client would only ever serve one request; there the
+# async helpers run their sync counterparts in a worker thread, on the shared
+# keep-alive session.
+_async_clients = weakref.WeakKeyDictionary()
+_async_pool = False
+
+
+def async_pool_enabled():
+    """Whether the async helpers use the pooled httpx client (see with_async_pool())."""
+    return _async_pool
+
+
+def with_async_pool(app):
+    """
+    ASGI application serving ``app`` with the pooled async Fuseki client, and
+    closing it on lifespan shutdown (Django itself does not speak lifespan).
+    """
+    global _async_pool
+    _async_pool = True
+
+    async def application(scope, receive, send):
+        if scope['type'] != 'lifespan':
+            return await app(scope, receive, send)
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await close_async_clients()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    return application
+
+
+async def close_async_clients():
+    """Close the pooled client of the running event loop."""
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+async def in_thread(func, *args, **kwargs):
+    """Run the sync ``func`` off the event loop (the fallback when not pooled)."""
+    from asgiref.sync import sync_to_async
+
+    return await sync_to_async(func, thread_sensitive=False)(*args, **kwargs)
+
+
+@lru_cache(maxsize=1)
+def _timed_async_client_class():
+    import httpx
+
+    class TimedAsyncClient(httpx.AsyncClient):
+        """httpx.AsyncClient counterpart of TimedSession."""
+
+        async def send(self, request, **kwargs):
+            with circuit.guarded(request.url) as (limit, failed):
+                request.extensions['timeout'] = {
+                    name: limit if value is None else min(value, limit)
+                    for name, value in request.extensions.get('timeout', {}).items()
+                }
+                with timing.timed('sparql', timing.sparql_label(request.url)) as info:
+                    response = await super().send(request, **kwargs)
+                    if not kwargs.get('stream'):
+                        info['bytes'] = len(response.content)
+                if response.status_code >= 500:
+                    failed()
+            return response
+
+    return TimedAsyncClient
+
+
+def get_async_client():
+    """Pooled httpx.AsyncClient for the running event loop (ASGI workers only)."""
+    import httpx
+    if not _async_pool:
+        raise RuntimeError("The async Fuseki client is only pooled under transport/asgi.py (with_async_pool)")
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        limits = httpx.Limits(
+            max_connections=getattr(settings, 'FUSEKI_ASYNC_MAX_CONNECTIONS', 32),
+            max_keepalive_connections=getattr(settings, 'FUSEKI_ASYNC_MAX_KEEPALIVE', 16),
+        )
+        client = _timed_async_client_class()(limits=limits, timeout=30)
+        _async_clients[loop] = client
+    return client
+
+
+async def _aselect_once(sparql, union, timeout, graphs=None):
+    import httpx
+
+    client = get_async_client()
+    if timeout is None:
+        timeout = httpx.USE_CLIENT_DEFAULT
+    if union:
+        url = query_url()
+        key = singleflight.flight_key(url, 'union', sparql)
+
+        def send():
+            return client.get(url, params={'query': sparql, 'unionDefaultGraph': 'true'},
+                              headers={'Accept': 'application/sparql-results+json'}, timeout=timeout)
+    else:
+        url, payload, headers = _query_request(sparql, graphs)
+        key = singleflight.flight_key(url, payload)
+
+        def send():
+            return client.post(url, data=payload, headers=headers, timeout=timeout)
+
+    async def fetch():
+        try:
+            response = await send()
+        except circuit.CircuitOpenError as e:
+            raise SparqlQueryError(str(e)) from e
+        except httpx.ReadTimeout as e:
+            raise SparqlQueryError(f"Fuseki n'a pas répondu à temps: {e}") from e
+        except httpx.TransportError as e:
+            raise SparqlQueryError(f"Fuseki injoignable: {e}", retryable=True) from e
+        if response.status_code != 200:
+            raise SparqlQueryError(f"Fuseki query failed: {response.status_code} - {response.text}",
+                                   retryable=response.status_code in RETRYABLE_STATUS)
+        return response.content
+
+    return json.loads(await singleflight.ado(key, fetch))
+
+
+async def aselect(sparql, union=None, timeout=None, graphs=None, entity=None):
+    """
+    Async select(): same graph scoping, retries and SparqlQueryError, on the
+    pooled client under ASGI or through select() in a worker thread otherwise.
+    """
+    if not _async_pool:
+        return await in_thread(select, sparql, union, timeout, graphs, entity)
+    union, graphs = _read_scope(union, graphs, entity)
+    retries = _read_retries()
+    for attempt in range(retries + 1):
+        try:
+            return await _aselect_once(sparql, union, timeout, graphs)
+        except SparqlQueryError as e:
+            await asyncio.sleep(_retry_delay(e, attempt, retries))
+
+
+async def sparql_query_async(sparql, entity=None):
+    """Async counterpart of sparql_query(): same graph scoping, retries and errors."""
+    try:
+        return await aselect(sparql, union=False, entity=entity)
+    except SparqlQueryError as e:
+        raise _query_exception(e)
+
+
+async def sparql_query_all_graphs_async(sparql, timeout=10, entity=None):
+    """
+    Async SELECT over the union of all graphs, as used by the list pages, or
+    over the graphs of ``entity`` when partitioned. Returns {} on failure (the
+    list caches keep their last answer).
+    """
+    try:
+        return await aselect(sparql, union=True, timeout=timeout, entity=entity)
+    except SparqlQueryError as e:
+        logger.warning("sparql_query_all_graphs_async failed: %s", e)
+        return {}
+
+
+@bumps_version()
+async def sparql_update_async(sparql, graph=None):
+    """Async counterpart of sparql_update() (without the debug verification query)."""
+    if not _async_pool:
+        return await in_thread(sparql_update, sparql, graph)
+    try:
+        FUSEKI_UPDATE_URL = f"{settings.FUSEKI_URL}/{settings.FUSEKI_DATASET}/update"
+        headers = {'Content-Type': 'application/x-www-form-urlencoded'}
+        
+        response = await get_async_client().post(FUSEKI_UPDATE_URL, data=_update_payload(sparql, graph), headers=headers)
+        
+        if response.status_code != 200:
+            raise Exception(f"Fuseki update failed: {response.status_code} - {response.text}")
+        
+        # Only the subjects the update names are re-derived (all on a pattern update)
+        await refresh_inferred_types_async(update_subjects(sparql))
+        return response
+    
+    except Exception as e:
+        raise Exception(f"Erreur lors de la mise à jour SPARQL: {e}")
@@ -0,0 +1,328 @@
+# core/utils/inference.py - Materialized rdfs:subClassOf inference
+#
+# Instead of evaluating `rdf:type/rdfs:subClassOf*` property paths on every list
+# query, the superclass types implied by the ontology (e.g. :BusinessTrip =>
+# :Itinerary) are asserted once in a dedicated inference graph. Queries over the
+# union/default graph can then use a plain `?s a :Itinerary` index lookup, and
+# queries scoped to one named graph use a VALUES list of the concrete classes.
+#
+# The whole graph is only rebuilt by the ontology load, repartitioning and
+# `manage.py refresh_inference`. Other writes re-derive the inferred types of
+# the subjects they touched, named by their updates (the shared session hands
+# them over) or declared with touch(); an update whose subjects cannot be told
+# (a type pattern on a variable subject) falls back to the rebuild.
+import contextlib
+import contextvars
+import functools
+import logging
+
+from django.conf import settings
+
+NS = "http://www.transport-ontology.org/travel#"
+
+logger = logging.getLogger(__name__)
+
+
+def inference_graph():
+    """URI of the graph holding the materialized superclass rdf:type triples."""
+    return getattr(settings, 'FUSEKI_INFERENCE_GRAPH', None) or f"{settings.FUSEKI_GRAPH}/inferred"
+
+
+def inference_enabled():
+    return bool(getattr(settings, 'FUSEKI_MATERIALIZE_INFERENCE', True))
+
+
+# ----------------------------------------------------------------------
+# CLASS HIERARCHY (from the ontology file)
+# ----------------------------------------------------------------------
+def class_hierarchy():
+    """
+    {class_uri: frozenset(strict superclass uris)} computed from the rdfs:subClassOf
+    axioms of ontology/transport_ontology.ttl. Restriction blank nodes are ignored.
+    Kept per version of the file by core.utils.schema: writes never recompute it.
+    """
+    from .schema import schema
+
+    return schema().hierarchy
+
+
+def _uri(cls):
+    return cls if cls.startswith('http') else f"{NS}{cls.lstrip(':')}"
+
+
+def subclasses(cls, include_self=True):
+    """Sorted URIs of every class whose closure contains ``cls``."""
+    from .schema import schema
+
+    return schema().subclasses(_uri(cls), include_self)
+
+
+def class_values(var, cls):
+    """VALUES clause binding ``var`` to ``cls`` and all of its subclasses."""
+    from .schema import schema
+
+    return schema().memo(('class_values', var, _uri(cls)), lambda: "VALUES %s { %s }" % (
+        var, " ".join(f"<{c}>" for c in subclasses(cls))))
+
+
+def subclass_filter(var, cls):
+    """FILTER keeping only the concrete subclasses of ``cls`` (drops inferred supertypes)."""
+    from .schema import schema
+
+    def build():
+        subs = subclasses(cls, include_self=False)
+        if not subs:
+            return ""
+        return "FILTER(%s IN (%s))" % (var, ", ".join(f"<{c}>" for c in subs))
+
+    return schema().memo(('subclass_filter', var, _uri(cls)), build)
+
+
+# ----------------------------------------------------------------------
+# MATERIALIZATION
+# ----------------------------------------------------------------------
+# Subjects per incremental refresh update
+SUBJECT_BATCH = 200
+
+
+def _pairs(ontology):
+    return ontology.memo(('materialization_pairs',), lambda: " ".join(
+        f"(<{sub}> <{sup}>)"
+        for sub, sups in sorted(ontology.hierarchy.items())
+        for sup in sorted(sups)
+    ))
+
+
+def materialization_update():
+    """SPARQL update that rebuilds the whole inference graph from the asserted types."""
+    from .schema import schema
+
+    graph = inference_graph()
+    ontology = schema()
+
+    def build():
+        return f"""
+DROP SILENT GRAPH <{graph}> ;
+INSERT {{ GRAPH <{graph}> {{ ?s a ?sup }} }}
+WHERE {{
+  VALUES (?sub ?sup) {{ {_pairs(ontology)} }}
+  {{ ?s a ?sub }}
+  UNION
+  {{ GRAPH ?g {{ ?s a ?sub }} FILTER(?g != <{graph}>) }}
+}}
+"""
+
+    # Only the ontology load, repartitioning and `manage.py refresh_inference`
+    # run it; the text is built once per schema version
+    return ontology.memo(('materialization', graph), build)
+
+
+def subjects_update(subjects):
+    """
+    SPARQL update re-deriving the inferred types of ``subjects`` (URIs) only:
+    their inferred triples are dropped, then those their asserted types imply
+    inserted again. Costs index lookups on the subjects, whatever the data size.
+    """
+    from .schema import schema
+
+    graph = inference_graph()
+    values = " ".join(f"<{s}>" for s in sorted(subjects))
+    return f"""
+DELETE {{ GRAPH <{graph}> {{ ?s a ?sup }} }}
+WHERE {{ VALUES ?s {{ {values} }} GRAPH <{graph}> {{ ?s a ?sup }} }} ;
+INSERT {{ GRAPH <{graph}> {{ ?s a ?sup }} }}
+WHERE {{
+  VALUES ?s {{ {values} }}
+  VALUES (?sub ?sup) {{ {_pairs(schema())} }}
+  {{ ?s a ?sub }}
+  UNION
+  {{ GRAPH ?g {{ ?s a ?sub }} FILTER(?g != <{graph}>) }}
+}}
+"""
+
+
+def update_subjects(sparql):
+    """
+    URIs of the subjects whose rdf:type triples the SPARQL update ``sparql``
+    may change, or None when that cannot be told from its text (a type
+    pattern on a variable subject, graph management, an unparsable update).
+    """
+    from rdflib import BNode, URIRef, Variable
+    from rdflib.namespace import RDF
+    from rdflib.plugins.sparql.algebra import translateUpdate
+    from rdflib.plugins.sparql.parser import parseUpdate
+
+    from .schema import schema
+
+    try:
+        operations = translateUpdate(parseUpdate(sparql)).algebra
+    except Exception:
+        return None
+    hierarchy = schema().hierarchy
+    subjects = set()
+
+    def templates(op):
+        clauses = [op]
+        if op.name == 'Modify':
+            clauses = [c for c in (op.get('delete'), op.get('insert')) if c is not None]
+        for clause in clauses:
+            yield from clause.get('triples') or []
+            for triples in (clause.get('quads') or {}).values():
+                yield from triples
+
+    for op in operations:
+        if op.name not in ('InsertData', 'DeleteData', 'DeleteWhere', 'Modify'):
+            return None
+        for s, p, o in templates(op):
+            if isinstance(s, URIRef):
+                subjects.add(str(s))
+                continue
+            typing = p == RDF.type or isinstance(p, Variable)
+            if typing and (isinstance(o, (Variable, BNode)) or str(o) in hierarchy
+                           or any(str(o) in sups for sups in hierarchy.values())):
+                return None
+    return subjects
+
+
+def _post_materialization(update):
+    from .fuseki import get_session
+    try:
+        response = get_session().post(
+            _update_url(),
+            data={'update': update},
+            headers={'Content-Type': 'application/x-www-form-urlencoded'},
+            timeout=30,
+        )
+        if response.status_code not in (200, 204):
+            logger.warning("Inference refresh failed: %s - %s", response.status_code, response.text)
+            return False
+        return True
+    except Exception as e:
+        logger.warning("Inference refresh failed: %s", e)
+        return False
+
+
+def _refresh_updates(subjects):
+    if subjects is None:
+        return [materialization_update()]
+    ordered = sorted(subjects)
+    return [subjects_update(ordered[i:i + SUBJECT_BATCH]) for i in range(0, len(ordered), SUBJECT_BATCH)]
+
+
+def _update_url():
+    return f"{settings.FUSEKI_URL}/{settings.FUSEKI_DATASET}/update"
+
+
+def refresh_inferred_types(subjects=None):
+    """
+    Re-derive the inferred types of ``subjects``, or rebuild the whole
+    inference graph when None. Best effort: returns False on failure.
+    """
+    if not inference_enabled():
+        return False
+    return all([_post_materialization(update) for update in _refresh_updates(subjects)])
+
+
+async def refresh_inferred_types_async(subjects=None):
+    """Async counterpart used by sparql_update_async()."""
+    if not inference_enabled():
+        return False
+    from .fuseki import async_pool_enabled, get_async_client, in_thread
+    if not async_pool_enabled():
+        return await in_thread(refresh_inferred_types, subjects)
+    try:
+        for update in _refresh_updates(subjects):
+            response = await get_async_client().post(
+                _update_url(),
+                data={'update': update},
+                headers={'Content-Type': 'application/x-www-form-urlencoded'},
+            )
+            if response.status_code not in (200, 204):
+                return False
+        return True
+    except Exception as e:
+        logger.warning("Inference refresh failed: %s", e)
+        return False
+
+
+# Depth of nested write operations in the current context, so that a create
+# that issues several updates refreshes the inference graph only once, and
+# the subjects those updates wrote (_REBUILD among them once one of them
+# needs the whole graph rebuilt).
+_write_depth = contextvars.ContextVar('inference_write_depth', default=0)
+_touched = contextvars.ContextVar('inference_touched', default=None)
+_REBUILD = object()
+_declared = contextvars.ContextVar('inference_declared', default=False)
+
+
+def touch(*subjects):
+    """Record subjects (URIs) the current write changed the types of."""
+    touched = _touched.get()
+    if touched is not None:
+        touched.update(str(s) for s in subjects)
+
+
+def touch_update(sparql):
+    """Record the subjects of a SPARQL update sent by the current write."""
+    touched = _touched.get()
+    if touched is None or _REBUILD in touched or _declared.get():
+        return
+    subjects = update_subjects(sparql)
+    touched.update({_REBUILD} if subjects is None else subjects)
+
+
+@contextlib.contextmanager
+def touching(subjects):
+    """
+    Record ``subjects`` for the current write, and do not parse the updates
+    sent meanwhile for theirs: for bulk writes whose subjects the caller knows
+    (parsing a large INSERT DATA costs more than the refresh it saves).
+    """
+    touch(*subjects)
+    token = _declared.set(True)
+    try:
+        yield
+    finally:
+        _declared.reset(token)
+
+
+def rebuild_inference():
+    """Have the current write rebuild the whole inference graph."""
+    touched = _touched.get()
+    if touched is not None:
+        touched.add(_REBUILD)
+
+
+def refreshes_inference(func):
+    """
+    Decorator for write paths: when the outermost write returns, re-derive the
+    inferred types of the subjects it touched (see touch(), touch_update();
+    updates sent through the shared session are recorded on their own).
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        outermost = _write_depth.get() == 0
+        depth = _write_depth.set(_write_depth.get() + 1)
+        touched = _touched.set(set()) if outermost else None
+        try:
+            return func(*args, **kwargs)
+        finally:
+            subjects = _touched.get()
+            _write_depth.reset(depth)
+            if outermost:
+                _touched.reset(touched)
+                if _REBUILD in subjects:
+                    refresh_inferred_types()
+                elif subjects:
+                    refresh_inferred_types(subjects)
+    return wrapper
+
+
+def rebuilds_inference(func):
+    """refreshes_inference() for writes that rebuild the whole inference graph."""
+    @refreshes_inference
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        rebuild_inference()
+        return func(*args, **kwargs)
+    return wrapper
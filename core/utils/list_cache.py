@@ -0,0 +1,170 @@
+# core/utils/list_cache.py - In-process cache of the ontology list queries
+#
+# The list pages (itineraries, schedules, cities, companies and the ontology
+# part of the station/ticket pages) rebuild their rows from one to three
+# SPARQL queries. A ListCache keeps the raw SPARQL results of one list, keyed
+# by the version stamps its writes bump (core.utils.versioning): a lookup is
+# one SQL read while nothing was written, and any write, from any worker,
+# makes the next lookup reload. Rows are still built per call, so callers may
+# sort or mutate them freely.
+#
+# Writes made outside the application move no stamp, so entries also age:
+# after LIST_CACHE_TTL seconds an entry is served stale while a background
+# thread reloads it (stale-while-revalidate), and past LIST_CACHE_MAX_STALE
+# it is reloaded before answering. A stamp change always reloads before
+# answering: nobody is served a list older than a write the stamps know of.
+#
+# Only complete answers are kept: the list helpers return {} (or an
+# exception, from a fan-out) for a query that failed, and such a result is
+# served once without being cached. While a reload fails, the last complete
+# answer is served instead, also when the loader raises (the pages loading
+# through sparql_query(), during an outage or with the circuit open).
+import logging
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from . import metrics, timing
+from .versioning import GRAPH, versions
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 60
+DEFAULT_MAX_STALE = 600
+
+_caches = {}
+_registry_lock = threading.Lock()
+
+
+def answered(results):
+    """True when every SPARQL result of ``results`` came back ({} marks a failed query)."""
+    return all(isinstance(result, dict) and result for result in results)
+
+
+def _ttl():
+    """(fresh, max stale) seconds; a TTL of 0 keeps entries until a stamp moves."""
+    ttl = getattr(settings, 'LIST_CACHE_TTL', DEFAULT_TTL)
+    return ttl, max(ttl, getattr(settings, 'LIST_CACHE_MAX_STALE', DEFAULT_MAX_STALE))
+
+
+class ListCache:
+    """
+    Raw results of one list, valid while the stamps ``graph`` and ``stamps``
+    are unchanged. ``load()`` returns them (``aload`` is its coroutine
+    counterpart for async views; background reloads always use ``load``); a
+    loader passed to get() replaces it. ``complete(value)`` tells whether a loaded value may be kept (default:
+    a single SPARQL result that came back).
+    """
+
+    def __init__(self, name, *stamps, load=None, aload=None, complete=None):
+        self.name = name
+        self.stamps = (GRAPH, *stamps)
+        self.load = load
+        self.aload = aload
+        self.complete = complete or (lambda value: answered([value]))
+        self._lock = threading.Lock()
+        self._entry = None
+        self._refreshing = False
+        with _registry_lock:
+            _caches[name] = self
+
+    def _lookup(self, current):
+        """(value to serve or None, stale value to fall back on)."""
+        with self._lock:
+            entry = self._entry
+        if entry is None or entry[0] != current:
+            metrics.cache_lookup(f"list:{self.name}", False)
+            return None, entry[1] if entry is not None else None
+        signature, value, loaded_at = entry
+        fresh, max_stale = _ttl()
+        age = time.monotonic() - loaded_at
+        if fresh and age > max_stale:
+            metrics.cache_lookup(f"list:{self.name}", False)
+            return None, value
+        if fresh and age > fresh:
+            self._revalidate(signature)
+        timing.record_cache_hit('sparql', f"list:{self.name}")
+        return value, value
+
+    def _revalidate(self, signature):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._refresh, args=(signature,), daemon=True,
+                         name=f"list-cache-{self.name}").start()
+
+    def _refresh(self, signature):
+        try:
+            self._store(signature, self.load())
+        except Exception as e:
+            logger.warning("List %s: background reload failed: %s", self.name, e)
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def _store(self, current, value):
+        if not self.complete(value):
+            return False
+        with self._lock:
+            self._entry = (current, value, time.monotonic())
+        return True
+
+    def _fallback(self, value, stale):
+        if stale is None:
+            return value
+        logger.warning("List %s: reload incomplete, serving the last complete answer", self.name)
+        return stale
+
+    def _raised(self, error, stale):
+        if stale is None:
+            raise error
+        logger.warning("List %s: reload failed (%s), serving the last complete answer", self.name, error)
+        return stale
+
+    def get(self, load=None):
+        """Cached value, or a fresh load when a stamp moved or the entry is too old."""
+        if load is not None:
+            self.load = load
+        current = versions(self.stamps)
+        value, stale = self._lookup(current)
+        if value is not None:
+            return value
+        try:
+            value = self.load()
+        except Exception as e:
+            return self._raised(e, stale)
+        if self._store(current, value):
+            return value
+        return self._fallback(value, stale)
+
+    async def aget(self):
+        """Async get(), loading through ``aload`` when given."""
+        current = await sync_to_async(versions)(self.stamps)
+        value, stale = self._lookup(current)
+        if value is not None:
+            return value
+        try:
+            value = await self.aload() if self.aload else await sync_to_async(self.load)()
+        except Exception as e:
+            return self._raised(e, stale)
+        if self._store(current, value):
+            return value
+        return self._fallback(value, stale)
+
+    def clear(self):
+        with self._lock:
+            self._entry = None
+
+
+def list_caches():
+    """{name: ListCache} of every list cache defined so far."""
+    with _registry_lock:
+        return dict(_caches)
+
+
+def invalidate_list_caches():
+    for cache in list_caches().values():
+        cache.clear()
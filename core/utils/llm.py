@@ -0,0 +1,42 @@
+# core/utils/llm.py - Instrumented wrappers around Groq chat completions
+#
+# Every LLM call goes through chat_completion()/chat_completion_async() so the
+# per-request collector (core.utils.timing) sees its latency and token usage.
+#
+# The groq SDK (and the httpx/pydantic stack under it) is imported on the
+# first client, not at module load: views import the NL helpers, so every
+# worker boot and manage.py command used to pay for it.
+from .timing import timed
+
+
+def groq_client(api_key):
+    """Groq(api_key=...), importing the SDK on first use."""
+    from groq import Groq
+    return Groq(api_key=api_key)
+
+
+def async_groq_client(api_key):
+    """AsyncGroq(api_key=...), importing the SDK on first use."""
+    from groq import AsyncGroq
+    return AsyncGroq(api_key=api_key)
+
+
+def _usage_tokens(response):
+    usage = getattr(response, 'usage', None)
+    return getattr(usage, 'total_tokens', 0) or 0
+
+
+def chat_completion(client, **kwargs):
+    """client.chat.completions.create(**kwargs), timed under the 'llm' kind."""
+    with timed('llm', kwargs.get('model', 'chat')) as info:
+        response = client.chat.completions.create(**kwargs)
+        info['tokens'] = _usage_tokens(response)
+    return response
+
+
+async def chat_completion_async(client, **kwargs):
+    """Async counterpart for AsyncGroq clients."""
+    with timed('llm', kwargs.get('model', 'chat')) as info:
+        response = await client.chat.completions.create(**kwargs)
+        info['tokens'] = _usage_tokens(response)
+    return response
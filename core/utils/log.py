@@ -0,0 +1,28 @@
+# core/utils/log.py - Logging helpers for the SPARQL/manager hot paths
+#
+# Modules log through per-module loggers (logging.getLogger(__name__)) with
+# %-style arguments, so messages are only formatted when a handler actually
+# emits them. At the default WARNING level a debug call costs one level check;
+# per-row loops hoist that check out with `logger.isEnabledFor(logging.DEBUG)`.
+import itertools
+import logging
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep only one record in ``rate`` at or below ``max_level``.
+
+    Used on the console handler (settings.LOG_SAMPLE_RATE) so that DEBUG traces
+    can stay enabled on a busy instance; warnings and errors always pass.
+    """
+
+    def __init__(self, rate=1, max_level='DEBUG'):
+        super().__init__()
+        self.rate = max(1, int(rate))
+        self.max_level = logging._checkLevel(max_level)
+        self._counter = itertools.count()
+
+    def filter(self, record):
+        if self.rate == 1 or record.levelno > self.max_level:
+            return True
+        return next(self._counter) % self.rate == 0
@@ -0,0 +1,333 @@
+# core/utils/metrics.py - Process-wide metrics in the Prometheus text format
+#
+# Every call recorded through core.utils.timing (Fuseki HTTP, rdflib, LLM) is
+# also observed here, whether or not it happens inside a request. The /metrics
+# view renders the registry; per-graph triple counts come from a background
+# sampler so that a scrape never triggers a query against Fuseki.
+import functools
+import sys
+import threading
+import time
+
+from django.conf import settings
+
+# Seconds; covers fast cached lookups up to slow LLM completions
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    pairs.extend(f'{n}="{_escape(v)}"' for n, v in extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        return tuple(str(labels.get(n, '')) for n in self.labelnames)
+
+    def header(self):
+        return [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return self.header() + [
+            f'{self.name}{_labels(self.labelnames, key)} {_number(v)}' for key, v in items
+        ]
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def count(self, **labels):
+        state = self._values.get(self._key(labels))
+        return state[2] if state else 0
+
+    def render(self):
+        with self._lock:
+            items = sorted((k, (list(v[0]), v[1], v[2])) for k, v in self._values.items())
+        lines = self.header()
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                le = _labels(self.labelnames, key, [('le', _number(float(bound)))])
+                lines.append(f'{self.name}_bucket{le} {cumulative}')
+            lines.append(f'{self.name}_sum{_labels(self.labelnames, key)} {_number(total)}')
+            lines.append(f'{self.name}_count{_labels(self.labelnames, key)} {count}')
+        return lines
+
+
+# ----------------------------------------------------------------------
+# REGISTRY
+# ----------------------------------------------------------------------
+REGISTRY = []
+_collectors = []
+
+
+def register(metric):
+    REGISTRY.append(metric)
+    return metric
+
+
+def register_collector(func):
+    """Callable run before each render to refresh scrape-time gauges (must be cheap)."""
+    _collectors.append(func)
+    return func
+
+
+SPARQL_DURATION = register(Histogram(
+    'sparql_request_duration_seconds', 'Latency of Fuseki calls by operation and calling module.',
+    ('operation', 'module'),
+))
+SPARQL_BYTES = register(Counter(
+    'sparql_response_bytes_total', 'Bytes received from Fuseki by operation.', ('operation',),
+))
+SPARQL_IN_FLIGHT = register(Gauge(
+    'sparql_requests_in_flight', 'Fuseki calls currently waiting for a response.',
+))
+LLM_DURATION = register(Histogram(
+    'llm_request_duration_seconds', 'Latency of LLM chat completions by model.', ('model',),
+))
+LLM_TOKENS = register(Counter(
+    'llm_tokens_total', 'Tokens consumed by LLM chat completions by model.', ('model',),
+))
+CACHE_REQUESTS = register(Counter(
+    'cache_requests_total', 'Cache lookups by cache name and result (hit/miss).', ('cache', 'result'),
+))
+SYNC_IN_FLIGHT = register(Gauge(
+    'ontology_sync_in_flight', 'Django -> ontology sync operations in progress (sync queue depth).',
+))
+SYNC_TOTAL = register(Counter(
+    'ontology_sync_total', 'Django -> ontology sync operations by entity and result.', ('entity', 'result'),
+))
+SYNC_DURATION = register(Histogram(
+    'ontology_sync_duration_seconds', 'Duration of Django -> ontology sync operations.', ('entity',),
+))
+SPARQL_COALESCED = register(Counter(
+    'sparql_coalesced_total', 'Fuseki reads answered by an identical in-flight read, by scope.', ('scope',),
+))
+FANOUT_QUEUE = register(Gauge(
+    'sparql_fanout_queue_depth', 'Tasks waiting for a worker in the SPARQL fan-out pool.',
+))
+FUSEKI_CIRCUIT_STATE = register(Gauge(
+    'fuseki_circuit_state', 'Fuseki circuit breaker state (0 closed, 1 half-open, 2 open).',
+))
+FUSEKI_CIRCUIT_REJECTED = register(Counter(
+    'fuseki_circuit_rejected_total', 'Fuseki calls refused while the circuit was open, by call class.', ('kind',),
+))
+GRAPH_TRIPLES = register(Gauge(
+    'fuseki_graph_triples', 'Triples per graph, sampled in the background.', ('graph',),
+))
+GRAPH_SAMPLED_AT = register(Gauge(
+    'fuseki_graph_triples_sampled_timestamp_seconds', 'Unix time of the last successful triple count.',
+))
+
+
+# ----------------------------------------------------------------------
+# OBSERVATION HOOKS
+# ----------------------------------------------------------------------
+# Frames from these modules are plumbing; the first frame outside them is
+# reported as the calling module (writes include their inference refresh).
+_PLUMBING = (
+    'core.utils.', 'core.middleware', 'requests', 'urllib3', 'httpx', 'httpcore',
+    'rdflib', 'SPARQLWrapper', 'contextlib', 'concurrent', 'threading', 'asyncio',
+    'asgiref', 'groq', 'functools',
+)
+# Recording machinery at the top of every stack
+_RECORDING = ('core.utils.metrics', 'core.utils.timing', 'contextlib')
+
+
+def caller_module():
+    frame = sys._getframe(1)
+    while frame is not None and frame.f_globals.get('__name__', '').startswith(_RECORDING):
+        frame = frame.f_back
+    while frame is not None:
+        name = frame.f_globals.get('__name__', '')
+        # the background sampler reports under its own name
+        if name == 'core.utils.metrics' or not name.startswith(_PLUMBING):
+            return name
+        frame = frame.f_back
+    # Calls started in their own asyncio task have no caller frame: fall back
+    # to the module of the view being served
+    from .timing import current
+    timings = current()
+    return getattr(timings, 'view_module', None) or 'unknown'
+
+
+def observe_call(kind, label, duration, size=0, tokens=0):
+    """Called by core.utils.timing.record() for every timed call."""
+    if kind == 'sparql':
+        SPARQL_DURATION.observe(duration, operation=label, module=caller_module())
+        if size:
+            SPARQL_BYTES.inc(size, operation=label)
+    elif kind == 'llm':
+        LLM_DURATION.observe(duration, model=label)
+        if tokens:
+            LLM_TOKENS.inc(tokens, model=label)
+
+
+def cache_lookup(cache, hit):
+    CACHE_REQUESTS.inc(cache=cache, result='hit' if hit else 'miss')
+
+
+def tracks_sync(entity):
+    """Decorator for ontology sync operations: in-flight gauge, duration and outcome."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            SYNC_IN_FLIGHT.inc()
+            start = time.perf_counter()
+            result = 'error'
+            try:
+                value = func(*args, **kwargs)
+                result = 'ok'
+                return value
+            finally:
+                SYNC_IN_FLIGHT.dec()
+                SYNC_DURATION.observe(time.perf_counter() - start, entity=entity)
+                SYNC_TOTAL.inc(entity=entity, result=result)
+        return wrapper
+    return decorator
+
+
+@register_collector
+def _fanout_queue():
+    from . import concurrency
+    executor = concurrency._executor
+    FANOUT_QUEUE.set(executor._work_queue.qsize() if executor is not None else 0)
+
+
+# ----------------------------------------------------------------------
+# TRIPLE COUNT SAMPLER
+# ----------------------------------------------------------------------
+TRIPLE_COUNT_QUERY = """
+SELECT ?g (COUNT(*) AS ?n) WHERE {
+  { GRAPH ?g { ?s ?p ?o } }
+  UNION
+  { ?s ?p ?o BIND("default" AS ?g) }
+}
+GROUP BY ?g
+"""
+
+_sampler = None
+_sampler_lock = threading.Lock()
+
+
+def sample_triple_counts():
+    """Count triples per graph once and update the gauges (used by the sampler thread)."""
+    from .fuseki import get_session
+    url = f"{settings.FUSEKI_URL}/{settings.FUSEKI_DATASET}/query"
+    response = get_session().get(
+        url,
+        params={'query': TRIPLE_COUNT_QUERY},
+        headers={'Accept': 'application/sparql-results+json'},
+        timeout=30,
+    )
+    response.raise_for_status()
+    GRAPH_TRIPLES.clear()
+    for b in response.json().get('results', {}).get('bindings', []):
+        if 'g' not in b or 'n' not in b:
+            continue
+        GRAPH_TRIPLES.set(int(b['n']['value']), graph=b['g']['value'])
+    GRAPH_SAMPLED_AT.set(time.time())
+
+
+def _sample_forever(interval):
+    import logging
+    logger = logging.getLogger(__name__)
+    while True:
+        try:
+            sample_triple_counts()
+        except Exception as e:
+            logger.warning("Triple count sampling failed: %s", e)
+        time.sleep(interval)
+
+
+def start_triple_sampler():
+    """Start the daemon sampler once per process (METRICS_TRIPLE_COUNT_INTERVAL seconds, 0 disables)."""
+    global _sampler
+    interval = getattr(settings, 'METRICS_TRIPLE_COUNT_INTERVAL', 60)
+    if not interval or _sampler is not None:
+        return
+    with _sampler_lock:
+        if _sampler is None:
+            _sampler = threading.Thread(
+                target=_sample_forever, args=(interval,), name='metrics-triple-sampler', daemon=True,
+            )
+            _sampler.start()
+
+
+def render():
+    """Whole registry in the Prometheus text exposition format."""
+    for collect in _collectors:
+        collect()
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
@@ -1,17 +1,14 @@
+import logging
 import os
-from groq import Groq
+from .llm import async_groq_client, chat_completion, chat_completion_async, groq_client
 import re
 
-MODEL = "llama-3.3-70b-versatile"  # Plus puissant pour meilleure génération
+logger = logging.getLogger(__name__)
 
-def nl_to_sparql(question: str) -> str:
-    api_key = os.getenv('GROQ_API_KEY')
-    if not api_key:
-        print("[ERROR] GROQ_API_KEY missing in .env")
-        return ""
-
-    client = Groq(api_key=api_key)
+MODEL = "llama-3.3-70b-versatile"  # Plus puissant pour meilleure génération
 
+def _select_prompt(question: str) -> str:
+    """Prompt used to turn a natural-language question into a SPARQL SELECT."""
     # SCHÉMA ULTRA-COMPLET avec TOUTES les relations de votre ontologie
     schema_snippet = """
 TRANSPORT ONTOLOGY COMPLETE SCHEMA:
@@ -272,23 +269,55 @@ CRITICAL INSTRUCTIONS:
 User Question: "{question}"
 
 Generate the SPARQL query NOW (nothing else):"""
+    return prompt
+
+
+def nl_to_sparql(question: str) -> str:
+    api_key = os.getenv('GROQ_API_KEY')
+    if not api_key:
+        logger.error("GROQ_API_KEY missing in .env")
+        return ""
+
+    client = groq_client(api_key)
 
-    response = client.chat.completions.create(
+    response = chat_completion(
+        client,
         model=MODEL,
-        messages=[{"role": "user", "content": prompt}],
+        messages=[{"role": "user", "content": _select_prompt(question)}],
         temperature=0.0,
         max_tokens=800,
     )
     
     generated = response.choices[0].message.content.strip()
-    print(f"[DEBUG] AI Generated:\n{generated}\n")
+    logger.debug("AI Generated:\n%s", generated)
     
     # Extraction minimale (juste nettoyage)
     sparql = clean_sparql(generated)
-    print(f"[OK] Final SPARQL:\n{sparql}\n")
+    logger.debug("Final SPARQL:\n%s", sparql)
     
     return sparql
 
+
+async def nl_to_sparql_async(question: str) -> str:
+    """Same as nl_to_sparql() but awaits Groq instead of blocking a worker thread."""
+    api_key = os.getenv('GROQ_API_KEY')
+    if not api_key:
+        logger.error("GROQ_API_KEY missing in .env")
+        return ""
+
+    client = async_groq_client(api_key)
+
+    response = await chat_completion_async(
+        client,
+        model=MODEL,
+        messages=[{"role": "user", "content": _select_prompt(question)}],
+        temperature=0.0,
+        max_tokens=800,
+    )
+
+    generated = response.choices[0].message.content.strip()
+    return clean_sparql(generated)
+
 def clean_sparql(text):
     """Clean AI output - minimal processing"""
     # Remove markdown blocks
@@ -314,10 +343,10 @@ def nl_to_sparql_update(question: str) -> str:
     """Convert natural language to SPARQL UPDATE queries"""
     api_key = os.getenv('GROQ_API_KEY')
     if not api_key:
-        print("[ERROR] GROQ_API_KEY missing in .env")
+        logger.error("GROQ_API_KEY missing in .env")
         return ""
 
-    client = Groq(api_key=api_key)
+    client = groq_client(api_key)
 
     update_schema = """
 ═══════════════════════════════════════════════════════════════════
@@ -522,7 +551,8 @@ User Request: "{question}"
 
 Generate the SPARQL UPDATE query NOW (nothing else):"""
 
-    response = client.chat.completions.create(
+    response = chat_completion(
+        client,
         model=MODEL,
         messages=[{"role": "user", "content": prompt}],
         temperature=0.0,
@@ -530,10 +560,10 @@ Generate the SPARQL UPDATE query NOW (nothing else):"""
     )
     
     generated = response.choices[0].message.content.strip()
-    print(f"[DEBUG] AI Generated UPDATE:\n{generated}\n")
+    logger.debug("AI Generated UPDATE:\n%s", generated)
     
     # Clean the output
     sparql = clean_sparql(generated)
-    print(f"[OK] Final SPARQL UPDATE:\n{sparql}\n")
+    logger.debug("Final SPARQL UPDATE:\n%s", sparql)
     
     return sparql
\ No newline at end of file
@@ -0,0 +1,212 @@
+# core/utils/partitions.py - One named graph per entity type
+#
+# All instance data used to go to FUSEKI_GRAPH (cities to the default graph),
+# so every list query scanned the default graph, FUSEKI_GRAPH and GRAPH ?g to
+# find one type of entity. With FUSEKI_PARTITION_GRAPHS set, each entity type
+# has its own graph under FUSEKI_GRAPH (<FUSEKI_GRAPH>/itineraries, /cities,
+# /network for stations and transports, ...):
+#
+# - writes go to entity_graph(entity);
+# - reads of one type are routed with read_scope(entity), a default-graph-uri
+#   list made of its partition, FUSEKI_GRAPH (the sample individuals of the
+#   ontology file), the schema graph and the inferred types, so a list query
+#   scans a fraction of the data and needs no GRAPH ?g fallback;
+# - graph-scoped reads that do not name a type see every instance graph.
+#
+# Data written before partitioning is moved by `manage.py repartition_graphs`
+# (repartition() below), to run before turning the setting on. The triples of
+# the subjects defined by the ontology file stay in FUSEKI_GRAPH, which
+# rdf_loader owns (and the read scope of every entity includes).
+import logging
+
+from django.conf import settings
+
+from .inference import NS, class_hierarchy, inference_enabled, inference_graph, subclasses
+from .schema import schema, schema_graph
+
+logger = logging.getLogger(__name__)
+
+# entity: (root class, graph suffix); the first matching root wins for a subject
+ENTITIES = {
+    'itinerary': ('Itinerary', 'itineraries'),
+    'schedule': ('Schedule', 'schedules'),
+    'city': ('City', 'cities'),
+    'company': ('Company', 'companies'),
+    'station': ('Station', 'network'),
+    'transport': ('Transport', 'network'),
+    'person': ('Person', 'persons'),
+    'ticket': ('Ticket', 'tickets'),
+}
+
+BATCH_SIZE = 200
+
+
+def partitioned():
+    return getattr(settings, 'FUSEKI_PARTITION_GRAPHS', False)
+
+
+def partition_graph(entity):
+    """URI of the partition of ``entity`` (whether or not partitioning is on)."""
+    return f"{settings.FUSEKI_GRAPH}/{ENTITIES[entity][1]}"
+
+
+def partition_graphs():
+    return sorted({partition_graph(entity) for entity in ENTITIES})
+
+
+def entity_graph(entity):
+    """Graph the writes of ``entity`` go to: its partition, or FUSEKI_GRAPH."""
+    return partition_graph(entity) if partitioned() else settings.FUSEKI_GRAPH
+
+
+def read_scope(entity):
+    """default-graph-uri list of a read of ``entity`` only, or None when not partitioned."""
+    if not partitioned():
+        return None
+    graphs = [partition_graph(entity), settings.FUSEKI_GRAPH, schema_graph()]
+    if inference_enabled():
+        graphs.append(inference_graph())
+    return graphs
+
+
+def instance_graphs():
+    """FUSEKI_GRAPH, plus every partition when partitioned."""
+    return [settings.FUSEKI_GRAPH] + (partition_graphs() if partitioned() else [])
+
+
+def entity_of(types):
+    """Entity of a subject with the rdf:type URIs ``types``, or None."""
+    hierarchy = class_hierarchy()
+    classes = set()
+    for t in types:
+        classes.add(str(t))
+        classes |= hierarchy.get(str(t), frozenset())
+    for entity, (root, _) in ENTITIES.items():
+        if f"{NS}{root}" in classes:
+            return entity
+    return None
+
+
+def split(graph):
+    """
+    {graph URI: rdflib Graph} of the triples of ``graph``, each subject going
+    to entity_graph() of its type (FUSEKI_GRAPH when untyped or unpartitioned).
+    """
+    from rdflib import Graph
+    from rdflib.namespace import RDF
+
+    targets = {}
+    for subject in set(graph.subjects()):
+        entity = entity_of(graph.objects(subject, RDF.type))
+        uri = entity_graph(entity) if entity else settings.FUSEKI_GRAPH
+        part = targets.get(uri)
+        if part is None:
+            part = targets[uri] = Graph()
+            for prefix, namespace in graph.namespaces():
+                part.bind(prefix, namespace)
+        for triple in graph.triples((subject, None, None)):
+            part.add(triple)
+    return targets
+
+
+# ----------------------------------------------------------------------
+# REPARTITIONING
+# ----------------------------------------------------------------------
+def _ontology_subjects():
+    # The schema terms are in their own graph; FUSEKI_GRAPH only has the samples
+    return {str(s) for s in schema().abox.subjects()}
+
+
+def _typed_subjects(graph):
+    """{subject: entity} of the typed instances in ``graph`` (None: the default graph)."""
+    from .fuseki import select
+
+    classes = " ".join(f"<{c}>" for root, _ in ENTITIES.values() for c in subclasses(root))
+    result = select(f"SELECT ?s ?type WHERE {{ VALUES ?type {{ {classes} }} ?s a ?type }}",
+                    graphs=[graph] if graph else [])
+    types = {}
+    for b in result.get('results', {}).get('bindings', []):
+        if b['s']['type'] == 'uri':
+            types.setdefault(b['s']['value'], []).append(b['type']['value'])
+    return {s: entity_of(ts) for s, ts in types.items()}
+
+
+def plan():
+    """[(source graph or None for the default graph, entity, [subjects])] to move."""
+    # rdf_loader owns the ontology's subjects in FUSEKI_GRAPH; the default
+    # graph only holds what the application wrote, about them or not
+    keep = {settings.FUSEKI_GRAPH: _ontology_subjects(), None: set()}
+    moves = []
+    for source in (settings.FUSEKI_GRAPH, None):
+        by_entity = {}
+        for subject, entity in _typed_subjects(source).items():
+            if entity and subject not in keep[source]:
+                by_entity.setdefault(entity, []).append(subject)
+        moves += [(source, entity, sorted(subjects)) for entity, subjects in by_entity.items()]
+    return moves
+
+
+def _move_update(source, target, subjects):
+    values = " ".join(f"<{s}>" for s in subjects)
+    where = f"VALUES ?s {{ {values} }} ?s ?p ?o"
+    scoped = f"GRAPH <{source}> {{ {where} }}" if source else where
+    removed = f"GRAPH <{source}> {{ ?s ?p ?o }}" if source else "?s ?p ?o"
+    return (f"INSERT {{ GRAPH <{target}> {{ ?s ?p ?o }} }} WHERE {{ {scoped} }} ;\n"
+            f"DELETE {{ {removed} }} WHERE {{ {scoped} }}")
+
+
+def _post_update(update):
+    from .circuit import call_class
+    from .fuseki import get_session, update_url
+
+    with call_class('bulk'):
+        response = get_session().post(update_url(), data={'update': update},
+                                      headers={'Content-Type': 'application/x-www-form-urlencoded'})
+    if response.status_code not in (200, 204):
+        raise Exception(f"Fuseki update failed: {response.status_code} - {response.text[:200]}")
+
+
+def _writes():
+    # Imported late: versioning pulls in the ORM
+    from .inference import rebuilds_inference
+    from .versioning import bumps_version
+
+    return lambda func: bumps_version()(rebuilds_inference(func))
+
+
+def repartition(dry_run=False, batch_size=BATCH_SIZE, log=None):
+    """
+    Move the instances of FUSEKI_GRAPH and of the default graph to their
+    partition. Returns {entity: subjects moved (or to move, with dry_run)}.
+    """
+    moves = plan()
+    counts = {}
+    for _, entity, subjects in moves:
+        counts[entity] = counts.get(entity, 0) + len(subjects)
+    if dry_run or not moves:
+        return counts
+
+    @_writes()
+    def apply():
+        for source, entity, subjects in moves:
+            target = partition_graph(entity)
+            for start in range(0, len(subjects), batch_size):
+                _post_update(_move_update(source, target, subjects[start:start + batch_size]))
+            if log:
+                log(entity, len(subjects), target)
+
+    apply()
+    return counts
+
+
+def merge(log=None):
+    """Undo repartition(): add every partition back to FUSEKI_GRAPH and drop it."""
+    @_writes()
+    def apply():
+        for graph in partition_graphs():
+            _post_update(f"ADD SILENT GRAPH <{graph}> TO GRAPH <{settings.FUSEKI_GRAPH}> ;\n"
+                         f"DROP SILENT GRAPH <{graph}>")
+            if log:
+                log(graph)
+
+    apply()
@@ -1,9 +1,171 @@
+# core/utils/rdf_loader.py - Idempotent, incremental load of the ontology TTL
+#
+# The SHA-256 and text of the last loaded TTL are kept in a bookkeeping graph
+# (<FUSEKI_META_GRAPH>/ontology), replaced by a Graph Store PUT at each load.
+# An unchanged file is skipped after one query, or none once this process has
+# loaded it.
+#
+# The file is split as core.utils.schema does: its schema (classes,
+# properties, restrictions) replaces FUSEKI_SCHEMA_GRAPH by a PUT when it
+# changed, and its sample individuals are applied to FUSEKI_GRAPH as a delta
+# in a single update: triples the previous version had and the new one lacks
+# are deleted, new ones inserted. FUSEKI_GRAPH also holds the application's
+# instances, so it is never replaced wholesale. The first split load also
+# removes the schema triples earlier loads left in FUSEKI_GRAPH.
+#
+# Blank nodes cannot be matched across loads. The application never writes
+# any, so when they change, every blank node triple of FUSEKI_GRAPH is dropped
+# and the new ones inserted; the first load also clears the duplicates the
+# former append-only upload left behind.
+import logging
 import os
+
 from django.conf import settings
-from .fuseki import upload_rdf
+from django.utils import timezone
+from rdflib import BNode, Graph, Literal, Namespace, URIRef
+from rdflib.compare import isomorphic
+from rdflib.namespace import XSD
+
+from .circuit import call_class
+from .fuseki import get_session, put_graph, sparql_query_all_graphs, update_url
+from .inference import rebuilds_inference
+from .schema import from_source, ontology_path, schema_graph
+from .versioning import bumps_version
+
+logger = logging.getLogger(__name__)
+
+META = Namespace("http://www.transport-ontology.org/meta#")
+ONTOLOGY_STATE = URIRef(f"{META}ontology")
+
+# (Fuseki URL, dataset, graph) -> digest of the TTL this process loaded there
+_loaded = {}
+
+
+def meta_graph(name):
+    """Bookkeeping graph ``name`` (e.g. 'ontology', 'sync') under FUSEKI_META_GRAPH."""
+    return f"{settings.FUSEKI_META_GRAPH}/{name}"
+
+
+def _stored(*props):
+    """{prop: value} of the ``props`` recorded by the last load (one query)."""
+    values = " ".join(f"<{prop}>" for prop in props)
+    result = sparql_query_all_graphs(
+        f"SELECT ?p ?v WHERE {{ GRAPH <{meta_graph('ontology')}> {{ "
+        f"VALUES ?p {{ {values} }} <{ONTOLOGY_STATE}> ?p ?v }} }}"
+    )
+    return {b['p']['value']: b['v']['value'] for b in result.get('results', {}).get('bindings', [])}
+
+
+def _split(graph):
+    """(ground triples, Graph of the triples involving a blank node)."""
+    ground, blank = set(), Graph()
+    for triple in graph:
+        if any(isinstance(term, BNode) for term in triple):
+            blank.add(triple)
+        else:
+            ground.add(triple)
+    return ground, blank
+
+
+def _statements(triples):
+    return "\n".join(f"{s.n3()} {p.n3()} {o.n3()} ." for s, p, o in triples)
+
 
-def load_ontology_to_fuseki():
-    ontology_path = os.path.join(settings.BASE_DIR, 'ontology', 'transport_ontology.ttl')
-    if not os.path.exists(ontology_path):
+def delta_update(previous, current, full=False):
+    """
+    SPARQL update turning FUSEKI_GRAPH's copy of the ``previous`` rdflib Graph
+    (None if unknown) into ``current``, or None when there is nothing to do.
+    ``full`` re-inserts every triple of ``current``.
+    """
+    graph = settings.FUSEKI_GRAPH
+    new_ground, new_blank = _split(current)
+    old_ground, old_blank = _split(previous if previous is not None else Graph())
+
+    removed = old_ground - new_ground
+    added = new_ground if full or previous is None else new_ground - old_ground
+    rebuild = full or previous is None or not isomorphic(old_blank, new_blank)
+
+    operations = []
+    if removed:
+        operations.append(f"DELETE DATA {{ GRAPH <{graph}> {{\n{_statements(removed)}\n}} }}")
+    if rebuild:
+        operations.append(
+            f"DELETE {{ GRAPH <{graph}> {{ ?s ?p ?o }} }}\n"
+            f"WHERE {{ GRAPH <{graph}> {{ ?s ?p ?o FILTER(isBlank(?s) || isBlank(?o)) }} }}"
+        )
+    inserted = list(added) + (list(new_blank) if rebuild else [])
+    if inserted:
+        operations.append(f"INSERT DATA {{ GRAPH <{graph}> {{\n{_statements(inserted)}\n}} }}")
+    return " ;\n".join(operations) or None
+
+
+def _previous(stored):
+    """
+    (schema, FUSEKI_GRAPH triples) of the last load, or (None, None) if unknown.
+    Loads made before the split had the whole file in FUSEKI_GRAPH.
+    """
+    source = stored.get(str(META.source))
+    if source is None:
+        return None, None
+    previous = from_source(source.encode('utf-8'))
+    if stored.get(str(META.schemaGraph)) == schema_graph():
+        return previous, previous.abox
+    return None, Graph().parse(data=source, format='turtle')
+
+
+@bumps_version()
+@rebuilds_inference
+def _apply(stored, current, full=False):
+    previous_schema, previous = _previous(stored)
+    if previous is None:
+        # Unknown state: whatever FUSEKI_GRAPH holds of the file is replaced
+        previous, full = Graph().parse(data=current.source, format='turtle'), True
+
+    if previous_schema is None or full or not isomorphic(previous_schema.tbox, current.tbox):
+        put_graph(schema_graph(), current.tbox)
+
+    update = delta_update(previous, current.abox, full=full)
+    if update:
+        with call_class('bulk'):
+            response = get_session().post(update_url(), data={'update': update},
+                                          headers={'Content-Type': 'application/x-www-form-urlencoded'},
+                                          timeout=120)
+        if response.status_code not in (200, 204):
+            raise Exception(f"Fuseki update failed: {response.status_code} - {response.text}")
+
+    state = Graph()
+    state.add((ONTOLOGY_STATE, META.sha256, Literal(current.digest)))
+    state.add((ONTOLOGY_STATE, META.source, Literal(current.source)))
+    state.add((ONTOLOGY_STATE, META.schemaGraph, URIRef(schema_graph())))
+    state.add((ONTOLOGY_STATE, META.loadedAt, Literal(timezone.now().isoformat(), datatype=XSD.dateTime)))
+    put_graph(meta_graph('ontology'), state)
+
+
+def load_ontology_to_fuseki(path=None, force=False):
+    """
+    Bring FUSEKI_SCHEMA_GRAPH and FUSEKI_GRAPH up to date with the ontology
+    TTL. Returns True when Fuseki was written to, False when it already held
+    this version. ``force`` re-inserts the whole file even if its digest is
+    unchanged.
+    """
+    path = path or ontology_path()
+    if not os.path.exists(path):
         raise FileNotFoundError("Ontology file not found.")
-    return upload_rdf(ontology_path, settings.FUSEKI_GRAPH)
\ No newline at end of file
+    with open(path, 'rb') as f:
+        current = from_source(f.read())
+
+    target = (settings.FUSEKI_URL, settings.FUSEKI_DATASET, settings.FUSEKI_GRAPH, schema_graph())
+    if not force and _loaded.get(target) == current.digest:
+        return False
+    stored = _stored(META.sha256, META.schemaGraph)
+    digest = stored.get(str(META.sha256))
+    if not force and digest == current.digest and stored.get(str(META.schemaGraph)) == schema_graph():
+        _loaded[target] = current.digest
+        return False
+
+    if digest:
+        stored.update(_stored(META.source))
+    logger.info("Loading ontology %s (%s -> %s)", path, digest and digest[:12], current.digest[:12])
+    _apply(stored, current, full=force)
+    _loaded[target] = current.digest
+    return True
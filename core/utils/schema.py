@@ -0,0 +1,183 @@
+# core/utils/schema.py - In-process registry of the ontology schema (TBox)
+#
+# transport_ontology.ttl holds both the schema (classes, properties, their
+# hierarchy, domains, ranges and owl:Restriction nodes) and sample individuals.
+# The schema only changes with the file, so it is parsed once per content
+# hash and kept for the life of the process: Schema objects are registered by
+# the SHA-256 of the TTL, and the file is only re-read when its size or mtime
+# moves. Anything derived from the schema alone (class closures, VALUES
+# lists, the inference materialization update) is memoized on the Schema it
+# came from, so instance writes, which never change the file, leave it all in
+# place; an edited file yields a new Schema and new memos.
+#
+# In Fuseki the schema lives in its own graph (FUSEKI_SCHEMA_GRAPH), written
+# only by core.utils.rdf_loader as a whole; FUSEKI_GRAPH keeps the sample
+# individuals next to the application's instances.
+import hashlib
+import os
+import threading
+
+from django.conf import settings
+
+OWL = "http://www.w3.org/2002/07/owl#"
+RDFS = "http://www.w3.org/2000/01/rdf-schema#"
+RDF_TYPE = "http://www.w3.org/1999/02/22-rdf-syntax-ns#type"
+
+# A subject typed with one of these is part of the schema
+SCHEMA_TYPES = frozenset([
+    f"{OWL}Ontology", f"{OWL}Class", f"{OWL}Restriction",
+    f"{OWL}ObjectProperty", f"{OWL}DatatypeProperty", f"{OWL}AnnotationProperty",
+    f"{OWL}FunctionalProperty", f"{OWL}InverseFunctionalProperty",
+    f"{OWL}TransitiveProperty", f"{OWL}SymmetricProperty",
+    f"{RDFS}Class", "http://www.w3.org/1999/02/22-rdf-syntax-ns#Property",
+])
+# ... and so is a subject of one of these
+SCHEMA_PREDICATES = frozenset([
+    f"{RDFS}subClassOf", f"{RDFS}subPropertyOf", f"{RDFS}domain", f"{RDFS}range",
+    f"{OWL}inverseOf", f"{OWL}equivalentClass", f"{OWL}disjointWith",
+])
+
+_registry = {}  # digest -> Schema
+_files = {}  # path -> ((mtime_ns, size), digest)
+_lock = threading.Lock()
+
+
+def ontology_path():
+    return os.path.join(settings.BASE_DIR, 'ontology', 'transport_ontology.ttl')
+
+
+def schema_graph():
+    """URI of the graph holding the schema triples."""
+    return getattr(settings, 'FUSEKI_SCHEMA_GRAPH', None) or f"{settings.FUSEKI_GRAPH}/schema"
+
+
+def split_schema(graph):
+    """(TBox, ABox) rdflib Graphs of ``graph``; blank nodes go with the schema term using them."""
+    from rdflib import BNode, Graph
+
+    schema_subjects = {
+        s for s, p, o in graph
+        if (str(p) == RDF_TYPE and str(o) in SCHEMA_TYPES) or str(p) in SCHEMA_PREDICATES
+    }
+    # owl:Restriction nodes and RDF lists hang off the schema terms
+    pending = [o for s in schema_subjects for o in graph.objects(s) if isinstance(o, BNode)]
+    while pending:
+        node = pending.pop()
+        if node in schema_subjects:
+            continue
+        schema_subjects.add(node)
+        pending.extend(o for o in graph.objects(node) if isinstance(o, BNode))
+
+    tbox, abox = Graph(), Graph()
+    for prefix, namespace in graph.namespaces():
+        tbox.bind(prefix, namespace)
+        abox.bind(prefix, namespace)
+    for triple in graph:
+        (tbox if triple[0] in schema_subjects else abox).add(triple)
+    return tbox, abox
+
+
+def _closure(tbox, predicate):
+    """{term: frozenset(strict ancestors)} along ``predicate`` between URIs."""
+    from rdflib import URIRef
+
+    direct = {}
+    for sub, sup in tbox.subject_objects(URIRef(predicate)):
+        if isinstance(sub, URIRef) and isinstance(sup, URIRef) and sub != sup:
+            direct.setdefault(str(sub), set()).add(str(sup))
+
+    closure = {}
+
+    def _supers(term, visiting):
+        if term in closure:
+            return closure[term]
+        result = set()
+        for parent in direct.get(term, ()):
+            if parent in visiting:
+                continue  # tolerate cycles in hand-written axioms
+            result.add(parent)
+            result |= _supers(parent, visiting | {parent})
+        closure[term] = frozenset(result)
+        return closure[term]
+
+    for term in direct:
+        _supers(term, {term})
+    return closure
+
+
+class Schema:
+    """
+    The schema of one version of the TTL: ``tbox`` and ``abox`` graphs,
+    ``hierarchy`` ({class: strict superclasses}), ``domains`` and ``ranges``
+    ({property: classes}). Treat it as read-only.
+    """
+
+    def __init__(self, source):
+        from rdflib import Graph, URIRef
+
+        self.digest = hashlib.sha256(source).hexdigest()
+        self.source = source.decode('utf-8')
+        self.tbox, self.abox = split_schema(Graph().parse(data=self.source, format='turtle'))
+        self.hierarchy = _closure(self.tbox, f"{RDFS}subClassOf")
+        self.domains = self._targets(f"{RDFS}domain")
+        self.ranges = self._targets(f"{RDFS}range")
+        self.properties = frozenset(
+            str(s) for s, o in self.tbox.subject_objects(URIRef(RDF_TYPE))
+            if isinstance(s, URIRef) and str(o).endswith('Property')
+        )
+        self._memo = {}
+        self._memo_lock = threading.Lock()
+
+    def _targets(self, predicate):
+        from rdflib import URIRef
+
+        targets = {}
+        for prop, cls in self.tbox.subject_objects(URIRef(predicate)):
+            if isinstance(prop, URIRef) and isinstance(cls, URIRef):
+                targets.setdefault(str(prop), set()).add(str(cls))
+        return {prop: frozenset(classes) for prop, classes in targets.items()}
+
+    def subclasses(self, cls, include_self=True):
+        """Sorted URIs of every class whose closure contains ``cls``."""
+        found = {sub for sub, sups in self.hierarchy.items() if cls in sups}
+        if include_self:
+            found.add(cls)
+        return sorted(found)
+
+    def memo(self, key, build):
+        """``build()``, computed once for this schema version."""
+        try:
+            return self._memo[key]
+        except KeyError:
+            pass
+        value = build()
+        with self._memo_lock:
+            return self._memo.setdefault(key, value)
+
+
+def from_source(source):
+    """Registered Schema of the TTL bytes ``source``."""
+    digest = hashlib.sha256(source).hexdigest()
+    with _lock:
+        known = _registry.get(digest)
+    if known is not None:
+        return known
+    parsed = Schema(source)
+    with _lock:
+        return _registry.setdefault(digest, parsed)
+
+
+def schema(path=None):
+    """Schema of the ontology file (re-read only when its size or mtime changed)."""
+    path = path or ontology_path()
+    stat = os.stat(path)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    with _lock:
+        known = _files.get(path)
+    if known is not None and known[0] == stamp:
+        return _registry[known[1]]
+    with open(path, 'rb') as f:
+        parsed = from_source(f.read())
+    with _lock:
+        _files[path] = (stamp, parsed.digest)
+    return parsed
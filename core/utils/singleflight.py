@@ -0,0 +1,195 @@
+# core/utils/singleflight.py - Coalescing of identical concurrent SPARQL reads
+#
+# When a popular list expires, every request arriving before the first one
+# got its answer used to send the same queries to Fuseki. Reads now go
+# through a single-flight table keyed by endpoint, parameters and query text:
+# the first caller (the leader) sends the request, callers arriving while it
+# is in flight wait for it and share its response body. Each caller parses
+# the body itself, so nobody sees another caller's mutations.
+#
+# A caller never joins a flight started before the last write made by this
+# process (the write generation is bumped with the version stamps), so a page
+# rendered after a POST still reads its own write.
+#
+# With SPARQL_SINGLEFLIGHT_CACHE naming a cache shared by the workers
+# (Redis, Memcached, database), leaders also take a cache lock and publish the
+# body there; a worker that finds the lock taken polls for the body instead
+# of querying, and falls back to its own query if the leader goes away. The
+# lock and body keys carry a write counter kept in that cache and bumped by
+# every write of any worker, so a body read before another worker's write is
+# never handed out after it.
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+import weakref
+
+from django.conf import settings
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# Seconds a follower in another worker waits for the leader's body
+SHARED_WAIT = 10.0
+SHARED_POLL = 0.02
+
+_generation = 0
+_last_write = 0.0
+
+
+# Shared-cache counter of the writes made by all the workers
+WRITES_KEY = 'sparql-sf:writes'
+
+
+def note_write():
+    """Called after every write (versioning._safe_bump): later reads start new flights."""
+    global _generation, _last_write
+    _generation += 1
+    _last_write = time.time()
+    cache = _shared_cache()
+    if cache is not None:
+        _quietly(_count_write, cache)
+
+
+def _count_write(cache):
+    if not cache.add(WRITES_KEY, 1, timeout=None):
+        cache.incr(WRITES_KEY)
+
+
+def enabled():
+    return getattr(settings, 'SPARQL_SINGLEFLIGHT', True)
+
+
+def flight_key(*parts):
+    """Stable key of a request (endpoint, parameters, query text)."""
+    return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+
+class _Call:
+    def __init__(self, generation):
+        self.generation = generation
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+_calls = {}
+_lock = threading.Lock()
+# event loop -> {key: (generation, task)}
+_tasks = weakref.WeakKeyDictionary()
+
+
+def do(key, fetch):
+    """``fetch()`` (returning the response body), shared with identical concurrent calls."""
+    if not enabled():
+        return fetch()
+    generation = _generation
+    with _lock:
+        call = _calls.get(key)
+        leader = call is None or call.generation != generation
+        if leader:
+            call = _calls[key] = _Call(generation)
+    if not leader:
+        metrics.SPARQL_COALESCED.inc(scope='process')
+        call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return call.value
+
+    try:
+        call.value = _shared(key, fetch)
+        return call.value
+    except Exception as e:
+        call.error = e
+        raise
+    finally:
+        with _lock:
+            if _calls.get(key) is call:
+                del _calls[key]
+        call.done.set()
+
+
+async def ado(key, fetch):
+    """Async do(): ``fetch`` is a coroutine function; shared within the event loop."""
+    if not enabled():
+        return await fetch()
+    loop = asyncio.get_running_loop()
+    flights = _tasks.setdefault(loop, {})
+    generation = _generation
+    current = flights.get(key)
+    if current is not None and current[0] == generation:
+        metrics.SPARQL_COALESCED.inc(scope='async')
+        return await asyncio.shield(current[1])
+
+    task = loop.create_task(fetch())
+    flights[key] = (generation, task)
+
+    def _forget(_):
+        if flights.get(key, (None, None))[1] is task:
+            del flights[key]
+
+    task.add_done_callback(_forget)
+    # A cancelled caller must not cancel the request the others wait on
+    return await asyncio.shield(task)
+
+
+# ----------------------------------------------------------------------
+# CROSS-WORKER
+# ----------------------------------------------------------------------
+def _shared_cache():
+    alias = getattr(settings, 'SPARQL_SINGLEFLIGHT_CACHE', None)
+    if not alias:
+        return None
+    from django.core.cache import caches
+    return caches[alias]
+
+
+def _quietly(operation, *args, **kwargs):
+    try:
+        return operation(*args, **kwargs)
+    except Exception as e:
+        # The shared cache is an optimisation: never fail the read because of it
+        logger.warning("Shared single-flight cache unavailable: %s", e)
+        return None
+
+
+def _wait(cache, lock_key, body_key):
+    """Body published by the leading worker after our last write, or None."""
+    deadline = time.monotonic() + SHARED_WAIT
+    while True:
+        found = _quietly(cache.get, body_key)
+        if found is not None and found[0] >= _last_write:
+            return found[1]
+        if time.monotonic() >= deadline or _quietly(cache.get, lock_key) is None:
+            break  # leader gone (failed, or finished before we looked)
+        time.sleep(SHARED_POLL)
+    found = _quietly(cache.get, body_key)
+    return found[1] if found is not None and found[0] >= _last_write else None
+
+
+def _shared_keys(cache, key):
+    """Lock and body keys of ``key`` since the last write of any worker."""
+    writes = _quietly(cache.get, WRITES_KEY) or 0
+    return f"sparql-sf:lock:{writes}:{key}", f"sparql-sf:body:{writes}:{key}"
+
+
+def _shared(key, fetch):
+    cache = _shared_cache()
+    if cache is None:
+        return fetch()
+    lock_key, body_key = _shared_keys(cache, key)
+    if _quietly(cache.add, lock_key, 1, timeout=SHARED_WAIT):
+        started = time.time()
+        try:
+            body = fetch()
+            _quietly(cache.set, body_key, (started, body), timeout=SHARED_WAIT)
+            return body
+        finally:
+            _quietly(cache.delete, lock_key)
+    body = _wait(cache, lock_key, body_key)
+    if body is not None:
+        metrics.SPARQL_COALESCED.inc(scope='shared')
+        return body
+    return fetch()
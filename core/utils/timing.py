@@ -0,0 +1,113 @@
+# core/utils/timing.py - Per-request timing of Fuseki and LLM calls
+#
+# TimingMiddleware opens a RequestTimings collector in a context variable for
+# every request. The shared HTTP clients (core.utils.fuseki.get_session and
+# get_async_client) and the LLM wrapper (core.utils.llm) record each call into
+# it. Context variables follow the request into fan_out() workers, asyncio
+# tasks and sync_to_async threads, so parallel calls land in the same collector.
+# Outside a request (management commands, shell) nothing is collected per
+# request, but every call still feeds the process metrics (core.utils.metrics).
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+from . import metrics
+
+_current = contextvars.ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    """Calls recorded during one request, grouped by kind ('sparql', 'llm', ...)."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.view_module = None
+        self.events = []
+        self._lock = threading.Lock()
+
+    def add(self, kind, label, duration, size=0, cache_hit=False, tokens=0):
+        with self._lock:
+            self.events.append({
+                'kind': kind,
+                'label': label,
+                'ms': duration * 1000,
+                'bytes': size,
+                'cache_hit': cache_hit,
+                'tokens': tokens,
+            })
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def summary(self):
+        """{kind: {'count', 'ms', 'bytes', 'cache_hits', 'tokens'}} in first-seen order."""
+        totals = {}
+        with self._lock:
+            events = list(self.events)
+        for event in events:
+            entry = totals.setdefault(event['kind'], {
+                'count': 0, 'ms': 0.0, 'bytes': 0, 'cache_hits': 0, 'tokens': 0,
+            })
+            if event['cache_hit']:
+                entry['cache_hits'] += 1
+            else:
+                entry['count'] += 1
+                entry['ms'] += event['ms']
+            entry['bytes'] += event['bytes']
+            entry['tokens'] += event['tokens']
+        return totals
+
+
+def begin():
+    """Start collecting for the current context; returns the token for end()."""
+    return _current.set(RequestTimings())
+
+
+def end(token):
+    timings = _current.get()
+    _current.reset(token)
+    return timings
+
+
+def current():
+    return _current.get()
+
+
+def record(kind, label, duration, size=0, cache_hit=False, tokens=0):
+    """Record one call (duration in seconds) if a request is being timed."""
+    if not cache_hit:
+        metrics.observe_call(kind, label, duration, size, tokens)
+    timings = _current.get()
+    if timings is not None:
+        timings.add(kind, label, duration, size, cache_hit, tokens)
+
+
+def record_cache_hit(kind, label):
+    """Record a call that was answered from a cache instead of the backend."""
+    record(kind, label, 0.0, cache_hit=True)
+    metrics.cache_lookup(label, True)
+
+
+@contextmanager
+def timed(kind, label):
+    """
+    Time the enclosed block. The yielded dict may be filled with 'bytes' and
+    'tokens' before the block exits.
+    """
+    info = {'bytes': 0, 'tokens': 0}
+    start = time.perf_counter()
+    if kind == 'sparql':
+        metrics.SPARQL_IN_FLIGHT.inc()
+    try:
+        yield info
+    finally:
+        if kind == 'sparql':
+            metrics.SPARQL_IN_FLIGHT.dec()
+        record(kind, label, time.perf_counter() - start, info['bytes'], tokens=info['tokens'])
+
+
+def sparql_label(url):
+    """'query', 'update' or 'data' from a Fuseki endpoint URL."""
+    path = str(url).split('?', 1)[0].rstrip('/')
+    return path.rsplit('/', 1)[-1] or 'sparql'
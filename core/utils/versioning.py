@@ -0,0 +1,237 @@
+# core/utils/versioning.py - Version stamps and conditional GET for pages
+#
+# Write paths bump version stamps (core.models.GraphVersion): ``graph`` for
+# free-form SPARQL updates and uploads, an entity type (``city``) and one
+# entity (``city:Tunis``) for the managers' create/update/delete. Pages derive
+# their ETag/Last-Modified from the stamps they depend on, so a revalidation
+# that matches is answered 304 after one small SQL read, without Fuseki.
+#
+# Writes made outside the application (Fuseki UI, s-update scripts) are not
+# seen; call bump() from such tooling, or disable with CONDITIONAL_GET=false.
+import contextvars
+import functools
+import hashlib
+import inspect
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+logger = logging.getLogger(__name__)
+
+GRAPH = 'graph'
+# Django rows of transport_app/ticket_app (stations, transports, persons, tickets)
+ORM = 'orm'
+
+# Keys collected by the outermost write in the current context: a manager's
+# create that issues several low-level updates bumps its own keys once, and
+# the generic ``graph`` stamp is not bumped on its behalf.
+_pending = contextvars.ContextVar('version_pending', default=None)
+
+# Stamps read by the conditional page being served: versions() answers from
+# them, so a cache checked during the page costs no second read
+_page_versions = contextvars.ContextVar('page_versions', default=None)
+
+
+def entity_key(entity, ident):
+    return f"{entity}:{ident}"
+
+
+def bump(*keys):
+    """Increment the stamps ``keys`` (created on first use)."""
+    now = timezone.now()
+    from core.models import GraphVersion
+    for key in keys:
+        updated = GraphVersion.objects.filter(key=key).update(version=F('version') + 1, modified=now)
+        if updated:
+            continue
+        try:
+            with transaction.atomic():
+                GraphVersion.objects.create(key=key, version=1, modified=now)
+        except IntegrityError:
+            # Created concurrently by another writer
+            GraphVersion.objects.filter(key=key).update(version=F('version') + 1, modified=now)
+
+
+def _safe_bump(keys):
+    from . import singleflight
+    # Stamps and in-flight reads started before this write no longer hold
+    _page_versions.set(None)
+    singleflight.note_write()
+    try:
+        bump(*sorted(keys))
+    except Exception as e:
+        # A missed bump only costs a stale 304 until the next write; never fail the write
+        logger.error("Version bump failed for %s: %s", sorted(keys), e)
+
+
+def _write_keys(entity, ident, args, kwargs):
+    if entity is None:
+        return {GRAPH}
+    keys = {entity}
+    if isinstance(ident, int):
+        value = args[ident] if len(args) > ident else None
+    else:
+        value = ident(*args, **kwargs) if ident else None
+    if value:
+        keys.add(entity_key(entity, value))
+    return keys
+
+
+def bumps_version(entity=None, ident=None):
+    """
+    Decorator for write paths. Without ``entity`` the write bumps ``graph``;
+    with it, the type stamp and, when ``ident`` resolves one, the entity stamp.
+    ``ident`` is the index of the positional argument holding the identifier,
+    or a callable taking the write's arguments. Nested writes fold into the
+    outermost one.
+    """
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                outer = _pending.get()
+                keys = _write_keys(entity, ident, args, kwargs)
+                if outer is not None:
+                    if entity is not None:
+                        outer.update(keys)
+                    return await func(*args, **kwargs)
+                token = _pending.set(keys)
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    _pending.reset(token)
+                    await sync_to_async(_safe_bump)(keys)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            outer = _pending.get()
+            keys = _write_keys(entity, ident, args, kwargs)
+            if outer is not None:
+                if entity is not None:
+                    outer.update(keys)
+                return func(*args, **kwargs)
+            token = _pending.set(keys)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _pending.reset(token)
+                _safe_bump(keys)
+        return wrapper
+    return decorator
+
+
+def versions(keys):
+    """{key: version} of the stamps ``keys`` (0 if never bumped); one SQL query."""
+    seen = _page_versions.get()
+    if seen is not None and all(key in seen for key in keys):
+        return {key: seen[key] for key in keys}
+    from core.models import GraphVersion
+    found = dict(GraphVersion.objects.filter(key__in=keys).values_list('key', 'version'))
+    return {key: found.get(key, 0) for key in keys}
+
+
+def bump_orm(sender, **kwargs):
+    """post_save/post_delete/m2m_changed receiver for the ORM-backed pages."""
+    if sender._meta.app_label in ('transport_app', 'ticket_app'):
+        _safe_bump({ORM})
+
+
+# ----------------------------------------------------------------------
+# CONDITIONAL GET
+# ----------------------------------------------------------------------
+def _stamps(keys):
+    """(signature, last_modified, {key: version}) of the stamps ``keys``; one SQL query."""
+    from core.models import GraphVersion
+    found = list(GraphVersion.objects.filter(key__in=keys).values_list('key', 'version', 'modified'))
+    current = {key: 0 for key in keys}
+    current.update((key, version) for key, version, _ in found)
+    last_modified = max((modified for _, _, modified in found), default=None)
+    signature = ";".join(f"{k}={current[k]}" for k in sorted(keys))
+    return signature, last_modified, current
+
+
+def _etag(request, signature):
+    # Pages embed the CSRF token and session state, so the tag is per client as
+    # well (cookies, not request.user: that would cost a session query)
+    client = f"{request.COOKIES.get(settings.CSRF_COOKIE_NAME, '')}|{request.COOKIES.get(settings.SESSION_COOKIE_NAME, '')}"
+    digest = hashlib.sha1(f"{request.get_full_path()}|{signature}|{client}".encode('utf-8')).hexdigest()
+    return f'W/"{digest[:20]}"'
+
+
+def _page_keys(keys, kwargs):
+    """Resolve ``'city:{name}'`` templates (or callables) against the view kwargs."""
+    return {GRAPH, *(k(kwargs) if callable(k) else k.format(**kwargs) for k in keys)}
+
+
+def _applies(request):
+    if request.method not in ('GET', 'HEAD') or not getattr(settings, 'CONDITIONAL_GET', True):
+        return False
+    # A pending flash message must reach the page, not a cached copy of it
+    return not len(get_messages(request))
+
+
+def _revalidate(request, stamps):
+    """(etag, last_modified, 304 response or None) for a request and its stamps."""
+    signature, last_modified, _ = stamps
+    etag = _etag(request, signature)
+    # Only the ETag decides: Last-Modified has one-second resolution, so an
+    # If-Modified-Since could match a page written again within that second
+    return etag, last_modified, get_conditional_response(request, etag=etag)
+
+
+def _finish(response, etag, last_modified):
+    if response.status_code in (200, 304) and not response.has_header('ETag'):
+        response['ETag'] = etag
+        if last_modified:
+            response['Last-Modified'] = http_date(last_modified.timestamp())
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def conditional_page(*keys):
+    """
+    View decorator: ETag/Last-Modified from the stamps ``keys`` (plus
+    ``graph``), 304 on a matching revalidation. Keys may reference URL kwargs,
+    e.g. ``conditional_page('city:{name}')``, or be callables of the kwargs.
+    Works on sync and async views.
+    """
+    def decorator(view):
+        if inspect.iscoroutinefunction(view):
+            @functools.wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                if not _applies(request):
+                    return await view(request, *args, **kwargs)
+                stamps = await sync_to_async(_stamps)(_page_keys(keys, kwargs))
+                etag, last_modified, not_modified = _revalidate(request, stamps)
+                if not_modified is not None:
+                    return _finish(not_modified, etag, last_modified)
+                token = _page_versions.set(stamps[2])
+                try:
+                    return _finish(await view(request, *args, **kwargs), etag, last_modified)
+                finally:
+                    _page_versions.reset(token)
+            return async_wrapper
+
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not _applies(request):
+                return view(request, *args, **kwargs)
+            stamps = _stamps(_page_keys(keys, kwargs))
+            etag, last_modified, not_modified = _revalidate(request, stamps)
+            if not_modified is not None:
+                return _finish(not_modified, etag, last_modified)
+            token = _page_versions.set(stamps[2])
+            try:
+                return _finish(view(request, *args, **kwargs), etag, last_modified)
+            finally:
+                _page_versions.reset(token)
+        return wrapper
+    return decorator
@@ -0,0 +1,137 @@
+# core/utils/warmup.py - Warm-up stage run before a worker serves traffic
+#
+# The first requests after a deploy used to pay, all at once, for the Fuseki
+# connection setup, the class hierarchy parse, template compilation and every
+# empty in-process cache. warm_up() does that work up front: it opens the
+# pooled keep-alive connections, parses the ontology's class hierarchy,
+# builds the station/route indexes, choice lists and autocomplete indexes,
+# and renders each list page once (which fills the list caches of
+# core.utils.list_cache and the template loader cache).
+#
+# It runs from `manage.py warmup`, and from transport/wsgi.py and asgi.py when
+# WARMUP_ON_STARTUP is set. Not from AppConfig.ready(): Django warns against
+# queries there, and every manage.py command would pay for it. When the
+# server preloads the application before forking (gunicorn --preload), the
+# parsed structures are shared copy-on-write by the workers; the database and
+# HTTP connections opened here are closed or dropped in the children.
+import logging
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+LIST_PAGES = (
+    'itinerary:list', 'schedule:list', 'city:list', 'company:list',
+    'list_stations', 'list_transports', 'list_persons', 'list_tickets',
+)
+
+
+def _fuseki_pool():
+    """Open one keep-alive connection per pool slot (parallel ASKs)."""
+    from .concurrency import fan_out, get_max_workers
+    from .fuseki import get_session, query_url
+
+    def ping():
+        response = get_session().get(query_url(), params={'query': 'ASK {}'},
+                                     headers={'Accept': 'application/sparql-results+json'}, timeout=5)
+        response.raise_for_status()
+
+    fan_out([ping] * get_max_workers())
+
+
+def _schema():
+    from .inference import class_hierarchy
+    class_hierarchy()
+
+
+def _indexes():
+    from itinerary.utils.route_planner import get_route_planner
+    from transport_app.services.station_graph import get_station_index
+    get_station_index()
+    get_route_planner()
+
+
+def _choices():
+    from transport_app.services.choices import LISTS, form_choices
+    form_choices(*LISTS)
+
+
+def _autocomplete():
+    from .autocomplete import lookup, source_keys
+    for name in source_keys():
+        lookup(name, 'a')
+
+
+def _host():
+    hosts = [h for h in settings.ALLOWED_HOSTS if h and '*' not in h]
+    return hosts[0].lstrip('.') if hosts else 'localhost'
+
+
+def _pages():
+    from django.test import Client
+    from django.urls import reverse
+
+    client = Client(HTTP_HOST=_host())
+    failed = []
+    for name in LIST_PAGES:
+        response = client.get(reverse(name))
+        if response.status_code != 200:
+            failed.append(f"{name}: {response.status_code}")
+    if failed:
+        raise RuntimeError(", ".join(failed))
+
+
+def _llm():
+    """Import the Groq SDK when the AI endpoints are configured (skipped otherwise)."""
+    import os
+    if os.getenv('GROQ_API_KEY'):
+        import groq  # noqa: F401
+
+
+STEPS = (
+    ('fuseki', _fuseki_pool),
+    ('schema', _schema),
+    ('indexes', _indexes),
+    ('choices', _choices),
+    ('autocomplete', _autocomplete),
+    ('pages', _pages),
+    ('llm', _llm),
+)
+
+
+def warm_up(steps=None, log=None):
+    """
+    Run the warm-up ``steps`` (names of STEPS, default all) and return
+    [(name, ms, error or None)]. A failing step is reported and skipped; the
+    caches it would have filled are built by the first request instead.
+    """
+    from django.db import connections
+
+    report = []
+    for name, step in STEPS:
+        if steps and name not in steps:
+            continue
+        start = time.perf_counter()
+        error = None
+        try:
+            step()
+        except Exception as e:
+            error = str(e) or e.__class__.__name__
+            logger.warning("Warm-up step %s failed: %s", name, error)
+        ms = (time.perf_counter() - start) * 1000
+        report.append((name, ms, error))
+        if log:
+            log(name, ms, error)
+    # Connections must not be shared with forked workers
+    for connection in connections.all(initialized_only=True):
+        if not connection.in_atomic_block:
+            connection.close()
+    logger.info("Warm-up done in %.0f ms", sum(ms for _, ms, _ in report))
+    return report
+
+
+def warm_up_on_startup():
+    """Entry point of the WSGI/ASGI modules: warm_up() when WARMUP_ON_STARTUP is set."""
+    if getattr(settings, 'WARMUP_ON_STARTUP', False):
+        warm_up()
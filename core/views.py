@@ -1,19 +1,57 @@
+import itertools
+import logging
 from django.shortcuts import render, redirect
-from django.http import JsonResponse
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.conf import settings
 from .utils.fuseki import sparql_query
 from .utils.nl_to_sparql import nl_to_sparql
 from .utils.rdf_loader import load_ontology_to_fuseki
+from .utils import metrics as metrics_registry
+from .utils.export import FORMATS, ExportError, filename, iter_export
 import json
 import requests
 
+logger = logging.getLogger(__name__)
+
 def home(request):
     return render(request, 'core/index.html')
 
+def metrics(request):
+    """Prometheus scrape endpoint (text exposition format)."""
+    # Triple counts are refreshed by a background thread, never by the scrape
+    metrics_registry.start_triple_sampler()
+    return HttpResponse(metrics_registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+def export_graph(request):
+    """
+    Stream the dataset: /export/?format=nt|nq|csv&type=<Class>&gzip=1&inferred=1.
+    Memory stays flat; the first chunk is read before answering so an
+    unreachable Fuseki gives a 502 instead of a truncated download.
+    """
+    fmt = request.GET.get('format', 'nq')
+    cls = request.GET.get('type') or None
+    gzip = request.GET.get('gzip') in ('1', 'true')
+    try:
+        chunks = iter_export(fmt, cls, gzip=gzip, include_inferred=request.GET.get('inferred') in ('1', 'true'))
+        first = next(chunks, b'')
+    except ExportError as e:
+        return JsonResponse({"status": "error", "message": str(e)}, status=400)
+    except requests.exceptions.RequestException as e:
+        logger.error("Export failed: %s", e)
+        return JsonResponse({"status": "error", "message": f"Connection error with Fuseki: {e}"}, status=502)
+
+    response = StreamingHttpResponse(
+        itertools.chain([first], chunks),
+        content_type='application/gzip' if gzip else FORMATS[fmt][0],
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename(fmt, cls, gzip)}"'
+    return response
+
 def load_ontology(request):
     try:
-        response = load_ontology_to_fuseki()
+        if not load_ontology_to_fuseki():
+            return JsonResponse({"status": "success", "message": "Ontology already up to date in Fuseki."})
         return JsonResponse({"status": "success", "message": "Ontology loaded into Fuseki successfully."})
     except FileNotFoundError as e:
         return JsonResponse({"status": "error", "message": f"File not found: {str(e)}"})
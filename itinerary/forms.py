@@ -71,6 +71,8 @@ class BusinessTripForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         # Store the original ID for update operations
         self.original_id = kwargs.pop('original_id', None)
+        # False when the caller checks existence itself (bulk_import, one query per batch)
+        self.check_existing = kwargs.pop('check_existing', True)
         super().__init__(*args, **kwargs)
     
     def clean_itinerary_id(self):
@@ -97,8 +99,7 @@ class BusinessTripForm(forms.ModelForm):
                 return itinerary_id
         
         # Check if ID exists in RDF store
-        existing = get_itinerary(full_id)
-        if existing:
+        if self.check_existing and get_itinerary(full_id):
             raise forms.ValidationError(f'Business trip with ID {full_id} already exists in RDF store.')
         
         return itinerary_id
@@ -176,6 +177,7 @@ class LeisureTripForm(forms.ModelForm):
     
     def __init__(self, *args, **kwargs):
         self.original_id = kwargs.pop('original_id', None)
+        self.check_existing = kwargs.pop('check_existing', True)
         super().__init__(*args, **kwargs)
     
     def clean_itinerary_id(self):
@@ -192,8 +194,7 @@ class LeisureTripForm(forms.ModelForm):
             if full_id == original_normalized:
                 return itinerary_id
         
-        existing = get_itinerary(full_id)
-        if existing:
+        if self.check_existing and get_itinerary(full_id):
             raise forms.ValidationError(f'Leisure trip with ID {full_id} already exists in RDF store.')
         
         return itinerary_id
@@ -271,6 +272,7 @@ class EducationalTripForm(forms.ModelForm):
     
     def __init__(self, *args, **kwargs):
         self.original_id = kwargs.pop('original_id', None)
+        self.check_existing = kwargs.pop('check_existing', True)
         super().__init__(*args, **kwargs)
     
     def clean_itinerary_id(self):
@@ -287,8 +289,7 @@ class EducationalTripForm(forms.ModelForm):
             if full_id == original_normalized:
                 return itinerary_id
         
-        existing = get_itinerary(full_id)
-        if existing:
+        if self.check_existing and get_itinerary(full_id):
             raise forms.ValidationError(f'Educational trip with ID {full_id} already exists in RDF store.')
         
         return itinerary_id
\ No newline at end of file
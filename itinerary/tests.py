@@ -1,3 +1,28 @@
-from django.test import TestCase
+from urllib.parse import quote
 
-# Create your tests here.
+from core.benchmark.generator import NS
+from core.benchmark.testing import StandInTestCase
+
+
+class ItineraryQueryBudgetTests(StandInTestCase):
+    """SPARQL budgets of the itinerary and schedule pages (RDF only, no SQL)."""
+
+    def _detail(self, app, full_id):
+        # Same link as the list templates: the subject URI rides along in ?s=
+        return f"/{app}/{full_id}/?s={quote(NS + full_id)}"
+
+    def test_itinerary_list(self):
+        self.assertViewBudget('/itinerary/', sql=1, sparql=3)
+
+    def test_itinerary_detail(self):
+        for full_id in self.network['itineraries'][:3]:
+            with self.subTest(itinerary=full_id):
+                self.assertViewBudget(self._detail('itinerary', full_id), sql=1, sparql=2)
+
+    def test_schedule_list(self):
+        self.assertViewBudget('/schedule/', sql=1, sparql=3)
+
+    def test_schedule_detail(self):
+        for full_id in self.network['schedules'][:3]:
+            with self.subTest(schedule=full_id):
+                self.assertViewBudget(self._detail('schedule', full_id), sql=1, sparql=1)
@@ -9,6 +9,7 @@ urlpatterns = [
     path('create/', views.itinerary_create, name='create'),
     path('ai-suggest/', views.itinerary_ai_suggest, name='ai_suggest'),  # MOVED BEFORE <str:id>
     path('ai-query/', views.itinerary_ai_query, name='ai_query'),
+    path('routes/', views.itinerary_routes, name='routes'),
     # Generic patterns at the end
     path('<str:id>/', views.itinerary_detail, name='detail'),
     path('<str:id>/update/', views.itinerary_update, name='update'),
@@ -1,6 +1,7 @@
 import re
-from core.utils.nl_to_sparql import nl_to_sparql, nl_to_sparql_update
-from core.utils.fuseki import sparql_query, sparql_update
+from asgiref.sync import sync_to_async
+from core.utils.nl_to_sparql import nl_to_sparql, nl_to_sparql_update, nl_to_sparql_async
+from core.utils.fuseki import sparql_query, sparql_update, sparql_query_async, sparql_update_async
 from .ontology_manager import create_itinerary, list_itineraries
 
 
@@ -69,6 +70,36 @@ def ai_generate_and_execute(nl_text: str):
         return {"error": str(e), "mode": "select", "sparql": sparql}
 
 
+async def ai_generate_and_execute_async(nl_text: str):
+    """
+    ASGI variant of ai_generate_and_execute(). Read questions (the common case)
+    await Groq and Fuseki on the event loop; create/update/delete intents reuse
+    the canonical sync pipeline in a worker thread.
+    """
+    if not nl_text or not nl_text.strip():
+        return {"error": "Empty query"}
+
+    if detect_intent(nl_text) != "read":
+        return await sync_to_async(ai_generate_and_execute, thread_sensitive=False)(nl_text)
+
+    sparql = await nl_to_sparql_async(nl_text)
+    if not sparql:
+        return {"error": "AI failed to generate SPARQL"}
+
+    if is_update_query(sparql):
+        try:
+            await sparql_update_async(sparql)
+            return {"ok": True, "mode": "update", "sparql": sparql}
+        except Exception as e:
+            return {"error": str(e), "mode": "update", "sparql": sparql}
+
+    try:
+        res = await sparql_query_async(sparql)
+        return {"ok": True, "mode": "select", "sparql": sparql, "results": res}
+    except Exception as e:
+        return {"error": str(e), "mode": "select", "sparql": sparql}
+
+
 def detect_intent(text: str) -> str:
     t = (text or "").lower()
     # Delete
@@ -1,24 +1,19 @@
 # itinerary/utils/ontology_manager.py - FIXED WITH CORRECT URI PATTERN
+import asyncio
+import logging
 import time
 import traceback
 from django.conf import settings
-from core.utils.fuseki import sparql_query, sparql_update
-import requests
-from urllib.parse import urlencode
+from core.utils.fuseki import select, sparql_query, sparql_update, sparql_query_all_graphs_async
+from core.utils.partitions import entity_graph, partitioned
+from core.utils.concurrency import fan_out
+from core.utils.timing import timed
+from core.utils.inference import refreshes_inference, class_values, subclass_filter, inference_graph, touch
+from core.utils.list_cache import ListCache, answered
+from core.utils.versioning import bumps_version
 
+logger = logging.getLogger(__name__)
 
-# ----------------------------------------------------------------------
-# CONFIGURATION FUSEKI
-# ----------------------------------------------------------------------
-try:
-    FUSEKI_BASE_URL = settings.FUSEKI_URL
-    FUSEKI_DATASET = settings.FUSEKI_DATASET
-    FUSEKI_QUERY_URL = f"{FUSEKI_BASE_URL}/{FUSEKI_DATASET}/query"
-    FUSEKI_UPDATE_URL = f"{FUSEKI_BASE_URL}/{FUSEKI_DATASET}/update"
-except AttributeError as e:
-    print(f"WARNING: Missing Fuseki config: {e}")
-    FUSEKI_QUERY_URL = "http://localhost:3030/transport_db/query"
-    FUSEKI_UPDATE_URL = "http://localhost:3030/transport_db/update"
 
 NS = "http://www.transport-ontology.org/travel#"
 
@@ -36,64 +31,11 @@ except Exception as _rdflib_err:
 
 
 
-def _run_sparql(query, expect_json=True, timeout=10, all_graphs=False):
-    """
-    Run SPARQL using sparql_query first, then HTTP fallback to FUSEKI_QUERY_URL if result empty/None.
-    If all_graphs=True, bypasses sparql_query and uses HTTP GET directly to search ALL graphs.
-    Returns Python dict (parsed JSON) if expect_json True, otherwise raw response text.
-    """
-    # If all_graphs=True, skip sparql_query (which adds default-graph-uri) and go straight to HTTP
-    if all_graphs:
-        try:
-            headers = {'Accept': 'application/sparql-results+json'}
-            # Use HTTP GET directly without default-graph-uri to search ALL graphs
-            # unionDefaultGraph=true makes Fuseki expose the union of all named graphs as the default graph
-            resp = requests.get(FUSEKI_QUERY_URL, params={'query': query, 'unionDefaultGraph': 'true'}, headers=headers, timeout=timeout)
-            resp.raise_for_status()
-            try:
-                return resp.json()
-            except ValueError:
-                return {'raw': resp.text}
-        except Exception as e:
-            print(f"_run_sparql (all_graphs): HTTP direct failed: {e}")
-            return {}
-    
-    # Try existing wrapper
-    try:
-        res = sparql_query(query)
-        if isinstance(res, dict):
-            # If bindings present or boolean (ASK), return immediately
-            if res.get('results', {}).get('bindings') or 'boolean' in res:
-                return res
-            # else continue to HTTP fallback
-        else:
-            # if wrapper returns non-dict, fall back
-            pass
-    except Exception as e:
-        print(f"_run_sparql: sparql_query wrapper raised: {e}")
+def _bind_all_graphs(query):
+    """Deferred select(query, union=True) call for fan_out() (the itinerary graphs when partitioned)."""
+    return lambda: select(query, union=True, entity='itinerary')
+
 
-    # HTTP fallback (mimic Fuseki UI) - also without default-graph-uri
-    try:
-        headers = {'Accept': 'application/sparql-results+json'}
-        resp = requests.get(FUSEKI_QUERY_URL, params={'query': query, 'unionDefaultGraph': 'true'}, headers=headers, timeout=timeout)
-        resp.raise_for_status()
-        try:
-            return resp.json()
-        except ValueError:
-            # sometimes ASK returns bare "true" or similar; return raw text
-            return {'raw': resp.text}
-    except Exception as e:
-        print(f"_run_sparql: HTTP fallback failed: {e}")
-        # Try encoded fallback
-        try:
-            qs = urlencode({'query': query})
-            # Keep unionDefaultGraph for encoded fallback
-            resp2 = requests.get(f"{FUSEKI_QUERY_URL}?unionDefaultGraph=true&{qs}", headers=headers, timeout=timeout)
-            resp2.raise_for_status()
-            return resp2.json()
-        except Exception as e2:
-            print(f"_run_sparql: HTTP encoded fallback also failed: {e2}")
-            return {}
 def _uri_candidates_for(full_id):
     """
     Return a list of SPARQL node strings to try when addressing the resource.
@@ -161,10 +103,13 @@ def escape_sparql_string(value):
 # ----------------------------------------------------------------------
 # CREATE - Pure RDF (use :I-*-NNN local name)
 # ----------------------------------------------------------------------
+@bumps_version('itinerary')
+@refreshes_inference
 def create_itinerary(data, itinerary_type):
     """Create a new itinerary in RDF store using :I-*-NNN URIs."""
     if USE_RDFLIB:
-        return _create_itinerary_rdflib(data, itinerary_type)
+        with timed('sparql', 'rdflib'):
+            return _create_itinerary_rdflib(data, itinerary_type)
     # Set defaults
     data.setdefault('overall_status', 'Planned')
     data.setdefault('total_cost_estimate', 0.0)
@@ -187,7 +132,7 @@ def create_itinerary(data, itinerary_type):
     # Use prefixed local name (e.g., :I-B-012)
     uri = f":{full_id}"
 
-    print(f"🔹 Creating itinerary: ID={full_id}, URI={uri}")
+    logger.debug("Creating itinerary: ID=%s, URI=%s", full_id, uri)
 
     # Base triples
     triples = [
@@ -262,9 +207,9 @@ def create_itinerary(data, itinerary_type):
     """
 
     try:
-        print(f"🔹 Creating RDF with SPARQL:\n{sparql}\n")
-        sparql_update(sparql)
-        print(f"✅ Created RDF: {full_id} as {uri}")
+        logger.debug("Creating RDF with SPARQL:\n%s", sparql)
+        sparql_update(sparql, graph=entity_graph('itinerary'))
+        logger.debug("Created RDF: %s as %s", full_id, uri)
 
         # Verify creation - check if the URI exists as the expected rdf:type
         time.sleep(0.5)
@@ -275,17 +220,17 @@ def create_itinerary(data, itinerary_type):
           {uri} rdf:type :{itinerary_type}Trip
         }}
         """
-        print(f"🔍 Verifying with:\n{verify_sparql}\n")
+        logger.debug("Verifying with:\n%s", verify_sparql)
         result = sparql_query(verify_sparql)
         if result.get('boolean', False):
-            print(f"✅ Verification OK: {full_id} exists as {uri}")
+            logger.debug("Verification OK: %s exists as %s", full_id, uri)
             return full_id
         else:
-            print(f"⚠️ Warning: Could not verify {uri}, but proceeding")
+            logger.warning("Could not verify %s, but proceeding", uri)
             return full_id
 
     except Exception as e:
-        print(f"❌ Failed to create RDF: {e}")
+        logger.error("Failed to create RDF: %s", e)
         traceback.print_exc()
         raise
 
@@ -296,7 +241,7 @@ def create_itinerary(data, itinerary_type):
 def get_itinerary(itinerary_id, subject_uri=None):
     """
     Robust retrieval: try normalized ids and multiple URI candidates (prefixed and absolute),
-    use wrapper _run_sparql to handle sparql_query and HTTP fallback.
+    one read per candidate, over the graphs chosen by FUSEKI_UNION_DEFAULT_GRAPH.
     """
     itinerary_id = str(itinerary_id).strip()
 
@@ -320,11 +265,12 @@ def get_itinerary(itinerary_id, subject_uri=None):
         id_candidates = possible_ids
 
     if USE_RDFLIB:
-        found = _get_itinerary_rdflib(itinerary_id, subject_uri)
+        with timed('sparql', 'rdflib'):
+            found = _get_itinerary_rdflib(itinerary_id, subject_uri)
         if found:
             return found
     for full_id in id_candidates:
-        print(f"🔍 Searching for RDF: {full_id}")
+        logger.debug("Searching for RDF: %s", full_id)
         candidates = node_list or _uri_candidates_for(full_id)
 
         for node in candidates:
@@ -338,10 +284,9 @@ def get_itinerary(itinerary_id, subject_uri=None):
             }}
             """
             try:
-                result = _run_sparql(sparql)
-                bindings = result.get('results', {}).get('bindings', []) if isinstance(result, dict) else []
+                bindings = select(sparql).get('results', {}).get('bindings', [])
             except Exception as e:
-                print(f"❌ SPARQL error for node {node}: {e}")
+                logger.error("SPARQL error for node %s: %s", node, e)
                 bindings = []
 
             if bindings:
@@ -366,24 +311,27 @@ def get_itinerary(itinerary_id, subject_uri=None):
                             itype = 'Educational'
                 data['type'] = itype
                 data['itineraryID'] = data.get('itineraryID', full_id)
-                print(f"✅ Found RDF for {full_id} using node {node}")
+                logger.debug("Found RDF for %s using node %s", full_id, node)
                 return data
 
-    print(f"⚠️ No RDF data found for {itinerary_id}")
+    logger.warning("No RDF data found for %s", itinerary_id)
     return None
 
 # ----------------------------------------------------------------------
 # UPDATE - Pure RDF (use :I-*-NNN URI pattern)
 # ----------------------------------------------------------------------
+@bumps_version('itinerary', 0)
+@refreshes_inference
 def update_itinerary(itinerary_id, new_data, subject_uri=None):
     """
     Update: fetch existing; merge; delete triples for all URI candidates; recreate under preferred :I-*-NNN URI.
     """
     if USE_RDFLIB:
-        return _update_itinerary_rdflib(itinerary_id, new_data, subject_uri)
+        with timed('sparql', 'rdflib'):
+            return _update_itinerary_rdflib(itinerary_id, new_data, subject_uri)
     existing = get_itinerary(itinerary_id, subject_uri=subject_uri)
     if not existing:
-        print(f"⚠️ No existing RDF found for {itinerary_id}, creating new one.")
+        logger.warning("No existing RDF found for %s, creating new one.", itinerary_id)
         return create_itinerary(new_data, new_data.get("type", "Business"))
 
     # Merge data
@@ -404,10 +352,10 @@ def update_itinerary(itinerary_id, new_data, subject_uri=None):
         DELETE WHERE {{ {node} ?p ?o }}
         """
         try:
-            sparql_update(delete_sparql)
-            print(f"🧹 Cleared old RDF data for {node}")
+            sparql_update(delete_sparql, graph=entity_graph('itinerary'))
+            logger.debug("Cleared old RDF data for %s", node)
         except Exception as e:
-            print(f"⚠️ Delete failed for {node}: {e}")
+            logger.warning("Delete failed for %s: %s", node, e)
 
         # also remove references to the node
         delete_obj = f"""
@@ -415,9 +363,9 @@ def update_itinerary(itinerary_id, new_data, subject_uri=None):
         DELETE WHERE {{ ?s ?p {node} }}
         """
         try:
-            sparql_update(delete_obj)
+            sparql_update(delete_obj, graph=entity_graph('itinerary'))
         except Exception as e:
-            print(f"⚠️ Delete references failed for {node}: {e}")
+            logger.warning("Delete references failed for %s: %s", node, e)
 
     # Now recreate under preferred URI :I-*-NNN (create_itinerary expects itinerary_id in merged)
     itinerary_type = merged.get("type", "Business")
@@ -427,12 +375,15 @@ def update_itinerary(itinerary_id, new_data, subject_uri=None):
 # ----------------------------------------------------------------------
 # DELETE - Pure RDF (use :I-*-NNN URI pattern)
 # ----------------------------------------------------------------------
+@bumps_version('itinerary', 0)
+@refreshes_inference
 def delete_itinerary(itinerary_id, subject_uri=None):
     """
     Delete resource: attempt to resolve full_id, then delete triples for all URI candidates and references.
     """
     if USE_RDFLIB:
-        return _delete_itinerary_rdflib(itinerary_id, subject_uri)
+        with timed('sparql', 'rdflib'):
+            return _delete_itinerary_rdflib(itinerary_id, subject_uri)
     original_id = str(itinerary_id).strip()
     existing = get_itinerary(original_id, subject_uri=subject_uri)
     if existing:
@@ -441,7 +392,7 @@ def delete_itinerary(itinerary_id, subject_uri=None):
         normalized = normalize_itinerary_id(original_id)
         full_id = f"I-B-{normalized}" if not original_id.startswith("I-") else normalized
 
-    print(f"\n🧹 Deleting itinerary: {original_id} (normalized: {full_id})")
+    logger.debug("Deleting itinerary: %s (normalized: %s)", original_id, full_id)
 
     success = True
     nodes_to_delete = list(_uri_candidates_for(full_id))
@@ -453,10 +404,10 @@ def delete_itinerary(itinerary_id, subject_uri=None):
             PREFIX : <{NS}>
             DELETE WHERE {{ {node} ?p ?o }}
             """
-            sparql_update(delete_subject)
-            print(f"✅ Deleted triples for: {node}")
+            sparql_update(delete_subject, graph=entity_graph('itinerary'))
+            logger.debug("Deleted triples for: %s", node)
         except Exception as e:
-            print(f"❌ Delete failed for {node}: {e}")
+            logger.error("Delete failed for %s: %s", node, e)
             success = False
 
         try:
@@ -464,10 +415,10 @@ def delete_itinerary(itinerary_id, subject_uri=None):
             PREFIX : <{NS}>
             DELETE WHERE {{ ?s ?p {node} }}
             """
-            sparql_update(delete_object)
-            print(f"✅ Deleted references to: {node}")
+            sparql_update(delete_object, graph=entity_graph('itinerary'))
+            logger.debug("Deleted references to: %s", node)
         except Exception as e:
-            print(f"❌ Delete references failed for {node}: {e}")
+            logger.error("Delete references failed for %s: %s", node, e)
             success = False
 
     # Verification: check if any candidate still exists
@@ -478,178 +429,192 @@ def delete_itinerary(itinerary_id, subject_uri=None):
         PREFIX : <{NS}>
         ASK WHERE {{ {node} ?p ?o }}
         """
-        res = _run_sparql(ask_q)
-        if isinstance(res, dict) and res.get('boolean', False):
+        try:
+            exists = select(ask_q).get('boolean', False)
+        except Exception as e:
+            logger.warning("Verification failed for %s: %s", node, e)
+            continue
+        if exists:
             any_exists = True
-            print(f"⚠️ Still exists: {node}")
+            logger.warning("Still exists: %s", node)
             break
 
     if any_exists:
-        print(f"⚠️ WARNING: {full_id} still exists in RDF!")
+        logger.warning("%s still exists in RDF!", full_id)
         return False
     else:
-        print(f"🎯 CONFIRMED: {full_id} fully deleted")
+        logger.debug("CONFIRMED: %s fully deleted", full_id)
         return success
 
 
 # ----------------------------------------------------------------------
 # LIST - Pure RDF (uses the working SPARQL)
 # ----------------------------------------------------------------------
-def list_itineraries(filters=None):
+def _itinerary_list_queries():
     """
-    List all itineraries from RDF store with optional filters.
-    - First tries existing sparql_query(...)
-    - If that returns empty bindings, falls back to a direct HTTP GET to FUSEKI_QUERY_URL
-      with Accept: application/sparql-results+json so we mimic Fuseki UI behavior.
+    The (label, query) pairs behind list_itineraries().
+    Strategy: Search in ALL graphs (default + configured graph) to find ALL itineraries.
+    This combines results from both the ontology file (default graph) and newly created ones (named graph).
+    IMPORTANT: Use the legacy robust Fuseki queries that search across ALL graphs.
+    This matches prior behavior and ensures we don't miss items stored outside the default graph.
     """
-    # Strategy: Search in ALL graphs (default + configured graph) to find ALL itineraries
-    # This combines results from both the ontology file (default graph) and newly created ones (named graph)
-    
-    # IMPORTANT: Use the legacy robust Fuseki queries that search across ALL graphs.
-    # This matches prior behavior and ensures we don't miss items stored outside the default graph.
-    all_bindings = []
-    seen_subjects = set()  # Track by subject URI to avoid duplicates across queries
-    
+    # Superclass types are materialized in the inference graph (core.utils.inference):
+    # the union/default graph is matched with a plain `?s a :Itinerary`, and graph-scoped
+    # queries enumerate the concrete classes instead of walking rdfs:subClassOf*.
+    itinerary_classes = class_values('?cls', 'Itinerary')
+    type_filter = subclass_filter('?type', 'Itinerary')
+    queries = []
+
     # Query 1: Search WITHOUT GRAPH restriction (finds everything including default graph)
-    query1 = f"""
+    queries.append(("Query 1", f"""
     PREFIX : <{NS}>
-    PREFIX rdf: <http://www.w3.org/1999/02/22/rdf-syntax-ns#>
-    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
 
     SELECT DISTINCT ?s ?id ?status ?cost ?duration ?type WHERE {{
       {{
         # Match by type first - catches all itineraries including new ones
-        ?s rdf:type/rdfs:subClassOf* :Itinerary .
+        ?s a :Itinerary .
         OPTIONAL {{ ?s :itineraryID ?id }}
       }}
       UNION
       {{
         # Also match by itineraryID if type matching didn't work
         ?s :itineraryID ?id .
-        OPTIONAL {{ ?s rdf:type/rdfs:subClassOf* :Itinerary }}
       }}
-      OPTIONAL {{ ?s rdf:type ?type }}
+      OPTIONAL {{ ?s a ?type . {type_filter} }}
       OPTIONAL {{ ?s :overallStatus ?status }}
       OPTIONAL {{ ?s :totalCostEstimate ?cost }}
       OPTIONAL {{ ?s :totalDurationDays ?duration }}
     }}
     ORDER BY ?id
     LIMIT 500
-    """
-    
-    print("🔍 Query 1: Searching ALL graphs (no GRAPH restriction, no default-graph-uri)...")
-    try:
-        # Use all_graphs=True to bypass sparql_query and search ALL graphs
-        result1 = _run_sparql(query1, all_graphs=True)
-        if isinstance(result1, dict):
-            bindings1 = result1.get('results', {}).get('bindings', []) or []
-            print(f"✅ Query 1 returned {len(bindings1)} bindings")
-            for b in bindings1:
-                s_uri = b.get('s', {}).get('value', '') if isinstance(b.get('s'), dict) else str(b.get('s', ''))
-                if s_uri and s_uri not in seen_subjects:
-                    all_bindings.append(b)
-                    seen_subjects.add(s_uri)
-        else:
-            print("⚠️ Query 1 returned non-dict result")
-    except Exception as e:
-        print(f"❌ Query 1 failed: {e}")
-        traceback.print_exc()
+    """))
+    # Partitioned, Query 1 runs over the itinerary graph, FUSEKI_GRAPH and the
+    # inferred types (core.utils.partitions): nothing is left for 2 and 3 to catch
+    if partitioned():
+        return queries
     
     # Query 2: If graph URI configured, also search explicitly in that graph (to catch any missed)
-    try:
-        graph_uri = getattr(settings, 'FUSEKI_GRAPH', None)
-        if graph_uri:
-            query2 = f"""
-            PREFIX : <{NS}>
-            PREFIX rdf: <http://www.w3.org/1999/02/22/rdf-syntax-ns#>
-            PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-            
-            SELECT DISTINCT ?s ?id ?status ?cost ?duration ?type WHERE {{
-              GRAPH <{graph_uri}> {{
-                {{
-                  ?s rdf:type/rdfs:subClassOf* :Itinerary .
-                  OPTIONAL {{ ?s :itineraryID ?id }}
-                }}
-                UNION
-                {{
-                  ?s :itineraryID ?id .
-                  OPTIONAL {{ ?s rdf:type/rdfs:subClassOf* :Itinerary }}
-                }}
-                OPTIONAL {{ ?s rdf:type ?type }}
-                OPTIONAL {{ ?s :overallStatus ?status }}
-                OPTIONAL {{ ?s :totalCostEstimate ?cost }}
-                OPTIONAL {{ ?s :totalDurationDays ?duration }}
-              }}
+    graph_uri = getattr(settings, 'FUSEKI_GRAPH', None)
+    if graph_uri:
+        queries.append(("Query 2", f"""
+        PREFIX : <{NS}>
+        
+        SELECT DISTINCT ?s ?id ?status ?cost ?duration ?type WHERE {{
+          GRAPH <{graph_uri}> {{
+            {{
+              {itinerary_classes}
+              ?s a ?cls .
+              OPTIONAL {{ ?s :itineraryID ?id }}
             }}
-            ORDER BY ?id
-            LIMIT 500
-            """
-            
-            print(f"🔍 Query 2: Searching explicitly in GRAPH <{graph_uri}>...")
-            try:
-                # Also use all_graphs=True to ensure we search in the named graph
-                result2 = _run_sparql(query2, all_graphs=True)
-                if isinstance(result2, dict):
-                    bindings2 = result2.get('results', {}).get('bindings', []) or []
-                    print(f"✅ Query 2 returned {len(bindings2)} bindings")
-                    for b in bindings2:
-                        s_uri = b.get('s', {}).get('value', '') if isinstance(b.get('s'), dict) else str(b.get('s', ''))
-                        if s_uri and s_uri not in seen_subjects:
-                            all_bindings.append(b)
-                            seen_subjects.add(s_uri)
-            except Exception as e:
-                print(f"❌ Query 2 failed: {e}")
-    except Exception as e:
-        print(f"⚠️ Error setting up graph query: {e}")
+            UNION
+            {{
+              ?s :itineraryID ?id .
+            }}
+            OPTIONAL {{ ?s a ?type . {type_filter} }}
+            OPTIONAL {{ ?s :overallStatus ?status }}
+            OPTIONAL {{ ?s :totalCostEstimate ?cost }}
+            OPTIONAL {{ ?s :totalDurationDays ?duration }}
+          }}
+        }}
+        ORDER BY ?id
+        LIMIT 500
+        """))
     
-    # Query 3: Scan across ALL named graphs using GRAPH ?g { ... }
-    query3 = f"""
+    # Query 3: Scan across ALL named graphs using GRAPH ?g { ... } (inference graph excluded)
+    queries.append(("Query 3", f"""
     PREFIX : <{NS}>
-    PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
 
     SELECT DISTINCT ?g ?s ?id ?status ?cost ?duration ?type WHERE {{
       GRAPH ?g {{
-        {{ ?s rdf:type/rdfs:subClassOf* :Itinerary . OPTIONAL {{ ?s :itineraryID ?id }} }}
+        {{ {itinerary_classes} ?s a ?cls . OPTIONAL {{ ?s :itineraryID ?id }} }}
         UNION
-        {{ ?s :itineraryID ?id . OPTIONAL {{ ?s rdf:type/rdfs:subClassOf* :Itinerary }} }}
-        OPTIONAL {{ ?s rdf:type ?type }}
+        {{ ?s :itineraryID ?id . }}
+        OPTIONAL {{ ?s a ?type . {type_filter} }}
         OPTIONAL {{ ?s :overallStatus ?status }}
         OPTIONAL {{ ?s :totalCostEstimate ?cost }}
         OPTIONAL {{ ?s :totalDurationDays ?duration }}
       }}
+      FILTER(?g != <{inference_graph()}>)
     }}
     ORDER BY ?id
     LIMIT 500
+    """))
+
+    return queries
+
+
+def _merge_bindings(labelled_results):
+    """Combine per-query results in order, keeping the first binding per subject."""
+    all_bindings = []
+    seen_subjects = set()  # Track by subject URI to avoid duplicates across queries
+    for label, result in labelled_results:
+        if isinstance(result, Exception):
+            logger.error("%s failed: %s", label, result)
+            continue
+        if not isinstance(result, dict):
+            logger.warning("%s returned non-dict result", label)
+            continue
+        bindings_n = result.get('results', {}).get('bindings', []) or []
+        logger.debug("%s returned %s bindings", label, len(bindings_n))
+        for b in bindings_n:
+            s_uri = b.get('s', {}).get('value', '') if isinstance(b.get('s'), dict) else str(b.get('s', ''))
+            if s_uri and s_uri not in seen_subjects:
+                all_bindings.append(b)
+                seen_subjects.add(s_uri)
+    return all_bindings
+
+
+def _itinerary_results():
+    queries = _itinerary_list_queries()
+    logger.debug("Running %s itinerary queries in parallel (default graph, named graph, GRAPH ?g)...", len(queries))
+    results = fan_out([_bind_all_graphs(q) for _, q in queries], return_exceptions=True)
+    return list(zip([label for label, _ in queries], results))
+
+
+async def _itinerary_results_async():
+    queries = _itinerary_list_queries()
+    results = await asyncio.gather(
+        *(sparql_query_all_graphs_async(q, entity='itinerary') for _, q in queries),
+        return_exceptions=True,
+    )
+    return list(zip([label for label, _ in queries], results))
+
+
+# (label, result) pairs of the list queries, until an itinerary or graph write
+ITINERARY_LIST = ListCache('itinerary', 'itinerary', load=_itinerary_results, aload=_itinerary_results_async,
+                           complete=lambda pairs: answered(r for _, r in pairs))
+
+
+def list_itineraries(filters=None):
     """
-    print("🔍 Query 3: Scanning across all named graphs with GRAPH ?g {...} ...")
-    try:
-        result3 = _run_sparql(query3, all_graphs=True)
-        if isinstance(result3, dict):
-            bindings3 = result3.get('results', {}).get('bindings', []) or []
-            print(f"✅ Query 3 returned {len(bindings3)} bindings")
-            for b in bindings3:
-                s_uri = b.get('s', {}).get('value', '') if isinstance(b.get('s'), dict) else str(b.get('s', ''))
-                if s_uri and s_uri not in seen_subjects:
-                    all_bindings.append(b)
-                    seen_subjects.add(s_uri)
-    except Exception as e:
-        print(f"❌ Query 3 failed: {e}")
+    List all itineraries from RDF store with optional filters.
+    The queries are independent, so they are dispatched in parallel and merged in order.
+    """
+    return _itinerary_rows(_merge_bindings(ITINERARY_LIST.get()), filters)
 
-    bindings = all_bindings
-    print(f"📊 Total unique bindings after combining queries: {len(bindings)}")
 
-    print(f"📊 Found {len(bindings)} raw bindings")
+async def list_itineraries_async(filters=None):
+    """Async list_itineraries() for ASGI views: same queries, awaited concurrently."""
+    return _itinerary_rows(_merge_bindings(await ITINERARY_LIST.aget()), filters)
+
+
+def _itinerary_rows(all_bindings, filters=None):
+    """Turn merged bindings into the row dicts rendered by the list page."""
+    bindings = all_bindings
+    logger.debug("Total unique bindings after combining queries: %s", len(bindings))
     
     if not bindings:
-        print("⚠️ WARNING: No bindings returned from SPARQL query!")
+        logger.debug("No bindings returned from SPARQL query")
         return []
 
     rows = []
     seen_ids = set()  # Track seen IDs to avoid duplicates
+    # Per-binding traces are only built when DEBUG is enabled for this module
+    trace = logger.isEnabledFor(logging.DEBUG)
 
     for idx, b in enumerate(bindings):
-        print(f"🔍 Processing binding {idx + 1}/{len(bindings)}: {b}")
+        if trace:
+            logger.debug("Processing binding %s/%s: %s", idx + 1, len(bindings), b)
         
         # Extract itinerary ID - handle both dict and direct values
         iid_obj = b.get('id', {})
@@ -659,7 +624,8 @@ def list_itineraries(filters=None):
         if not iid:
             s_obj = b.get('s', {})
             s_uri = s_obj.get('value', '') if isinstance(s_obj, dict) else str(s_obj) if s_obj else ''
-            print(f"  🔍 No ID from property, trying to extract from URI: {s_uri}")
+            if trace:
+                logger.debug("No ID from property, trying to extract from URI: %s", s_uri)
             if s_uri:
                 local_part = s_uri.split('#')[-1] if '#' in s_uri else s_uri.split('/')[-1]
                 if '/' in local_part:
@@ -669,10 +635,11 @@ def list_itineraries(filters=None):
                     iid = local_part
         
         if not iid:
-            print(f"⚠️ Skipping entry {idx + 1} with empty id. Binding: {b}")
+            logger.warning("Skipping entry %s with empty id. Binding: %s", idx + 1, b)
             continue
         
-        print(f"  ✅ Extracted ID: {iid}")
+        if trace:
+            logger.debug("Extracted ID: %s", iid)
 
         # Skip duplicates
         if iid in seen_ids:
@@ -784,15 +751,17 @@ def list_itineraries(filters=None):
                     pass
 
         rows.append(row)
-        print(f"  ✅ Added row: {row}")
+        if trace:
+            logger.debug("Added row: %s", row)
 
     # Sort by ID to ensure consistent ordering
     rows.sort(key=lambda x: x["id"])
 
-    print(f"✅ Final: Listed {len(rows)} itineraries (from {len(bindings)} bindings)")
-    print(f"   IDs: {[r['id'] for r in rows[:10]]}{'...' if len(rows) > 10 else ''}")
+    logger.debug("Final: Listed %s itineraries (from %s bindings)", len(rows), len(bindings))
+    if trace:
+        logger.debug("IDs: %s%s", [r['id'] for r in rows[:10]], '...' if len(rows) > 10 else '')
     if len(rows) == 0:
-        print("⚠️ WARNING: No rows created! Check the bindings processing above.")
+        logger.debug("No rows created from %s bindings", len(bindings))
     return rows
 
 
@@ -821,7 +790,8 @@ def _subject_candidates(full_id: str, subject_uri: str = None):
     ]
 
 
-def _create_itinerary_rdflib(data, itinerary_type):
+def itinerary_triples(data, itinerary_type):
+    """(full_id, triples) of a new itinerary; also used by core.utils.bulk_import."""
     data.setdefault('overall_status', 'Planned')
     data.setdefault('total_cost_estimate', 0.0)
     data.setdefault('total_duration_days', 1)
@@ -829,63 +799,71 @@ def _create_itinerary_rdflib(data, itinerary_type):
     full_id = _full_id_from_input(itinerary_type, data.get('itinerary_id'))
     subj = URIRef(f"{NS}{full_id}")
 
-    graph = get_graph()
-    ctx = get_named_graph(graph)
-
+    triples = []
     # Type
-    ctx.add((subj, RDF.type, TR[f"{itinerary_type}Trip"]))
+    triples.append((subj, RDF.type, TR[f"{itinerary_type}Trip"]))
     # Base properties
-    ctx.add((subj, TR.itineraryID, Literal(full_id)))
-    ctx.add((subj, TR.overallStatus, Literal(str(data['overall_status']))))
+    triples.append((subj, TR.itineraryID, Literal(full_id)))
+    triples.append((subj, TR.overallStatus, Literal(str(data['overall_status']))))
     try:
-        ctx.add((subj, TR.totalCostEstimate, Literal(float(data['total_cost_estimate']), datatype=XSD.decimal)))
+        triples.append((subj, TR.totalCostEstimate, Literal(float(data['total_cost_estimate']), datatype=XSD.decimal)))
     except Exception:
-        ctx.add((subj, TR.totalCostEstimate, Literal(0.0, datatype=XSD.decimal)))
+        triples.append((subj, TR.totalCostEstimate, Literal(0.0, datatype=XSD.decimal)))
     try:
-        ctx.add((subj, TR.totalDurationDays, Literal(int(data['total_duration_days']), datatype=XSD.integer)))
+        triples.append((subj, TR.totalDurationDays, Literal(int(data['total_duration_days']), datatype=XSD.integer)))
     except Exception:
-        ctx.add((subj, TR.totalDurationDays, Literal(1, datatype=XSD.integer)))
+        triples.append((subj, TR.totalDurationDays, Literal(1, datatype=XSD.integer)))
 
     if itinerary_type == 'Business':
         if data.get('client_project_name'):
-            ctx.add((subj, TR.clientProjectName, Literal(str(data['client_project_name']))))
+            triples.append((subj, TR.clientProjectName, Literal(str(data['client_project_name']))))
         if data.get('expense_limit') is not None:
             try:
-                ctx.add((subj, TR.expenseLimit, Literal(float(data['expense_limit']), datatype=XSD.decimal)))
+                triples.append((subj, TR.expenseLimit, Literal(float(data['expense_limit']), datatype=XSD.decimal)))
             except Exception:
-                ctx.add((subj, TR.expenseLimit, Literal(0.0, datatype=XSD.decimal)))
+                triples.append((subj, TR.expenseLimit, Literal(0.0, datatype=XSD.decimal)))
         if data.get('purpose_code'):
-            ctx.add((subj, TR.purposeCode, Literal(str(data['purpose_code']))))
-        ctx.add((subj, TR.approvalRequired, Literal(bool(data.get('approval_required', False)), datatype=XSD.boolean)))
+            triples.append((subj, TR.purposeCode, Literal(str(data['purpose_code']))))
+        triples.append((subj, TR.approvalRequired, Literal(bool(data.get('approval_required', False)), datatype=XSD.boolean)))
 
     elif itinerary_type == 'Leisure':
         if data.get('activity_type'):
-            ctx.add((subj, TR.activityType, Literal(str(data['activity_type']))))
+            triples.append((subj, TR.activityType, Literal(str(data['activity_type']))))
         if data.get('accommodation'):
-            ctx.add((subj, TR.accommodation, Literal(str(data['accommodation']))))
+            triples.append((subj, TR.accommodation, Literal(str(data['accommodation']))))
         if data.get('budget_per_day') is not None:
             try:
-                ctx.add((subj, TR.budgetPerDay, Literal(float(data['budget_per_day']), datatype=XSD.decimal)))
+                triples.append((subj, TR.budgetPerDay, Literal(float(data['budget_per_day']), datatype=XSD.decimal)))
             except Exception:
-                ctx.add((subj, TR.budgetPerDay, Literal(0.0, datatype=XSD.decimal)))
+                triples.append((subj, TR.budgetPerDay, Literal(0.0, datatype=XSD.decimal)))
         if data.get('group_size') is not None:
             try:
-                ctx.add((subj, TR.groupSize, Literal(int(data['group_size']), datatype=XSD.integer)))
+                triples.append((subj, TR.groupSize, Literal(int(data['group_size']), datatype=XSD.integer)))
             except Exception:
-                ctx.add((subj, TR.groupSize, Literal(1, datatype=XSD.integer)))
+                triples.append((subj, TR.groupSize, Literal(1, datatype=XSD.integer)))
 
     elif itinerary_type == 'Educational':
         if data.get('institution'):
-            ctx.add((subj, TR.institution, Literal(str(data['institution']))))
+            triples.append((subj, TR.institution, Literal(str(data['institution']))))
         if data.get('course_reference'):
-            ctx.add((subj, TR.courseReference, Literal(str(data['course_reference']))))
+            triples.append((subj, TR.courseReference, Literal(str(data['course_reference']))))
         if data.get('credit_hours') is not None:
             try:
-                ctx.add((subj, TR.creditHours, Literal(int(data['credit_hours']), datatype=XSD.integer)))
+                triples.append((subj, TR.creditHours, Literal(int(data['credit_hours']), datatype=XSD.integer)))
             except Exception:
-                ctx.add((subj, TR.creditHours, Literal(0, datatype=XSD.integer)))
+                triples.append((subj, TR.creditHours, Literal(0, datatype=XSD.integer)))
         if data.get('required_documentation'):
-            ctx.add((subj, TR.requiredDocumentation, Literal(str(data['required_documentation']))))
+            triples.append((subj, TR.requiredDocumentation, Literal(str(data['required_documentation']))))
+    return full_id, triples
+
+
+def _create_itinerary_rdflib(data, itinerary_type):
+    full_id, triples = itinerary_triples(data, itinerary_type)
+    graph = get_graph()
+    ctx = get_named_graph(graph, 'itinerary')
+    for triple in triples:
+        ctx.add(triple)
+    touch(*{s for s, _, _ in triples})  # the rdflib store bypasses the shared session
 
     # Simple verification (ASK)
     ask = f"""
@@ -911,7 +889,7 @@ def _get_itinerary_rdflib(itinerary_id, subject_uri=None):
         id_candidates = [normalize_itinerary_id(itinerary_id)]
 
     graph = get_graph()
-    ctx = get_named_graph(graph)
+    ctx = get_named_graph(graph, 'itinerary')
 
     for fid in id_candidates:
         for subj in _subject_candidates(fid, subject_uri):
@@ -944,9 +922,10 @@ def _update_itinerary_rdflib(itinerary_id, new_data, subject_uri=None):
 
     full_id = existing.get('itineraryID', str(itinerary_id))
     graph = get_graph()
-    ctx = get_named_graph(graph)
+    ctx = get_named_graph(graph, 'itinerary')
 
     # Remove all triples for candidate subjects and inbound references
+    touch(*_subject_candidates(full_id, subject_uri))
     for subj in _subject_candidates(full_id, subject_uri):
         to_remove = list(ctx.triples((subj, None, None)))
         for t in to_remove:
@@ -972,8 +951,9 @@ def _delete_itinerary_rdflib(itinerary_id, subject_uri=None):
         full_id = f"I-B-{normalized}" if not original_id.startswith("I-") else normalized
 
     graph = get_graph()
-    ctx = get_named_graph(graph)
+    ctx = get_named_graph(graph, 'itinerary')
     success = True
+    touch(*_subject_candidates(full_id, subject_uri))
     for subj in _subject_candidates(full_id, subject_uri):
         try:
             for t in list(ctx.triples((subj, None, None))):
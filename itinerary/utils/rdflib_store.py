@@ -27,9 +27,15 @@ def get_graph():
     return graph
 
 
-def get_named_graph(graph: ConjunctiveGraph):
-    """Return the named graph context if configured; otherwise the default graph."""
+def get_named_graph(graph: ConjunctiveGraph, entity=None):
+    """
+    Return the named graph context if configured (the graph of ``entity`` when
+    given, see core.utils.partitions); otherwise the default graph.
+    """
     graph_uri = getattr(settings, "FUSEKI_GRAPH", None)
+    if graph_uri and entity:
+        from core.utils.partitions import entity_graph
+        graph_uri = entity_graph(entity)
     if graph_uri:
         return graph.get_context(graph_uri)
     return graph.default_context
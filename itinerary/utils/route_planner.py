@@ -0,0 +1,464 @@
+# itinerary/utils/route_planner.py - In-memory route planning over the transport network
+#
+# The Django tables (Station, Transport, DailySchedule, BusCompany fares) are
+# loaded once into array-backed adjacency (CSR) and searched locally:
+#   - shortest_path(): Dijkstra, or A* when a heuristic is given, minimising
+#     travel time, fare, or a blend of both;
+#   - earliest_arrival(): RAPTOR-style rounds (one round per boarded vehicle)
+#     over timetabled departures from DailySchedule;
+#   - plan_routes(): ranked, de-duplicated alternatives for a journey.
+# No SPARQL or LLM round trip is involved, so a query costs milliseconds.
+import heapq
+import threading
+import time
+from array import array
+from datetime import time as dt_time
+
+from django.conf import settings
+
+from transport_app.models import Station, Transport
+
+# ----------------------------------------------------------------------
+# DEFAULTS (overridable through settings)
+# ----------------------------------------------------------------------
+# Stations carry no coordinates, so each leg is assumed to cover a typical
+# segment length; per-type speeds and fares fill in missing data.
+DEFAULT_SEGMENT_KM = 5.0
+DEFAULT_HEADWAY_MINUTES = 15
+TRANSFER_MINUTES = 5.0
+VALUE_OF_TIME = 10.0  # minutes of travel one TND is worth (balanced objective)
+CACHE_SECONDS = 300
+
+DEFAULT_SPEEDS = {'Bus': 25.0, 'Metro': 35.0, 'Tram': 20.0, 'Train': 70.0, 'Transport': 25.0}
+DEFAULT_FARES = {'Bus': 0.5, 'Metro': 0.7, 'Tram': 0.6, 'Train': 2.0, 'Transport': 0.5}
+
+OBJECTIVES = ('time', 'cost', 'balanced')
+TRANSFER = -1  # transport index of a walking link between connected stations
+
+
+def _setting(name, default):
+    value = getattr(settings, name, None)
+    return default if value is None else value
+
+
+def _minutes(value):
+    """datetime.time / 'HH:MM' / minutes -> minutes after midnight."""
+    if value is None or value == '':
+        return None
+    if isinstance(value, dt_time):
+        return value.hour * 60 + value.minute + value.second / 60
+    if isinstance(value, (int, float)):
+        return float(value)
+    hours, _, rest = str(value).partition(':')
+    return int(hours) * 60 + int((rest or '0')[:2])
+
+
+def _clock(minutes):
+    minutes = int(round(minutes))
+    return f"{(minutes // 60) % 24:02d}:{minutes % 60:02d}"
+
+
+class RoutePlanner:
+    """
+    Weighted multigraph of stations.
+
+    Nodes are station pks mapped to dense ids. Every transport contributes a
+    leg in each direction (lines run both ways); Station.connected_to adds
+    walking transfer legs. Leg attributes live in parallel arrays indexed by
+    leg id and the outgoing legs of node ``n`` are
+    ``_legs_by_node[_offsets[n]:_offsets[n + 1]]``.
+    """
+
+    def __init__(self):
+        self._ids = {}
+        self._pks = []
+        self._names = []
+        self._by_name = {}
+        # transports: parallel lists indexed by transport index
+        self.transports = []
+        # legs: parallel arrays indexed by leg id
+        self._leg_from = array('l')
+        self._leg_to = array('l')
+        self._leg_transport = array('l')
+        self._leg_minutes = array('d')
+        self._leg_wait = array('d')
+        self._leg_cost = array('d')
+        self._offsets = array('l', [0])
+        self._legs_by_node = array('l')
+        self.built_at = time.monotonic()
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+    def add_station(self, pk, name=''):
+        node = self._ids.get(pk)
+        if node is None:
+            node = len(self._pks)
+            self._ids[pk] = node
+            self._pks.append(pk)
+            self._names.append(name or str(pk))
+            if name:
+                self._by_name.setdefault(name.strip().lower(), node)
+        return node
+
+    def add_transport(self, info):
+        """Register a transport (dict) and its two legs; returns its index."""
+        index = len(self.transports)
+        self.transports.append(info)
+        speed = info['speed'] or DEFAULT_SPEEDS.get(info['type'], DEFAULT_SPEEDS['Transport'])
+        minutes = _setting('ROUTE_PLANNER_SEGMENT_KM', DEFAULT_SEGMENT_KM) / speed * 60
+        wait = info['headway'] / 2
+        for a, b in ((info['from'], info['to']), (info['to'], info['from'])):
+            self._add_leg(self.add_station(a), self.add_station(b), index, minutes, wait, info['fare'])
+        return index
+
+    def add_transfer(self, a, b):
+        minutes = _setting('ROUTE_PLANNER_TRANSFER_MINUTES', TRANSFER_MINUTES)
+        self._add_leg(self.add_station(a), self.add_station(b), TRANSFER, minutes, 0.0, 0.0)
+
+    def _add_leg(self, u, v, transport, minutes, wait, cost):
+        self._leg_from.append(u)
+        self._leg_to.append(v)
+        self._leg_transport.append(transport)
+        self._leg_minutes.append(minutes)
+        self._leg_wait.append(wait)
+        self._leg_cost.append(cost)
+
+    def freeze(self):
+        """Build the CSR index once all legs are added."""
+        n = len(self._pks)
+        offsets = array('l', [0]) * (n + 1)
+        for u in self._leg_from:
+            offsets[u + 1] += 1
+        for i in range(n):
+            offsets[i + 1] += offsets[i]
+        cursor = array('l', offsets)
+        legs = array('l', [0]) * len(self._leg_from)
+        for leg, u in enumerate(self._leg_from):
+            legs[cursor[u]] = leg
+            cursor[u] += 1
+        self._offsets, self._legs_by_node = offsets, legs
+        return self
+
+    def _outgoing(self, node):
+        return self._legs_by_node[self._offsets[node]:self._offsets[node + 1]]
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+    def resolve(self, station):
+        """Node id for a Station, a pk, or a station name (case-insensitive)."""
+        if station is None or station == '':
+            return None
+        if isinstance(station, Station):
+            station = station.pk
+        if isinstance(station, int) or str(station).isdigit():
+            return self._ids.get(int(station))
+        return self._by_name.get(str(station).strip().lower())
+
+    def stats(self):
+        return {
+            'stations': len(self._pks),
+            'transports': len(self.transports),
+            'legs': len(self._leg_from),
+        }
+
+    # ------------------------------------------------------------------
+    # Dijkstra / A*
+    # ------------------------------------------------------------------
+    def _weight(self, leg, objective):
+        minutes = self._leg_minutes[leg] + self._leg_wait[leg]
+        if objective == 'time':
+            return minutes
+        if objective == 'cost':
+            # fare first, time only to break ties between equal fares
+            return self._leg_cost[leg] + minutes * 1e-6
+        return minutes + self._leg_cost[leg] * _setting('ROUTE_PLANNER_VALUE_OF_TIME', VALUE_OF_TIME)
+
+    def shortest_path(self, origin, destination, objective='time', heuristic=None):
+        """
+        Cheapest path for ``objective`` ('time', 'cost' or 'balanced').
+
+        ``heuristic(node) -> float`` turns the search into A*; it must never
+        overestimate the remaining weight. Returns a route dict or None.
+        """
+        if objective not in OBJECTIVES:
+            raise ValueError(f"Unknown objective: {objective}")
+        source, target = self.resolve(origin), self.resolve(destination)
+        if source is None or target is None:
+            return None
+
+        n = len(self._pks)
+        dist = array('d', [float('inf')]) * n
+        parent = array('l', [-1]) * n
+        dist[source] = 0.0
+        heap = [(heuristic(source) if heuristic else 0.0, source)]
+        while heap:
+            _, node = heapq.heappop(heap)
+            if node == target:
+                break
+            base = dist[node]
+            for leg in self._outgoing(node):
+                nxt = self._leg_to[leg]
+                candidate = base + self._weight(leg, objective)
+                if candidate < dist[nxt]:
+                    dist[nxt] = candidate
+                    parent[nxt] = leg
+                    priority = candidate + (heuristic(nxt) if heuristic else 0.0)
+                    heapq.heappush(heap, (priority, nxt))
+
+        if dist[target] == float('inf'):
+            return None
+        legs = []
+        node = target
+        while node != source:
+            leg = parent[node]
+            legs.append(leg)
+            node = self._leg_from[leg]
+        legs.reverse()
+        return self._describe(legs, objective)
+
+    # ------------------------------------------------------------------
+    # RAPTOR-style earliest arrival
+    # ------------------------------------------------------------------
+    def _next_departure(self, info, at):
+        """Earliest departure of ``info`` at or after minute ``at`` (None if no more runs)."""
+        headway = info['headway']
+        first = info['first_run']
+        last = info['last_run']
+        if first is None:
+            first = 0.0
+        if at <= first:
+            departure = first
+        else:
+            runs = -(-(at - first) // headway)  # ceil
+            departure = first + runs * headway
+        if last is not None and departure > last:
+            return None
+        return departure
+
+    def earliest_arrival(self, origin, destination, depart_at='08:00', weekday=None, max_rounds=5):
+        """
+        Earliest arrival at ``destination`` leaving ``origin`` at ``depart_at``.
+
+        Round k holds the best arrival times using at most k vehicles; each
+        round only rescans stations improved in the previous one. Transports
+        with a DailySchedule depart every ``frequency_minutes`` between first
+        and last run, on the days of ``day_of_week_mask`` (bit 0 = Monday);
+        other transports are assumed to run all day at their headway.
+        """
+        source, target = self.resolve(origin), self.resolve(destination)
+        if source is None or target is None:
+            return None
+        start = _minutes(depart_at)
+
+        n = len(self._pks)
+        inf = float('inf')
+        best = array('d', [inf]) * n
+        # per station: (leg, boarding minute) of the last improvement
+        via = [None] * n
+        best[source] = start
+        marked = self._walk({source}, best, via)
+
+        for _ in range(max_rounds):
+            if not marked:
+                break
+            previous = array('d', best)
+            improved = set()
+            for node in marked:
+                ready = previous[node]
+                for leg in self._outgoing(node):
+                    index = self._leg_transport[leg]
+                    if index == TRANSFER:
+                        continue
+                    info = self.transports[index]
+                    if weekday is not None and info['days'] is not None and not info['days'] & (1 << weekday):
+                        continue
+                    departure = self._next_departure(info, ready)
+                    if departure is None:
+                        continue
+                    arrival = departure + self._leg_minutes[leg]
+                    nxt = self._leg_to[leg]
+                    if arrival < best[nxt] and arrival < best[target]:
+                        best[nxt] = arrival
+                        via[nxt] = (leg, departure)
+                        improved.add(nxt)
+            marked = self._walk(improved, best, via)
+
+        if best[target] == inf:
+            return None
+        legs, departures = [], []
+        node = target
+        while node != source:
+            leg, departure = via[node]
+            legs.append(leg)
+            departures.append(departure)
+            node = self._leg_from[leg]
+        legs.reverse()
+        departures.reverse()
+        route = self._describe(legs, 'earliest_arrival', departures)
+        route['depart_at'] = _clock(start)
+        route['arrive_at'] = _clock(best[target])
+        route['total_minutes'] = round(best[target] - start, 1)
+        return route
+
+    def _walk(self, nodes, best, via):
+        """Relax transfer legs from ``nodes``; returns every station improved."""
+        marked = set(nodes)
+        stack = list(nodes)
+        while stack:
+            node = stack.pop()
+            for leg in self._outgoing(node):
+                if self._leg_transport[leg] != TRANSFER:
+                    continue
+                nxt = self._leg_to[leg]
+                arrival = best[node] + self._leg_minutes[leg]
+                if arrival < best[nxt]:
+                    best[nxt] = arrival
+                    via[nxt] = (leg, best[node])
+                    marked.add(nxt)
+                    stack.append(nxt)
+        return marked
+
+    # ------------------------------------------------------------------
+    # Ranking
+    # ------------------------------------------------------------------
+    def plan_routes(self, origin, destination, budget=None, depart_at=None, weekday=None, limit=3):
+        """
+        Ranked alternatives: the fastest, cheapest and best-balanced paths
+        (plus the timetable-based earliest arrival when ``depart_at`` is given),
+        de-duplicated and filtered by ``budget``.
+        """
+        candidates = []
+        if depart_at is not None:
+            candidates.append(self.earliest_arrival(origin, destination, depart_at, weekday))
+        for objective in OBJECTIVES:
+            candidates.append(self.shortest_path(origin, destination, objective))
+
+        routes, seen = [], set()
+        for route in candidates:
+            if route is None:
+                continue
+            signature = tuple((leg['from'], leg['to'], leg['transport']) for leg in route['legs'])
+            if signature in seen:
+                continue
+            if budget not in (None, '') and route['total_cost'] > float(budget):
+                continue
+            seen.add(signature)
+            routes.append(route)
+
+        routes.sort(key=lambda r: (r['total_minutes'], r['total_cost']))
+        for rank, route in enumerate(routes[:limit], start=1):
+            route['rank'] = rank
+        return routes[:limit]
+
+    def _describe(self, legs, objective, departures=None):
+        steps = []
+        total_minutes = total_cost = 0.0
+        for position, leg in enumerate(legs):
+            index = self._leg_transport[leg]
+            info = self.transports[index] if index != TRANSFER else None
+            minutes = self._leg_minutes[leg] + (0.0 if departures else self._leg_wait[leg])
+            step = {
+                'from': self._names[self._leg_from[leg]],
+                'to': self._names[self._leg_to[leg]],
+                'transport': info['line'] if info else None,
+                'type': info['type'] if info else 'Transfer',
+                'minutes': round(minutes, 1),
+                'cost': self._leg_cost[leg],
+            }
+            if departures:
+                step['departure'] = _clock(departures[position])
+            steps.append(step)
+            total_minutes += minutes
+            total_cost += self._leg_cost[leg]
+        return {
+            'objective': objective,
+            'stations': [steps[0]['from']] + [s['to'] for s in steps] if steps else [],
+            'legs': steps,
+            'total_minutes': round(total_minutes, 1),
+            'total_cost': round(total_cost, 2),
+            'transfers': max(0, sum(1 for s in steps if s['transport']) - 1),
+        }
+
+
+# ----------------------------------------------------------------------
+# LOADING
+# ----------------------------------------------------------------------
+TRANSPORT_TYPES = ('bus', 'metro', 'train', 'tram')
+
+
+def build_route_planner():
+    """Load stations, transports and schedules from Django into a fresh planner."""
+    planner = RoutePlanner()
+    default_headway = _setting('ROUTE_PLANNER_DEFAULT_HEADWAY', DEFAULT_HEADWAY_MINUTES)
+
+    for pk, name in Station.objects.values_list('pk', 'station_name'):
+        planner.add_station(pk, name)
+
+    rows = Transport.objects.filter(
+        departs_from__isnull=False, arrives_at__isnull=False,
+    ).values(
+        'pk', 'transport_line_number', 'transport_speed', 'transport_frequency',
+        'transport_capacity', 'departs_from_id', 'arrives_at_id',
+        'operated_by__company_name', 'operated_by__buscompany__ticket_price',
+        'applies_to__dailyschedule__first_run_time',
+        'applies_to__dailyschedule__last_run_time',
+        'applies_to__dailyschedule__frequency_minutes',
+        'applies_to__dailyschedule__day_of_week_mask',
+        *TRANSPORT_TYPES,
+    )
+    for row in rows:
+        kind = next((t.capitalize() for t in TRANSPORT_TYPES if row[t] is not None), 'Transport')
+        headway = (row['applies_to__dailyschedule__frequency_minutes']
+                   or row['transport_frequency'] or default_headway)
+        fare = row['operated_by__buscompany__ticket_price']
+        planner.add_transport({
+            'id': row['pk'],
+            'line': row['transport_line_number'],
+            'type': kind,
+            'from': row['departs_from_id'],
+            'to': row['arrives_at_id'],
+            'speed': row['transport_speed'],
+            'capacity': row['transport_capacity'],
+            'operator': row['operated_by__company_name'],
+            'headway': float(max(1, headway)),
+            'fare': float(fare if fare is not None else DEFAULT_FARES.get(kind, DEFAULT_FARES['Transport'])),
+            'first_run': _minutes(row['applies_to__dailyschedule__first_run_time']),
+            'last_run': _minutes(row['applies_to__dailyschedule__last_run_time']),
+            'days': row['applies_to__dailyschedule__day_of_week_mask'],
+        })
+
+    through = Station.connected_to.through
+    for a, b in through.objects.values_list('from_station_id', 'to_station_id'):
+        # symmetrical M2M: both directions are already present as rows
+        planner.add_transfer(a, b)
+
+    return planner.freeze()
+
+
+_planner = None
+_planner_lock = threading.Lock()
+
+
+def get_route_planner():
+    """Process-wide planner, rebuilt after invalidation or ROUTE_PLANNER_CACHE_SECONDS."""
+    global _planner
+    ttl = _setting('ROUTE_PLANNER_CACHE_SECONDS', CACHE_SECONDS)
+    planner = _planner
+    if planner is None or time.monotonic() - planner.built_at > ttl:
+        with _planner_lock:
+            if _planner is None or time.monotonic() - _planner.built_at > ttl:
+                _planner = build_route_planner()
+            planner = _planner
+    return planner
+
+
+def invalidate_route_planner():
+    global _planner
+    with _planner_lock:
+        _planner = None
+
+
+def plan_routes(origin, destination, budget=None, depart_at=None, weekday=None, limit=3):
+    return get_route_planner().plan_routes(origin, destination, budget, depart_at, weekday, limit)
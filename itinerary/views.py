@@ -1,4 +1,6 @@
 # itinerary/views.py - FIXED PURE RDF VERSION
+import logging
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect
 from django.http import JsonResponse
 from django.contrib import messages
@@ -6,26 +8,33 @@ from .forms import BusinessTripForm, LeisureTripForm, EducationalTripForm
 from .utils.ontology_manager import (
     create_itinerary, get_itinerary, update_itinerary,
     delete_itinerary, list_itineraries, normalize_itinerary_id,
+    list_itineraries_async,
 )
 from .utils.ai_generator import generate_itinerary_suggestions
+from .utils.route_planner import plan_routes
 from core.utils.fuseki import sparql_query
-from .utils.ai_nl_interface import ai_generate_and_execute
+from core.utils.concurrency import fan_out
+from core.utils.versioning import conditional_page
+from .utils.ai_nl_interface import ai_generate_and_execute, ai_generate_and_execute_async
+
+logger = logging.getLogger(__name__)
 
 
 # ----------------------------------------------------------------------
 # LIST - Pure RDF
 # ----------------------------------------------------------------------
-def itinerary_list(request):
+@conditional_page('itinerary')
+async def itinerary_list(request):
     """List all itineraries from RDF store."""
     filters = request.GET.dict()
 
     # Fetch itineraries from RDF only
-    itineraries = list_itineraries(filters)
+    itineraries = await list_itineraries_async(filters)
 
     # Sort by ID
     itineraries.sort(key=lambda x: x["id"])
 
-    return render(request, "core/itinerary/itinerary_list.html", {
+    return await sync_to_async(render)(request, "core/itinerary/itinerary_list.html", {
         "itineraries": itineraries,
         "filters": filters,
         "has_unsynced": False,
@@ -35,16 +44,8 @@ def itinerary_list(request):
 # ----------------------------------------------------------------------
 # DETAIL - Pure RDF
 # ----------------------------------------------------------------------
-def itinerary_detail(request, id: str):
-    """Display single itinerary details from RDF store."""
-    subject_uri = request.GET.get("s")
-    itinerary = get_itinerary(id, subject_uri=subject_uri)
-
-    if not itinerary:
-        messages.error(request, f"Itinerary {id} not found in RDF store.")
-        return redirect("itinerary:list")
-
-    # Query related transports and schedules
+def _related_resources(id: str):
+    """Transports and schedules linked to an itinerary (best effort)."""
     related = []
     try:
         sparql = f"""
@@ -64,7 +65,26 @@ def itinerary_detail(request, id: str):
                 "sched": b.get("sched", {}).get("value", "N/A").split('#')[-1]
             })
     except Exception as e:
-        print(f"⚠️ Related query error: {e}")
+        logger.warning("Related query error: %s", e)
+    return related
+
+
+@conditional_page('itinerary:{id}')
+def itinerary_detail(request, id: str):
+    """Display single itinerary details from RDF store."""
+    subject_uri = request.GET.get("s")
+
+    # The itinerary and its related resources are independent lookups
+    results = fan_out({
+        "itinerary": lambda: get_itinerary(id, subject_uri=subject_uri),
+        "related": lambda: _related_resources(id),
+    })
+    itinerary = results["itinerary"]
+    related = results["related"]
+
+    if not itinerary:
+        messages.error(request, f"Itinerary {id} not found in RDF store.")
+        return redirect("itinerary:list")
 
     return render(request, "core/itinerary/itinerary_detail.html", {
         "itinerary": itinerary,
@@ -136,7 +156,7 @@ def itinerary_create(request):
             
             except Exception as e:
                 messages.error(request, f"❌ Failed to create itinerary: {str(e)}")
-                print(f"Create error: {e}")
+                logger.warning("Create error: %s", e)
                 import traceback
                 traceback.print_exc()
         else:
@@ -267,7 +287,7 @@ def itinerary_update(request, id: str):
             
             except Exception as e:
                 messages.error(request, f"❌ Failed to update itinerary: {str(e)}")
-                print(f"Update error: {e}")
+                logger.warning("Update error: %s", e)
                 import traceback
                 traceback.print_exc()
         else:
@@ -305,7 +325,7 @@ def itinerary_delete(request, id: str):
             
         except Exception as e:
             messages.error(request, f"❌ Delete error: {str(e)}")
-            print(f"Delete error: {e}")
+            logger.warning("Delete error: %s", e)
             import traceback
             traceback.print_exc()
         
@@ -346,17 +366,41 @@ def itinerary_ai_suggest(request):
     return render(request, "core/itinerary/itinerary_ai_suggest.html")
 
 
+# ----------------------------------------------------------------------
+# ROUTE PLANNER (JSON API)
+# ----------------------------------------------------------------------
+def itinerary_routes(request):
+    """Ranked routes between two stations (?from=&to=&budget=&depart=&weekday=)."""
+    origin = request.GET.get("from", "").strip()
+    destination = request.GET.get("to", "").strip()
+    if not origin or not destination:
+        return JsonResponse({"error": "Parameters 'from' and 'to' are required"}, status=400)
+
+    weekday = request.GET.get("weekday")
+    try:
+        routes = plan_routes(
+            origin, destination,
+            budget=request.GET.get("budget") or None,
+            depart_at=request.GET.get("depart") or None,
+            weekday=int(weekday) if weekday not in (None, "") else None,
+        )
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    return JsonResponse({"from": origin, "to": destination, "routes": routes})
+
+
 # ----------------------------------------------------------------------
 # AI NL QUERY CONSOLE (JSON API)
 # ----------------------------------------------------------------------
-def itinerary_ai_query(request):
+async def itinerary_ai_query(request):
     """NL -> SPARQL endpoint for SELECT/UPDATE, returns JSON."""
     if request.method != "POST":
         return JsonResponse({"error": "POST required"}, status=405)
 
     payload = request.POST.dict()
     nl_text = payload.get("query") or payload.get("q") or ""
-    result = ai_generate_and_execute(nl_text)
+    result = await ai_generate_and_execute_async(nl_text)
 
     status = 200 if "error" not in result else 400
     return JsonResponse(result, status=status)
\ No newline at end of file
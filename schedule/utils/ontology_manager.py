@@ -1,9 +1,17 @@
+import asyncio
+import logging
 import time
 import traceback
 from django.conf import settings
-from core.utils.fuseki import sparql_query, sparql_update
-import requests
-from urllib.parse import urlencode
+from core.utils.fuseki import select, sparql_update, sparql_query_all_graphs_async
+from core.utils.partitions import entity_graph, partitioned
+from core.utils.concurrency import fan_map
+from core.utils.timing import timed
+from core.utils.inference import refreshes_inference, class_values, subclass_filter, inference_graph, touch
+from core.utils.list_cache import ListCache, answered
+from core.utils.versioning import bumps_version
+
+logger = logging.getLogger(__name__)
 
 NS = "http://www.transport-ontology.org/travel#"
 
@@ -18,36 +26,6 @@ except Exception:
     USE_RDFLIB = False
 
 
-def _run_sparql(query, expect_json=True, timeout=10, all_graphs=False):
-    try:
-        FUSEKI_QUERY_URL = f"{settings.FUSEKI_URL}/{settings.FUSEKI_DATASET}/query"
-    except Exception:
-        FUSEKI_QUERY_URL = "http://localhost:3030/transport_db/query"
-
-    if all_graphs:
-        try:
-            headers = {'Accept': 'application/sparql-results+json'}
-            resp = requests.get(FUSEKI_QUERY_URL, params={'query': query, 'unionDefaultGraph': 'true'}, headers=headers, timeout=timeout)
-            resp.raise_for_status()
-            return resp.json()
-        except Exception as e:
-            print(f"_run_sparql (all_graphs) failed: {e}")
-            return {}
-    try:
-        res = sparql_query(query)
-        if isinstance(res, dict) and (res.get('results', {}).get('bindings') or 'boolean' in res):
-            return res
-    except Exception as e:
-        print(f"_run_sparql wrapper failed: {e}")
-    try:
-        headers = {'Accept': 'application/sparql-results+json'}
-        resp = requests.get(FUSEKI_QUERY_URL, params={'query': query, 'unionDefaultGraph': 'true'}, headers=headers, timeout=timeout)
-        resp.raise_for_status()
-        return resp.json()
-    except Exception:
-        return {}
-
-
 def normalize_schedule_id(schedule_id):
     if isinstance(schedule_id, int):
         return f"{schedule_id:03d}"
@@ -70,9 +48,12 @@ def normalize_schedule_id(schedule_id):
         return "000"
 
 
+@bumps_version('schedule')
+@refreshes_inference
 def create_schedule(data):
     if USE_RDFLIB:
-        return _create_schedule_rdflib(data)
+        with timed('sparql', 'rdflib'):
+            return _create_schedule_rdflib(data)
     # SPARQL fallback
     sid = str(data.get('schedule_id', '0')).strip()
     try:
@@ -160,11 +141,12 @@ def create_schedule(data):
       {triples_str}
     }}
     """
-    sparql_update(sparql)
+    sparql_update(sparql, graph=entity_graph('schedule'))
     return full_id
 
 
-def _create_schedule_rdflib(data):
+def schedule_triples(data):
+    """(full_id, triples) of a new schedule; also used by core.utils.bulk_import."""
     sid = str(data.get('schedule_id', '0')).strip()
     try:
         normalized = f"{int(sid):03d}"
@@ -181,62 +163,71 @@ def _create_schedule_rdflib(data):
         prefix = 'S-'
     full_id = f"{prefix}{normalized}"
     subj = URIRef(f"{NS}{full_id}")
-    g = get_graph(); ctx = get_named_graph(g)
+    triples = []
     sch_type = data.get('schedule_type') or ''
     if sch_type == 'Daily':
-        ctx.add((subj, RDF.type, TR.DailySchedule))
+        triples.append((subj, RDF.type, TR.DailySchedule))
     elif sch_type == 'Seasonal':
-        ctx.add((subj, RDF.type, TR.SeasonalSchedule))
+        triples.append((subj, RDF.type, TR.SeasonalSchedule))
     elif sch_type == 'OnDemand':
-        ctx.add((subj, RDF.type, TR.OnDemandSchedule))
+        triples.append((subj, RDF.type, TR.OnDemandSchedule))
     else:
-        ctx.add((subj, RDF.type, TR.Schedule))
-    ctx.add((subj, TR.scheduleID, Literal(full_id)))
+        triples.append((subj, RDF.type, TR.Schedule))
+    triples.append((subj, TR.scheduleID, Literal(full_id)))
     if data.get('route_name'):
-        ctx.add((subj, TR.routeName, Literal(str(data['route_name']))))
+        triples.append((subj, TR.routeName, Literal(str(data['route_name']))))
     if data.get('effective_date'):
-        ctx.add((subj, TR.effectiveDate, Literal(str(data['effective_date']))))
-    ctx.add((subj, TR.isPublic, Literal(bool(data.get('is_public', False)))))
+        triples.append((subj, TR.effectiveDate, Literal(str(data['effective_date']))))
+    triples.append((subj, TR.isPublic, Literal(bool(data.get('is_public', False)))))
     # Type-specific
     if sch_type == 'Daily':
         if data.get('first_run_time'):
-            ctx.add((subj, TR.firstRunTime, Literal(str(data['first_run_time']))))
+            triples.append((subj, TR.firstRunTime, Literal(str(data['first_run_time']))))
         if data.get('last_run_time'):
-            ctx.add((subj, TR.lastRunTime, Literal(str(data['last_run_time']))))
+            triples.append((subj, TR.lastRunTime, Literal(str(data['last_run_time']))))
         if data.get('frequency_minutes') not in (None, ''):
             try:
-                ctx.add((subj, TR.frequencyMinutes, Literal(int(data['frequency_minutes']))))
+                triples.append((subj, TR.frequencyMinutes, Literal(int(data['frequency_minutes']))))
             except Exception:
                 pass
         if data.get('day_of_week_mask'):
-            ctx.add((subj, TR.dayOfWeekMask, Literal(str(data['day_of_week_mask']))))
+            triples.append((subj, TR.dayOfWeekMask, Literal(str(data['day_of_week_mask']))))
     elif sch_type == 'Seasonal':
         if data.get('season'):
-            ctx.add((subj, TR.season, Literal(str(data['season']))))
+            triples.append((subj, TR.season, Literal(str(data['season']))))
         if data.get('start_date'):
-            ctx.add((subj, TR.startDate, Literal(str(data['start_date']))))
+            triples.append((subj, TR.startDate, Literal(str(data['start_date']))))
         if data.get('end_date'):
-            ctx.add((subj, TR.endDate, Literal(str(data['end_date']))))
+            triples.append((subj, TR.endDate, Literal(str(data['end_date']))))
         if data.get('operational_capacity_percentage') not in (None, ''):
             try:
-                ctx.add((subj, TR.operationalCapacityPercentage, Literal(int(data['operational_capacity_percentage']))))
+                triples.append((subj, TR.operationalCapacityPercentage, Literal(int(data['operational_capacity_percentage']))))
             except Exception:
                 pass
     elif sch_type == 'OnDemand':
         if data.get('booking_lead_time_hours') not in (None, ''):
             try:
-                ctx.add((subj, TR.bookingLeadTimeHours, Literal(int(data['booking_lead_time_hours']))))
+                triples.append((subj, TR.bookingLeadTimeHours, Literal(int(data['booking_lead_time_hours']))))
             except Exception:
                 pass
         if data.get('service_window_start'):
-            ctx.add((subj, TR.serviceWindowStart, Literal(str(data['service_window_start']))))
+            triples.append((subj, TR.serviceWindowStart, Literal(str(data['service_window_start']))))
         if data.get('service_window_end'):
-            ctx.add((subj, TR.serviceWindowEnd, Literal(str(data['service_window_end']))))
+            triples.append((subj, TR.serviceWindowEnd, Literal(str(data['service_window_end']))))
         if data.get('max_wait_time_minutes') not in (None, ''):
             try:
-                ctx.add((subj, TR.maxWaitTimeMinutes, Literal(int(data['max_wait_time_minutes']))))
+                triples.append((subj, TR.maxWaitTimeMinutes, Literal(int(data['max_wait_time_minutes']))))
             except Exception:
                 pass
+    return full_id, triples
+
+
+def _create_schedule_rdflib(data):
+    full_id, triples = schedule_triples(data)
+    g = get_graph(); ctx = get_named_graph(g, 'schedule')
+    for triple in triples:
+        ctx.add(triple)
+    touch(*{s for s, _, _ in triples})  # the rdflib store bypasses the shared session
     return full_id
 
 
@@ -252,8 +243,11 @@ def get_schedule(sid, subject_uri=None):
         PREFIX : <{NS}>
         SELECT ?p ?o WHERE {{ {node} ?p ?o }}
         """
-        res = _run_sparql(q)
-        bindings = res.get('results', {}).get('bindings', []) if isinstance(res, dict) else []
+        try:
+            bindings = select(q).get('results', {}).get('bindings', [])
+        except Exception as e:
+            logger.warning("Schedule lookup failed for %s: %s", node, e)
+            continue
         if bindings:
             data = {}
             for b in bindings:
@@ -265,6 +259,8 @@ def get_schedule(sid, subject_uri=None):
     return None
 
 
+@bumps_version('schedule', 0)
+@refreshes_inference
 def update_schedule(sid, new_data, subject_uri=None):
     existing = get_schedule(sid, subject_uri)
     if not existing:
@@ -274,12 +270,14 @@ def update_schedule(sid, new_data, subject_uri=None):
     if subject_uri:
         nodes.insert(0, f"<{subject_uri}>")
     for n in nodes:
-        sparql_update(f"PREFIX : <{NS}> DELETE WHERE {{ {n} ?p ?o }}")
-        sparql_update(f"PREFIX : <{NS}> DELETE WHERE {{ ?s ?p {n} }}")
+        sparql_update(f"PREFIX : <{NS}> DELETE WHERE {{ {n} ?p ?o }}", graph=entity_graph('schedule'))
+        sparql_update(f"PREFIX : <{NS}> DELETE WHERE {{ ?s ?p {n} }}", graph=entity_graph('schedule'))
     new_data['schedule_id'] = full_id.split('-')[-1]
     return create_schedule(new_data)
 
 
+@bumps_version('schedule', 0)
+@refreshes_inference
 def delete_schedule(sid, subject_uri=None):
     existing = get_schedule(sid, subject_uri)
     # Accept new prefixed IDs (S-D-xxx etc.) as well as legacy SCH-xxx
@@ -294,7 +292,7 @@ def delete_schedule(sid, subject_uri=None):
     if subject_uri:
         nodes.insert(0, f"<{subject_uri}>")
     ok = True
-    graph_uri = getattr(settings, 'FUSEKI_GRAPH', None)
+    graph_uri = entity_graph('schedule') if getattr(settings, 'FUSEKI_GRAPH', None) else None
     for n in nodes:
         try:
             sparql_update(f"PREFIX : <{NS}> DELETE WHERE {{ {n} ?p ?o }}")
@@ -311,92 +309,113 @@ def delete_schedule(sid, subject_uri=None):
     return ok
 
 
-def list_schedules(filters=None):
-    filters = filters or {}
-    all_bindings = []
-    seen_subjects = set()
+def _schedule_list_queries():
+    """Queries behind list_schedules(): union default graph, named graph, GRAPH ?g."""
+    # Superclass types are materialized in the inference graph (core.utils.inference)
+    schedule_classes = class_values('?cls', 'Schedule')
+    type_filter = subclass_filter('?type', 'Schedule')
+    queries = []
 
     # Query 1: search without GRAPH restriction (union default graph)
-    q1 = f"""
+    queries.append(f"""
     PREFIX : <{NS}>
-    PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
     SELECT DISTINCT ?s ?id ?type ?route ?date ?pub WHERE {{
-      {{ ?s rdf:type/rdfs:subClassOf* :Schedule . OPTIONAL {{ ?s :scheduleID ?id }} }}
+      {{ ?s a :Schedule . OPTIONAL {{ ?s :scheduleID ?id }} }}
       UNION
-      {{ ?s :scheduleID ?id . OPTIONAL {{ ?s rdf:type/rdfs:subClassOf* :Schedule }} }}
-      OPTIONAL {{ ?s rdf:type ?type }}
+      {{ ?s :scheduleID ?id . }}
+      OPTIONAL {{ ?s a ?type . {type_filter} }}
       OPTIONAL {{ ?s :routeName ?route }}
       OPTIONAL {{ ?s :effectiveDate ?date }}
       OPTIONAL {{ ?s :isPublic ?pub }}
     }}
     ORDER BY ?id
     LIMIT 500
-    """
-    r1 = _run_sparql(q1, all_graphs=True)
-    b1 = r1.get('results', {}).get('bindings', []) if isinstance(r1, dict) else []
-    for b in b1:
-        s_uri = b.get('s', {}).get('value', '') if isinstance(b.get('s'), dict) else ''
-        if s_uri and s_uri not in seen_subjects:
-            all_bindings.append(b); seen_subjects.add(s_uri)
+    """)
+    # Partitioned, Query 1 already covers the schedule graph and FUSEKI_GRAPH
+    if partitioned():
+        return queries
 
     # Query 2: explicit named graph if configured
-    try:
-        graph_uri = getattr(settings, 'FUSEKI_GRAPH', None)
-        if graph_uri:
-            q2 = f"""
-            PREFIX : <{NS}>
-            PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-            PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-            SELECT DISTINCT ?s ?id ?type ?route ?date ?pub WHERE {{
-              GRAPH <{graph_uri}> {{
-                {{ ?s rdf:type/rdfs:subClassOf* :Schedule . OPTIONAL {{ ?s :scheduleID ?id }} }}
-                UNION
-                {{ ?s :scheduleID ?id . OPTIONAL {{ ?s rdf:type/rdfs:subClassOf* :Schedule }} }}
-                OPTIONAL {{ ?s rdf:type ?type }}
-                OPTIONAL {{ ?s :routeName ?route }}
-                OPTIONAL {{ ?s :effectiveDate ?date }}
-                OPTIONAL {{ ?s :isPublic ?pub }}
-              }}
-            }}
-            ORDER BY ?id
-            LIMIT 500
-            """
-            r2 = _run_sparql(q2, all_graphs=True)
-            b2 = r2.get('results', {}).get('bindings', []) if isinstance(r2, dict) else []
-            for b in b2:
-                s_uri = b.get('s', {}).get('value', '') if isinstance(b.get('s'), dict) else ''
-                if s_uri and s_uri not in seen_subjects:
-                    all_bindings.append(b); seen_subjects.add(s_uri)
-    except Exception:
-        pass
-
-    # Query 3: scan across all named graphs
-    q3 = f"""
+    graph_uri = getattr(settings, 'FUSEKI_GRAPH', None)
+    if graph_uri:
+        queries.append(f"""
+        PREFIX : <{NS}>
+        SELECT DISTINCT ?s ?id ?type ?route ?date ?pub WHERE {{
+          GRAPH <{graph_uri}> {{
+            {{ {schedule_classes} ?s a ?cls . OPTIONAL {{ ?s :scheduleID ?id }} }}
+            UNION
+            {{ ?s :scheduleID ?id . }}
+            OPTIONAL {{ ?s a ?type . {type_filter} }}
+            OPTIONAL {{ ?s :routeName ?route }}
+            OPTIONAL {{ ?s :effectiveDate ?date }}
+            OPTIONAL {{ ?s :isPublic ?pub }}
+          }}
+        }}
+        ORDER BY ?id
+        LIMIT 500
+        """)
+
+    # Query 3: scan across all named graphs (inference graph excluded)
+    queries.append(f"""
     PREFIX : <{NS}>
-    PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
     SELECT DISTINCT ?g ?s ?id ?type ?route ?date ?pub WHERE {{
       GRAPH ?g {{
-        {{ ?s rdf:type/rdfs:subClassOf* :Schedule . OPTIONAL {{ ?s :scheduleID ?id }} }}
+        {{ {schedule_classes} ?s a ?cls . OPTIONAL {{ ?s :scheduleID ?id }} }}
         UNION
-        {{ ?s :scheduleID ?id . OPTIONAL {{ ?s rdf:type/rdfs:subClassOf* :Schedule }} }}
-        OPTIONAL {{ ?s rdf:type ?type }}
+        {{ ?s :scheduleID ?id . }}
+        OPTIONAL {{ ?s a ?type . {type_filter} }}
         OPTIONAL {{ ?s :routeName ?route }}
         OPTIONAL {{ ?s :effectiveDate ?date }}
         OPTIONAL {{ ?s :isPublic ?pub }}
       }}
+      FILTER(?g != <{inference_graph()}>)
     }}
     ORDER BY ?id
     LIMIT 500
-    """
-    r3 = _run_sparql(q3, all_graphs=True)
-    b3 = r3.get('results', {}).get('bindings', []) if isinstance(r3, dict) else []
-    for b in b3:
-        s_uri = b.get('s', {}).get('value', '') if isinstance(b.get('s'), dict) else ''
-        if s_uri and s_uri not in seen_subjects:
-            all_bindings.append(b); seen_subjects.add(s_uri)
+    """)
+
+    return queries
+
+
+def _merge_schedule_bindings(results):
+    all_bindings = []
+    seen_subjects = set()
+    for res in results:
+        bn = res.get('results', {}).get('bindings', []) if isinstance(res, dict) else []
+        for b in bn:
+            s_uri = b.get('s', {}).get('value', '') if isinstance(b.get('s'), dict) else ''
+            if s_uri and s_uri not in seen_subjects:
+                all_bindings.append(b); seen_subjects.add(s_uri)
+    return all_bindings
+
 
+def _schedule_results():
+    # The three queries are independent: dispatch them in parallel, merge in order
+    return fan_map(lambda q: select(q, union=True, entity='schedule'), _schedule_list_queries(), return_exceptions=True)
+
+
+async def _schedule_results_async():
+    return await asyncio.gather(
+        *(sparql_query_all_graphs_async(q, entity='schedule') for q in _schedule_list_queries()),
+        return_exceptions=True,
+    )
+
+
+SCHEDULE_LIST = ListCache('schedule', 'schedule', load=_schedule_results, aload=_schedule_results_async,
+                          complete=answered)
+
+
+def list_schedules(filters=None):
+    return _schedule_rows(_merge_schedule_bindings(SCHEDULE_LIST.get()), filters)
+
+
+async def list_schedules_async(filters=None):
+    """Async list_schedules() for ASGI views."""
+    return _schedule_rows(_merge_schedule_bindings(await SCHEDULE_LIST.aget()), filters)
+
+
+def _schedule_rows(all_bindings, filters=None):
+    filters = filters or {}
     rows = []
     seen_ids = set()
     for b in all_bindings:
@@ -1,3 +1,4 @@
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect
 from django.http import JsonResponse
 from django.contrib import messages
@@ -5,21 +6,25 @@ from .forms import (
     ScheduleForm, DailyScheduleForm, SeasonalScheduleForm, OnDemandScheduleForm
 )
 from .utils.ontology_manager import (
-    list_schedules, get_schedule, create_schedule, update_schedule, delete_schedule
+    list_schedules, get_schedule, create_schedule, update_schedule, delete_schedule,
+    list_schedules_async,
 )
-from .utils.ai_nl_interface import ai_generate_and_execute
+from .utils.ai_nl_interface import ai_generate_and_execute, ai_generate_and_execute_async
+from core.utils.versioning import conditional_page
 
 
-def schedule_list(request):
+@conditional_page('schedule')
+async def schedule_list(request):
     filters = request.GET.dict()
-    rows = list_schedules(filters)
+    rows = await list_schedules_async(filters)
     rows.sort(key=lambda x: x['id'])
-    return render(request, 'core/schedule/schedule_list.html', {
+    return await sync_to_async(render)(request, 'core/schedule/schedule_list.html', {
         'schedules': rows,
         'filters': filters,
     })
 
 
+@conditional_page('schedule:{id}')
 def schedule_detail(request, id: str):
     subject_uri = request.GET.get('s')
     sched = get_schedule(id, subject_uri=subject_uri)
@@ -228,12 +233,12 @@ def schedule_delete(request, id: str):
     })
 
 
-def schedule_ai_query(request):
+async def schedule_ai_query(request):
     if request.method != 'POST':
         return JsonResponse({"error": "POST required"}, status=405)
     payload = request.POST.dict()
     q = payload.get('query') or payload.get('q') or ''
-    res = ai_generate_and_execute(q)
+    res = await ai_generate_and_execute_async(q)
     return JsonResponse(res, status=200 if 'error' not in res else 400)
 
 
@@ -5,14 +5,8 @@ from .models import (
     Ticket, TicketSimple, TicketSenior, TicketÉtudiant,
     AbonnementHebdomadaire, AbonnementMensuel
 )
-from transport_app.models import Person, Transport, Bus, Metro, Train, Tram
-
-# Import pour les requêtes ontologie
-try:
-    from core.utils.fuseki import sparql_query
-    ONTOLOGY_AVAILABLE = True
-except ImportError:
-    ONTOLOGY_AVAILABLE = False
+from transport_app.models import Person, Transport
+from transport_app.services.choices import form_choices
 
 
 class TicketForm(forms.ModelForm):
@@ -147,89 +141,13 @@ class TicketForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
+        choices = form_choices('persons', 'ticket_transports')
+
         # === PERSONNES ===
-        person_choices = [('', '— Choisir une personne —')]
-        for person in Person.objects.all():
-            person_choices.append((str(person.pk), f"{person.has_name} ({person.has_id})"))
-        person_choices.sort(key=lambda x: x[1])
-        self.fields['owned_by'].choices = person_choices
+        self.fields['owned_by'].choices = [('', '— Choisir une personne —'), *choices['persons']]
 
-        # === TRANSPORTS - Depuis l'ontologie ===
-        transport_choices = [('', '— Choisir un transport —')]
-        
-        # Essayer d'abord depuis l'ontologie
-        if ONTOLOGY_AVAILABLE:
-            try:
-                sparql = """
-                PREFIX : <http://www.transport-ontology.org/travel#>
-                PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-                
-                SELECT ?transport ?line ?type
-                WHERE {
-                    ?transport a/rdfs:subClassOf* :Transport ;
-                            :Transport_hasLineNumber ?line .
-                    BIND(
-                        IF(EXISTS { ?transport a :Bus }, "Bus",
-                        IF(EXISTS { ?transport a :Metro }, "Metro",
-                        IF(EXISTS { ?transport a :Train }, "Train",
-                        IF(EXISTS { ?transport a :Tram }, "Tram", "Transport")))))
-                        AS ?type)
-                }
-                ORDER BY ?line
-                LIMIT 100
-                """
-                result = sparql_query(sparql)
-                bindings = result.get('results', {}).get('bindings', [])
-                
-                # Créer un mapping URI -> Transport Django
-                uri_to_transport = {}
-                for binding in bindings:
-                    transport_uri = binding.get('transport', {}).get('value', '')
-                    line = binding.get('line', {}).get('value', '')
-                    transport_type = binding.get('type', {}).get('value', 'Transport')
-                    
-                    if transport_uri and line:
-                        # Extraire le nom du transport depuis l'URI (ex: Bus_23)
-                        transport_name = transport_uri.split('#')[-1] if '#' in transport_uri else transport_uri.split('/')[-1]
-                        
-                        # Chercher dans la base de données Django par numéro de ligne
-                        try:
-                            if transport_type == 'Bus':
-                                transport = Bus.objects.filter(transport_line_number=line).first()
-                            elif transport_type == 'Metro':
-                                transport = Metro.objects.filter(transport_line_number=line).first()
-                            elif transport_type == 'Train':
-                                transport = Train.objects.filter(transport_line_number=line).first()
-                            elif transport_type == 'Tram':
-                                transport = Tram.objects.filter(transport_line_number=line).first()
-                            else:
-                                # Fallback: chercher dans toutes les sous-classes
-                                transport = None
-                                for model in [Bus, Metro, Train, Tram]:
-                                    transport = model.objects.filter(transport_line_number=line).first()
-                                    if transport:
-                                        break
-                            
-                            if transport:
-                                transport_choices.append((str(transport.pk), f"{line} ({transport_type})"))
-                        except Exception:
-                            # Si on ne trouve pas dans Django, on utilise l'URI comme identifiant temporaire
-                            transport_choices.append((transport_name, f"{line} ({transport_type})"))
-                
-            except Exception as e:
-                print(f"[WARNING] Erreur lors de la récupération des transports depuis l'ontologie: {e}")
-                # Fallback sur la base de données Django
-                for model in [Bus, Metro, Train, Tram]:
-                    for transport in model.objects.all():
-                        transport_choices.append((str(transport.pk), f"{transport.transport_line_number} ({transport.get_type()})"))
-        else:
-            # Fallback sur la base de données Django si l'ontologie n'est pas disponible
-            for model in [Bus, Metro, Train, Tram]:
-                for transport in model.objects.all():
-                    transport_choices.append((str(transport.pk), f"{transport.transport_line_number} ({transport.get_type()})"))
-        
-        transport_choices.sort(key=lambda x: x[1])
-        self.fields['valid_for'].choices = transport_choices
+        # === TRANSPORTS - Depuis l'ontologie (repli sur Django si Fuseki est injoignable) ===
+        self.fields['valid_for'].choices = [('', '— Choisir un transport —'), *choices['ticket_transports']]
 
         # Si on modifie une instance existante
         if self.instance and self.instance.pk:
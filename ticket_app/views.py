@@ -1,3 +1,4 @@
+import logging
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.core.exceptions import ValidationError
@@ -9,6 +10,10 @@ from .models import (
 )
 from .forms import TicketForm
 from .utils.ai_nl_interface import ai_generate_and_execute
+from core.utils.list_cache import ListCache
+from core.utils.versioning import ORM, conditional_page
+
+logger = logging.getLogger(__name__)
 
 # Import des services ontologie
 try:
@@ -16,17 +21,21 @@ try:
     from core.utils.fuseki import sparql_query
     ONTOLOGY_AVAILABLE = True
 except ImportError as e:
-    print(f"Ontology services not available: {e}")
+    logger.warning("Ontology services not available: %s", e)
     ONTOLOGY_AVAILABLE = False
 
+# Ontology part of the list page, until a Django or graph write
+ONTOLOGY_TICKETS = ListCache('ontology_tickets', ORM)
+
 
 # ==================== TICKETS ====================
 
+@conditional_page(ORM)
 def list_tickets(request):
     """List all tickets grouped by type"""
     tickets = []
     for subclass in Ticket.__subclasses__():
-        qs = subclass.objects.all().order_by('-id')  # Plus récent en premier
+        qs = subclass.objects.select_related('owned_by', 'valid_for').order_by('-id')  # Plus récent en premier
         for obj in qs:
             obj.ticket_type = subclass.__name__
             tickets.append(obj)
@@ -47,13 +56,12 @@ def list_tickets(request):
             SELECT DISTINCT ?ticket ?id ?price ?purchaseDate ?type ?validityDuration ?ownerName ?validForLine
             WHERE {
                 {
-                    ?ticket a/rdfs:subClassOf* :Ticket .
+                    ?ticket a :Ticket .
                     OPTIONAL { ?ticket :hasTicketID ?id }
                 }
                 UNION
                 {
                     ?ticket :hasTicketID ?id .
-                    OPTIONAL { ?ticket a/rdfs:subClassOf* :Ticket }
                 }
                 OPTIONAL { ?ticket :hasPrice ?price }
                 OPTIONAL { ?ticket :hasPurchaseDate ?purchaseDate }
@@ -77,13 +85,13 @@ def list_tickets(request):
             ORDER BY ?id
             LIMIT 100
             """
-            result = sparql_query(sparql)
+            result = ONTOLOGY_TICKETS.get(lambda: sparql_query(sparql))
             ontology_tickets = result.get('results', {}).get('bindings', [])
-            print(f"[DEBUG] Tickets de l'ontologie: {len(ontology_tickets)} trouvés")
+            logger.debug("Tickets de l'ontologie: %s trouvés", len(ontology_tickets))
             if ontology_tickets:
-                print(f"[DEBUG] Premier ticket: {ontology_tickets[0]}")
+                logger.debug("Premier ticket: %s", ontology_tickets[0])
         except Exception as e:
-            print(f"[ERROR] Erreur lors de la récupération des tickets de l'ontologie: {e}")
+            logger.error("Erreur lors de la récupération des tickets de l'ontologie: %s", e)
             import traceback
             traceback.print_exc()
             messages.warning(request, f"Impossible de charger les données de l'ontologie: {e}")
@@ -13,4 +13,15 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'transport.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Async views share one pooled Fuseki client per worker loop, closed on
+# lifespan shutdown (core.utils.fuseki.with_async_pool)
+from core.utils.fuseki import with_async_pool  # noqa: E402
+
+application = with_async_pool(django_application)
+
+# Fuseki pool, indexes and list caches before the first request (WARMUP_ON_STARTUP)
+from core.utils.warmup import warm_up_on_startup  # noqa: E402
+
+warm_up_on_startup()
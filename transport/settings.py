@@ -51,6 +51,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.TimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -137,6 +138,109 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 FUSEKI_URL = os.getenv('FUSEKI_URL', 'http://localhost:3030')
 FUSEKI_DATASET = os.getenv('FUSEKI_DATASET', 'transport_db')
 FUSEKI_GRAPH = os.getenv('FUSEKI_GRAPH', 'http://www.transport-ontology.org/travel')
+# Graph holding the materialized superclass rdf:type triples (see core/utils/inference.py)
+FUSEKI_INFERENCE_GRAPH = os.getenv('FUSEKI_INFERENCE_GRAPH', f'{FUSEKI_GRAPH}/inferred')
+FUSEKI_MATERIALIZE_INFERENCE = os.getenv('FUSEKI_MATERIALIZE_INFERENCE', 'true').lower() == 'true'
+# Bookkeeping graphs (<meta>/ontology, <meta>/sync): digests of the last ontology load
+# and Django sync, so that bootstrap only writes what changed (see core/utils/rdf_loader.py)
+FUSEKI_META_GRAPH = os.getenv('FUSEKI_META_GRAPH', f'{FUSEKI_GRAPH}/meta')
+# Classes, properties and restrictions of the ontology TTL, kept apart from the
+# instances and replaced only when the file changes (see core/utils/schema.py)
+FUSEKI_SCHEMA_GRAPH = os.getenv('FUSEKI_SCHEMA_GRAPH', f'{FUSEKI_GRAPH}/schema')
+# One named graph per entity type (<FUSEKI_GRAPH>/itineraries, /cities, /network, ...):
+# writes go to the entity's graph and list reads are scoped to it (see
+# core/utils/partitions.py). Move existing data first with `manage.py repartition_graphs`.
+FUSEKI_PARTITION_GRAPHS = os.getenv('FUSEKI_PARTITION_GRAPHS', 'false').lower() == 'true'
+
+# Fuseki circuit breaker (core/utils/circuit.py): opens when FAILURE_RATE of
+# at least MIN_CALLS calls over the last WINDOW seconds failed, refuses calls
+# for COOLDOWN seconds, then lets one probe through. Timeouts are per call
+# class (read: /query, write: /update, bulk: /data, imports and exports).
+FUSEKI_BREAKER = os.getenv('FUSEKI_BREAKER', 'true').lower() == 'true'
+FUSEKI_BREAKER_WINDOW = int(os.getenv('FUSEKI_BREAKER_WINDOW', '30'))
+FUSEKI_BREAKER_MIN_CALLS = int(os.getenv('FUSEKI_BREAKER_MIN_CALLS', '5'))
+FUSEKI_BREAKER_FAILURE_RATE = float(os.getenv('FUSEKI_BREAKER_FAILURE_RATE', '0.5'))
+FUSEKI_BREAKER_COOLDOWN = int(os.getenv('FUSEKI_BREAKER_COOLDOWN', '15'))
+# Reads (core.utils.fuseki.select): failed connections and gateway errors are
+# retried with jittered exponential backoff (a read timeout is not: the query
+# already held the worker for the whole timeout); lookups that do not
+# pick a scope query the union of all graphs unless FUSEKI_UNION_DEFAULT_GRAPH
+# is false (then FUSEKI_GRAPH and its inferred types only).
+FUSEKI_UNION_DEFAULT_GRAPH = os.getenv('FUSEKI_UNION_DEFAULT_GRAPH', 'true').lower() == 'true'
+FUSEKI_READ_RETRIES = int(os.getenv('FUSEKI_READ_RETRIES', '2'))
+FUSEKI_RETRY_BACKOFF = float(os.getenv('FUSEKI_RETRY_BACKOFF', '0.2'))
+FUSEKI_TIMEOUTS = {
+    'read': int(os.getenv('FUSEKI_READ_TIMEOUT', '15')),
+    'write': int(os.getenv('FUSEKI_WRITE_TIMEOUT', '30')),
+    'bulk': int(os.getenv('FUSEKI_BULK_TIMEOUT', '300')),
+}
+
+# Logging: per-module loggers (logging.getLogger(__name__)) under the root logger.
+# WARNING by default so that hot-path debug traces cost a single level check;
+# set LOG_LEVEL=DEBUG to trace SPARQL traffic, and LOG_SAMPLE_RATE=N to keep
+# only one debug/info record in N (see core/utils/log.py).
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'WARNING').upper()
+LOG_SAMPLE_RATE = int(os.getenv('LOG_SAMPLE_RATE', '1'))
+
+# Per-request SPARQL/LLM timing (core/middleware.py): always sent as a
+# Server-Timing header; the HTML panel shows on every page when TIMING_PANEL
+# is set, or with ?timing=1 while DEBUG is on.
+TIMING_PANEL = os.getenv('TIMING_PANEL', 'false').lower() == 'true'
+
+# ETag/Last-Modified and 304s on list/detail pages from the write paths' version
+# stamps (core/utils/versioning.py); disable when Fuseki is also written to
+# from outside the application
+CONDITIONAL_GET = os.getenv('CONDITIONAL_GET', 'true').lower() == 'true'
+
+# Identical concurrent SPARQL reads share one request (core/utils/singleflight.py).
+# SPARQL_SINGLEFLIGHT_CACHE names a CACHES alias shared by the workers (Redis,
+# Memcached, database) to coalesce across processes as well; unset, per process.
+SPARQL_SINGLEFLIGHT = os.getenv('SPARQL_SINGLEFLIGHT', 'true').lower() == 'true'
+SPARQL_SINGLEFLIGHT_CACHE = os.getenv('SPARQL_SINGLEFLIGHT_CACHE') or None
+
+# Ontology list caches (core/utils/list_cache.py) are reloaded at once after
+# any write; writes made outside the application are caught by age: after
+# LIST_CACHE_TTL seconds the list is served stale while reloaded in the
+# background, after LIST_CACHE_MAX_STALE it is reloaded before answering.
+# LIST_CACHE_TTL=0 keeps lists until the next write.
+LIST_CACHE_TTL = int(os.getenv('LIST_CACHE_TTL', '60'))
+LIST_CACHE_MAX_STALE = int(os.getenv('LIST_CACHE_MAX_STALE', '600'))
+
+# Run the warm-up stage (core/utils/warmup.py: Fuseki pool, indexes, list
+# caches, templates) when the WSGI/ASGI application is loaded; with a
+# preloading server it runs once before the workers fork
+WARMUP_ON_STARTUP = os.getenv('WARMUP_ON_STARTUP', 'false').lower() == 'true'
+
+# Seconds between background per-graph triple counts exported on /metrics (0 disables)
+METRICS_TRIPLE_COUNT_INTERVAL = int(os.getenv('METRICS_TRIPLE_COUNT_INTERVAL', '60'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'filters': {
+        'sampling': {
+            '()': 'core.utils.log.SamplingFilter',
+            'rate': LOG_SAMPLE_RATE,
+            'max_level': 'INFO',
+        },
+    },
+    'formatters': {
+        'simple': {
+            'format': '[%(levelname)s] %(name)s: %(message)s',
+        },
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'simple',
+            'filters': ['sampling'],
+        },
+    },
+    'root': {
+        'handlers': ['console'],
+        'level': LOG_LEVEL,
+    },
+}
 
 # Ajoutez ceci pour debug
 # print(f"Configuration Fuseki:")
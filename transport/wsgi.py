@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'transport.settings')
 
 application = get_wsgi_application()
+
+# Fuseki pool, indexes and list caches before the first request (WARMUP_ON_STARTUP)
+from core.utils.warmup import warm_up_on_startup  # noqa: E402
+
+warm_up_on_startup()
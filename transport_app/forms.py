@@ -1,4 +1,5 @@
 # transport_app/forms.py
+import logging
 from django import forms
 from django.core.exceptions import ValidationError
 from .models import (
@@ -7,6 +8,9 @@ from .models import (
     BusCompany, MetroCompany,
     Station, Company, Person, Conducteur, Contrôleur, EmployéAgence, Passager
 )
+from .services.choices import form_choices
+
+logger = logging.getLogger(__name__)
 
 
 class StationForm(forms.ModelForm):
@@ -81,22 +85,15 @@ class TransportForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
+        choices = form_choices('stations', 'companies')
+
         # === STATIONS ===
-        station_choices = [('', '— Choisir une station —')]
-        for model in [BusStop, MetroStation, TrainStation, TramStation]:
-            for obj in model.objects.all():
-                station_choices.append((str(obj.pk), f"{obj.get_type()} — {obj.station_name}"))
-        station_choices.sort(key=lambda x: x[1])
+        station_choices = [('', '— Choisir une station —'), *choices['stations']]
         self.fields['departs_from'].choices = station_choices
         self.fields['arrives_at'].choices = station_choices
 
         # === COMPAGNIES ===
-        company_choices = [('', '— Choisir une compagnie —')]
-        for model in [BusCompany, MetroCompany]:
-            for obj in model.objects.all():
-                company_choices.append((str(obj.pk), f"{obj.get_type()} — {obj.company_name}"))
-        company_choices.sort(key=lambda x: x[1])
-        self.fields['operated_by'].choices = company_choices
+        self.fields['operated_by'].choices = [('', '— Choisir une compagnie —'), *choices['companies']]
 
         # Pré-remplissage
         if self.instance and self.instance.pk:
@@ -356,7 +353,7 @@ class PersonForm(forms.ModelForm):
         has_id = str(has_id_raw).strip() if has_id_raw else ''
         has_name = str(has_name_raw).strip() if has_name_raw else ''
         
-        print(f"[DEBUG] full_clean() AFTER super() - forcing values - has_id: {repr(has_id)}, has_name: {repr(has_name)}")
+        logger.debug("full_clean() AFTER super() - forcing values - has_id: %s, has_name: %s", repr(has_id), repr(has_name))
         
         # FORCER les valeurs dans cleaned_data
         if has_id:
@@ -364,7 +361,7 @@ class PersonForm(forms.ModelForm):
             # Supprimer l'erreur si elle existe
             if 'has_id' in self.errors:
                 del self.errors['has_id']
-                print(f"[DEBUG] full_clean() removed has_id error")
+                logger.debug("full_clean() removed has_id error")
         elif not has_id and self.data:  # Seulement si c'est une soumission de formulaire
             # Ne pas ajouter d'erreur pour les requêtes GET
             if 'has_id' not in self.cleaned_data:
@@ -375,32 +372,26 @@ class PersonForm(forms.ModelForm):
             # Supprimer l'erreur si elle existe
             if 'has_name' in self.errors:
                 del self.errors['has_name']
-                print(f"[DEBUG] full_clean() removed has_name error")
+                logger.debug("full_clean() removed has_name error")
         elif not has_name and self.data:  # Seulement si c'est une soumission de formulaire
             # Ne pas ajouter d'erreur pour les requêtes GET
             if 'has_name' not in self.cleaned_data:
                 self.cleaned_data['has_name'] = ''
         
-        print(f"[DEBUG] full_clean() FINAL - has_id in cleaned_data: {'has_id' in self.cleaned_data}, value: {repr(self.cleaned_data.get('has_id'))}")
-        print(f"[DEBUG] full_clean() FINAL - has_name in cleaned_data: {'has_name' in self.cleaned_data}, value: {repr(self.cleaned_data.get('has_name'))}")
-        print(f"[DEBUG] full_clean() FINAL - errors: {list(self.errors.keys())}")
+        logger.debug("full_clean() FINAL - has_id in cleaned_data: %s, value: %s", 'has_id' in self.cleaned_data, repr(self.cleaned_data.get('has_id')))
+        logger.debug("full_clean() FINAL - has_name in cleaned_data: %s, value: %s", 'has_name' in self.cleaned_data, repr(self.cleaned_data.get('has_name')))
+        logger.debug("full_clean() FINAL - errors: %s", list(self.errors.keys()))
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
+        choices = form_choices('companies', 'schedules')
+
         # === COMPAGNIES ===
-        company_choices = [('', '— Choisir une compagnie —')]
-        for model in [BusCompany, MetroCompany]:
-            for obj in model.objects.all():
-                company_choices.append((str(obj.pk), f"{obj.__class__.__name__} — {obj.company_name}"))
-        company_choices.sort(key=lambda x: x[1])
-        self.fields['works_for'].choices = company_choices
+        self.fields['works_for'].choices = [('', '— Choisir une compagnie —'), *choices['companies']]
 
         # === SCHEDULES ===
-        schedule_choices = [('', '— Choisir un horaire —')]
-        for schedule in Schedule.objects.all():
-            schedule_choices.append((str(schedule.pk), f"{schedule.schedule_id} - {schedule.route_name or 'No Route'}"))
-        self.fields['has_schedule'].choices = schedule_choices
+        self.fields['has_schedule'].choices = [('', '— Choisir un horaire —'), *choices['schedules']]
 
         # Si on modifie une instance existante
         if self.instance and self.instance.pk:
@@ -476,7 +467,7 @@ class PersonForm(forms.ModelForm):
         else:
             value = ''
         
-        print(f"[DEBUG] clean_has_id() CALLED, value from data: {repr(self.data.get('has_id'))}, final: {repr(value)}")
+        logger.debug("clean_has_id() CALLED, value from data: %s, final: %s", repr(self.data.get('has_id')), repr(value))
         
         if not value:
             raise ValidationError("Ce champ ne peut pas être vide.")
@@ -498,7 +489,7 @@ class PersonForm(forms.ModelForm):
         else:
             value = ''
         
-        print(f"[DEBUG] clean_has_name() CALLED, value from data: {repr(self.data.get('has_name'))}, final: {repr(value)}")
+        logger.debug("clean_has_name() CALLED, value from data: %s, final: %s", repr(self.data.get('has_name')), repr(value))
         
         if not value:
             raise ValidationError("Ce champ ne peut pas être vide.")
@@ -510,9 +501,9 @@ class PersonForm(forms.ModelForm):
         cleaned_data = super().clean()
         
         # Debug final
-        print(f"[DEBUG] clean() called, cleaned_data keys: {list(cleaned_data.keys())}")
-        print(f"[DEBUG] has_id in cleaned_data: {'has_id' in cleaned_data}, value: {repr(cleaned_data.get('has_id'))}")
-        print(f"[DEBUG] has_name in cleaned_data: {'has_name' in cleaned_data}, value: {repr(cleaned_data.get('has_name'))}")
+        logger.debug("clean() called, cleaned_data keys: %s", list(cleaned_data.keys()))
+        logger.debug("has_id in cleaned_data: %s, value: %s", 'has_id' in cleaned_data, repr(cleaned_data.get('has_id')))
+        logger.debug("has_name in cleaned_data: %s, value: %s", 'has_name' in cleaned_data, repr(cleaned_data.get('has_name')))
         
         # FORCER les valeurs dans cleaned_data et supprimer les erreurs
         # Récupérer depuis self.data (toujours disponible)
@@ -529,7 +520,7 @@ class PersonForm(forms.ModelForm):
         has_id = str(has_id_raw).strip() if has_id_raw else ''
         has_name = str(has_name_raw).strip() if has_name_raw else ''
         
-        print(f"[DEBUG] clean() forcing values - has_id: {repr(has_id)}, has_name: {repr(has_name)}")
+        logger.debug("clean() forcing values - has_id: %s, has_name: %s", repr(has_id), repr(has_name))
         
         # FORCER les valeurs dans cleaned_data
         if has_id:
@@ -537,7 +528,7 @@ class PersonForm(forms.ModelForm):
             # Supprimer l'erreur si elle existe
             if 'has_id' in self.errors:
                 del self.errors['has_id']
-                print(f"[DEBUG] clean() removed has_id error")
+                logger.debug("clean() removed has_id error")
         elif not has_id:
             # Si vide, ajouter l'erreur
             self.add_error('has_id', "Ce champ ne peut pas être vide.")
@@ -547,14 +538,14 @@ class PersonForm(forms.ModelForm):
             # Supprimer l'erreur si elle existe
             if 'has_name' in self.errors:
                 del self.errors['has_name']
-                print(f"[DEBUG] clean() removed has_name error")
+                logger.debug("clean() removed has_name error")
         elif not has_name:
             # Si vide, ajouter l'erreur
             self.add_error('has_name', "Ce champ ne peut pas être vide.")
         
-        print(f"[DEBUG] clean() FINAL - has_id in cleaned_data: {'has_id' in cleaned_data}, value: {repr(cleaned_data.get('has_id'))}")
-        print(f"[DEBUG] clean() FINAL - has_name in cleaned_data: {'has_name' in cleaned_data}, value: {repr(cleaned_data.get('has_name'))}")
-        print(f"[DEBUG] clean() FINAL - errors: {list(self.errors.keys())}")
+        logger.debug("clean() FINAL - has_id in cleaned_data: %s, value: %s", 'has_id' in cleaned_data, repr(cleaned_data.get('has_id')))
+        logger.debug("clean() FINAL - has_name in cleaned_data: %s, value: %s", 'has_name' in cleaned_data, repr(cleaned_data.get('has_name')))
+        logger.debug("clean() FINAL - errors: %s", list(self.errors.keys()))
         
         return cleaned_data
     
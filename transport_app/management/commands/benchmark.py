@@ -0,0 +1,51 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmark.generator import SIZES, resolve_counts
+from core.benchmark.runner import run_benchmark
+
+ENTITIES = ('cities', 'companies', 'stations', 'transports', 'persons', 'tickets', 'itineraries', 'schedules')
+
+
+class Command(BaseCommand):
+    help = ('Offline benchmark: p50/p95 latency and SPARQL/SQL queries per request for every '
+            'list/detail/create/update/delete path, against a local Fuseki stand-in and a '
+            'synthetic Tunisian network (uses throwaway test databases)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', choices=sorted(SIZES), default='small',
+                            help='Network preset (default: small)')
+        for entity in ENTITIES:
+            parser.add_argument(f'--{entity}', type=int, help=f'Override the number of {entity}')
+        parser.add_argument('--repeat', type=int, default=5, help='Measured requests per path')
+        parser.add_argument('--warmup', type=int, default=1, help='Unmeasured requests per path')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--apps', help='Comma-separated subset, e.g. "itinerary,city"')
+        parser.add_argument('--json', dest='json_path', help='Also write the results to this file')
+
+    def handle(self, *args, **options):
+        counts = resolve_counts(options['size'], **{e: options[e] for e in ENTITIES})
+        apps = [a.strip() for a in options['apps'].split(',')] if options['apps'] else None
+
+        self.stdout.write('⏱️  Benchmark hors ligne (Fuseki local simulé)')
+        try:
+            report = run_benchmark(
+                counts,
+                repeat=options['repeat'],
+                warmup=options['warmup'],
+                seed=options['seed'],
+                apps=apps,
+                log=self.stdout.write,
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        errors = sum(r['errors'] for r in report['results'])
+        if errors:
+            self.stdout.write(self.style.WARNING(f'⚠️ {errors} requête(s) en erreur'))
+        if options['json_path']:
+            with open(options['json_path'], 'w', encoding='utf-8') as fh:
+                json.dump(report, fh, indent=2, ensure_ascii=False)
+            self.stdout.write(f"Résultats écrits dans {options['json_path']}")
+        self.stdout.write(self.style.SUCCESS('✅ Benchmark terminé'))
@@ -0,0 +1,58 @@
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+from core.utils.bulk_import import DEFAULT_BATCH_SIZE, METHODS, BulkImporter, BulkImportError
+
+
+class Command(BaseCommand):
+    help = ('Bulk-load itineraries, schedules, cities and companies from CSV or JSON Lines '
+            '(form validation, batched writes, resumable from a checkpoint)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV file with a header line, or JSON Lines file')
+        parser.add_argument('--entity', choices=['itinerary', 'schedule', 'city', 'company'],
+                            help="Entity of rows without an 'entity' column")
+        parser.add_argument('--format', choices=['csv', 'jsonl'],
+                            help='Input format (default: from the file extension)')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                            help=f'Rows per write (default: {DEFAULT_BATCH_SIZE})')
+        parser.add_argument('--method', choices=METHODS, default='insert',
+                            help='insert: one INSERT DATA per batch; gsp: Graph Store POST per target graph')
+        parser.add_argument('--checkpoint', help='Checkpoint file (default: <path>.checkpoint)')
+        parser.add_argument('--restart', action='store_true',
+                            help='Ignore an existing checkpoint and start from the first row')
+
+    def handle(self, *args, **options):
+        def reject(line, reason):
+            self.stderr.write(f"⚠️  ligne {line}: {reason}")
+
+        def progress(stats):
+            self.stdout.write(
+                f"📦 {stats['rows']} lignes lues, {stats['loaded']} chargées "
+                f"({stats['rate']:.0f} lignes/s)"
+            )
+
+        try:
+            importer = BulkImporter(
+                options['path'],
+                entity=options['entity'],
+                fmt=options['format'],
+                batch_size=options['batch_size'],
+                method=options['method'],
+                checkpoint=options['checkpoint'],
+                restart=options['restart'],
+                reject=reject,
+                progress=progress if options['verbosity'] >= 1 else None,
+            )
+            stats = importer.run()
+        except (BulkImportError, OSError) as e:
+            raise CommandError(str(e))
+        except requests.exceptions.RequestException as e:
+            raise CommandError(f"Impossible de joindre Fuseki: {e} (relancez la commande pour reprendre)")
+
+        if stats['resumed']:
+            self.stdout.write(f"↪️  {stats['resumed']} lignes déjà importées ignorées (reprise)")
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {stats['loaded']} entités importées, {stats['rejected']} rejetées "
+            f"en {stats['seconds']:.1f}s ({stats['rate']:.0f} lignes/s)"
+        ))
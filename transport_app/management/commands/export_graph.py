@@ -0,0 +1,44 @@
+import sys
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+from core.utils.export import FORMATS, ExportError, filename, iter_export
+
+
+class Command(BaseCommand):
+    help = ('Stream the whole Fuseki dataset, or one ontology class, as N-Triples, N-Quads '
+            'or CSV (constant memory, optional gzip)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=sorted(FORMATS), default='nq')
+        parser.add_argument('--type', dest='cls', help='Ontology class to export, e.g. Itinerary')
+        parser.add_argument('--gzip', action='store_true', help='Gzip the output')
+        parser.add_argument('--inferred', action='store_true',
+                            help='Include the materialized inference graph')
+        parser.add_argument('-o', '--output',
+                            help='Output file ("-" for stdout; default: <type>.<format>[.gz])')
+
+    def handle(self, *args, **options):
+        fmt, cls, gzip = options['format'], options['cls'], options['gzip']
+        output = options['output'] or filename(fmt, cls, gzip)
+        to_stdout = output == '-'
+
+        try:
+            chunks = iter_export(fmt, cls, gzip=gzip, include_inferred=options['inferred'])
+            out = sys.stdout.buffer if to_stdout else open(output, 'wb')
+            written = 0
+            try:
+                for chunk in chunks:
+                    out.write(chunk)
+                    written += len(chunk)
+            finally:
+                if not to_stdout:
+                    out.close()
+        except ExportError as e:
+            raise CommandError(str(e))
+        except requests.exceptions.RequestException as e:
+            raise CommandError(f"Impossible de joindre Fuseki: {e}")
+
+        if not to_stdout:
+            self.stdout.write(self.style.SUCCESS(f'✅ {written} octets exportés dans {output}'))
@@ -4,19 +4,27 @@ from core.utils.rdf_loader import load_ontology_to_fuseki
 
 class Command(BaseCommand):
     help = 'Initialize ontology with base data and sync existing Django data'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true',
+                            help='Reload the ontology TTL even if it is unchanged')
+        parser.add_argument('--full', action='store_true',
+                            help='Upload every station and transport, not only the changed ones')
     
     def handle(self, *args, **options):
         try:
             # 1. Load base ontology
             self.stdout.write('Loading base ontology...')
-            result = load_ontology_to_fuseki()
-            self.stdout.write(self.style.SUCCESS('Base ontology loaded successfully'))
+            if load_ontology_to_fuseki(force=options['force']):
+                self.stdout.write(self.style.SUCCESS('Base ontology loaded successfully'))
+            else:
+                self.stdout.write(self.style.SUCCESS('Base ontology unchanged, upload skipped'))
             
             # 2. Sync existing Django data
             self.stdout.write('Syncing existing Django data...')
             sync_service = OntologySyncService()
-            sync_result = sync_service.sync_all_data()
+            sync_result = sync_service.sync_all_data(incremental=not options['full'])
             self.stdout.write(self.style.SUCCESS(f'Data sync completed: {sync_result}'))
             
         except Exception as e:
-            self.stdout.write(self.style.ERROR(f'Error: {e}'))
\ No newline at end of file
+            self.stdout.write(self.style.ERROR(f'Error: {e}'))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.utils.inference import inference_enabled, inference_graph, refresh_inferred_types
+
+
+class Command(BaseCommand):
+    help = ('Rebuild the whole inference graph from the asserted types (writes only re-derive '
+            'the subjects they touched; use this after editing Fuseki from outside the application)')
+
+    def handle(self, *args, **options):
+        if not inference_enabled():
+            raise CommandError("FUSEKI_MATERIALIZE_INFERENCE est désactivé")
+        if not refresh_inferred_types():
+            raise CommandError(f"Reconstruction de {inference_graph()} échouée (voir les logs)")
+        self.stdout.write(self.style.SUCCESS(f"✅ Graphe d'inférence reconstruit: {inference_graph()}"))
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.utils.partitions import BATCH_SIZE, merge, partitioned, repartition
+
+
+class Command(BaseCommand):
+    help = ('Move the instances of FUSEKI_GRAPH and of the default graph to one named graph per '
+            'entity type (run before setting FUSEKI_PARTITION_GRAPHS), or merge them back')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only count the subjects that would be moved')
+        parser.add_argument('--merge', action='store_true',
+                            help='Undo the split: add every partition back to FUSEKI_GRAPH and drop it')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                            help=f'Subjects moved per update (default {BATCH_SIZE})')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size doit être au moins 1")
+
+        if options['merge']:
+            if options['dry_run']:
+                raise CommandError("--dry-run ne s'applique pas à --merge")
+            merge(log=lambda graph: self.stdout.write(f"↩️  {graph} -> FUSEKI_GRAPH"))
+            self.stdout.write(self.style.SUCCESS("✅ Graphes fusionnés"))
+            if partitioned():
+                self.stdout.write(self.style.WARNING("⚠️  FUSEKI_PARTITION_GRAPHS est encore activé"))
+            return
+
+        def log(entity, count, graph):
+            self.stdout.write(f"📦 {entity}: {count} sujet(s) -> {graph}")
+
+        try:
+            counts = repartition(dry_run=options['dry_run'], batch_size=options['batch_size'], log=log)
+        except Exception as e:
+            raise CommandError(f"Répartition interrompue: {e}")
+
+        if options['dry_run']:
+            for entity, count in sorted(counts.items()):
+                self.stdout.write(f"🔎 {entity}: {count} sujet(s) à déplacer")
+        total = sum(counts.values())
+        verb = "à déplacer" if options['dry_run'] else "déplacé(s)"
+        self.stdout.write(self.style.SUCCESS(f"✅ {total} sujet(s) {verb}"))
+        if not options['dry_run'] and not partitioned():
+            self.stdout.write("ℹ️  Activez FUSEKI_PARTITION_GRAPHS=true pour lire et écrire dans les partitions")
@@ -0,0 +1,44 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmark.startup import TARGETS, profile_startup
+
+
+class Command(BaseCommand):
+    help = ('Import-time profile (python -X importtime) of a fresh process: django.setup() as paid '
+            'by every manage.py command, or setup plus the URLconf as paid by a worker boot')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target', choices=sorted(TARGETS), action='append',
+                            help='Start to profile (repeatable, default: setup and urls)')
+        parser.add_argument('--repeat', type=int, default=3, help='Fresh interpreters per target')
+        parser.add_argument('--top', type=int, default=15, help='Slowest top-level imports to list')
+        parser.add_argument('--json', dest='json_path', help='Also write the results to this file')
+
+    def handle(self, *args, **options):
+        reports = []
+        for target in options['target'] or ['setup', 'urls']:
+            try:
+                report = profile_startup(target, repeat=options['repeat'], top=options['top'])
+            except RuntimeError as e:
+                raise CommandError(f"Démarrage '{target}' en échec: {e}")
+            reports.append(report)
+
+            self.stdout.write(
+                f"⏱️  {target}: imports {report['import_ms']:.0f} ms, "
+                f"processus {report['wall_ms']:.0f} ms (médiane de {options['repeat']})"
+            )
+            for module, ms in report['top']:
+                self.stdout.write(f"    {ms:8.1f} ms  {module}")
+            if report['heavy']:
+                self.stdout.write(self.style.WARNING(
+                    f"⚠️  Modules lourds chargés au démarrage: {', '.join(report['heavy'])}"
+                ))
+
+        if options['json_path']:
+            with open(options['json_path'], 'w', encoding='utf-8') as fh:
+                json.dump([{k: v for k, v in r.items() if k != 'modules'} for r in reports],
+                          fh, indent=2, ensure_ascii=False)
+            self.stdout.write(f"Résultats écrits dans {options['json_path']}")
+        self.stdout.write(self.style.SUCCESS('✅ Profil de démarrage terminé'))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from core.utils.warmup import STEPS, warm_up
+
+
+class Command(BaseCommand):
+    help = ('Warm-up stage: open the Fuseki connection pool, build the in-process indexes and '
+            'choice lists, and render the list pages once to fill their caches')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--step', choices=[name for name, _ in STEPS], action='append',
+                            help='Run only this step (repeatable, default: all)')
+
+    def handle(self, *args, **options):
+        def log(name, ms, error):
+            if error:
+                self.stdout.write(self.style.WARNING(f"⚠️  {name}: {error} ({ms:.0f} ms)"))
+            else:
+                self.stdout.write(f"🔥 {name}: {ms:.0f} ms")
+
+        report = warm_up(steps=options['step'], log=log)
+        total = sum(ms for _, ms, _ in report)
+        failed = sum(1 for *_, error in report if error)
+        message = f"✅ Préchauffage terminé en {total:.0f} ms"
+        if failed:
+            message += f" ({failed} étape(s) en échec)"
+        self.stdout.write(self.style.SUCCESS(message))
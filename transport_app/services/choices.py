@@ -0,0 +1,152 @@
+# transport_app/services/choices.py - Cached <select> options for the CRUD forms
+#
+# StationForm/TransportForm/PersonForm/TicketForm used to rebuild their
+# options on every instantiation: one query per subclass table, and for the
+# ticket transports a SPARQL query plus one lookup per line number. Each list
+# is now built with a single SQL query (the ticket transports: one SPARQL
+# query and one batched SQL lookup) and kept in process until a version stamp
+# it depends on changes. ORM writes bump 'orm' (signals wired in core.apps) and
+# ontology writes bump 'graph', so a warm form costs one stamp read whatever
+# the table sizes, and every worker sees a write on its next form.
+import logging
+import threading
+
+from core.utils.versioning import GRAPH, ORM, versions
+from transport_app.models import (
+    Company, Person, Schedule, Station, Transport,
+)
+
+logger = logging.getLogger(__name__)
+
+STATION_TYPES = ('BusStop', 'MetroStation', 'TrainStation', 'TramStation')
+COMPANY_TYPES = ('BusCompany', 'MetroCompany')
+TRANSPORT_TYPES = ('Bus', 'Metro', 'Train', 'Tram')
+
+TRANSPORTS_QUERY = """
+PREFIX : <http://www.transport-ontology.org/travel#>
+PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+
+SELECT ?transport ?line ?type
+WHERE {
+    ?transport a :Transport ;
+            :Transport_hasLineNumber ?line .
+    BIND(
+        IF(EXISTS { ?transport a :Bus }, "Bus",
+        IF(EXISTS { ?transport a :Metro }, "Metro",
+        IF(EXISTS { ?transport a :Train }, "Train",
+        IF(EXISTS { ?transport a :Tram }, "Tram", "Transport"))))
+        AS ?type)
+}
+ORDER BY ?line
+LIMIT 100
+"""
+
+
+class _Uncached(list):
+    """Options built from a fallback source: served, but not kept."""
+
+
+def _concrete(model, types, *fields):
+    """(pk, concrete subclass name, *fields) for rows of a multi-table subclass."""
+    children = [f"{name.lower()}__pk" for name in types]
+    rows = model.objects.values_list('pk', *fields, *children)
+    for row in rows:
+        pk, values, child_pks = row[0], row[1:1 + len(fields)], row[1 + len(fields):]
+        kind = next((name for name, child in zip(types, child_pks) if child is not None), None)
+        if kind:
+            yield (pk, kind, *values)
+
+
+def _sorted(options):
+    return sorted(options, key=lambda option: option[1])
+
+
+def _stations():
+    return _sorted((str(pk), f"{kind} — {name}")
+                   for pk, kind, name in _concrete(Station, STATION_TYPES, 'station_name'))
+
+
+def _companies():
+    return _sorted((str(pk), f"{kind} — {name}")
+                   for pk, kind, name in _concrete(Company, COMPANY_TYPES, 'company_name'))
+
+
+def _persons():
+    return _sorted((str(pk), f"{name} ({ident})")
+                   for pk, name, ident in Person.objects.values_list('pk', 'has_name', 'has_id'))
+
+
+def _schedules():
+    return [(str(pk), f"{schedule_id} - {route or 'No Route'}")
+            for pk, schedule_id, route in Schedule.objects.values_list('pk', 'schedule_id', 'route_name')]
+
+
+def _django_transports():
+    return _sorted((str(pk), f"{line} ({kind})")
+                   for pk, kind, line in _concrete(Transport, TRANSPORT_TYPES, 'transport_line_number'))
+
+
+def _ticket_transports():
+    """Transports known to the ontology that have a Django row (TicketForm.valid_for)."""
+    from core.utils.fuseki import sparql_query
+
+    try:
+        bindings = sparql_query(TRANSPORTS_QUERY, entity='transport').get('results', {}).get('bindings', [])
+    except Exception as e:
+        logger.warning("Erreur lors de la récupération des transports depuis l'ontologie: %s", e)
+        return _Uncached(_django_transports())
+
+    wanted = [(b['line']['value'], b.get('type', {}).get('value', 'Transport'))
+              for b in bindings if b.get('transport') and b.get('line')]
+    # Line numbers are unique: one lookup resolves every binding
+    children = [f"{name.lower()}__pk" for name in TRANSPORT_TYPES]
+    by_line = {}
+    for pk, line, *child_pks in Transport.objects.filter(
+            transport_line_number__in={line for line, _ in wanted}).values_list(
+            'pk', 'transport_line_number', *children):
+        by_line[line] = (pk, {name for name, child in zip(TRANSPORT_TYPES, child_pks) if child is not None})
+
+    options = []
+    for line, kind in wanted:
+        pk, kinds = by_line.get(line, (None, ()))
+        if pk is not None and (kind == 'Transport' or kind in kinds):
+            options.append((str(pk), f"{line} ({kind})"))
+    return _sorted(options)
+
+
+# name -> (stamps the list depends on, builder)
+LISTS = {
+    'stations': ((ORM,), _stations),
+    'companies': ((ORM,), _companies),
+    'persons': ((ORM,), _persons),
+    'schedules': ((ORM,), _schedules),
+    'ticket_transports': ((ORM, GRAPH), _ticket_transports),
+}
+
+_cache = {}
+_lock = threading.Lock()
+
+
+def form_choices(*names):
+    """{name: tuple of (value, label)} for the lists ``names``; one stamp read when warm."""
+    current = versions({key for name in names for key in LISTS[name][0]})
+    result = {}
+    for name in names:
+        keys, build = LISTS[name]
+        signature = tuple(current[key] for key in keys)
+        with _lock:
+            cached = _cache.get(name)
+        if cached and cached[0] == signature:
+            result[name] = cached[1]
+            continue
+        options = build()
+        result[name] = tuple(options)
+        if not isinstance(options, _Uncached):
+            with _lock:
+                _cache[name] = (signature, result[name])
+    return result
+
+
+def invalidate_choices():
+    with _lock:
+        _cache.clear()
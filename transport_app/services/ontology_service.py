@@ -1,8 +1,18 @@
+import hashlib
+
 import rdflib
 from rdflib import Graph, Namespace, URIRef, Literal
 from rdflib.namespace import RDF, RDFS, XSD
 from django.conf import settings
-import requests  # ← AJOUTEZ CET IMPORT MANQUANT
+from core.utils.circuit import call_class
+from core.utils.fuseki import get_session, put_graph, update_url
+from core.utils.inference import refreshes_inference, touching
+from core.utils.partitions import BATCH_SIZE, entity_graph, instance_graphs, partition_graph, partitioned, split
+from core.utils.versioning import bumps_version
+from core.utils.metrics import tracks_sync
+from core.utils.rdf_loader import META, meta_graph
+from .station_graph import station_saved, transport_saved, invalidate_station_index
+from itinerary.utils.route_planner import invalidate_route_planner
 from transport_app.models import (
     Station, BusStop, MetroStation, TrainStation, TramStation,
     Transport, Bus, Metro, Train, Tram, City, Company,
@@ -20,6 +30,15 @@ except ImportError:
 # Namespaces
 ONTOLOGY = Namespace("http://www.transport-ontology.org/travel#")
 
+
+def subject_digests(graph):
+    """{subject: SHA-1 of its sorted N-Triples} for an rdflib graph."""
+    lines = {}
+    for s, p, o in graph:
+        lines.setdefault(s, []).append(f"{p.n3()} {o.n3()}")
+    return {s: hashlib.sha1("\n".join(sorted(ls)).encode('utf-8')).hexdigest() for s, ls in lines.items()}
+
+
 class OntologySyncService:
     def __init__(self):
         self.graph = Graph()
@@ -159,64 +178,154 @@ class OntologySyncService:
         
         return company_uri
     
+    @tracks_sync('station')
     def sync_station_to_ontology(self, station):
         """Sync a single station to ontology"""
         self.graph = Graph()  # Reset graph
         self.graph.bind("", ONTOLOGY)
         station_uri = self.station_to_rdf(station)
         self._upload_to_fuseki()
+        station_saved(station)
+        invalidate_route_planner()
         return station_uri
     
+    @tracks_sync('transport')
     def sync_transport_to_ontology(self, transport):
         """Sync a single transport to ontology"""
         self.graph = Graph()  # Reset graph
         self.graph.bind("", ONTOLOGY)
         transport_uri = self.transport_to_rdf(transport)
         self._upload_to_fuseki()
+        transport_saved(transport)
+        invalidate_route_planner()
         return transport_uri
     
-    def sync_all_data(self):
-        """Sync all stations and transports to ontology"""
+    @tracks_sync('all')
+    def sync_all_data(self, incremental=True):
+        """
+        Sync all stations and transports to ontology. Incremental syncs only
+        replace the subjects whose triples changed since the last sync (per
+        subject digests kept in the <meta>/sync graph); a full sync replaces
+        all. Subjects the last sync wrote and Django no longer has are deleted.
+        """
         self.graph = Graph()  # Reset graph
         self.graph.bind("", ONTOLOGY)
         
         # Sync all stations
         for station_class in [BusStop, MetroStation, TrainStation, TramStation]:
-            for station in station_class.objects.all():
+            for station in station_class.objects.select_related('located_in'):
                 self.station_to_rdf(station)
         
         # Sync all transports
         for transport_class in [Bus, Metro, Train, Tram]:
-            for transport in transport_class.objects.all():
+            for transport in transport_class.objects.select_related(
+                    'departs_from__located_in', 'arrives_at__located_in',
+                    'operated_by__based_in').prefetch_related('operates_in'):
                 self.transport_to_rdf(transport)
         
-        result = self._upload_to_fuseki()
-        return f"Synced {len(self.graph)} triples to ontology"
+        digests = subject_digests(self.graph)
+        stored = self._sync_digests()
+        previous = stored if incremental else {}
+        changed = {s for s, digest in digests.items() if previous.get(s) != digest}
+        # Subjects the last sync wrote whose rows are gone from Django
+        removed = set(stored) - set(digests)
+        if changed or removed:
+            full = self.graph
+            self.graph = Graph()
+            self.graph.bind("", ONTOLOGY)
+            for triple in full:
+                if triple[0] in changed:
+                    self.graph.add(triple)
+            self._upload_to_fuseki(removed, put=not incremental)
+        if digests != stored:
+            self._save_sync_digests(digests)
+        return (f"Synced {len(self.graph) if changed else 0} triples to ontology "
+                f"({len(changed)}/{len(digests)} subjects changed, {len(removed)} removed)")
+
+    @staticmethod
+    def _sync_digests():
+        """{subject: digest} recorded by the last sync."""
+        from core.utils.fuseki import sparql_query_all_graphs
+        result = sparql_query_all_graphs(
+            f"SELECT ?s ?d WHERE {{ GRAPH <{meta_graph('sync')}> {{ ?s <{META.digest}> ?d }} }}"
+        )
+        return {
+            URIRef(b['s']['value']): b['d']['value']
+            for b in result.get('results', {}).get('bindings', [])
+        }
+
+    @staticmethod
+    def _save_sync_digests(digests):
+        from core.utils.fuseki import put_graph
+        state = Graph()
+        for subject, digest in digests.items():
+            state.add((subject, META.digest, Literal(digest)))
+        put_graph(meta_graph('sync'), state)
     
-    def _upload_to_fuseki(self):
-        """Upload current graph to Fuseki"""
+    @bumps_version()
+    @refreshes_inference
+    def _upload_to_fuseki(self, removed=(), put=False):
+        """
+        Replace the triples of the current graph's subjects in Fuseki (each in
+        its entity graph when partitioned) and delete the ``removed`` subjects.
+        ``put`` replaces the station/transport partition wholesale (full sync).
+        """
         try:
             if not hasattr(settings, 'FUSEKI_URL'):
                 raise Exception("FUSEKI_URL not configured in settings")
-            
-            rdf_data = self.graph.serialize(format='turtle')
-            
-            # Upload to Fuseki
-            upload_url = f"{settings.FUSEKI_URL}/{settings.FUSEKI_DATASET}/data"
-            if hasattr(settings, 'FUSEKI_GRAPH') and settings.FUSEKI_GRAPH:
-                upload_url += f"?graph={settings.FUSEKI_GRAPH}"
-            
-            headers = {'Content-Type': 'text/turtle'}
-            response = requests.post(upload_url, data=rdf_data.encode('utf-8'), headers=headers, timeout=30)
-            
-            if response.status_code != 200:
-                raise Exception(f"Fuseki upload failed: {response.status_code} - {response.text}")
-            
-            return response
-            
+
+            # Stations, transports, cities, companies, persons and tickets each
+            # go to their own graph (core.utils.partitions)
+            if getattr(settings, 'FUSEKI_GRAPH', None):
+                parts = split(self.graph)
+            else:
+                parts = {None: self.graph}
+            operations = []
+            with touching(set(self.graph.subjects()) | set(removed)):
+                for graph_uri, part in parts.items():
+                    if put and partitioned() and graph_uri == partition_graph('station'):
+                        # Only the sync writes the network partition
+                        put_graph(graph_uri, part)
+                        continue
+                    operations += [self._replace_update(graph_uri, part, subject)
+                                   for subject in sorted(set(part.subjects()))]
+                if removed:
+                    operations.append(self._delete_update(removed))
+                for start in range(0, len(operations), BATCH_SIZE):
+                    self._post_update(" ;\n".join(operations[start:start + BATCH_SIZE]))
+
         except Exception as e:
             raise Exception(f"Erreur lors de l'upload vers Fuseki: {e}")
 
+    @staticmethod
+    def _replace_update(graph_uri, graph, subject):
+        """DELETE then INSERT DATA of one subject: Fuseki keeps its current values only."""
+        def scoped(body):
+            return f"GRAPH <{graph_uri}> {{ {body} }}" if graph_uri else body
+
+        statements = "\n".join(f"{s.n3()} {p.n3()} {o.n3()} ." for s, p, o in graph.triples((subject, None, None)))
+        return (f"DELETE WHERE {{ {scoped(f'{subject.n3()} ?p ?o')} }} ;\n"
+                f"INSERT DATA {{ {scoped(statements)} }}")
+
+    @staticmethod
+    def _delete_update(subjects):
+        values = " ".join(f"<{s}>" for s in sorted(subjects))
+        if not getattr(settings, 'FUSEKI_GRAPH', None):
+            return f"DELETE {{ ?s ?p ?o }} WHERE {{ VALUES ?s {{ {values} }} ?s ?p ?o }}"
+        graphs = " ".join(f"<{g}>" for g in instance_graphs())
+        return (f"DELETE {{ GRAPH ?g {{ ?s ?p ?o }} }} "
+                f"WHERE {{ VALUES ?s {{ {values} }} VALUES ?g {{ {graphs} }} GRAPH ?g {{ ?s ?p ?o }} }}")
+
+    @staticmethod
+    def _post_update(update):
+        with call_class('bulk'):
+            response = get_session().post(update_url(), data={'update': update},
+                                          headers={'Content-Type': 'application/x-www-form-urlencoded'})
+        if response.status_code not in (200, 204):
+            raise Exception(f"Fuseki update failed: {response.status_code} - {response.text}")
+        return response
+
+    @tracks_sync('station')
     def delete_station_from_ontology(self, station):
         """Delete station from ontology"""
         station_uri = f"{ONTOLOGY}station_{station.id}"
@@ -227,8 +336,11 @@ class OntologySyncService:
         }}
         """
         from core.utils.fuseki import sparql_update
-        sparql_update(delete_query)
+        sparql_update(delete_query, graph=entity_graph('station'))
+        invalidate_station_index()
+        invalidate_route_planner()
     
+    @tracks_sync('transport')
     def delete_transport_from_ontology(self, transport):
         """Delete transport from ontology"""
         transport_uri = f"{ONTOLOGY}{transport.__class__.__name__}_{transport.transport_line_number}"
@@ -239,7 +351,10 @@ class OntologySyncService:
         }}
         """
         from core.utils.fuseki import sparql_update
-        sparql_update(delete_query)    
+        sparql_update(delete_query, graph=entity_graph('transport'))
+        invalidate_station_index()
+        invalidate_route_planner()
+
     def person_to_rdf(self, person):
         """Convert Person instance to RDF"""
         # Utiliser has_id pour créer un URI stable
@@ -322,6 +437,7 @@ class OntologySyncService:
         
         return person_uri
     
+    @tracks_sync('person')
     def sync_person_to_ontology(self, person):
         """Sync a single person to ontology"""
         self.graph = Graph()  # Reset graph
@@ -330,6 +446,7 @@ class OntologySyncService:
         self._upload_to_fuseki()
         return person_uri
     
+    @tracks_sync('person')
     def delete_person_from_ontology(self, person):
         """Delete person from ontology"""
         person_id = person.has_id.replace('-', '_').replace(' ', '_')
@@ -341,7 +458,7 @@ class OntologySyncService:
         }}
         """
         from core.utils.fuseki import sparql_update
-        sparql_update(delete_query)
+        sparql_update(delete_query, graph=entity_graph('person'))
     
     def ticket_to_rdf(self, ticket):
         """Convert Ticket instance to RDF"""
@@ -436,6 +553,7 @@ class OntologySyncService:
         
         return ticket_uri
     
+    @tracks_sync('ticket')
     def sync_ticket_to_ontology(self, ticket):
         """Sync a single ticket to ontology"""
         self.graph = Graph()  # Reset graph
@@ -444,6 +562,7 @@ class OntologySyncService:
         self._upload_to_fuseki()
         return ticket_uri
     
+    @tracks_sync('ticket')
     def delete_ticket_from_ontology(self, ticket):
         """Delete ticket from ontology"""
         ticket_id = ticket.has_ticket_id.replace('-', '_').replace(' ', '_')
@@ -455,4 +574,4 @@ class OntologySyncService:
         }}
         """
         from core.utils.fuseki import sparql_update
-        sparql_update(delete_query)
+        sparql_update(delete_query, graph=entity_graph('ticket'))
@@ -0,0 +1,284 @@
+# transport_app/services/station_graph.py - In-memory station connectivity index
+#
+# :connectedTo is symmetric and transitive in the ontology, so "is B reachable
+# from A" is a connected-components question. Instead of running property-path
+# queries against Fuseki, the station graph is loaded once from Django
+# (Station.connected_to, Transport departs_from/arrives_at) and the ontology
+# (:connectedTo triples), stored as compact adjacency arrays, and every station
+# carries a component label so reachability is a single array comparison.
+#
+# The index is per process and keyed by the version stamps of the Django rows
+# and of the graph (core.utils.versioning): a station or transport write from
+# any worker, the admin included, makes the next lookup rebuild it. The
+# sync-service hooks below patch it in place in the writing process meanwhile.
+import logging
+import threading
+from array import array
+
+from core.utils.versioning import GRAPH, ORM, versions
+from transport_app.models import Station, Transport
+
+ONTOLOGY_NS = "http://www.transport-ontology.org/travel#"
+
+logger = logging.getLogger(__name__)
+
+
+def station_uri(station):
+    """URI used by OntologySyncService for a Django station (instance or pk)."""
+    pk = getattr(station, 'pk', station)
+    return f"{ONTOLOGY_NS}station_{pk}"
+
+
+def _node_key(value):
+    """Accept a Station, a pk, a full URI or a ':local' / 'local' ontology name."""
+    if isinstance(value, Station) or isinstance(value, int):
+        return station_uri(value)
+    text = str(value).strip()
+    if text.isdigit():
+        return station_uri(int(text))
+    if text.startswith('<') and text.endswith('>'):
+        text = text[1:-1]
+    if text.startswith('http'):
+        return text
+    return f"{ONTOLOGY_NS}{text.lstrip(':')}"
+
+
+class StationGraphIndex:
+    """
+    Undirected station graph with an incrementally maintained component table.
+
+    - Nodes are station URIs mapped to dense integer ids.
+    - Edges live in two parallel ``array('l')`` columns; a CSR view (offsets and
+      targets) is rebuilt lazily for neighbour scans.
+    - ``_component[i]`` is the component label of node i. Unions relabel the
+      smaller component (small-to-large), so adding an edge costs O(min size)
+      amortised and ``is_reachable`` is O(1).
+
+    Transports are directed (departs_from -> arrives_at) but lines run both
+    ways, so they are indexed as undirected links like :connectedTo. Removing
+    an edge cannot be done incrementally; callers invalidate the index instead.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._ids = {}
+        self._uris = []
+        self._component = array('l')
+        self._members = {}
+        self._src = array('l')
+        self._dst = array('l')
+        self._csr = None
+        # Django-sourced links, kept to detect removals on re-sync
+        self._station_links = {}
+        self._transport_links = {}
+        # Version stamps the index was built at (get_station_index)
+        self.signature = None
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+    def add_station(self, station):
+        """Register a node (idempotent) and return its integer id."""
+        key = _node_key(station)
+        with self._lock:
+            node = self._ids.get(key)
+            if node is None:
+                node = len(self._uris)
+                self._ids[key] = node
+                self._uris.append(key)
+                self._component.append(node)
+                self._members[node] = [node]
+            return node
+
+    def add_edge(self, a, b):
+        """Add an undirected link and merge the two components if needed."""
+        with self._lock:
+            u = self.add_station(a)
+            v = self.add_station(b)
+            if u == v:
+                return
+            self._src.append(u)
+            self._dst.append(v)
+            self._csr = None
+            self._union(u, v)
+
+    def _union(self, u, v):
+        cu, cv = self._component[u], self._component[v]
+        if cu == cv:
+            return
+        if len(self._members[cu]) < len(self._members[cv]):
+            cu, cv = cv, cu
+        moved = self._members.pop(cv)
+        for node in moved:
+            self._component[node] = cu
+        self._members[cu].extend(moved)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def is_reachable(self, a, b):
+        """True if a path of links joins a and b (O(1) component lookup)."""
+        ka, kb = _node_key(a), _node_key(b)
+        u, v = self._ids.get(ka), self._ids.get(kb)
+        if u is None or v is None:
+            return ka == kb
+        return self._component[u] == self._component[v]
+
+    def reachable_from(self, station):
+        """URIs of every station in the same component (the connectedTo closure)."""
+        node = self._ids.get(_node_key(station))
+        if node is None:
+            return []
+        with self._lock:
+            return [self._uris[n] for n in self._members[self._component[node]]]
+
+    def neighbours(self, station):
+        """Direct links of a station, read from the CSR adjacency arrays."""
+        node = self._ids.get(_node_key(station))
+        if node is None:
+            return []
+        offsets, targets = self._adjacency()
+        return [self._uris[targets[i]] for i in range(offsets[node], offsets[node + 1])]
+
+    def _adjacency(self):
+        with self._lock:
+            if self._csr is None:
+                n = len(self._uris)
+                degree = array('l', [0]) * (n + 1)
+                for u, v in zip(self._src, self._dst):
+                    degree[u + 1] += 1
+                    degree[v + 1] += 1
+                for i in range(n):
+                    degree[i + 1] += degree[i]
+                offsets = degree
+                cursor = array('l', offsets)
+                targets = array('l', [0]) * (2 * len(self._src))
+                for u, v in zip(self._src, self._dst):
+                    targets[cursor[u]] = v
+                    cursor[u] += 1
+                    targets[cursor[v]] = u
+                    cursor[v] += 1
+                self._csr = (offsets, targets)
+            return self._csr
+
+    def stats(self):
+        return {
+            'stations': len(self._uris),
+            'links': len(self._src),
+            'components': len(self._members),
+        }
+
+    # ------------------------------------------------------------------
+    # Incremental maintenance from the Django write path
+    # ------------------------------------------------------------------
+    def sync_station(self, station):
+        """
+        Apply a created/updated station. Returns False when links were removed,
+        in which case the caller must invalidate the index.
+        """
+        linked = set(station.connected_to.values_list('pk', flat=True))
+        with self._lock:
+            previous = self._station_links.get(station.pk, set())
+            if previous - linked:
+                return False
+            self.add_station(station)
+            for other in linked - previous:
+                self.add_edge(station.pk, other)
+                # connected_to is symmetrical: record the reverse link too
+                self._station_links.setdefault(other, set()).add(station.pk)
+            self._station_links[station.pk] = linked
+            return True
+
+    def sync_transport(self, transport):
+        """Apply a created/updated transport; False if an existing link changed."""
+        link = (transport.departs_from_id, transport.arrives_at_id)
+        with self._lock:
+            previous = self._transport_links.get(transport.pk)
+            if previous is not None and previous != link:
+                return False
+            if previous is None and None not in link:
+                self.add_edge(link[0], link[1])
+            self._transport_links[transport.pk] = link
+            return True
+
+
+# ----------------------------------------------------------------------
+# LOADING
+# ----------------------------------------------------------------------
+def build_station_index(include_ontology=True):
+    """Build a fresh index from the Django tables and ontology :connectedTo triples."""
+    index = StationGraphIndex()
+
+    for pk in Station.objects.values_list('pk', flat=True):
+        index.add_station(pk)
+
+    through = Station.connected_to.through
+    for a, b in through.objects.values_list('from_station_id', 'to_station_id'):
+        # Symmetrical M2M rows exist in both directions; index each link once
+        index._station_links.setdefault(a, set()).add(b)
+        if a < b:
+            index.add_edge(a, b)
+
+    transports = Transport.objects.values_list('pk', 'departs_from_id', 'arrives_at_id')
+    for pk, dep, arr in transports:
+        index._transport_links[pk] = (dep, arr)
+        if dep is not None and arr is not None:
+            index.add_edge(dep, arr)
+
+    if include_ontology:
+        try:
+            from core.utils.fuseki import sparql_query
+            result = sparql_query(f"""
+            PREFIX : <{ONTOLOGY_NS}>
+            SELECT DISTINCT ?a ?b WHERE {{ ?a :connectedTo ?b }}
+            """, entity='station')
+            for b in result.get('results', {}).get('bindings', []):
+                index.add_edge(b['a']['value'], b['b']['value'])
+        except Exception as e:
+            logger.warning("Station index built without ontology links: %s", e)
+
+    return index
+
+
+# Stations and transports are Django rows (ORM); :connectedTo links come from the graph
+STAMPS = (ORM, GRAPH)
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_station_index():
+    """Process-wide index, built on first use, after invalidation and once a stamp moved."""
+    global _index
+    current = versions(STAMPS)
+    signature = tuple(current[key] for key in STAMPS)
+    index = _index
+    if index is None or index.signature != signature:
+        with _index_lock:
+            if _index is None or _index.signature != signature:
+                _index = build_station_index()
+                _index.signature = signature
+            index = _index
+    return index
+
+
+def invalidate_station_index():
+    global _index
+    with _index_lock:
+        _index = None
+
+
+def station_saved(station):
+    """Write-path hook: keep the index current after a station create/update."""
+    if _index is not None and not _index.sync_station(station):
+        invalidate_station_index()
+
+
+def transport_saved(transport):
+    """Write-path hook: keep the index current after a transport create/update."""
+    if _index is not None and not _index.sync_transport(transport):
+        invalidate_station_index()
+
+
+def is_reachable(a, b):
+    return get_station_index().is_reachable(a, b)
@@ -1,3 +1,105 @@
-from django.test import TestCase
+from core.benchmark.testing import StandInTestCase
+from transport_app.services.choices import form_choices
+from transport_app.services.station_graph import get_station_index
+from transport_app.models import Bus, BusStop, City, Passager
+from ticket_app.models import TicketSimple
 
-# Create your tests here.
+
+class ListViewQueryBudgetTests(StandInTestCase):
+    """SQL and SPARQL budgets of the Django-backed list pages."""
+
+    def test_list_stations(self):
+        self.assertViewBudget('/transport/stations/', sql=5, sparql=1)
+
+    def test_list_transports(self):
+        self.assertViewBudget('/transport/transports/', sql=5, sparql=1)
+
+    def test_list_persons(self):
+        self.assertViewBudget('/transport/persons/', sql=5, sparql=1)
+
+    def test_list_tickets(self):
+        self.assertViewBudget('/ticket/tickets/', sql=6, sparql=1)
+
+
+class ListViewScalingTests(StandInTestCase):
+    """Adding rows must not add queries (no per-row ORM access)."""
+
+    def _assert_constant(self, path, add_rows):
+        before = self.request(path)['db_queries']
+        add_rows()
+        after = self.request(path)['db_queries']
+        self.assertEqual(after, before, f"{path}: {after - before} extra SQL queries for new rows")
+
+    def test_list_transports_constant(self):
+        stops = list(BusStop.objects.all()[:2])
+
+        def add_rows():
+            for i in range(5):
+                Bus.objects.create(
+                    transport_line_number=f"SCALE-{i}", departs_from=stops[0], arrives_at=stops[1],
+                )
+        self._assert_constant('/transport/transports/', add_rows)
+
+    def test_list_stations_constant(self):
+        city = City.objects.first()
+
+        def add_rows():
+            for i in range(5):
+                BusStop.objects.create(station_name=f"Scale {i}", located_in=city)
+        self._assert_constant('/transport/stations/', add_rows)
+
+    def test_list_persons_constant(self):
+        def add_rows():
+            for i in range(5):
+                Passager.objects.create(has_id=f"SCALE-P-{i}", has_name=f"Scale {i}")
+        self._assert_constant('/transport/persons/', add_rows)
+
+    def test_list_tickets_constant(self):
+        owner = Passager.objects.first()
+        transport = Bus.objects.first()
+
+        def add_rows():
+            for i in range(5):
+                TicketSimple.objects.create(
+                    has_ticket_id=f"SCALE-T-{i}", has_price=1.0, owned_by=owner, valid_for=transport,
+                )
+        self._assert_constant('/ticket/tickets/', add_rows)
+
+
+class FormChoicesTests(StandInTestCase):
+    """Create forms build their option lists once, until a write bumps a stamp."""
+
+    def _warm(self, path):
+        cold = self.request(path)
+        self.assertEqual(cold['status'], 200, f"{path} answered {cold['status']}")
+        warm = self.request(path)
+        self.assertLess(warm['db_queries'], cold['db_queries'], f"{path}: lists rebuilt on a warm form")
+        return cold, warm
+
+    def test_create_forms_warm(self):
+        for path in ('/transport/transports/create/', '/transport/persons/create/'):
+            self._warm(path)
+
+    def test_ticket_form_transports_cached(self):
+        cold, warm = self._warm('/ticket/tickets/create/')
+        self.assertEqual(cold['sparql_queries'], 1)
+        self.assertEqual(warm['sparql_queries'], 0)
+
+    def test_write_invalidates(self):
+        form_choices('persons')
+        person = Passager.objects.create(has_id="CHOICE-P", has_name="Choice")
+        labels = dict(form_choices('persons')['persons'])
+        self.assertEqual(labels[str(person.pk)], "Choice (CHOICE-P)")
+
+
+class StationIndexTests(StandInTestCase):
+    """The reachability index follows writes that bypass the sync service."""
+
+    def test_orm_write_rebuilds_the_index(self):
+        city = City.objects.first()
+        a = BusStop.objects.create(station_name="Index A", located_in=city)
+        b = BusStop.objects.create(station_name="Index B", located_in=city)
+        self.assertFalse(get_station_index().is_reachable(a, b))
+        # As the admin or another worker would: no sync-service hook runs here
+        a.connected_to.add(b)
+        self.assertTrue(get_station_index().is_reachable(a, b))
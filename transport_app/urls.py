@@ -7,6 +7,7 @@ urlpatterns = [
     path('stations/create/', views.create_station, name='create_station'),
     path('stations/<int:pk>/update/', views.update_station, name='update_station'),
     path('stations/<int:pk>/delete/', views.delete_station, name='delete_station'),
+    path('stations/reachable/', views.station_reachability, name='station_reachability'),
     
     # Transports
     path('transports/', views.list_transports, name='list_transports'),
@@ -1,3 +1,4 @@
+import logging
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.core.exceptions import ValidationError
@@ -11,6 +12,11 @@ from .models import (
     Schedule, DailySchedule, Person, Conducteur, Contrôleur, EmployéAgence, Passager
 )
 from .forms import StationForm, TransportForm, PersonForm
+from .services.station_graph import get_station_index
+from core.utils.list_cache import ListCache
+from core.utils.versioning import ORM, conditional_page
+
+logger = logging.getLogger(__name__)
 
 # Import des services ontologie
 try:
@@ -19,11 +25,17 @@ try:
     from core.utils.fuseki import sparql_query, sparql_update
     ONTOLOGY_AVAILABLE = True
 except ImportError as e:
-    print(f"Ontology services not available: {e}")
+    logger.warning("Ontology services not available: %s", e)
     ONTOLOGY_AVAILABLE = False
 
+# Ontology part of the list pages, until a Django or graph write
+ONTOLOGY_STATIONS = ListCache('ontology_stations', ORM)
+ONTOLOGY_TRANSPORTS = ListCache('ontology_transports', ORM)
+ONTOLOGY_PERSONS = ListCache('ontology_persons', ORM)
+
 # ==================== STATIONS ====================
 
+@conditional_page(ORM)
 def list_stations(request):
     stations = []
     for subclass in Station.__subclasses__():
@@ -51,18 +63,18 @@ def list_stations(request):
             
             SELECT ?station ?name ?location ?accessibility
             WHERE {
-                ?station a/rdfs:subClassOf* :Station ;
+                ?station a :Station ;
                         :Station_hasName ?name .
                 OPTIONAL { ?station :Station_hasLocation ?location }
                 OPTIONAL { ?station :Station_hasAccessibility ?accessibility }
             }
             LIMIT 20
             """
-            result = sparql_query(sparql)
+            result = ONTOLOGY_STATIONS.get(lambda: sparql_query(sparql, entity='station'))
             ontology_stations = result.get('results', {}).get('bindings', [])
             
         except Exception as e:
-            print(f"[ERROR] Erreur requete ontologie: {e}")
+            logger.error("Erreur requete ontologie: %s", e)
             messages.warning(request, f"Impossible de charger les données de l'ontologie: {e}")
 
     return render(request, 'list_stations.html', {
@@ -143,12 +155,30 @@ def delete_station(request, pk):
         'type': 'station'
     })
 
+def station_reachability(request):
+    """JSON: is station `to` reachable from station `from` (pk, URI or :local name)."""
+    source = request.GET.get('from')
+    target = request.GET.get('to')
+    if not source:
+        return JsonResponse({'error': "Paramètre 'from' requis"}, status=400)
+
+    index = get_station_index()
+    data = {'from': source, 'stats': index.stats()}
+    if target:
+        data['to'] = target
+        data['reachable'] = index.is_reachable(source, target)
+    else:
+        data['reachable_stations'] = index.reachable_from(source)
+    return JsonResponse(data)
+
 # ==================== TRANSPORTS ====================
 
+@conditional_page(ORM)
 def list_transports(request):
     transports = []
     for subclass in Transport.__subclasses__():
-        transports.extend(subclass.objects.all())
+        # The table shows the stations and operator of every row
+        transports.extend(subclass.objects.select_related('departs_from', 'arrives_at', 'operated_by'))
     
     # Query ontology for additional transport data
     ontology_transports = []
@@ -160,14 +190,14 @@ def list_transports(request):
 
                     SELECT ?transport ?line ?capacity ?speed
                     WHERE {
-                        ?transport a/rdfs:subClassOf* :Transport ;
+                        ?transport a :Transport ;
                                 :Transport_hasLineNumber ?line .
                         OPTIONAL { ?transport :Transport_hasCapacity ?capacity }
                         OPTIONAL { ?transport :Transport_hasSpeed ?speed }
                     }
                     LIMIT 50
                     """
-            result = sparql_query(sparql)
+            result = ONTOLOGY_TRANSPORTS.get(lambda: sparql_query(sparql, entity='transport'))
             ontology_transports = result.get('results', {}).get('bindings', [])
         except Exception as e:
             messages.warning(request, f"Could not fetch ontology data: {e}")
@@ -344,14 +374,14 @@ def ontology_update_view(request):
                     generated_sparql = nl_to_sparql(question)
                 
                 if generated_sparql:
-                    print(f"[DEBUG] Requete generee: {generated_sparql}")
+                    logger.debug("Requete generee: %s", generated_sparql)
                     
                     if action == 'update':
                         try:
                             # Execute UPDATE query
-                            print("[DEBUG] Execution de la requete UPDATE...")
+                            logger.debug("Execution de la requete UPDATE...")
                             result = sparql_update(generated_sparql)
-                            print(f"[OK] UPDATE reussi - Status: {result.status_code}")
+                            logger.debug("UPDATE reussi - Status: %s", result.status_code)
                             
                             update_result = {
                                 'status': 'success',
@@ -359,16 +389,16 @@ def ontology_update_view(request):
                             }
                             
                         except Exception as e:
-                            print(f"[ERROR] Erreur UPDATE: {e}")
+                            logger.error("Erreur UPDATE: %s", e)
                             update_result = {
                                 'status': 'error',
                                 'message': f"Erreur lors de l'exécution: {e}"
                             }
                     else:
                         # Execute SELECT query
-                        print("[DEBUG] Execution de la requete SELECT...")
+                        logger.debug("Execution de la requete SELECT...")
                         results_data = sparql_query(generated_sparql)
-                        print(f"[OK] SELECT reussi - {len(results_data.get('results', {}).get('bindings', []))} resultats")
+                        logger.debug("SELECT reussi - %s resultats", len(results_data.get('results', {}).get('bindings', [])))
                         
                         # Preprocess results
                         table_headers = []
@@ -394,7 +424,7 @@ def ontology_update_view(request):
                 else:
                     messages.error(request, "Impossible de générer la requête SPARQL")
             except Exception as e:
-                print(f"[ERROR] Erreur generale: {e}")
+                logger.error("Erreur generale: %s", e)
                 update_result = {
                     'status': 'error',
                     'message': f"Erreur: {e}"
@@ -458,6 +488,7 @@ def ontology_status_view(request):
 
 # ==================== PERSONS ====================
 
+@conditional_page(ORM)
 def list_persons(request):
     """List all persons grouped by type"""
     persons = []
@@ -480,14 +511,13 @@ def list_persons(request):
             SELECT DISTINCT ?person ?id ?name ?age ?email ?role ?phoneNumber ?type
             WHERE {
                 {
-                    ?person a/rdfs:subClassOf* :Person .
+                    ?person a :Person .
                     OPTIONAL { ?person :hasID ?id }
                     OPTIONAL { ?person :hasName ?name }
                 }
                 UNION
                 {
                     ?person :hasID ?id .
-                    OPTIONAL { ?person a/rdfs:subClassOf* :Person }
                     OPTIONAL { ?person :hasName ?name }
                 }
                 OPTIONAL { ?person :hasAge ?age }
@@ -504,13 +534,13 @@ def list_persons(request):
             ORDER BY ?name
             LIMIT 100
             """
-            result = sparql_query(sparql)
+            result = ONTOLOGY_PERSONS.get(lambda: sparql_query(sparql, entity='person'))
             ontology_persons = result.get('results', {}).get('bindings', [])
-            print(f"[DEBUG] Personnes de l'ontologie: {len(ontology_persons)} trouvées")
+            logger.debug("Personnes de l'ontologie: %s trouvées", len(ontology_persons))
             if ontology_persons:
-                print(f"[DEBUG] Première personne: {ontology_persons[0]}")
+                logger.debug("Première personne: %s", ontology_persons[0])
         except Exception as e:
-            print(f"[ERROR] Erreur lors de la récupération des personnes de l'ontologie: {e}")
+            logger.error("Erreur lors de la récupération des personnes de l'ontologie: %s", e)
             import traceback
             traceback.print_exc()
             messages.warning(request, f"Impossible de charger les données de l'ontologie: {e}")
@@ -526,21 +556,21 @@ def create_person(request):
     """Create a new person"""
     if request.method == 'POST':
         # Debug: afficher les données POST
-        print(f"[DEBUG] POST data: {request.POST}")
-        print(f"[DEBUG] has_id: {request.POST.get('has_id')}")
-        print(f"[DEBUG] has_name: {request.POST.get('has_name')}")
+        logger.debug("POST data: %s", request.POST)
+        logger.debug("has_id: %s", request.POST.get('has_id'))
+        logger.debug("has_name: %s", request.POST.get('has_name'))
         
         form = PersonForm(request.POST)
         
         # Appeler is_valid() explicitement
         is_valid = form.is_valid()
         
-        print(f"[DEBUG] Form is valid: {is_valid}")
-        print(f"[DEBUG] Form errors: {form.errors}")
+        logger.debug("Form is valid: %s", is_valid)
+        logger.debug("Form errors: %s", form.errors)
         if hasattr(form, 'cleaned_data'):
-            print(f"[DEBUG] Cleaned data keys: {list(form.cleaned_data.keys())}")
-            print(f"[DEBUG] has_id in cleaned_data: {'has_id' in form.cleaned_data}, value: {repr(form.cleaned_data.get('has_id'))}")
-            print(f"[DEBUG] has_name in cleaned_data: {'has_name' in form.cleaned_data}, value: {repr(form.cleaned_data.get('has_name'))}")
+            logger.debug("Cleaned data keys: %s", list(form.cleaned_data.keys()))
+            logger.debug("has_id in cleaned_data: %s, value: %s", 'has_id' in form.cleaned_data, repr(form.cleaned_data.get('has_id')))
+            logger.debug("has_name in cleaned_data: %s, value: %s", 'has_name' in form.cleaned_data, repr(form.cleaned_data.get('has_name')))
         
         if is_valid:
             try: